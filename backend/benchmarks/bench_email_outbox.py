@@ -0,0 +1,88 @@
+"""
+Email outbox delivery benchmark
+Delivers a batch of outbox rows through services.email_outbox against a mock
+Resend API that adds a fixed latency per request, comparing one request per
+message (the old behaviour) with the batch endpoint. No database or network
+is needed: rows are built in memory and handed straight to deliver().
+
+Usage:
+    cd backend
+    python benchmarks/bench_email_outbox.py                         # 500 messages, 120ms per request
+    python benchmarks/bench_email_outbox.py --messages 2000 --latency-ms 250
+"""
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+import httpx
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import settings
+from models import OutboxEmail, OutboxEmailStatus
+from models.admin import AdminUser  # noqa: F401  (configures the User mappers' relationships)
+from services import email_outbox as outbox_module
+from services.email_outbox import EmailOutbox
+
+
+def _rows(count: int) -> list:
+    now = datetime.utcnow()
+    return [
+        OutboxEmail(
+            id=str(uuid.uuid4()), category="statement", status=OutboxEmailStatus.PENDING,
+            to_email=f"user{i}@example.com", to_name=f"User {i}", subject="Your statement is ready",
+            html="<p>Your monthly statement is ready.</p>" * 20, inline_logo=False,
+            attempts=1, next_attempt_at=now, created_at=now,
+        )
+        for i in range(count)
+    ]
+
+
+def _transport(latency_seconds: float, counter: dict) -> httpx.AsyncBaseTransport:
+    async def handler(request: httpx.Request) -> httpx.Response:
+        counter["requests"] += 1
+        await asyncio.sleep(latency_seconds)
+        payload = json.loads(request.content)
+        if isinstance(payload, list):
+            return httpx.Response(200, json={"data": [{"id": str(uuid.uuid4())} for _ in payload]})
+        return httpx.Response(200, json={"id": str(uuid.uuid4())})
+    return httpx.MockTransport(handler)
+
+
+async def run(label: str, rows: list, latency_seconds: float, batch_limit: int) -> None:
+    counter = {"requests": 0}
+    outbox_module._RESEND_BATCH_LIMIT = batch_limit
+    outbox = EmailOutbox(resend_transport=_transport(latency_seconds, counter))
+    started = time.perf_counter()
+    results = await outbox.deliver(rows)
+    elapsed = time.perf_counter() - started
+    await outbox.shutdown()
+    sent = sum(1 for provider, _, _ in results.values() if provider)
+    print(
+        f"{label:<22} | {sent}/{len(rows)} sent in {elapsed:7.2f}s ({len(rows) / elapsed:8.1f} msg/s)"
+        f" | {counter['requests']} requests"
+    )
+
+
+async def main(args: argparse.Namespace) -> None:
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    settings.RESEND_API_KEY = "re_bench"
+    settings.SMTP_SERVER = ""
+    settings.EMAIL_RESEND_REQUESTS_PER_SECOND = 0  # measure the API, not the rate limit
+    rows = _rows(args.messages)
+    await run("request per message", rows, args.latency_ms / 1000, batch_limit=1)
+    await run("batch endpoint", rows, args.latency_ms / 1000, batch_limit=100)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=500)
+    parser.add_argument("--latency-ms", type=float, default=120.0, help="simulated Resend round trip per request")
+    asyncio.run(main(parser.parse_args()))
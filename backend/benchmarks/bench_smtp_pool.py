@@ -0,0 +1,118 @@
+"""
+SMTP pool benchmark
+Sends a batch of messages through utils.smtp_pool against an in-process SMTP
+server that adds latency to connection setup (standing in for TCP, STARTTLS
+and AUTH round trips to a hosted provider). Compares a session per message,
+the old behaviour, with pooled sessions.
+
+Usage:
+    cd backend
+    python benchmarks/bench_smtp_pool.py                            # 200 messages, pool sizes 1 and 4
+    python benchmarks/bench_smtp_pool.py --messages 500 --handshake-ms 400 --sizes 1 4 8
+"""
+import argparse
+import asyncio
+import sys
+import threading
+import time
+from email.mime.text import MIMEText
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import settings
+from utils.smtp_pool import SmtpPool
+
+DEFAULT_SIZES = [1, 4]
+
+
+class FakeSmtpServer:
+    """Minimal ESMTP server: accepts AUTH PLAIN and any message, delaying the greeting and login"""
+
+    def __init__(self, handshake_seconds: float, message_seconds: float):
+        self.handshake_seconds = handshake_seconds
+        self.message_seconds = message_seconds
+        self.sessions = 0
+        self.port = None
+        self._ready = threading.Event()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        async def reply(line: str) -> None:
+            writer.write(line.encode() + b"\r\n")
+            await writer.drain()
+
+        self.sessions += 1
+        await asyncio.sleep(self.handshake_seconds / 2)
+        await reply("220 bench ESMTP")
+        while line := await reader.readline():
+            command = line.decode().strip().upper()
+            if command.startswith("EHLO"):
+                await reply("250-bench\r\n250-AUTH PLAIN\r\n250 8BITMIME")
+            elif command.startswith("AUTH"):
+                await asyncio.sleep(self.handshake_seconds / 2)
+                await reply("235 Authenticated")
+            elif command == "DATA":
+                await reply("354 End data with <CR><LF>.<CR><LF>")
+                while (await reader.readline()) != b".\r\n":
+                    pass
+                await asyncio.sleep(self.message_seconds)
+                await reply("250 Queued")
+            elif command == "QUIT":
+                await reply("221 Bye")
+                break
+            else:
+                await reply("250 OK")
+        writer.close()
+
+    def _serve(self) -> None:
+        async def main():
+            server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+            self.port = server.sockets[0].getsockname()[1]
+            self._ready.set()
+            async with server:
+                await server.serve_forever()
+        asyncio.run(main())
+
+    def start(self) -> "FakeSmtpServer":
+        threading.Thread(target=self._serve, daemon=True).start()
+        self._ready.wait()
+        return self
+
+
+def _message(i: int) -> MIMEText:
+    msg = MIMEText(f"<p>Your statement #{i} is ready.</p>" * 20, "html")
+    msg["From"] = "bench@example.com"
+    msg["To"] = f"user{i}@example.com"
+    msg["Subject"] = "Your statement"
+    return msg
+
+
+async def run(server: FakeSmtpServer, label: str, messages: int, size: int, per_connection: int) -> None:
+    pool = SmtpPool(host="127.0.0.1", port=server.port, size=size, max_messages_per_connection=per_connection)
+    opened = server.sessions
+    started = time.perf_counter()
+    await asyncio.gather(*(pool.send(_message(i)) for i in range(messages)))
+    elapsed = time.perf_counter() - started
+    pool.close()
+    print(
+        f"{label:<20} threads {size:>2} | {messages} messages in {elapsed:7.2f}s ({messages / elapsed:8.1f} msg/s)"
+        f" | {server.sessions - opened} sessions opened"
+    )
+
+
+async def main(args: argparse.Namespace) -> None:
+    settings.SMTP_USE_TLS = False
+    server = FakeSmtpServer(args.handshake_ms / 1000, args.message_ms / 1000).start()
+    for size in args.sizes:
+        await run(server, "session per message", args.messages, size, per_connection=1)
+        await run(server, "pooled sessions", args.messages, size, per_connection=settings.SMTP_MAX_MESSAGES_PER_CONNECTION)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--handshake-ms", type=float, default=300.0, help="simulated connect + STARTTLS + AUTH time")
+    parser.add_argument("--message-ms", type=float, default=5.0, help="simulated server time per message")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="SMTP_POOL_SIZE values to compare")
+    asyncio.run(main(parser.parse_args()))
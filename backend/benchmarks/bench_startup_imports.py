@@ -0,0 +1,101 @@
+"""
+Startup import profile
+Imports ``main`` in a fresh interpreter under ``-X importtime`` and reports
+where cold-start time goes. Exits non-zero when the total exceeds the budget
+or when a deferred SDK is imported eagerly again, so it can gate CI.
+
+Usage:
+    cd backend
+    python benchmarks/bench_startup_imports.py                 # top 25, default budget
+    python benchmarks/bench_startup_imports.py --top 50 --budget-ms 2000
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+BACKEND_DIR = Path(__file__).parent.parent
+
+DEFAULT_BUDGET_MS = 2000.0
+
+# Heavy optional subsystems that must only be imported on first use
+DEFERRED_MODULES = [
+    "stytch",
+    "ably",
+    "cloudinary",
+    "reportlab",
+    "PIL",
+    "pytesseract",
+    "numpy",
+    "utils.pdf_generator",
+    "catalog.fallback_billers_data",
+    "data.names_database",
+]
+
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)$")
+
+
+def profile_imports(target: str = "main") -> List[Tuple[str, int, int, int]]:
+    """Return (module, self_us, cumulative_us, depth) for every module imported by ``target``"""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        cwd=BACKEND_DIR,
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
+        capture_output=True,
+        text=True,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"import {target} failed:\n{completed.stderr[-2000:]}")
+
+    rows = []
+    for line in completed.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            rows.append((module, int(self_us), int(cumulative_us), len(indent) // 2))
+    return rows
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", default="main", help="module to import (default: main)")
+    parser.add_argument("--top", type=int, default=25, help="modules to list by cumulative time")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS, help="fail above this total")
+    args = parser.parse_args()
+
+    rows = profile_imports(args.target)
+    total_ms = next((cumulative for module, _, cumulative, _ in rows if module == args.target), 0) / 1000
+
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for module, self_us, cumulative_us, depth in sorted(rows, key=lambda r: r[2], reverse=True)[:args.top]:
+        print(f"{cumulative_us / 1000:>14.1f} {self_us / 1000:>9.1f}  {'  ' * depth}{module}")
+
+    by_package: Dict[str, int] = defaultdict(int)
+    for module, self_us, _, _ in rows:
+        by_package[module.split(".")[0]] += self_us
+    print("\nSelf time by top-level package:")
+    for package, self_us in sorted(by_package.items(), key=lambda item: item[1], reverse=True)[:10]:
+        print(f"{self_us / 1000:>14.1f}  {package}")
+
+    imported = {module for module, _, _, _ in rows}
+    eager = [name for name in DEFERRED_MODULES if name in imported]
+
+    print(f"\nimport {args.target}: {total_ms:.0f}ms (budget {args.budget_ms:.0f}ms)")
+    failed = False
+    if total_ms > args.budget_ms:
+        print(f"FAIL: startup imports exceed the budget by {total_ms - args.budget_ms:.0f}ms")
+        failed = True
+    if eager:
+        print(f"FAIL: deferred modules imported at startup: {', '.join(eager)}")
+        failed = True
+    if not failed:
+        print("OK")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,103 @@
+"""
+Storage upload benchmark
+Uploads a batch of synthetic PDFs through utils.storage, fully offline: the
+local backend writes to a temp directory and the Cloudinary backend talks to
+an in-process mock of the Upload API with simulated latency and failures.
+Reports throughput and the worst event-loop stall seen during each run.
+
+Usage:
+    cd backend
+    python benchmarks/bench_storage_upload.py                                 # 200 x 200KB, concurrency 1/4/8/16
+    python benchmarks/bench_storage_upload.py --files 50 --size-kb 30000      # chunked uploads
+    python benchmarks/bench_storage_upload.py --latency-ms 150 --failure-rate 0.05
+"""
+import argparse
+import asyncio
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import httpx
+from config import settings
+from utils import storage
+
+DEFAULT_CONCURRENCY = [1, 4, 8, 16]
+
+
+def mock_upload_api(latency_seconds: float, failure_rate: float, seed: int = 1234) -> httpx.MockTransport:
+    """Cloudinary Upload API stand-in: sleeps, sometimes answers 503, otherwise echoes a result"""
+    rng = random.Random(seed)
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await request.aread()
+        await asyncio.sleep(latency_seconds)
+        if rng.random() < failure_rate:
+            return httpx.Response(503, json={"error": {"message": "Service unavailable"}})
+        return httpx.Response(200, json={
+            "public_id": "bench",
+            "secure_url": "https://res.cloudinary.com/bench/raw/upload/bench.pdf",
+            "bytes": len(request.content),
+            "format": "pdf",
+        })
+
+    return httpx.MockTransport(handler)
+
+
+async def _watch_loop(interval: float, stalls: list) -> None:
+    while True:
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        stalls.append(time.perf_counter() - started - interval)
+
+
+async def run(backend: storage.StorageBackend, label: str, files: int, payload: bytes, concurrency: int) -> None:
+    stalls: list = []
+    watcher = asyncio.create_task(_watch_loop(0.005, stalls))
+    started = time.perf_counter()
+    try:
+        results = await asyncio.gather(*(
+            backend.upload(payload, folder="bench", public_id=f"statement_{i}.pdf", resource_type="raw")
+            for i in range(files)
+        ))
+    finally:
+        elapsed = time.perf_counter() - started
+        watcher.cancel()
+        await backend.aclose()
+    assert all(result["url"] for result in results)
+    megabytes = files * len(payload) / 1_000_000
+    print(
+        f"{label:<10} concurrency {concurrency:>3} | {files} files in {elapsed:7.3f}s"
+        f" ({files / elapsed:8.1f} files/s, {megabytes / elapsed:7.1f} MB/s) | max loop stall {max(stalls or [0]) * 1000:6.1f}ms"
+    )
+
+
+async def main(args: argparse.Namespace) -> None:
+    payload = os.urandom(args.size_kb * 1024)
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    # Keep retry waits short so injected failures do not dominate the timings
+    storage._RETRY_BASE_DELAY_SECONDS = 0.01
+    settings.STORAGE_CHUNK_SIZE_BYTES = args.chunk_mb * 1024 * 1024
+    for concurrency in args.concurrency:
+        settings.STORAGE_MAX_CONCURRENT_UPLOADS = concurrency
+        with tempfile.TemporaryDirectory() as root:
+            await run(storage.LocalStorage(root=root, base_url="/media"), "local", args.files, payload, concurrency)
+        transport = mock_upload_api(args.latency_ms / 1000, args.failure_rate)
+        await run(storage.CloudinaryStorage(transport=transport), "cloudinary", args.files, payload, concurrency)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--size-kb", type=int, default=200)
+    parser.add_argument("--chunk-mb", type=int, default=20, help="STORAGE_CHUNK_SIZE_BYTES in MB (min 5)")
+    parser.add_argument("--latency-ms", type=float, default=80.0, help="simulated Upload API latency per request")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="share of mock requests answered with 503")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=DEFAULT_CONCURRENCY)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,81 @@
+"""
+TransactionGenerator benchmark
+Times array generation and row materialization for large synthetic histories.
+Before timing, checks the shape of small histories: the running balance never
+goes negative and no amount exceeds TransactionGenerator.MAX_AMOUNT.
+
+Usage:
+    cd backend
+    python benchmarks/bench_transaction_generator.py            # 1k, 100k, 1M rows
+    python benchmarks/bench_transaction_generator.py 5000 50000
+"""
+import sys
+import time
+from datetime import datetime
+from decimal import Decimal
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.transaction_generator import TransactionGenerator
+
+DEFAULT_SIZES = [1_000, 100_000, 1_000_000]
+START_DATE = datetime(2020, 1, 1)
+END_DATE = datetime(2024, 12, 31, 23, 59, 59)
+STARTING_BALANCE = Decimal("25000.00")
+
+# (starting balance, closing balance) for the shape check; 1,000 rows each
+SHAPE_CASES = [
+    (Decimal("5000.00"), Decimal("10000.00")),
+    (Decimal("100000.00"), Decimal("0.00")),
+    (Decimal("0.00"), Decimal("250000.00")),
+    (Decimal("25000.00"), Decimal("775000.00")),
+]
+SHAPE_SEEDS = range(1, 6)
+
+
+def check_shape() -> None:
+    cap_cents = int(TransactionGenerator.MAX_AMOUNT * 100)
+    for starting_balance, closing_balance in SHAPE_CASES:
+        for seed in SHAPE_SEEDS:
+            batch = TransactionGenerator(seed=seed).generate_batch(
+                START_DATE, END_DATE, starting_balance, closing_balance, 1_000
+            )
+            case = f"{starting_balance} -> {closing_balance}, seed {seed}"
+            assert int(batch.balance_after_cents[-1]) == int(closing_balance * 100), f"{case}: closing balance missed"
+            assert int(batch.balance_after_cents.min()) >= 0, f"{case}: balance dips to {batch.balance_after_cents.min() / 100}"
+            assert int(batch.amount_cents.max()) <= cap_cents, f"{case}: amount {batch.amount_cents.max() / 100} over the cap"
+    print(f"shape check passed ({len(SHAPE_CASES)} cases x {len(SHAPE_SEEDS)} seeds)")
+
+
+def run(size: int) -> None:
+    # Keep the average movement inside the generator's plausibility window
+    closing_balance = STARTING_BALANCE + Decimal(size) * Decimal("750.00")
+    generator = TransactionGenerator(seed=1234)
+
+    started = time.perf_counter()
+    batch = generator.generate_batch(START_DATE, END_DATE, STARTING_BALANCE, closing_balance, size)
+    array_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    rows = generator.generate_transactions(
+        START_DATE, END_DATE, STARTING_BALANCE, closing_balance, size, account_id="bench"
+    )
+    rows_seconds = time.perf_counter() - started
+
+    assert rows[-1]["balance_after"] == closing_balance, "closing balance constraint violated"
+    assert int(batch.balance_after_cents[-1]) == int(closing_balance * 100)
+    assert int(batch.balance_after_cents.min()) >= 0, "running balance went negative"
+
+    print(
+        f"{size:>10,} rows | arrays {array_seconds:8.3f}s ({size / array_seconds:>12,.0f} rows/s)"
+        f" | dict rows {rows_seconds:8.3f}s ({size / rows_seconds:>12,.0f} rows/s)"
+    )
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES
+    check_shape()
+    for size in sizes:
+        run(size)
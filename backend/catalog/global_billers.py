@@ -1,7 +1,6 @@
 from typing import List, Dict, Optional
 from services.biller_service import BillerService
 from utils.logger import logger
-from catalog.fallback_billers_data import FALLBACK_BILLERS
 
 # Map common full country names to ISO 2-letter codes
 _COUNTRY_NAME_TO_ISO = {
@@ -36,9 +35,15 @@ def _normalize_country(raw: str) -> str:
     return _COUNTRY_NAME_TO_ISO.get(val, val)
 
 
+def _fallback_billers() -> Dict[str, List[Dict]]:
+    """Built-in catalog, imported on first fallback rather than at startup."""
+    from catalog.fallback_billers_data import FALLBACK_BILLERS
+    return FALLBACK_BILLERS
+
+
 def _get_fallback(cc: str, q: Optional[str] = None, category: Optional[str] = None) -> List[Dict]:
     """Return built-in billers, optionally filtered by query/category."""
-    items = list(FALLBACK_BILLERS.get(cc, []))
+    items = list(_fallback_billers().get(cc, []))
     if category:
         items = [i for i in items if i.get("category", "").lower() == category.lower()]
     if q:
@@ -83,7 +88,7 @@ def find_entry_by_code(payee_code: str) -> Optional[Dict]:
 
     # Check fallback catalogs
     if payee_code.startswith("BLR-"):
-        for billers in FALLBACK_BILLERS.values():
+        for billers in _fallback_billers().values():
             for b in billers:
                 if b["payee_code"] == payee_code:
                     return b
@@ -102,4 +107,4 @@ def find_entry_by_code(payee_code: str) -> Optional[Dict]:
 
 def _iso2_codes() -> List[str]:
     """List of supported countries with fallback catalogs"""
-    return list(FALLBACK_BILLERS.keys())
+    return list(_fallback_billers().keys())
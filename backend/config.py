@@ -15,6 +15,37 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URL: str
+    DATABASE_READ_URL: Optional[str] = None  # Read replica for get_read_db routes; falls back to DATABASE_URL
+    DB_READ_STICKY_SECONDS: float = 5.0  # After a write, that principal reads from the primary for this long
+    RUN_MIGRATIONS_ON_STARTUP: bool = False  # Apply pending migrations in the API process instead of `python -m migrations upgrade`
+    DB_POOL_SIZE: int = 5  # Persistent connections kept per process
+    DB_MAX_OVERFLOW: int = 10  # Extra connections opened under burst load, closed on checkin
+    DB_POOL_TIMEOUT: float = 30.0  # Seconds to wait for a free connection before failing
+    DB_POOL_RECYCLE: int = 300  # Replace connections older than this (seconds); covers idle-closing managed Postgres
+    DB_POOL_PRE_PING: bool = False  # Ping on every checkout (one extra round-trip); recycle usually suffices
+    DB_STATEMENT_CACHE_SIZE: int = 100  # asyncpg per-connection statement cache
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = 100  # SQLAlchemy asyncpg dialect prepared statement cache
+    DB_PGBOUNCER_MODE: bool = False  # Transaction-pooling PgBouncer: disable prepared statement caching
+    DB_POOL_SLOW_CHECKOUT_MS: float = 250.0  # Log a warning with pool state when a checkout waits longer
+    QUERY_STATS_ENABLED: bool = True  # Count SQL statements and DB time per request
+    QUERY_STATS_SERVER_TIMING: bool = True  # Expose the counts as a Server-Timing response header
+    QUERY_REPEAT_WARN_THRESHOLD: int = 10  # Warn (possible N+1) when one statement shape repeats more often in a request
+    SLOW_QUERY_THRESHOLD_MS: float = 200.0  # Statements slower than this go to the slow query log
+    SLOW_QUERY_BUFFER_SIZE: int = 200  # Most recent slow queries kept in memory
+    SLOW_QUERY_EXPLAIN_SAMPLE_RATE: float = 0.1  # Fraction of slow queries re-run under EXPLAIN (ANALYZE for SELECTs)
+    SLOW_QUERY_EXPLAIN_TIMEOUT_MS: int = 5000  # statement_timeout for the EXPLAIN connection
+    HEALTH_DB_TIMEOUT_SECONDS: float = 2.0  # Upper bound on the database probe in /health and /ready
+    METRICS_TOKEN: Optional[str] = None  # When set, /metrics requires "Authorization: Bearer <token>"; required in production
+    LOOP_WATCHDOG_ENABLED: bool = True  # Measure event loop lag and log stacks of calls that block it
+    LOOP_LAG_SAMPLE_INTERVAL_MS: float = 100.0  # Heartbeat interval for lag measurement
+    LOOP_BLOCK_THRESHOLD_MS: float = 250.0  # Log the blocking stack when the loop is held longer than this
+    LOOP_BLOCK_STRICT: bool = False  # Raise after a request that blocked the loop (for test runs)
+    PROFILER_ENABLED: bool = False  # Install the on-demand request profiler (requests still need an admin-issued token)
+    PROFILER_MAX_CONCURRENT: int = 1  # Requests profiled at the same time; extra ones run unprofiled
+    PROFILER_INTERVAL_MS: float = 5.0  # Sampling interval
+    PROFILER_MAX_SECONDS: float = 30.0  # Stop sampling a request after this long
+    PROFILER_BUFFER_SIZE: int = 20  # Most recent profiles kept in memory
+    PROFILER_TOKEN_TTL_MINUTES: int = 15  # Lifetime of an admin-issued profile token
     
     # Redis
     REDIS_URL: str = "redis://localhost:6379"
@@ -38,6 +69,13 @@ class Settings(BaseSettings):
     CLOUDINARY_CLOUD_NAME: str
     CLOUDINARY_API_KEY: str
     CLOUDINARY_API_SECRET: str
+    STORAGE_BACKEND: str = "cloudinary"  # "cloudinary", or "local" to keep uploads on disk (development, offline benchmarks)
+    STORAGE_LOCAL_DIR: str = "./media"  # Root directory for the local storage backend
+    STORAGE_LOCAL_BASE_URL: str = "/media"  # URL prefix local uploads are served under
+    STORAGE_MAX_CONCURRENT_UPLOADS: int = 8  # Uploads in flight at once per process (also the connection pool size)
+    STORAGE_CHUNK_SIZE_BYTES: int = 20_000_000  # Larger files are uploaded in chunks of this size (min 5MB)
+    STORAGE_UPLOAD_RETRIES: int = 3  # Retries per request on network errors, 429 and 5xx, with exponential backoff
+    STORAGE_UPLOAD_TIMEOUT_SECONDS: float = 60.0  # Per-request timeout for storage uploads
     
     # Celery
     CELERY_BROKER_URL: str = "redis://localhost:6379/0"
@@ -50,13 +88,44 @@ class Settings(BaseSettings):
     SMTP_PASSWORD: str
     SMTP_FROM: str
     SMTP_TIMEOUT_SECONDS: int = 10  # Connection/operation timeout for SMTP
+    SMTP_USE_TLS: bool = True  # STARTTLS on ports other than 465; disable only for a local SMTP stand-in
+    SMTP_POOL_SIZE: int = 4  # Authenticated SMTP sessions (and sender threads) kept per process
+    SMTP_POOL_NOOP_AFTER_SECONDS: float = 30.0  # Pooled sessions idle longer than this are checked with NOOP before reuse
+    SMTP_POOL_MAX_IDLE_SECONDS: float = 240.0  # Pooled sessions idle longer than this are closed instead of reused
+    SMTP_MAX_MESSAGES_PER_CONNECTION: int = 100  # Sessions are replaced after this many messages (provider per-session limits)
     RESEND_API_KEY: Optional[str] = None # API Key for Resend API delivery
+    EMAIL_OUTBOX_WORKERS: int = 2  # Email outbox delivery tasks per API process (0 = this process only enqueues)
+    EMAIL_OUTBOX_BATCH_SIZE: int = 100  # Due emails claimed per worker round (one Resend batch request)
+    EMAIL_OUTBOX_POLL_SECONDS: float = 2.0  # Idle workers check for due emails this often; enqueues in the same process wake them at once
+    EMAIL_OUTBOX_LEASE_SECONDS: int = 300  # Claimed emails are retried after this long if their worker never reports back
+    EMAIL_OUTBOX_MAX_ATTEMPTS: int = 8  # Delivery rounds (backoff 30s doubling to 1h) before an email is dead-lettered
+    EMAIL_OUTBOX_RETENTION_DAYS: int = 14  # Sent emails are deleted after this many days; dead letters are kept
+    EMAIL_RESEND_REQUESTS_PER_SECOND: float = 2.0  # Resend API requests per second per process (0 = unlimited)
+    EMAIL_SMTP_MESSAGES_PER_SECOND: float = 10.0  # SMTP messages per second per process (0 = unlimited)
     
     # Frontend
     FRONTEND_URL: str = "http://localhost:3000"
     
     # Admin
     ADMIN_CODE: str
+    ADMIN_PRINCIPAL_CACHE_TTL_SECONDS: int = 60  # Admin role/status cache used by get_current_admin (0 disables)
+    USER_DELETION_BATCH_SIZE: int = 5000  # Rows per DELETE chunk in background user deletion
+    JOB_LEASE_SECONDS: int = 120  # A background job runner's claim expires this long after its last heartbeat
+    TRANSACTION_INSERT_CHUNK_SIZE: int = 1000  # Rows per multi-row INSERT for generated transactions
+    TRANSACTION_GENERATION_SYNC_LIMIT: int = 1000  # Larger generation requests run as background jobs
+    BULK_APPROVAL_MAX_ITEMS: int = 5000  # Upper bound on ids accepted by the admin bulk approve/decline endpoints
+    STATEMENT_RENDER_PROCESSES: int = 0  # PDF render processes for the monthly statement job (0 = one per CPU)
+    STATEMENT_IO_CONCURRENCY: int = 8  # Concurrent upload/save/email workers in the monthly statement job
+    STATEMENT_FETCH_BATCH_SIZE: int = 200  # Users read per batch by the monthly statement job
+    STATEMENT_MAX_ATTEMPTS: int = 3  # A user's statement is retried on reruns until it has failed this often
+    PDF_RENDER_PROCESSES: int = 2  # Statement render processes per API worker (0 = one per CPU)
+    PDF_RENDER_TIMEOUT_SECONDS: float = 60.0  # Per-statement render time limit
+    PDF_RENDER_MAX_TASKS_PER_CHILD: int = 200  # Render processes are replaced after this many statements (0 = never)
+    STATEMENT_EXPORT_BATCH_SIZE: int = 1000  # Rows fetched per server-side cursor batch by CSV/OFX/QFX exports
+    EXPORT_DEFAULT_BANK_ID: str = "026002561"  # OFX BANKID for accounts without a routing number
+    QFX_INTU_BID: Optional[str] = None  # Intuit-assigned institution id written to QFX exports (INTU.BID)
+    PDF_CANVAS_ROW_THRESHOLD: int = 1000  # Statements with more transactions use the direct canvas renderer
+    PDF_RENDER_PREWARM: bool = True  # Spawn and warm render processes at startup instead of on the first statement
     
     # Biller Directory APIs
     METHOD_FI_API_KEY: Optional[str] = None
@@ -67,6 +136,10 @@ class Settings(BaseSettings):
     ENVIRONMENT: str = "development"
     DEBUG: bool = False
     LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "json"  # "json" (one object per line) or "text"
+    LOG_QUEUE_SIZE: int = 10000  # Records buffered for the log writer thread; overflow is dropped and counted
+    LOG_SAMPLE_BURST: int = 50  # Records per call site allowed in each sampling window
+    LOG_SAMPLE_WINDOW_SECONDS: float = 10.0  # Sampling window per call site
     
     # Networking / Security
     # Comma-separated list of CIDRs/IPs that are trusted reverse proxies
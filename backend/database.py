@@ -1,8 +1,14 @@
+from sqlalchemy import Delete, Insert, Update, event
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
 from config import settings
+from utils.db_pool import InstrumentedAsyncPool, PoolMetrics, instrument_pool, instrumented_pool_class, publish_pool_metrics
+from utils.request_context import get_request_principal
+from typing import Dict
 import ssl
+import time
 from urllib.parse import urlparse, parse_qsl, urlencode, urlunparse, unquote
+from uuid import uuid4
 
 
 def _to_async_database_url(url: str) -> str:
@@ -52,17 +58,59 @@ def _asyncpg_connect_args_for_sslmode(sslmode: str | None) -> dict:
         return {"ssl": ctx}
     return {}
 
+
+def _statement_cache_connect_args() -> dict:
+    """Statement cache settings; PgBouncer (transaction pooling) mode disables them.
+
+    ``prepared_statement_cache_size`` and ``prepared_statement_name_func`` are
+    consumed by the SQLAlchemy asyncpg adapter, ``statement_cache_size`` by
+    asyncpg.connect().
+    """
+    if not settings.DB_PGBOUNCER_MODE:
+        return {
+            "prepared_statement_cache_size": settings.DB_PREPARED_STATEMENT_CACHE_SIZE,
+            "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        }
+    return {
+        "prepared_statement_cache_size": 0,
+        "statement_cache_size": 0,
+        # Unique names so a statement prepared on one server connection never collides on another
+        "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+    }
+
+
+def _create_engine(url: str, pool_class: type):
+    url = _to_async_database_url(url)
+    url, sslmode = _strip_unsupported_params_from_url(url)
+    created = create_async_engine(
+        url,
+        echo=settings.DEBUG,
+        future=True,
+        poolclass=pool_class,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        connect_args={**_asyncpg_connect_args_for_sslmode(sslmode), **_statement_cache_connect_args()},
+    )
+    instrument_pool(created.sync_engine.pool)
+    return created
+
+
 # Async database engine for FastAPI
-_db_url = _to_async_database_url(settings.DATABASE_URL)
-_db_url, _sslmode = _strip_unsupported_params_from_url(_db_url)
-
-engine = create_async_engine(
-    _db_url,
-    echo=settings.DEBUG,
-    future=True,
-    pool_pre_ping=True,
-    connect_args=_asyncpg_connect_args_for_sslmode(_sslmode),
-)
+engine = _create_engine(settings.DATABASE_URL, InstrumentedAsyncPool)
+
+# Read replica engine; the primary doubles as the read engine when none is configured
+read_pool_metrics = PoolMetrics()
+if settings.DATABASE_READ_URL:
+    read_engine = _create_engine(settings.DATABASE_READ_URL, instrumented_pool_class("replica", read_pool_metrics))
+else:
+    read_engine = engine
+
+publish_pool_metrics("primary", engine)
+if read_engine is not engine:
+    publish_pool_metrics("replica", read_engine)
 
 AsyncSessionLocal = sessionmaker(
     engine,
@@ -75,6 +123,75 @@ AsyncSessionLocal = sessionmaker(
 Base = declarative_base()
 
 
+# Read-your-writes: once a principal commits a write, its reads stay on the
+# primary for DB_READ_STICKY_SECONDS so replica lag never hides that write.
+# Auth dependencies publish the principal through set_request_principal().
+_primary_sticky_until: Dict[str, float] = {}
+_STICKY_PRUNE_THRESHOLD = 10000
+
+
+def _mark_recent_write() -> None:
+    principal_id = get_request_principal()
+    if read_engine is engine or not principal_id:
+        return
+    now = time.monotonic()
+    if len(_primary_sticky_until) > _STICKY_PRUNE_THRESHOLD:
+        for key in [key for key, until in _primary_sticky_until.items() if until <= now]:
+            _primary_sticky_until.pop(key, None)
+    _primary_sticky_until[principal_id] = now + settings.DB_READ_STICKY_SECONDS
+
+
+def _reads_pinned_to_primary() -> bool:
+    principal_id = get_request_principal()
+    if not principal_id:
+        return False
+    until = _primary_sticky_until.get(principal_id)
+    return until is not None and until > time.monotonic()
+
+
+@event.listens_for(Session, "after_flush")
+def _flag_flushed_writes(session, flush_context):
+    session.info["has_writes"] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _flag_orm_writes(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info["has_writes"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _pin_writer_to_primary(session):
+    if session.info.pop("has_writes", False):
+        _mark_recent_write()
+
+
+@event.listens_for(Session, "after_rollback")
+def _clear_write_flag(session):
+    session.info.pop("has_writes", None)
+
+
+class RoutingSession(Session):
+    """Sends reads to the replica; flushes, DML and recently-writing principals go to the primary"""
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self._flushing or isinstance(clause, (Insert, Update, Delete)) or _reads_pinned_to_primary():
+            return engine.sync_engine
+        return read_engine.sync_engine
+
+
+if read_engine is engine:
+    ReadSessionLocal = AsyncSessionLocal
+else:
+    ReadSessionLocal = sessionmaker(
+        class_=AsyncSession,
+        sync_session_class=RoutingSession,
+        expire_on_commit=False,
+        autocommit=False,
+        autoflush=False,
+    )
+
+
 async def get_db():
     """Database session dependency for FastAPI routes"""
     async with AsyncSessionLocal() as session:
@@ -82,3 +199,12 @@ async def get_db():
             yield session
         finally:
             await session.close()
+
+
+async def get_read_db():
+    """Session dependency for read-only routes; served by DATABASE_READ_URL when configured"""
+    async with ReadSessionLocal() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
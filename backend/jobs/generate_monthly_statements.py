@@ -1,6 +1,8 @@
 """
 Monthly Statement Generation Job
-Run this script at the end of each month to generate statements for all users
+Run this script at the end of each month to generate statements for all users.
+Progress is checkpointed per user, so rerunning it after a crash resumes the
+same month instead of starting over.
 """
 import asyncio
 import sys
@@ -13,19 +15,21 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 from config import settings
-from services.statement_service import StatementService
+from services.statement_pipeline import MonthlyStatementPipeline
 from utils.logger import logger
+from utils.storage import close_storage
 
 
 async def main():
     """Generate monthly statements for all users"""
     logger.info("Starting monthly statement generation job...")
     
-    # Create async engine
+    # Create async engine (sized for the pipeline's concurrent I/O workers)
     engine = create_async_engine(
         settings.DATABASE_URL,
         echo=False,
-        pool_pre_ping=True
+        pool_pre_ping=True,
+        pool_size=settings.STATEMENT_IO_CONCURRENCY + 2,
     )
     
     # Create session factory
@@ -36,24 +40,28 @@ async def main():
     )
     
     try:
-        async with async_session() as session:
-            result = await StatementService.generate_monthly_statements(session)
-            
-            logger.info("Monthly statement generation completed!")
-            logger.info(f"Period: {result['period']['start']} to {result['period']['end']}")
-            logger.info(f"Total users: {result['total_users']}")
-            logger.info(f"Successful: {result['success_count']}")
-            logger.info(f"Errors: {result['error_count']}")
-            
-            if result['errors']:
-                logger.warning(f"Errors encountered: {result['errors']}")
-            
-            return result
+        result = await MonthlyStatementPipeline(async_session).run()
+
+        logger.info("Monthly statement generation completed!")
+        logger.info(f"Job: {result['job_id']}")
+        logger.info(f"Period: {result['period']['start']} to {result['period']['end']}")
+        logger.info(f"Total users: {result['total_users']} ({result['items']})")
+        logger.info(f"Successful this run: {result['success_count']}")
+        logger.info(f"Errors this run: {result['error_count']}")
+        logger.info(f"Throughput: {result['users_per_second']} users/s, stage seconds {result['stage_seconds']}")
+
+        if result['exhausted_count']:
+            logger.warning(f"Out of attempts (not retried on rerun, need manual attention): {result['exhausted_count']} users")
+        if result['errors']:
+            logger.warning(f"Errors encountered: {result['errors']}")
+
+        return result
             
     except Exception as e:
         logger.error(f"Monthly statement generation failed: {e}")
         raise
     finally:
+        await close_storage()
         await engine.dispose()
 
 
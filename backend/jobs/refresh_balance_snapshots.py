@@ -0,0 +1,63 @@
+"""
+Daily Balance Snapshot Job
+Run this script nightly (after midnight UTC) to bring account_balance_snapshots
+up to date through yesterday. The first run, or a run with --backfill,
+rebuilds every day from the transaction ledger.
+
+    python jobs/refresh_balance_snapshots.py
+    python jobs/refresh_balance_snapshots.py --backfill [--start 2024-01-01] [--end 2024-12-31]
+"""
+import argparse
+import asyncio
+import sys
+from datetime import date
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+from config import settings
+from services.balance_snapshot_service import BalanceSnapshotService
+from utils.logger import logger
+
+
+async def main(backfill: bool = False, start: date = None, end: date = None):
+    """Refresh (or rebuild) daily balance snapshots"""
+    logger.info("Starting balance snapshot job...")
+
+    engine = create_async_engine(
+        settings.DATABASE_URL,
+        echo=False,
+        pool_pre_ping=True
+    )
+    async_session = sessionmaker(
+        engine,
+        class_=AsyncSession,
+        expire_on_commit=False
+    )
+
+    try:
+        async with async_session() as session:
+            if backfill:
+                result = {"mode": "backfill", "rows": await BalanceSnapshotService.backfill(session, start, end)}
+            else:
+                result = await BalanceSnapshotService.refresh(session)
+            await session.commit()
+            logger.info(f"Balance snapshot job completed: {result}")
+            return result
+    except Exception as e:
+        logger.error(f"Balance snapshot job failed: {e}")
+        raise
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backfill", action="store_true", help="Rebuild snapshots from the ledger instead of refreshing changed days")
+    parser.add_argument("--start", type=date.fromisoformat, help="First day to rebuild (with --backfill)")
+    parser.add_argument("--end", type=date.fromisoformat, help="Last day to rebuild (with --backfill; default yesterday)")
+    args = parser.parse_args()
+    asyncio.run(main(args.backfill, args.start, args.end))
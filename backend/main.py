@@ -1,15 +1,17 @@
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from contextlib import asynccontextmanager
 from config import settings
-from database import engine, Base, AsyncSessionLocal
+from database import engine, read_engine, AsyncSessionLocal
+from sqlalchemy import text as sa_text
 from routers import auth, verification, accounts, transfers, withdrawals, loans, notifications, support, profile, documents, bill_payments, deposits, virtual_cards, admin
 from routers import security as security_router
 import logging
 import asyncio
-import httpx
+import hmac
+from utils.http_client import outbound_client
 import os
 import time
 from datetime import datetime, timedelta
@@ -37,269 +39,50 @@ from models.virtual_card import VirtualCard
 from models.admin import AdminUser, AdminAuditLog, AdminPermission
 from models.security import TrustedDevice
 from models.user_restriction import UserRestriction
+from models.job import BackgroundJob
+from models.email_outbox import OutboxEmail
 
 logger = logging.getLogger(__name__)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Lifespan context manager for app startup and shutdown"""
-    from sqlalchemy import text
-    
     # Log timezone setting
     logger.info(f"Application timezone set to: {settings.TIMEZONE}")
 
-    # Step 1: ID Length Migrations (Critical for Stytch/Auth)
-    async with engine.begin() as conn:
-        try:
-            print("\n" + "="*50)
-            print("MIGRATION STAGE 1: ID COLUMN EXTENSIONS")
-            print("="*50)
-            await conn.execute(text("ALTER TABLE admin_users ALTER COLUMN id TYPE VARCHAR(255)"))
-            await conn.execute(text("ALTER TABLE admin_users ALTER COLUMN created_by TYPE VARCHAR(255)"))
-            await conn.execute(text("ALTER TABLE admin_audit_logs ALTER COLUMN id TYPE VARCHAR(255)"))
-            await conn.execute(text("ALTER TABLE admin_audit_logs ALTER COLUMN admin_id TYPE VARCHAR(255)"))
-            await conn.execute(text("ALTER TABLE admin_audit_logs ALTER COLUMN resource_id TYPE VARCHAR(255)"))
-            await conn.execute(text("ALTER TABLE admin_permissions ALTER COLUMN id TYPE VARCHAR(255)"))
-            print("SUCCESS: Stage 1 completed.")
-        except Exception as e:
-            print(f"STAGE 1 NOTICE: {e}")
-
-    # Step 2: Table Creation
-    async with engine.begin() as conn:
-        try:
-            print("MIGRATION STAGE 2: TABLE CREATION")
-            await conn.run_sync(Base.metadata.create_all)
-            print("SUCCESS: Stage 2 completed.")
-        except Exception as e:
-            print(f"STAGE 2 ERROR: {e}")
-
-    # Step 3: Functional Columns and Table Alterations
-    async with engine.begin() as conn:
-        try:
-            print("MIGRATION STAGE 3: FUNCTIONAL COLUMNS")
-            # User Columns
-            await conn.execute(text("ALTER TABLE users ADD COLUMN IF NOT EXISTS password_hash VARCHAR"))
-            await conn.execute(text("ALTER TABLE users ADD COLUMN IF NOT EXISTS transfer_pin VARCHAR"))
-            await conn.execute(text("ALTER TABLE users ADD COLUMN IF NOT EXISTS transfer_pin_failed_attempts INTEGER DEFAULT 0 NOT NULL"))
-            await conn.execute(text("ALTER TABLE users ADD COLUMN IF NOT EXISTS transfer_pin_locked_until TIMESTAMPTZ"))
-            await conn.execute(text("ALTER TABLE users ADD COLUMN IF NOT EXISTS email_verification_token VARCHAR"))
-            await conn.execute(text("ALTER TABLE users ADD COLUMN IF NOT EXISTS email_verification_expires FLOAT"))
-            await conn.execute(text("ALTER TABLE users ADD COLUMN IF NOT EXISTS password_reset_token VARCHAR"))
-            await conn.execute(text("ALTER TABLE users ADD COLUMN IF NOT EXISTS password_reset_expires FLOAT"))
-            await conn.execute(text("ALTER TABLE users ADD COLUMN IF NOT EXISTS two_factor_enabled BOOLEAN DEFAULT FALSE NOT NULL"))
-            await conn.execute(text("ALTER TABLE users ADD COLUMN IF NOT EXISTS two_factor_secret VARCHAR"))
-            await conn.execute(text("ALTER TABLE users ADD COLUMN IF NOT EXISTS biometric_enabled BOOLEAN DEFAULT FALSE NOT NULL"))
-            await conn.execute(text("ALTER TABLE users ADD COLUMN IF NOT EXISTS street_address VARCHAR"))
-            await conn.execute(text("ALTER TABLE users ADD COLUMN IF NOT EXISTS city VARCHAR"))
-            await conn.execute(text("ALTER TABLE users ADD COLUMN IF NOT EXISTS state VARCHAR"))
-            await conn.execute(text("ALTER TABLE users ADD COLUMN IF NOT EXISTS postal_code VARCHAR"))
-            await conn.execute(text("ALTER TABLE users ADD COLUMN IF NOT EXISTS is_active BOOLEAN DEFAULT TRUE NOT NULL"))
-            await conn.execute(text("ALTER TABLE users ADD COLUMN IF NOT EXISTS is_approved BOOLEAN DEFAULT FALSE NOT NULL"))
-            await conn.execute(text("ALTER TABLE users ADD COLUMN IF NOT EXISTS is_locked BOOLEAN DEFAULT FALSE NOT NULL"))
-            await conn.execute(text("ALTER TABLE users ADD COLUMN IF NOT EXISTS is_restricted BOOLEAN DEFAULT FALSE NOT NULL"))
-            await conn.execute(text("ALTER TABLE users ADD COLUMN IF NOT EXISTS restricted_until TIMESTAMPTZ"))
-            await conn.execute(text("ALTER TABLE users ADD COLUMN IF NOT EXISTS bio VARCHAR"))
-            await conn.execute(text("ALTER TABLE users ADD COLUMN IF NOT EXISTS last_login TIMESTAMPTZ"))
-            await conn.execute(text("ALTER TABLE users ADD COLUMN IF NOT EXISTS date_of_birth TIMESTAMPTZ"))
-            await conn.execute(text("ALTER TABLE users ADD COLUMN IF NOT EXISTS identity_verified BOOLEAN DEFAULT FALSE NOT NULL"))
-            await conn.execute(text("ALTER TABLE users ADD COLUMN IF NOT EXISTS phone_verified BOOLEAN DEFAULT FALSE NOT NULL"))
-            await conn.execute(text("ALTER TABLE users ADD COLUMN IF NOT EXISTS profile_picture_url VARCHAR"))
-            # Account Columns
-            await conn.execute(text("ALTER TABLE accounts ADD COLUMN IF NOT EXISTS routing_number VARCHAR"))
-            await conn.execute(text("ALTER TABLE accounts ADD COLUMN IF NOT EXISTS wallet_id VARCHAR"))
-            await conn.execute(text("ALTER TABLE accounts ADD COLUMN IF NOT EXISTS wallet_qrcode VARCHAR"))
-            # Loan Product Columns
-            await conn.execute(text("ALTER TABLE loan_products ADD COLUMN IF NOT EXISTS image_url VARCHAR"))
-            await conn.execute(text("ALTER TABLE loan_products ADD COLUMN IF NOT EXISTS base_interest_rate FLOAT"))
-            await conn.execute(text("ALTER TABLE loan_products ADD COLUMN IF NOT EXISTS min_term_months INTEGER"))
-            await conn.execute(text("ALTER TABLE loan_products ADD COLUMN IF NOT EXISTS max_term_months INTEGER"))
-            await conn.execute(text("ALTER TABLE loan_products ADD COLUMN IF NOT EXISTS employment_required BOOLEAN DEFAULT TRUE"))
-            await conn.execute(text("ALTER TABLE loan_products ADD COLUMN IF NOT EXISTS available_to_standard BOOLEAN DEFAULT TRUE"))
-            await conn.execute(text("ALTER TABLE loan_products ADD COLUMN IF NOT EXISTS available_to_priority BOOLEAN DEFAULT TRUE"))
-            await conn.execute(text("ALTER TABLE loan_products ADD COLUMN IF NOT EXISTS available_to_premium BOOLEAN DEFAULT TRUE"))
-            await conn.execute(text("ALTER TABLE loan_products ADD COLUMN IF NOT EXISTS tag VARCHAR"))
-            await conn.execute(text("ALTER TABLE loan_products ADD COLUMN IF NOT EXISTS features VARCHAR"))
-            # Loan Applications Columns
-            await conn.execute(text("ALTER TABLE loan_applications ADD COLUMN IF NOT EXISTS account_id VARCHAR"))
-            await conn.execute(text("ALTER TABLE loan_applications ADD COLUMN IF NOT EXISTS submitted_at TIMESTAMP"))
-            await conn.execute(text("ALTER TABLE loan_applications ADD COLUMN IF NOT EXISTS reviewed_at TIMESTAMP"))
-            await conn.execute(text("ALTER TABLE loan_applications ADD COLUMN IF NOT EXISTS approved_at TIMESTAMP"))
-            await conn.execute(text("ALTER TABLE loan_applications ADD COLUMN IF NOT EXISTS rejected_at TIMESTAMP"))
-            await conn.execute(text("ALTER TABLE loan_applications ADD COLUMN IF NOT EXISTS rejection_reason VARCHAR"))
-            await conn.execute(text("ALTER TABLE loan_applications ADD COLUMN IF NOT EXISTS approved_amount FLOAT"))
-            await conn.execute(text("ALTER TABLE loan_applications ADD COLUMN IF NOT EXISTS approved_interest_rate FLOAT"))
-            await conn.execute(text("ALTER TABLE loan_applications ADD COLUMN IF NOT EXISTS approved_term_months INTEGER"))
-            await conn.execute(text("ALTER TABLE loan_applications ADD COLUMN IF NOT EXISTS monthly_payment FLOAT"))
-            await conn.execute(text("ALTER TABLE loan_applications ADD COLUMN IF NOT EXISTS supporting_documents VARCHAR"))
-            await conn.execute(text("ALTER TABLE loan_applications ADD COLUMN IF NOT EXISTS purpose VARCHAR"))
-            await conn.execute(text("ALTER TABLE loan_applications ADD COLUMN IF NOT EXISTS annual_income FLOAT"))
-            await conn.execute(text("ALTER TABLE loan_applications ADD COLUMN IF NOT EXISTS employment_status VARCHAR"))
-            await conn.execute(text("ALTER TABLE loan_applications ADD COLUMN IF NOT EXISTS employer_name VARCHAR"))
-            await conn.execute(text("ALTER TABLE loan_applications ADD COLUMN IF NOT EXISTS credit_score INTEGER"))
-            # Loan Creation Columns (Admin)
-            await conn.execute(text("ALTER TABLE loans ADD COLUMN IF NOT EXISTS daily_interest_rate FLOAT DEFAULT 0.0"))
-            await conn.execute(text("ALTER TABLE loans ADD COLUMN IF NOT EXISTS created_by_admin BOOLEAN DEFAULT FALSE"))
-            
-            # Initial Data Cleanup
-            await conn.execute(text("UPDATE loan_products SET available_to_standard = TRUE WHERE available_to_standard IS NULL OR available_to_standard = ''"))
-            await conn.execute(text("UPDATE loan_products SET available_to_priority = TRUE WHERE available_to_priority IS NULL OR available_to_priority = ''"))
-            await conn.execute(text("UPDATE loan_products SET available_to_premium = TRUE WHERE available_to_premium IS NULL OR available_to_premium = ''"))
-            await conn.execute(text("UPDATE loan_products SET employment_required = TRUE WHERE employment_required IS NULL OR employment_required = ''"))
-            print("SUCCESS: Stage 3 completed.")
-        except Exception as e:
-            print(f"STAGE 3 NOTICE: {e}")
-
-    # Step 4: Enum Extensions (Separated to avoid transaction toxicity)
-    async with engine.begin() as conn:
-        try:
-            print("MIGRATION STAGE 4: ENUM EXTENSIONS")
-            # Transaction Types
-            for val in ['LOAN', 'loan', 'INTEREST', 'interest', 'FEE', 'fee']:
-                try: await conn.execute(text(f"ALTER TYPE transactiontype ADD VALUE IF NOT EXISTS '{val}'"))
-                except Exception: pass
-            # Transaction Status
-            for val in ['PENDING', 'pending', 'COMPLETED', 'completed', 'FAILED', 'failed']:
-                try: await conn.execute(text(f"ALTER TYPE transactionstatus ADD VALUE IF NOT EXISTS '{val}'"))
-                except Exception: pass
-            # Loan Application Status
-            for val in ['SUBMITTED', 'under_review', 'approved', 'rejected']:
-                try: await conn.execute(text(f"ALTER TYPE loanapplicationstatus ADD VALUE IF NOT EXISTS '{val}'"))
-                except Exception: pass
-            # Loan Types
-            for val in ['PERSONAL', 'HOME', 'AUTO', 'EDUCATION', 'BUSINESS']:
-                try: await conn.execute(text(f"ALTER TYPE loantype ADD VALUE IF NOT EXISTS '{val}'"))
-                except Exception: pass
-            # Loan Status
-            for val in ['ACTIVE', 'COMPLETED', 'DEFAULTED']:
-                try: await conn.execute(text(f"ALTER TYPE loanstatus ADD VALUE IF NOT EXISTS '{val}'"))
-                except Exception: pass
-            # Virtual Card Status
-            for val in ['declined', 'pending', 'suspended', 'inactive', 'active', 'blocked', 'cancelled', 'expired']:
-                try: await conn.execute(text(f"ALTER TYPE virtualcardstatus ADD VALUE IF NOT EXISTS '{val}'"))
-                except Exception: pass
-            # Virtual Card Types
-            for val in ['debit', 'credit']:
-                try: await conn.execute(text(f"ALTER TYPE virtualcardtype ADD VALUE IF NOT EXISTS '{val}'"))
-                except Exception: pass
-            # Deposit Status
-            for val in ['PENDING','PROCESSING','VERIFIED','COMPLETED','FAILED','REJECTED','CANCELLED',
-                        'pending','processing','verified','completed','failed','rejected','cancelled']:
-                try: await conn.execute(text(f"ALTER TYPE depositstatus ADD VALUE IF NOT EXISTS '{val}'"))
-                except Exception: pass
-            # Deposit Types
-            for val in ['CHECK_DEPOSIT','DIRECT_DEPOSIT','MOBILE_CHECK_DEPOSIT',
-                        'check_deposit','direct_deposit','mobile_check_deposit']:
-                try: await conn.execute(text(f"ALTER TYPE deposittype ADD VALUE IF NOT EXISTS '{val}'"))
-                except Exception: pass
-            print("SUCCESS: Stage 4 completed.")
-        except Exception as e:
-            print(f"STAGE 4 NOTICE: {e}")
-
-    # Step 5: Special Admin Resources & Data Normalization
-    async with engine.begin() as conn:
-        try:
-            print("MIGRATION STAGE 5: ADMIN RESOURCES")
-            # Fix existing products that were seeded with '{}' instead of '[]'
-            await conn.execute(text("UPDATE loan_products SET features = '[]' WHERE features = '{}'"))
-            # Normalize Deposit Data
-            status_map = {'pending': 'PENDING','processing': 'PROCESSING','verified': 'VERIFIED','completed': 'COMPLETED','failed': 'FAILED','rejected': 'REJECTED','cancelled': 'CANCELLED'}
-            for old, new in status_map.items():
-                try: await conn.execute(text(f"UPDATE deposits SET status = '{new}' WHERE status = '{old}'"))
-                except Exception: pass
-            print("SUCCESS: Stage 5 completed.")
-        except Exception as e:
-            print(f"STAGE 5 NOTICE: {e}")
-
-    # Step 6: Composite Indexes (Isolated because errors here are common but non-critical)
-    async with engine.begin() as conn:
-        print("MIGRATION STAGE 6: COMPOSITE INDEXES")
-        index_ddls = [
-            "CREATE INDEX IF NOT EXISTS ix_transactions_account_created ON transactions (account_id, created_at)",
-            "CREATE INDEX IF NOT EXISTS ix_transactions_user_created ON transactions (user_id, created_at)",
-            "CREATE INDEX IF NOT EXISTS ix_transactions_status ON transactions (status)",
-            "CREATE INDEX IF NOT EXISTS ix_transfers_from_account_created ON transfers (from_account_id, created_at)",
-            "CREATE INDEX IF NOT EXISTS ix_transfers_user_created ON transfers (from_user_id, created_at)",
-            "CREATE INDEX IF NOT EXISTS ix_transfers_status ON transfers (status)",
-            "CREATE INDEX IF NOT EXISTS ix_transfers_scheduled_status ON transfers (status, scheduled_for)",
-            "CREATE INDEX IF NOT EXISTS ix_loans_user_status ON loans (user_id, status)",
-            "CREATE INDEX IF NOT EXISTS ix_loans_next_payment ON loans (status, next_payment_date)",
-            "CREATE INDEX IF NOT EXISTS ix_loan_applications_user_status ON loan_applications (user_id, status)",
-            "CREATE INDEX IF NOT EXISTS ix_loan_applications_status_created ON loan_applications (status, created_at)",
-            "CREATE INDEX IF NOT EXISTS ix_deposits_account_status ON deposits (account_id, status)",
-            "CREATE INDEX IF NOT EXISTS ix_deposits_user_created ON deposits (user_id, created_at)",
-            "CREATE INDEX IF NOT EXISTS ix_deposits_status_created ON deposits (status, created_at)",
-            "CREATE INDEX IF NOT EXISTS ix_notifications_user_status ON notifications (user_id, status)",
-            "CREATE INDEX IF NOT EXISTS ix_notifications_user_created ON notifications (user_id, created_at)",
-            "CREATE INDEX IF NOT EXISTS ix_support_tickets_user_status ON support_tickets (user_id, status)",
-            "CREATE INDEX IF NOT EXISTS ix_support_tickets_status_created ON support_tickets (status, created_at)",
-            "CREATE INDEX IF NOT EXISTS ix_support_tickets_status_priority ON support_tickets (status, priority)",
-            "CREATE INDEX IF NOT EXISTS ix_login_history_user_created ON login_history (user_id, created_at)",
-            "CREATE INDEX IF NOT EXISTS ix_login_history_user_success ON login_history (user_id, login_successful)",
-            "CREATE INDEX IF NOT EXISTS ix_bill_payments_user_created ON bill_payments (user_id, created_at)",
-            "CREATE INDEX IF NOT EXISTS ix_bill_payments_status ON bill_payments (status)",
-            "CREATE INDEX IF NOT EXISTS ix_scheduled_payments_next_date_active ON scheduled_payments (next_payment_date, is_active)",
-            "CREATE INDEX IF NOT EXISTS ix_scheduled_payments_user_active ON scheduled_payments (user_id, is_active)",
-            "CREATE INDEX IF NOT EXISTS ix_virtual_cards_account_status ON virtual_cards (account_id, status)",
-            "CREATE INDEX IF NOT EXISTS ix_virtual_cards_user_status ON virtual_cards (user_id, status)",
-        ]
-        count = 0
-        for ddl in index_ddls:
-            try:
-                await conn.execute(text(ddl))
-                count += 1
-            except Exception as e:
-                pass # Silently skip failed index creation
-        print(f"SUCCESS: Stage 6 completed ({count} indexes verified).")
-
-    # Step 7: Seeding default loan products if none exist
-    async with engine.begin() as conn:
-        try:
-            print("MIGRATION STAGE 7: PRODUCT SEEDING")
-            check_products = await conn.execute(text("SELECT id FROM loan_products LIMIT 1"))
-            if not check_products.fetchone():
-                import json
-                loan_products = [
-                    ("lp_personal_gold", "Personal Gold Facility", "personal", "Flexible personal loan for any occasion.", 5000, 50000, 6.5, 12, 60, "Low Interest", "https://images.unsplash.com/photo-1554224155-6726b3ff858f?q=80&w=500"),
-                    ("lp_home_elite", "Elite Home Mortgage", "home", "Competitive rates for your dream home.", 100000, 2000000, 4.25, 120, 360, "Premium", "https://images.unsplash.com/photo-1560518883-ce09059eeffa?q=80&w=500"),
-                    ("lp_auto_express", "Auto Express Loan", "auto", "Drive your new car today with instant approval.", 10000, 100000, 5.5, 12, 84, "Fast Approval", "https://images.unsplash.com/photo-1533473359331-0135ef1b58ae?q=80&w=500"),
-                    ("lp_edu_support", "Education Support", "education", "Invest in your future with low rates.", 2000, 50000, 3.5, 6, 120, "Student Friendly", "https://images.unsplash.com/photo-1523050854058-8df90110c9f1?q=80&w=500"),
-                    ("lp_business_grow", "Business Growth Capital", "business", "Scale your business to new heights.", 20000, 500000, 7.5, 12, 120, "For SMEs", "https://images.unsplash.com/photo-1460925895917-afdab827c52f?q=80&w=500")
-                ]
-                for lid, name, ltype, desc, min_a, max_a, rate, min_t, max_t, tag, img in loan_products:
-                    feats = json.dumps(["Instant Approval", "Flat Interest Rate", "No Prepayment Penalty"])
-                    await conn.execute(text(
-                        "INSERT INTO loan_products (id, name, type, description, min_amount, max_amount, base_interest_rate, min_term_months, max_term_months, tag, image_url, features, employment_required, available_to_standard, available_to_priority, available_to_premium, created_at, updated_at) "
-                        "VALUES (:id, :name, :type, :description, :min_amount, :max_amount, :rate, :min_term, :max_term, :tag, :img, :feats, TRUE, TRUE, TRUE, TRUE, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)"
-                    ), {"id": lid, "name": name, "type": ltype, "description": desc, "min_amount": min_a, "max_amount": max_a, "rate": rate, "min_term": min_t, "max_term": max_t, "tag": tag, "img": img, "feats": feats})
-                print("SUCCESS: Stage 7 completed (Default products seeded).")
-            else:
-                print("STAGE 7 NOTICE: Products already exist, skipping seed.")
-        except Exception as e:
-            print(f"STAGE 7 NOTICE: {e}")
-
-    print("="*50)
-    print("ALL MIGRATIONS FINISHED SUCCESSFULLY.")
-    print("="*50 + "\n")
-
-    # Final Stage: Cleanup unwanted administrative resources
-    async with engine.begin() as conn:
+    # Schema check: one query; migrations themselves run via `python -m migrations upgrade`
+    from migrations import current_schema_version, latest_schema_version, upgrade
+    current_version = await current_schema_version(engine)
+    latest_version = latest_schema_version()
+    if current_version is None or current_version < latest_version:
+        if settings.RUN_MIGRATIONS_ON_STARTUP:
+            logger.info(f"Schema at version {current_version}, upgrading to {latest_version}")
+            await upgrade(engine)
+        else:
+            logger.error(
+                f"Database schema is at version {current_version} but the code expects {latest_version}; "
+                "run `python -m migrations upgrade`"
+            )
+    elif current_version > latest_version:
+        logger.warning(f"Database schema version {current_version} is newer than this build ({latest_version})")
+
+    if settings.LOOP_WATCHDOG_ENABLED:
+        loop_watchdog.start()
+
+    # Statement PDFs render in a process pool; spawn it now so the first statement is not slow
+    from services.pdf_render_service import pdf_renderer
+
+    async def _prewarm_pdf_renderer():
         try:
-            print("MIGRATION STAGE 8: RESOURCE CLEANUP")
-            # Find any valid product ID to use as a fallback
-            fallback_res = await conn.execute(text("SELECT id FROM loan_products WHERE id != 'admin_created' LIMIT 1"))
-            fallback = fallback_res.fetchone()
-            
-            if fallback:
-                fallback_id = fallback[0]
-                # Migrate any applications referencing the old admin product to a standard one
-                await conn.execute(text(f"UPDATE loan_applications SET product_id = '{fallback_id}' WHERE product_id = 'admin_created'"))
-                # Now safe to delete
-                await conn.execute(text("DELETE FROM loan_products WHERE id = 'admin_created'"))
-                print(f"SUCCESS: Stage 8 completed (Special Facility removed, migrated to {fallback_id}).")
-            else:
-                print("STAGE 8 NOTICE: No fallback products found, skipping cleanup to prevent data loss.")
-        except Exception as e:
-            print(f"STAGE 8 NOTICE: {e}")
+            await pdf_renderer.start()
+        except Exception as exc:
+            logger.warning(f"PDF render pool warm-up failed: {exc}")
+
+    _pdf_warmup_task = asyncio.create_task(_prewarm_pdf_renderer()) if settings.PDF_RENDER_PREWARM else None
+
+    # Email delivery: handlers only enqueue, these workers send
+    from services.email_outbox import email_outbox
+    email_outbox.start()
 
     # Background Tasks
     async def _keep_alive():
@@ -309,7 +92,7 @@ async def lifespan(app: FastAPI):
         logger.info(f"Keep-alive pinger started → {ping_url}")
         while True:
             try:
-                async with httpx.AsyncClient(timeout=15) as client:
+                async with outbound_client("keep_alive", timeout=15) as client:
                     resp = await client.get(ping_url)
                     logger.info(f"Keep-alive ping → {resp.status_code}")
             except Exception as exc:
@@ -376,6 +159,15 @@ async def lifespan(app: FastAPI):
     except asyncio.CancelledError: pass
     try: await _daily_interest_task
     except asyncio.CancelledError: pass
+    await loop_watchdog.stop()
+    if _pdf_warmup_task is not None:
+        _pdf_warmup_task.cancel()
+    await pdf_renderer.shutdown()
+    from utils.storage import close_storage
+    await close_storage()
+    await email_outbox.shutdown()
+    from utils.smtp_pool import smtp_pool
+    await asyncio.to_thread(smtp_pool.close)
     await engine.dispose()
 
 app = FastAPI(
@@ -395,8 +187,29 @@ class ForceHTTPSSchemeMiddleware(BaseHTTPMiddleware):
             request.scope["scheme"] = "https"
         return await call_next(request)
 
+# Attributes event loop blocks to requests; innermost so it shares the handler's task
+from utils.loop_watchdog import LoopBlockMiddleware, loop_watchdog
+app.add_middleware(LoopBlockMiddleware)
+
+# On-demand request profiler; innermost so it shares the handler's task
+if settings.PROFILER_ENABLED:
+    from utils.profiler import ProfilerMiddleware
+    app.add_middleware(ProfilerMiddleware)
+
 app.add_middleware(ForceHTTPSSchemeMiddleware)
 
+# Per-request SQL counters, Server-Timing header and N+1 warnings
+from utils.query_stats import QueryStatsMiddleware
+app.add_middleware(QueryStatsMiddleware)
+
+# Exposes the request scope (matched route) to the database layer
+from utils.request_context import RequestContextMiddleware
+app.add_middleware(RequestContextMiddleware)
+
+# Request count, latency histograms and in-flight gauge for /metrics
+from utils.metrics import MetricsMiddleware, registry as metrics_registry
+app.add_middleware(MetricsMiddleware)
+
 # CORS configuration
 _cors_origins = ["http://localhost:3000", "http://127.0.0.1:3000"]
 if settings.FRONTEND_URL and settings.FRONTEND_URL not in _cors_origins:
@@ -408,6 +221,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing", "X-Request-ID"],
 )
 
 # Router mounting
@@ -427,6 +241,12 @@ app.include_router(virtual_cards.router, prefix="/api/v1/cards", tags=["Virtual
 app.include_router(admin.router, tags=["Admin"])
 app.include_router(security_router.router)
 
+# The local storage backend serves its own files; Cloudinary serves them otherwise
+if settings.STORAGE_BACKEND == "local":
+    from fastapi.staticfiles import StaticFiles
+    os.makedirs(settings.STORAGE_LOCAL_DIR, exist_ok=True)
+    app.mount(settings.STORAGE_LOCAL_BASE_URL, StaticFiles(directory=settings.STORAGE_LOCAL_DIR), name="media")
+
 @app.exception_handler(APIError)
 async def api_error_handler(request: Request, exc: APIError):
     return JSONResponse(status_code=exc.status_code, content=exc.to_dict())
@@ -444,9 +264,62 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
 async def root():
     return {"message": "Standard Chartered Banking API", "version": "1.0.0", "status": "operational"}
 
+async def _probe(check, label: str) -> dict:
+    """Run ``check`` with the health timeout; never raises"""
+    started = time.perf_counter()
+    try:
+        value = await asyncio.wait_for(check(), timeout=settings.HEALTH_DB_TIMEOUT_SECONDS)
+        return {"ok": True, "latency_ms": round((time.perf_counter() - started) * 1000, 1), "value": value}
+    except asyncio.TimeoutError:
+        return {"ok": False, "error": f"{label} probe timed out after {settings.HEALTH_DB_TIMEOUT_SECONDS}s"}
+    except Exception as e:
+        return {"ok": False, "error": f"{label} probe failed: {type(e).__name__}"}
+
+
+async def _select_one(target_engine):
+    async with target_engine.connect() as conn:
+        return (await conn.execute(sa_text("SELECT 1"))).scalar()
+
+
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy", "database": "connected"}
+    """Liveness: always 200 while the process serves requests; reports database reachability"""
+    db = await _probe(lambda: _select_one(engine), "database")
+    return {
+        "status": "healthy" if db["ok"] else "degraded",
+        "database": "connected" if db["ok"] else "unavailable",
+        "database_latency_ms": db.get("latency_ms"),
+    }
+
+
+@app.get("/ready")
+async def readiness_check():
+    """Readiness: 503 until the database answers and the schema is at the expected version"""
+    from migrations import current_schema_version, latest_schema_version
+    schema = await _probe(lambda: current_schema_version(engine), "database")
+    checks = {"database": schema["ok"]}
+    if schema["ok"]:
+        checks["schema"] = schema["value"] == latest_schema_version()
+    if read_engine is not engine:
+        checks["read_replica"] = (await _probe(lambda: _select_one(read_engine), "read replica"))["ok"]
+    ready = all(checks.values())
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"status": "ready" if ready else "not_ready", "checks": checks, "error": schema.get("error")},
+    )
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics(request: Request):
+    """Prometheus text exposition of request, database pool, outbound HTTP, task and cache metrics"""
+    if settings.METRICS_TOKEN:
+        provided = request.headers.get("Authorization", "")
+        if not hmac.compare_digest(provided.encode(), f"Bearer {settings.METRICS_TOKEN}".encode()):
+            return JSONResponse(status_code=401, content={"detail": "Missing or invalid metrics token"})
+    elif settings.ENVIRONMENT == "production":
+        # Never serve metrics unauthenticated in production
+        return JSONResponse(status_code=401, content={"detail": "Metrics token not configured"})
+    return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4")
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,14 @@
+"""
+Versioned schema migrations.
+
+Run ``python -m migrations upgrade`` before starting the API; the app itself
+only checks the recorded version at startup.
+"""
+from migrations.base import Migration
+from migrations.runner import (
+    current_schema_version,
+    latest_schema_version,
+    upgrade,
+)
+
+__all__ = ["Migration", "current_schema_version", "latest_schema_version", "upgrade"]
@@ -0,0 +1,47 @@
+"""
+Command line entry point.
+
+    python -m migrations upgrade [--target N]
+    python -m migrations status
+"""
+import argparse
+import asyncio
+import sys
+from database import engine
+from migrations.runner import current_schema_version, latest_schema_version, upgrade
+
+
+async def _upgrade(target):
+    try:
+        applied = await upgrade(engine, target=target)
+        print(f"Applied {len(applied)} migration(s): {applied}" if applied else "Nothing to apply")
+    finally:
+        await engine.dispose()
+
+
+async def _status():
+    try:
+        current = await current_schema_version(engine)
+    finally:
+        await engine.dispose()
+    latest = latest_schema_version()
+    print(f"current: {current if current is not None else 'none'}  latest: {latest}")
+    return 0 if current == latest else 1
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m migrations", description="Database schema migrations")
+    commands = parser.add_subparsers(dest="command", required=True)
+    upgrade_parser = commands.add_parser("upgrade", help="apply pending migrations")
+    upgrade_parser.add_argument("--target", type=int, default=None, help="stop after this version")
+    commands.add_parser("status", help="show current and latest version (exit 1 when behind)")
+    args = parser.parse_args(argv)
+
+    if args.command == "upgrade":
+        asyncio.run(_upgrade(args.target))
+        return 0
+    return asyncio.run(_status())
+
+
+if __name__ == "__main__":
+    sys.exit(main())
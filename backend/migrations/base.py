@@ -0,0 +1,37 @@
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Iterable
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+from utils.logger import logger
+
+
+@dataclass(frozen=True)
+class Migration:
+    """One ordered, idempotent schema change.
+
+    Transactional migrations run inside a single transaction together with
+    their schema_version row. Non-transactional ones (ALTER TYPE ... ADD VALUE,
+    CREATE INDEX CONCURRENTLY) run on an AUTOCOMMIT connection and are
+    recorded afterwards, so every statement in them must be safe to repeat.
+    """
+    version: int
+    name: str
+    upgrade: Callable[[AsyncConnection], Awaitable[None]]
+    transactional: bool = True
+
+
+async def execute_all(conn: AsyncConnection, statements: Iterable[str]) -> None:
+    for statement in statements:
+        await conn.execute(text(statement))
+
+
+async def execute_each_ignoring_errors(conn: AsyncConnection, statements: Iterable[str]) -> int:
+    """Run statements independently on an AUTOCOMMIT connection; return how many succeeded"""
+    succeeded = 0
+    for statement in statements:
+        try:
+            await conn.execute(text(statement))
+            succeeded += 1
+        except Exception as e:
+            logger.warning(f"Migration statement skipped: {statement} ({e})")
+    return succeeded
@@ -0,0 +1,101 @@
+import time
+from typing import List, Optional, Set
+from sqlalchemy import text
+from sqlalchemy.exc import ProgrammingError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from migrations.base import Migration
+from migrations.versions import MIGRATIONS
+from utils.logger import logger
+
+
+SCHEMA_VERSION_DDL = """
+CREATE TABLE IF NOT EXISTS schema_version (
+    version INTEGER PRIMARY KEY,
+    name VARCHAR(255) NOT NULL,
+    applied_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    duration_ms DOUBLE PRECISION
+)
+"""
+
+# Arbitrary constant shared by every process that runs migrations
+MIGRATION_LOCK_KEY = 727_001_031
+
+
+def latest_schema_version() -> int:
+    return max(m.version for m in MIGRATIONS)
+
+
+async def current_schema_version(engine: AsyncEngine) -> Optional[int]:
+    """Highest applied version, or None when the database was never migrated"""
+    try:
+        async with engine.connect() as conn:
+            result = await conn.execute(text("SELECT max(version) FROM schema_version"))
+            return result.scalar()
+    except ProgrammingError:
+        return None
+
+
+async def upgrade(engine: AsyncEngine, target: Optional[int] = None) -> List[int]:
+    """Apply pending migrations up to ``target`` (default: latest); return the versions applied.
+
+    A session-level advisory lock serialises concurrent runners (several
+    instances booting at once), and the applied set is re-read after the lock
+    is taken so a migration that another runner finished is not repeated.
+    """
+    target = latest_schema_version() if target is None else target
+    applied_now: List[int] = []
+
+    async with engine.connect() as lock_conn:
+        lock_conn = await lock_conn.execution_options(isolation_level="AUTOCOMMIT")
+        await lock_conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+        try:
+            await lock_conn.execute(text(SCHEMA_VERSION_DDL))
+            result = await lock_conn.execute(text("SELECT version FROM schema_version"))
+            applied: Set[int] = {row[0] for row in result}
+
+            pending = sorted(
+                (m for m in MIGRATIONS if m.version not in applied and m.version <= target),
+                key=lambda m: m.version,
+            )
+            if not pending:
+                logger.info(f"Schema is up to date at version {max(applied, default=0)}")
+                return applied_now
+
+            for migration in pending:
+                await _apply(engine, migration)
+                applied_now.append(migration.version)
+        finally:
+            await lock_conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": MIGRATION_LOCK_KEY})
+
+    return applied_now
+
+
+async def _apply(engine: AsyncEngine, migration: Migration) -> None:
+    logger.info(f"Applying migration {migration.version}: {migration.name}")
+    started = time.perf_counter()
+    record = text("INSERT INTO schema_version (version, name, duration_ms) VALUES (:version, :name, :duration_ms)")
+
+    try:
+        if migration.transactional:
+            # Schema change and version row commit together or not at all
+            async with engine.begin() as conn:
+                await migration.upgrade(conn)
+                await conn.execute(record, {
+                    "version": migration.version,
+                    "name": migration.name,
+                    "duration_ms": (time.perf_counter() - started) * 1000,
+                })
+        else:
+            async with engine.connect() as conn:
+                conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+                await migration.upgrade(conn)
+                await conn.execute(record, {
+                    "version": migration.version,
+                    "name": migration.name,
+                    "duration_ms": (time.perf_counter() - started) * 1000,
+                })
+    except Exception as e:
+        logger.error(f"Migration {migration.version} ({migration.name}) failed", error=e)
+        raise
+
+    logger.info(f"Migration {migration.version} applied in {(time.perf_counter() - started) * 1000:.0f}ms")
@@ -0,0 +1,297 @@
+"""
+Ordered migration steps.
+
+Versions 1-8 are the boot-time stages that used to run in main.lifespan on
+every start; they are idempotent, so databases created by the old code pass
+through them unchanged. Append new steps with the next version number and
+never edit a step that has shipped.
+"""
+import json
+from typing import List
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+from database import Base
+from migrations.base import Migration, execute_all, execute_each_ignoring_errors
+from utils.logger import logger
+
+
+async def _create_tables(conn: AsyncConnection) -> None:
+    # Importing the model modules registers every table on Base.metadata
+    import models  # noqa: F401
+    import models.admin  # noqa: F401
+    import models.security  # noqa: F401
+    await conn.run_sync(Base.metadata.create_all)
+
+
+async def _id_column_extensions(conn: AsyncConnection) -> None:
+    # Critical for Stytch/Auth ids
+    await execute_all(conn, [
+        "ALTER TABLE admin_users ALTER COLUMN id TYPE VARCHAR(255)",
+        "ALTER TABLE admin_users ALTER COLUMN created_by TYPE VARCHAR(255)",
+        "ALTER TABLE admin_audit_logs ALTER COLUMN id TYPE VARCHAR(255)",
+        "ALTER TABLE admin_audit_logs ALTER COLUMN admin_id TYPE VARCHAR(255)",
+        "ALTER TABLE admin_audit_logs ALTER COLUMN resource_id TYPE VARCHAR(255)",
+        "ALTER TABLE admin_permissions ALTER COLUMN id TYPE VARCHAR(255)",
+    ])
+
+
+_FUNCTIONAL_COLUMNS = {
+    "users": [
+        "password_hash VARCHAR",
+        "transfer_pin VARCHAR",
+        "transfer_pin_failed_attempts INTEGER DEFAULT 0 NOT NULL",
+        "transfer_pin_locked_until TIMESTAMPTZ",
+        "email_verification_token VARCHAR",
+        "email_verification_expires FLOAT",
+        "password_reset_token VARCHAR",
+        "password_reset_expires FLOAT",
+        "two_factor_enabled BOOLEAN DEFAULT FALSE NOT NULL",
+        "two_factor_secret VARCHAR",
+        "biometric_enabled BOOLEAN DEFAULT FALSE NOT NULL",
+        "street_address VARCHAR",
+        "city VARCHAR",
+        "state VARCHAR",
+        "postal_code VARCHAR",
+        "is_active BOOLEAN DEFAULT TRUE NOT NULL",
+        "is_approved BOOLEAN DEFAULT FALSE NOT NULL",
+        "is_locked BOOLEAN DEFAULT FALSE NOT NULL",
+        "is_restricted BOOLEAN DEFAULT FALSE NOT NULL",
+        "restricted_until TIMESTAMPTZ",
+        "bio VARCHAR",
+        "last_login TIMESTAMPTZ",
+        "date_of_birth TIMESTAMPTZ",
+        "identity_verified BOOLEAN DEFAULT FALSE NOT NULL",
+        "phone_verified BOOLEAN DEFAULT FALSE NOT NULL",
+        "profile_picture_url VARCHAR",
+    ],
+    "accounts": [
+        "routing_number VARCHAR",
+        "wallet_id VARCHAR",
+        "wallet_qrcode VARCHAR",
+    ],
+    "loan_products": [
+        "image_url VARCHAR",
+        "base_interest_rate FLOAT",
+        "min_term_months INTEGER",
+        "max_term_months INTEGER",
+        "employment_required BOOLEAN DEFAULT TRUE",
+        "available_to_standard BOOLEAN DEFAULT TRUE",
+        "available_to_priority BOOLEAN DEFAULT TRUE",
+        "available_to_premium BOOLEAN DEFAULT TRUE",
+        "tag VARCHAR",
+        "features VARCHAR",
+    ],
+    "loan_applications": [
+        "account_id VARCHAR",
+        "submitted_at TIMESTAMP",
+        "reviewed_at TIMESTAMP",
+        "approved_at TIMESTAMP",
+        "rejected_at TIMESTAMP",
+        "rejection_reason VARCHAR",
+        "approved_amount FLOAT",
+        "approved_interest_rate FLOAT",
+        "approved_term_months INTEGER",
+        "monthly_payment FLOAT",
+        "supporting_documents VARCHAR",
+        "purpose VARCHAR",
+        "annual_income FLOAT",
+        "employment_status VARCHAR",
+        "employer_name VARCHAR",
+        "credit_score INTEGER",
+    ],
+    # Loan creation columns (admin)
+    "loans": [
+        "daily_interest_rate FLOAT DEFAULT 0.0",
+        "created_by_admin BOOLEAN DEFAULT FALSE",
+    ],
+}
+
+
+async def _functional_columns(conn: AsyncConnection) -> None:
+    # One ALTER TABLE per table so each table is locked once
+    for table, columns in _FUNCTIONAL_COLUMNS.items():
+        additions = ", ".join(f"ADD COLUMN IF NOT EXISTS {column}" for column in columns)
+        await conn.execute(text(f"ALTER TABLE {table} {additions}"))
+    await execute_all(conn, [
+        "UPDATE loan_products SET available_to_standard = TRUE WHERE available_to_standard IS NULL",
+        "UPDATE loan_products SET available_to_priority = TRUE WHERE available_to_priority IS NULL",
+        "UPDATE loan_products SET available_to_premium = TRUE WHERE available_to_premium IS NULL",
+        "UPDATE loan_products SET employment_required = TRUE WHERE employment_required IS NULL",
+    ])
+
+
+_ENUM_VALUES = {
+    "transactiontype": ['LOAN', 'loan', 'INTEREST', 'interest', 'FEE', 'fee'],
+    "transactionstatus": ['PENDING', 'pending', 'COMPLETED', 'completed', 'FAILED', 'failed'],
+    "loanapplicationstatus": ['SUBMITTED', 'under_review', 'approved', 'rejected'],
+    "loantype": ['PERSONAL', 'HOME', 'AUTO', 'EDUCATION', 'BUSINESS'],
+    "loanstatus": ['ACTIVE', 'COMPLETED', 'DEFAULTED'],
+    "virtualcardstatus": ['declined', 'pending', 'suspended', 'inactive', 'active', 'blocked', 'cancelled', 'expired'],
+    "virtualcardtype": ['debit', 'credit'],
+    "depositstatus": ['PENDING', 'PROCESSING', 'VERIFIED', 'COMPLETED', 'FAILED', 'REJECTED', 'CANCELLED',
+                      'pending', 'processing', 'verified', 'completed', 'failed', 'rejected', 'cancelled'],
+    "deposittype": ['CHECK_DEPOSIT', 'DIRECT_DEPOSIT', 'MOBILE_CHECK_DEPOSIT',
+                    'check_deposit', 'direct_deposit', 'mobile_check_deposit'],
+    "jobtype": ['USER_DELETION', 'TRANSACTION_GENERATION'],
+}
+
+
+async def _enum_extensions(conn: AsyncConnection) -> None:
+    statements = [
+        f"ALTER TYPE {type_name} ADD VALUE IF NOT EXISTS '{value}'"
+        for type_name, values in _ENUM_VALUES.items()
+        for value in values
+    ]
+    await execute_each_ignoring_errors(conn, statements)
+
+
+async def _data_normalization(conn: AsyncConnection) -> None:
+    # Fix existing products that were seeded with '{}' instead of '[]'
+    await conn.execute(text("UPDATE loan_products SET features = '[]' WHERE features = '{}'"))
+    for value in ['pending', 'processing', 'verified', 'completed', 'failed', 'rejected', 'cancelled']:
+        await conn.execute(
+            text("UPDATE deposits SET status = CAST(:new AS depositstatus) WHERE status = CAST(:old AS depositstatus)"),
+            {"new": value.upper(), "old": value},
+        )
+
+
+_COMPOSITE_INDEXES = [
+    "ix_transactions_account_created ON transactions (account_id, created_at)",
+    "ix_transactions_user_created ON transactions (user_id, created_at)",
+    "ix_transactions_status ON transactions (status)",
+    "ix_transfers_from_account_created ON transfers (from_account_id, created_at)",
+    "ix_transfers_user_created ON transfers (from_user_id, created_at)",
+    "ix_transfers_status ON transfers (status)",
+    "ix_transfers_scheduled_status ON transfers (status, scheduled_for)",
+    "ix_loans_user_status ON loans (user_id, status)",
+    "ix_loans_next_payment ON loans (status, next_payment_date)",
+    "ix_loan_applications_user_status ON loan_applications (user_id, status)",
+    "ix_loan_applications_status_created ON loan_applications (status, created_at)",
+    "ix_deposits_account_status ON deposits (account_id, status)",
+    "ix_deposits_user_created ON deposits (user_id, created_at)",
+    "ix_deposits_status_created ON deposits (status, created_at)",
+    "ix_notifications_user_status ON notifications (user_id, status)",
+    "ix_notifications_user_created ON notifications (user_id, created_at)",
+    "ix_support_tickets_user_status ON support_tickets (user_id, status)",
+    "ix_support_tickets_status_created ON support_tickets (status, created_at)",
+    "ix_support_tickets_status_priority ON support_tickets (status, priority)",
+    "ix_login_history_user_created ON login_history (user_id, created_at)",
+    "ix_login_history_user_success ON login_history (user_id, login_successful)",
+    "ix_bill_payments_user_created ON bill_payments (user_id, created_at)",
+    "ix_bill_payments_status ON bill_payments (status)",
+    "ix_scheduled_payments_next_date_active ON scheduled_payments (next_payment_date, is_active)",
+    "ix_scheduled_payments_user_active ON scheduled_payments (user_id, is_active)",
+    "ix_virtual_cards_account_status ON virtual_cards (account_id, status)",
+    "ix_virtual_cards_user_status ON virtual_cards (user_id, status)",
+]
+
+
+async def _composite_indexes(conn: AsyncConnection) -> None:
+    # CONCURRENTLY keeps hot tables writable while an index is built
+    created = await execute_each_ignoring_errors(
+        conn, [f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {ddl}" for ddl in _COMPOSITE_INDEXES]
+    )
+    logger.info(f"Composite indexes verified: {created}/{len(_COMPOSITE_INDEXES)}")
+
+
+_DEFAULT_LOAN_PRODUCTS = [
+    ("lp_personal_gold", "Personal Gold Facility", "PERSONAL", "Flexible personal loan for any occasion.", 5000, 50000, 6.5, 12, 60, "Low Interest", "https://images.unsplash.com/photo-1554224155-6726b3ff858f?q=80&w=500"),
+    ("lp_home_elite", "Elite Home Mortgage", "HOME", "Competitive rates for your dream home.", 100000, 2000000, 4.25, 120, 360, "Premium", "https://images.unsplash.com/photo-1560518883-ce09059eeffa?q=80&w=500"),
+    ("lp_auto_express", "Auto Express Loan", "AUTO", "Drive your new car today with instant approval.", 10000, 100000, 5.5, 12, 84, "Fast Approval", "https://images.unsplash.com/photo-1533473359331-0135ef1b58ae?q=80&w=500"),
+    ("lp_edu_support", "Education Support", "EDUCATION", "Invest in your future with low rates.", 2000, 50000, 3.5, 6, 120, "Student Friendly", "https://images.unsplash.com/photo-1523050854058-8df90110c9f1?q=80&w=500"),
+    ("lp_business_grow", "Business Growth Capital", "BUSINESS", "Scale your business to new heights.", 20000, 500000, 7.5, 12, 120, "For SMEs", "https://images.unsplash.com/photo-1460925895917-afdab827c52f?q=80&w=500"),
+]
+
+
+async def _seed_loan_products(conn: AsyncConnection) -> None:
+    existing = await conn.execute(text("SELECT id FROM loan_products LIMIT 1"))
+    if existing.fetchone():
+        return
+    features = json.dumps(["Instant Approval", "Flat Interest Rate", "No Prepayment Penalty"])
+    await conn.execute(
+        text(
+            "INSERT INTO loan_products (id, name, type, description, min_amount, max_amount, base_interest_rate, min_term_months, max_term_months, tag, image_url, features, employment_required, available_to_standard, available_to_priority, available_to_premium, created_at, updated_at) "
+            "VALUES (:id, :name, CAST(:type AS loantype), :description, :min_amount, :max_amount, :rate, :min_term, :max_term, :tag, :img, :feats, TRUE, TRUE, TRUE, TRUE, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)"
+        ),
+        [
+            {"id": lid, "name": name, "type": ltype, "description": desc, "min_amount": min_a, "max_amount": max_a,
+             "rate": rate, "min_term": min_t, "max_term": max_t, "tag": tag, "img": img, "feats": features}
+            for lid, name, ltype, desc, min_a, max_a, rate, min_t, max_t, tag, img in _DEFAULT_LOAN_PRODUCTS
+        ],
+    )
+
+
+async def _remove_admin_created_product(conn: AsyncConnection) -> None:
+    # Move applications off the retired 'admin_created' product before deleting it
+    fallback = (await conn.execute(text("SELECT id FROM loan_products WHERE id != 'admin_created' LIMIT 1"))).fetchone()
+    if not fallback:
+        logger.warning("No fallback loan product found; keeping 'admin_created' to prevent data loss")
+        return
+    await conn.execute(
+        text("UPDATE loan_applications SET product_id = :fallback WHERE product_id = 'admin_created'"),
+        {"fallback": fallback[0]},
+    )
+    await conn.execute(text("DELETE FROM loan_products WHERE id = 'admin_created'"))
+
+
+async def _background_job_items(conn: AsyncConnection) -> None:
+    from models.job import BackgroundJobItem
+    await conn.run_sync(lambda sync_conn: Base.metadata.create_all(sync_conn, tables=[BackgroundJobItem.__table__]))
+
+
+async def _monthly_statements_job_type(conn: AsyncConnection) -> None:
+    await execute_each_ignoring_errors(conn, ["ALTER TYPE jobtype ADD VALUE IF NOT EXISTS 'MONTHLY_STATEMENTS'"])
+
+
+async def _account_balance_snapshots(conn: AsyncConnection) -> None:
+    from models.account import AccountBalanceSnapshot
+    await conn.run_sync(lambda sync_conn: Base.metadata.create_all(sync_conn, tables=[AccountBalanceSnapshot.__table__]))
+
+
+async def _transactions_updated_at_index(conn: AsyncConnection) -> None:
+    await execute_each_ignoring_errors(
+        conn, ["CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_transactions_updated_at ON transactions (updated_at)"]
+    )
+
+
+async def _statement_content_hash(conn: AsyncConnection) -> None:
+    await execute_all(conn, ["ALTER TABLE statements ADD COLUMN IF NOT EXISTS content_hash VARCHAR(64)"])
+
+
+async def _statement_content_hash_index(conn: AsyncConnection) -> None:
+    await execute_each_ignoring_errors(
+        conn, ["CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_statements_content_hash ON statements (content_hash)"]
+    )
+
+
+async def _email_outbox(conn: AsyncConnection) -> None:
+    from models.email_outbox import OutboxEmail
+    await conn.run_sync(lambda sync_conn: Base.metadata.create_all(sync_conn, tables=[OutboxEmail.__table__]))
+
+
+
+async def _background_job_leases(conn: AsyncConnection) -> None:
+    await execute_all(conn, [
+        "ALTER TABLE background_jobs ADD COLUMN IF NOT EXISTS lease_owner VARCHAR",
+        "ALTER TABLE background_jobs ADD COLUMN IF NOT EXISTS lease_expires_at TIMESTAMP WITHOUT TIME ZONE",
+    ])
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "create_tables", _create_tables),
+    Migration(2, "id_column_extensions", _id_column_extensions),
+    Migration(3, "functional_columns", _functional_columns),
+    Migration(4, "enum_extensions", _enum_extensions, transactional=False),
+    Migration(5, "data_normalization", _data_normalization),
+    Migration(6, "composite_indexes", _composite_indexes, transactional=False),
+    Migration(7, "seed_loan_products", _seed_loan_products),
+    Migration(8, "remove_admin_created_product", _remove_admin_created_product),
+    Migration(9, "background_job_items", _background_job_items),
+    Migration(10, "monthly_statements_job_type", _monthly_statements_job_type, transactional=False),
+    Migration(11, "account_balance_snapshots", _account_balance_snapshots),
+    Migration(12, "transactions_updated_at_index", _transactions_updated_at_index, transactional=False),
+    Migration(13, "statement_content_hash", _statement_content_hash),
+    Migration(14, "statement_content_hash_index", _statement_content_hash_index, transactional=False),
+    Migration(15, "email_outbox", _email_outbox),
+    Migration(16, "background_job_leases", _background_job_leases),
+]
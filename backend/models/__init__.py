@@ -6,7 +6,7 @@ All models inherit from Base and are registered with the engine.
 """
 
 from .user import User
-from .account import Account, Statement
+from .account import Account, Statement, AccountBalanceSnapshot
 from .transaction import Transaction
 from .transfer import Transfer, Beneficiary, TransferType, TransferStatus
 from .loan import Loan, LoanApplication, LoanProduct, LoanPayment, LoanSchedule
@@ -17,11 +17,14 @@ from .bill_payment import BillPayment, BillPayee, ScheduledPayment
 from .deposit import Deposit, DepositType, DepositStatus
 from .virtual_card import VirtualCard, VirtualCardType, VirtualCardStatus
 from .user_restriction import UserRestriction
+from .job import BackgroundJob, BackgroundJobItem, JobStatus, JobItemStatus, JobType
+from .email_outbox import OutboxEmail, OutboxEmailStatus
 
 __all__ = [
     "User",
     "Account",
     "Statement",
+    "AccountBalanceSnapshot",
     "Transaction",
     "Transfer",
     "Beneficiary",
@@ -50,4 +53,11 @@ __all__ = [
     "VirtualCardType",
     "VirtualCardStatus",
     "UserRestriction",
+    "BackgroundJob",
+    "BackgroundJobItem",
+    "JobStatus",
+    "JobItemStatus",
+    "JobType",
+    "OutboxEmail",
+    "OutboxEmailStatus",
 ]
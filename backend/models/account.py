@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Float, Integer, DateTime, Boolean, Enum, ForeignKey, Text
+from sqlalchemy import Column, String, Float, Integer, Date, DateTime, Boolean, Enum, ForeignKey, Text
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -82,8 +82,31 @@ class Statement(Base):
     total_credits = Column(Float, default=0.0, nullable=False)
     total_debits = Column(Float, default=0.0, nullable=False)
     
+    # Statement cache key (StatementService.statement_cache_keys); cleared when
+    # a transaction in the period is edited or deleted
+    content_hash = Column(String(64), nullable=True, index=True)
+    
     # Timestamps
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     
     # Relationships
     account = relationship("Account", back_populates="statements")
+
+
+class AccountBalanceSnapshot(Base):
+    """End-of-day (UTC) balance for each account on days it had completed transactions.
+
+    Days without activity have no row; the balance on any date is the most
+    recent snapshot on or before it. Maintained by jobs/refresh_balance_snapshots.py.
+    """
+    __tablename__ = "account_balance_snapshots"
+
+    account_id = Column(String, ForeignKey("accounts.id", ondelete="CASCADE"), primary_key=True)
+    snapshot_date = Column(Date, primary_key=True)
+
+    closing_balance = Column(Float, nullable=False)
+    credits = Column(Float, default=0.0, nullable=False)
+    debits = Column(Float, default=0.0, nullable=False)
+    transaction_count = Column(Integer, default=0, nullable=False)
+
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
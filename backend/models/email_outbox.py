@@ -0,0 +1,44 @@
+from sqlalchemy import Column, String, Integer, DateTime, Enum, Text, Boolean, Index
+from datetime import datetime
+import enum
+from database import Base
+
+
+class OutboxEmailStatus(str, enum.Enum):
+    PENDING = "pending"
+    SENT = "sent"
+    DEAD = "dead"  # Gave up after EMAIL_OUTBOX_MAX_ATTEMPTS; kept for inspection
+
+
+class OutboxEmail(Base):
+    """Outgoing email waiting for (or done with) delivery by the email outbox workers"""
+    __tablename__ = "email_outbox"
+
+    id = Column(String, primary_key=True)
+    category = Column(String, nullable=False)  # e.g. "verification", "statement"; metrics label
+    status = Column(Enum(OutboxEmailStatus), default=OutboxEmailStatus.PENDING, nullable=False)
+
+    # Rendered message
+    to_email = Column(String, nullable=False)
+    to_name = Column(String, nullable=True)
+    subject = Column(String, nullable=False)
+    html = Column(Text, nullable=False)
+    inline_logo = Column(Boolean, default=False, nullable=False)  # html references cid:brandlogo
+
+    # Delivery state; a claimed row's next_attempt_at is its lease expiry
+    attempts = Column(Integer, default=0, nullable=False)
+    next_attempt_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    provider = Column(String, nullable=True)  # "resend" or "smtp" once sent
+    provider_message_id = Column(String, nullable=True)
+    error = Column(Text, nullable=True)
+
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    sent_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        # Worker claim scan: due pending rows only
+        Index(
+            "ix_email_outbox_due", "next_attempt_at",
+            postgresql_where=(status == OutboxEmailStatus.PENDING),
+        ),
+    )
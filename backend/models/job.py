@@ -0,0 +1,81 @@
+from sqlalchemy import Column, String, Integer, DateTime, Enum, Text, Index, ForeignKey
+from datetime import datetime
+import enum
+from database import Base
+
+
+class JobStatus(str, enum.Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class JobType(str, enum.Enum):
+    USER_DELETION = "user_deletion"
+    TRANSACTION_GENERATION = "transaction_generation"
+    MONTHLY_STATEMENTS = "monthly_statements"
+
+
+class JobItemStatus(str, enum.Enum):
+    PENDING = "pending"
+    STORED = "stored"  # Output saved; follow-up (e.g. email) still outstanding
+    COMPLETED = "completed"
+    FAILED = "failed"
+    SKIPPED = "skipped"
+
+
+class BackgroundJob(Base):
+    """Long-running admin job with checkpointed progress"""
+    __tablename__ = "background_jobs"
+
+    id = Column(String, primary_key=True, index=True)
+    job_type = Column(Enum(JobType), nullable=False)
+    status = Column(Enum(JobStatus), default=JobStatus.PENDING, nullable=False)
+
+    # Target resource and requester
+    resource_type = Column(String, nullable=False)
+    resource_id = Column(String, nullable=False)
+    requested_by = Column(String, nullable=True)  # Admin ID
+
+    # Job input and checkpoint (JSON strings)
+    params = Column(Text, nullable=True)
+    progress = Column(Text, nullable=True)
+    processed_items = Column(Integer, default=0, nullable=False)
+    error = Column(Text, nullable=True)
+
+    # Runner lease (services.job_lease): who is executing the job, renewed by a heartbeat
+    lease_owner = Column(String, nullable=True)
+    lease_expires_at = Column(DateTime, nullable=True)
+
+    # Timestamps
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        # Look up active jobs for a resource (e.g. prevent duplicate deletions)
+        Index("ix_background_jobs_resource_status", "resource_type", "resource_id", "status"),
+    )
+
+
+class BackgroundJobItem(Base):
+    """Per-item checkpoint of a fan-out job (e.g. one row per user for monthly statements)"""
+    __tablename__ = "background_job_items"
+
+    job_id = Column(String, ForeignKey("background_jobs.id", ondelete="CASCADE"), primary_key=True)
+    item_id = Column(String, primary_key=True)
+    status = Column(Enum(JobItemStatus), default=JobItemStatus.PENDING, nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+
+    # Stage output (JSON string, e.g. the uploaded document URL) and last failure
+    result = Column(Text, nullable=True)
+    error = Column(Text, nullable=True)
+
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        # Resume scans: remaining items of a job in id order
+        Index("ix_background_job_items_job_status", "job_id", "status", "item_id"),
+    )
@@ -70,4 +70,6 @@ class Transaction(Base):
         Index("ix_transactions_user_created", "user_id", "created_at"),
         # Filter by status (pending/failed jobs, admin views)
         Index("ix_transactions_status", "status"),
+        # Incremental balance snapshot refresh (rows changed since the last run)
+        Index("ix_transactions_updated_at", "updated_at"),
     )
@@ -1,4 +1,5 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
@@ -6,15 +7,20 @@ from models.account import Account, Statement
 from models.user import User
 from models.transaction import Transaction
 from models.transfer import Transfer
-from database import get_db
+from database import get_read_db
 from utils.auth import get_current_user_id
 from utils.account_helpers import _get_owned_account, _get_statement_by_id
+from services.balance_snapshot_service import BalanceSnapshotService
+from services.statement_export import EXPORT_FORMATS, StatementExportService
 import httpx
-from datetime import datetime, timedelta
+from datetime import date, datetime, time, timedelta
+from typing import Optional
 from utils.logger import logger
 
 router = APIRouter()
 
+MAX_BALANCE_HISTORY_DAYS = 366
+
 from utils.crypto import get_crypto_price
 
 
@@ -35,7 +41,7 @@ async def get_crypto_price_endpoint(symbol: str = Query("bitcoin")):
 @router.get("/")
 async def get_accounts(
     user_id: str = Depends(get_current_user_id),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get all accounts for the authenticated user"""
     result = await db.execute(select(Account).where(Account.user_id == user_id))
@@ -75,7 +81,7 @@ async def get_accounts(
 async def get_account_details(
     account_id: str,
     user_id: str = Depends(get_current_user_id),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get specific account details for authenticated user"""
     account = await _get_owned_account(db, account_id, user_id)
@@ -110,12 +116,28 @@ async def get_account_details(
 @router.get("/{account_id}/balance")
 async def get_balance(
     account_id: str,
+    as_of: Optional[date] = Query(None, description="Balance at the end of this UTC day instead of now"),
     user_id: str = Depends(get_current_user_id),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    """Get real-time balance (authenticated + owned account only)"""
+    """Get real-time balance, or the end-of-day balance for ``as_of`` (authenticated + owned account only)"""
     account = await _get_owned_account(db, account_id, user_id)
 
+    if as_of is not None:
+        if as_of > datetime.utcnow().date():
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="as_of cannot be in the future")
+        balances = await BalanceSnapshotService.balances_as_of(db, [account.id], as_of)
+        return {
+            "success": True,
+            "data": {
+                "account_id": account.id,
+                "as_of": as_of.isoformat(),
+                "balance": round(balances.get(account.id, 0.0), 2),
+                "currency": account.currency,
+            },
+            "message": "Balance retrieved",
+        }
+
     return {
         "success": True,
         "data": {
@@ -128,13 +150,75 @@ async def get_balance(
     }
 
 
+@router.get("/{account_id}/balance-history")
+async def get_balance_history(
+    account_id: str,
+    start: date = Query(..., description="First UTC day"),
+    end: Optional[date] = Query(None, description="Last UTC day (default today)"),
+    user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """End-of-day balances for charting, one point per day (authenticated + owned account only)"""
+    account = await _get_owned_account(db, account_id, user_id)
+    today = datetime.utcnow().date()
+    end = min(end or today, today)
+    if start > end:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="start must be on or before end")
+    if (end - start).days >= MAX_BALANCE_HISTORY_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Balance history is limited to {MAX_BALANCE_HISTORY_DAYS} days per request",
+        )
+
+    points = await BalanceSnapshotService.daily_balances(db, account.id, start, end)
+    return {
+        "success": True,
+        "data": {
+            "account_id": account.id,
+            "currency": account.currency,
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "points": points,
+        },
+        "message": "Balance history retrieved",
+    }
+
+
+@router.get("/{account_id}/export")
+async def export_transactions(
+    account_id: str,
+    request: Request,
+    start: date = Query(..., description="First UTC day"),
+    end: Optional[date] = Query(None, description="Last UTC day (default today)"),
+    export_format: str = Query("csv", alias="format", pattern="^(csv|ofx|qfx)$"),
+    user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Stream posted transactions as CSV, OFX or QFX (authenticated + owned account only)"""
+    account = await _get_owned_account(db, account_id, user_id)
+    end = end or datetime.utcnow().date()
+    if start > end:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="start must be on or before end")
+
+    media_type, extension = EXPORT_FORMATS[export_format]
+    body = StatementExportService.stream(export_format, account, datetime.combine(start, time.min), datetime.combine(end, time.max))
+    headers = {
+        "Content-Disposition": f'attachment; filename="transactions_{account.account_number[-4:]}_{start}_{end}.{extension}"',
+        "Vary": "Accept-Encoding",
+    }
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        body = StatementExportService.gzip_stream(body)
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(body, media_type=media_type, headers=headers)
+
+
 @router.get("/{account_id}/transactions")
 async def get_transactions(
     account_id: str,
     limit: int = Query(20, le=100),
     offset: int = Query(0),
     user_id: str = Depends(get_current_user_id),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get transaction history for an owned account"""
     await _get_owned_account(db, account_id, user_id)
@@ -225,7 +309,7 @@ async def get_account_history(
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
     user_id: str = Depends(get_current_user_id),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Return enriched history items for a single account, matching transfers/history formatting."""
     # Ensure the requester owns this account
@@ -477,7 +561,7 @@ async def get_account_history(
 async def get_statements(
     account_id: str,
     user_id: str = Depends(get_current_user_id),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get account statements for an owned account"""
     await _get_owned_account(db, account_id, user_id)
@@ -508,7 +592,7 @@ async def download_statement(
     account_id: str,
     statement_id: str,
     user_id: str = Depends(get_current_user_id),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Download eStatement (authenticated + owned account only)"""
     # Verify account ownership
@@ -7,6 +7,7 @@ from database import get_db
 from utils.auth import get_current_user_id
 from utils.account_helpers import _get_owned_account
 from services.statement_service import StatementService
+from services.pdf_render_service import PdfRenderTimeout
 import uuid
 from datetime import datetime
 
@@ -148,6 +149,11 @@ async def generate_statement(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
         )
+    except PdfRenderTimeout:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Statement is too large to generate right now; try a shorter date range"
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -1,10 +1,12 @@
 from fastapi import APIRouter, Depends, status, Query
+from fastapi.responses import PlainTextResponse
 from typing import List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_, text
 from datetime import datetime, timezone, timedelta
 import uuid
 import json
+import time
 
 from models.admin import AdminUser, AdminAuditLog
 from models.support import SupportTicket, TicketMessage, LoginHistory
@@ -19,26 +21,33 @@ from models.notification import Notification, NotificationType
 from models.document import Document
 from models.bill_payment import BillPayment, BillPayee, ScheduledPayment
 from models.user_restriction import UserRestriction, RestrictionType
+from models.job import BackgroundJob, JobStatus, JobType
 from schemas.admin import (
     AdminRegisterRequest, AdminLoginRequest, AdminResponse,
     ApproveTransferRequest, DeclineTransferRequest, TransferApprovalResponse,
     ApproveDepositRequest, DeclineDepositRequest, DepositApprovalResponse,
     ApproveVirtualCardRequest, DeclineVirtualCardRequest, VirtualCardApprovalResponse,
     ApproveLoanRequest, DeclineLoanRequest, LoanApprovalResponse,
+    BulkApproveRequest, BulkDeclineRequest, BulkActionResponse,
     ApproveUserRequest, DeclineUserRequest, UserApprovalResponse,
     AdminCreateUserRequest, AdminEditUserRequest, AdminAuditLogResponse,
     AdminAccountStatusRequest, AdminAdjustBalanceRequest, AdminUpdateCardStatusRequest, AdminCardActionRequest,
     AdminStatisticsResponse, AdminCreateLoanProductRequest, AdminCreateLoanRequest,
     GenerateTransactionsRequest, GenerateTransactionsPreviewRequest,
-    GenerateTransactionsPreviewResponse, GenerateTransactionsResponse
+    GenerateTransactionsPreviewResponse, GenerateTransactionsResponse,
+    BackgroundJobResponse
 )
 from schemas.user_restriction import (
     CreateRestrictionRequest, RemoveRestrictionRequest, 
     UserRestrictionResponse, UserRestrictionsResponse
 )
 from pydantic import ValidationError as PydanticValidationError
-from utils.admin_auth import AdminAuthManager, AdminPermissionManager, get_current_admin
-from database import get_db
+from utils.admin_auth import AdminAuthManager, AdminPermissionManager, AdminPrincipal, get_current_admin
+from database import engine, read_engine, read_pool_metrics, get_db, get_read_db
+from utils.db_pool import pool_metrics
+from utils.slow_queries import SlowQueryLog
+from utils.loop_watchdog import loop_watchdog
+from utils.profiler import PROFILE_HEADER, ProfileStore, create_profile_token, to_collapsed, to_speedscope
 from utils.errors import (
     ValidationError, AuthenticationError, NotFoundError, UnauthorizedError, InternalServerError, ConflictError
 )
@@ -46,6 +55,10 @@ from utils.logger import logger
 from utils.ably import AblyRealtimeManager, get_admin_ably_token_request
 from config import settings
 from services.email import email_service
+from services.user_deletion import UserDeletionService
+from services.bulk_approval import BulkApprovalService
+from services.statement_service import StatementService
+from services.balance_snapshot_service import BalanceSnapshotService
 from models.notification import Notification, NotificationType
 
 router = APIRouter(prefix="/admin", tags=["admin"])
@@ -83,14 +96,10 @@ def _verification_status(user: User) -> str:
 
 @router.get("/dashboard/overview")
 async def admin_dashboard_overview(
-    admin_id: str,
-    db: AsyncSession = Depends(get_db),
+    admin: AdminPrincipal = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Admin dashboard data based entirely on live database values."""
-    admin_result = await db.execute(select(AdminUser).where(AdminUser.id == admin_id))
-    admin = admin_result.scalar()
-    if not admin:
-        raise UnauthorizedError(message="Admin not found", error_code="ADMIN_NOT_FOUND")
 
     # KPIs
     users_result = await db.execute(select(User))
@@ -239,8 +248,8 @@ def _serialize_admin_ticket(t: SupportTicket, user: User | None, agent: AdminUse
 @router.get("/support/tickets")
 async def admin_list_tickets(
     limit: int = Query(50),
-    db: AsyncSession = Depends(get_db),
-    admin: AdminUser = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_read_db),
+    admin: AdminPrincipal = Depends(get_current_admin),
 ):
     # Load tickets (keep existing query and limit)
     result = await db.execute(
@@ -280,8 +289,8 @@ async def admin_list_tickets(
 
 @router.get("/support/agents")
 async def admin_list_support_agents(
-    db: AsyncSession = Depends(get_db),
-    admin: AdminUser = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_read_db),
+    admin: AdminPrincipal = Depends(get_current_admin),
 ):
     result = await db.execute(select(AdminUser).where(AdminUser.role.in_([AdminRole.SUPPORT, AdminRole.MANAGER, AdminRole.SUPER_ADMIN])))
     agents = result.scalars().all()
@@ -293,7 +302,7 @@ async def admin_assign_ticket(
     ticket_id: str,
     request: AssignTicketRequest,
     db: AsyncSession = Depends(get_db),
-    admin: AdminUser = Depends(get_current_admin),
+    admin: AdminPrincipal = Depends(get_current_admin),
 ):
     t_res = await db.execute(select(SupportTicket).where(SupportTicket.id == ticket_id))
     t = t_res.scalar_one_or_none()
@@ -321,7 +330,7 @@ async def admin_update_ticket_status(
     ticket_id: str,
     request: UpdateTicketStatusRequest,
     db: AsyncSession = Depends(get_db),
-    admin: AdminUser = Depends(get_current_admin),
+    admin: AdminPrincipal = Depends(get_current_admin),
 ):
     t_res = await db.execute(select(SupportTicket).where(SupportTicket.id == ticket_id))
     t = t_res.scalar_one_or_none()
@@ -351,8 +360,8 @@ async def admin_update_ticket_status(
 @router.get("/support/tickets/{ticket_id}/replies")
 async def admin_get_ticket_replies(
     ticket_id: str,
-    db: AsyncSession = Depends(get_db),
-    admin: AdminUser = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_read_db),
+    admin: AdminPrincipal = Depends(get_current_admin),
 ):
     t_res = await db.execute(select(SupportTicket).where(SupportTicket.id == ticket_id))
     t = t_res.scalar_one_or_none()
@@ -391,7 +400,7 @@ async def admin_post_ticket_reply(
     ticket_id: str,
     request: TicketReplyRequest,
     db: AsyncSession = Depends(get_db),
-    admin: AdminUser = Depends(get_current_admin),
+    admin: AdminPrincipal = Depends(get_current_admin),
 ):
     t_res = await db.execute(select(SupportTicket).where(SupportTicket.id == ticket_id))
     t = t_res.scalar_one_or_none()
@@ -447,22 +456,18 @@ async def admin_post_ticket_reply(
     # email: optional
     try:
         if u and getattr(settings, "SMTP_SERVER", None):
-            email_service.send_support_ticket_reply(u.email, t.ticket_number, t.subject, request.message)
+            await email_service.send_support_ticket_reply(u.email, t.ticket_number, t.subject, request.message)
     except Exception:
         pass
     return {"success": True, "data": {"id": msg.id}}
 
 @router.put("/cards/status")
 async def admin_update_card_status(
-    admin_id: str,
     request: AdminUpdateCardStatusRequest,
+    admin: AdminPrincipal = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db)
 ):
     try:
-        admin_result = await db.execute(select(AdminUser).where(AdminUser.id == admin_id))
-        admin = admin_result.scalar()
-        if not admin:
-            raise UnauthorizedError(message="Admin not found", error_code="ADMIN_NOT_FOUND")
         required_perm = "cards:approve" if request.status == "active" else "cards:update"
         if not AdminPermissionManager.has_permission(admin.role, required_perm):
             raise UnauthorizedError(message="You don't have permission to update cards", error_code="PERMISSION_DENIED")
@@ -511,7 +516,7 @@ async def admin_update_card_status(
                 )
                 try:
                     if getattr(settings, "SMTP_SERVER", None):
-                        email_service.send_card_ready_email(
+                        await email_service.send_card_ready_email(
                             user.email,
                             card.card_name,
                             card.card_type.value if hasattr(card.card_type, "value") else str(card.card_type),
@@ -532,11 +537,9 @@ async def admin_update_card_status(
         raise InternalServerError(operation="card status", error_code="CARD_STATUS_FAILED", original_error=e)
 
 @router.post("/cards/freeze")
-async def admin_freeze_card(admin_id: str, request: AdminCardActionRequest, db: AsyncSession = Depends(get_db)):
+async def admin_freeze_card(request: AdminCardActionRequest, admin: AdminPrincipal = Depends(get_current_admin), db: AsyncSession = Depends(get_db)):
     try:
-        admin_result = await db.execute(select(AdminUser).where(AdminUser.id == admin_id))
-        admin = admin_result.scalar()
-        if not admin or not AdminPermissionManager.has_permission(admin.role, "cards:update"):
+        if not AdminPermissionManager.has_permission(admin.role, "cards:update"):
             raise UnauthorizedError(message="You don't have permission to freeze cards", error_code="PERMISSION_DENIED")
         card_result = await db.execute(select(VirtualCard).where(VirtualCard.id == request.card_id))
         card = card_result.scalar_one_or_none()
@@ -566,11 +569,9 @@ async def admin_freeze_card(admin_id: str, request: AdminCardActionRequest, db:
         raise InternalServerError(operation="freeze card", error_code="FREEZE_FAILED", original_error=e)
 
 @router.post("/cards/unfreeze")
-async def admin_unfreeze_card(admin_id: str, request: AdminCardActionRequest, db: AsyncSession = Depends(get_db)):
+async def admin_unfreeze_card(request: AdminCardActionRequest, admin: AdminPrincipal = Depends(get_current_admin), db: AsyncSession = Depends(get_db)):
     try:
-        admin_result = await db.execute(select(AdminUser).where(AdminUser.id == admin_id))
-        admin = admin_result.scalar()
-        if not admin or not AdminPermissionManager.has_permission(admin.role, "cards:update"):
+        if not AdminPermissionManager.has_permission(admin.role, "cards:update"):
             raise UnauthorizedError(message="You don't have permission to unfreeze cards", error_code="PERMISSION_DENIED")
         card_result = await db.execute(select(VirtualCard).where(VirtualCard.id == request.card_id))
         card = card_result.scalar_one_or_none()
@@ -600,11 +601,9 @@ async def admin_unfreeze_card(admin_id: str, request: AdminCardActionRequest, db
         raise InternalServerError(operation="unfreeze card", error_code="UNFREEZE_FAILED", original_error=e)
 
 @router.post("/cards/block")
-async def admin_block_card(admin_id: str, request: AdminCardActionRequest, db: AsyncSession = Depends(get_db)):
+async def admin_block_card(request: AdminCardActionRequest, admin: AdminPrincipal = Depends(get_current_admin), db: AsyncSession = Depends(get_db)):
     try:
-        admin_result = await db.execute(select(AdminUser).where(AdminUser.id == admin_id))
-        admin = admin_result.scalar()
-        if not admin or not AdminPermissionManager.has_permission(admin.role, "cards:update"):
+        if not AdminPermissionManager.has_permission(admin.role, "cards:update"):
             raise UnauthorizedError(message="You don't have permission to block cards", error_code="PERMISSION_DENIED")
         card_result = await db.execute(select(VirtualCard).where(VirtualCard.id == request.card_id))
         card = card_result.scalar_one_or_none()
@@ -632,11 +631,9 @@ async def admin_block_card(admin_id: str, request: AdminCardActionRequest, db: A
         raise InternalServerError(operation="block card", error_code="BLOCK_FAILED", original_error=e)
 
 @router.get("/cards/list")
-async def admin_list_cards(admin_id: str, db: AsyncSession = Depends(get_db)):
+async def admin_list_cards(admin: AdminPrincipal = Depends(get_current_admin), db: AsyncSession = Depends(get_read_db)):
     try:
-        admin_result = await db.execute(select(AdminUser).where(AdminUser.id == admin_id))
-        admin = admin_result.scalar()
-        if not admin or not AdminPermissionManager.has_permission(admin.role, "cards:view"):
+        if not AdminPermissionManager.has_permission(admin.role, "cards:view"):
             raise UnauthorizedError(message="You don't have permission to view cards", error_code="PERMISSION_DENIED")
         cards_result = await db.execute(select(VirtualCard))
         cards = cards_result.scalars().all()
@@ -662,20 +659,16 @@ async def admin_list_cards(admin_id: str, db: AsyncSession = Depends(get_db)):
 
 @router.get("/users/list")
 async def admin_list_users(
-    admin_id: str,
     q: str = Query("", max_length=120),
     status_filter: str = Query("all"),
     verification_filter: str = Query("all"),
     country: str = Query("all"),
     page: int = Query(1, ge=1),
     page_size: int = Query(10, ge=5, le=50),
-    db: AsyncSession = Depends(get_db),
+    admin: AdminPrincipal = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """User directory list for admin UI (filterable + paginated)."""
-    admin_result = await db.execute(select(AdminUser).where(AdminUser.id == admin_id))
-    admin = admin_result.scalar()
-    if not admin:
-        raise UnauthorizedError(message="Admin not found", error_code="ADMIN_NOT_FOUND")
 
     result = await db.execute(select(User))
     users = result.scalars().all()
@@ -747,19 +740,15 @@ async def admin_list_users(
 
 @router.get("/accounts/list")
 async def admin_list_accounts(
-    admin_id: str,
     q: str = Query("", max_length=120),
     status: str = Query("all"),
     type_filter: str = Query("all"),
     page: int = Query(1, ge=1),
     page_size: int = Query(10, ge=5, le=50),
-    db: AsyncSession = Depends(get_db),
+    admin: AdminPrincipal = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Accounts list for admin UI."""
-    admin_result = await db.execute(select(AdminUser).where(AdminUser.id == admin_id))
-    admin = admin_result.scalar()
-    if not admin:
-        raise UnauthorizedError(message="Admin not found", error_code="ADMIN_NOT_FOUND")
 
     acc_result = await db.execute(select(Account))
     accounts = acc_result.scalars().all()
@@ -813,7 +802,7 @@ async def admin_list_accounts(
 @router.put("/transfers/edit")
 async def admin_edit_transfer(
     payload: dict,
-    current_admin: AdminUser = Depends(get_current_admin),
+    current_admin: AdminPrincipal = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db),
 ):
     try:
@@ -986,12 +975,8 @@ async def admin_edit_transfer(
         raise InternalServerError(operation="edit transfer", error_code="TRANSFER_EDIT_FAILED", original_error=e)
 
 @router.get("/system/settings")
-async def admin_system_settings(admin_id: str, db: AsyncSession = Depends(get_db)):
+async def admin_system_settings(admin: AdminPrincipal = Depends(get_current_admin), db: AsyncSession = Depends(get_db)):
     """System settings overview for admin UI."""
-    result = await db.execute(select(AdminUser).where(AdminUser.id == admin_id))
-    admin = result.scalar()
-    if not admin:
-        raise UnauthorizedError(message="Admin not found", error_code="ADMIN_NOT_FOUND")
 
     ably_configured = bool(getattr(settings, "ABLY_API_KEY", None)) and settings.ABLY_API_KEY != "your-ably-api-key"
     email_configured = bool(getattr(settings, "SMTP_SERVER", None))
@@ -1010,20 +995,129 @@ async def admin_system_settings(admin_id: str, db: AsyncSession = Depends(get_db
         "message": "System settings loaded",
     }
 
+@router.get("/system/db-pool")
+async def admin_database_pool(admin: AdminPrincipal = Depends(get_current_admin)):
+    """Connection pool configuration and live checkout/usage counters."""
+    if not AdminPermissionManager.has_permission(admin.role, "settings:manage"):
+        raise UnauthorizedError(message="You don't have permission to view database pool stats", error_code="PERMISSION_DENIED")
+    return {
+        "success": True,
+        "data": {
+            "config": {
+                "pool_size": settings.DB_POOL_SIZE,
+                "max_overflow": settings.DB_MAX_OVERFLOW,
+                "pool_timeout": settings.DB_POOL_TIMEOUT,
+                "pool_recycle": settings.DB_POOL_RECYCLE,
+                "pool_pre_ping": settings.DB_POOL_PRE_PING,
+                "pgbouncer_mode": settings.DB_PGBOUNCER_MODE,
+                "read_replica": read_engine is not engine,
+            },
+            "stats": pool_metrics.snapshot(engine.sync_engine.pool),
+            "replica_stats": read_pool_metrics.snapshot(read_engine.sync_engine.pool) if read_engine is not engine else None,
+        },
+        "message": "Database pool stats loaded",
+    }
+
+@router.get("/system/slow-queries")
+async def admin_slow_queries(
+    limit: int = Query(50, ge=1, le=500),
+    top: int = Query(20, ge=1, le=100),
+    admin: AdminPrincipal = Depends(get_current_admin),
+):
+    """Recent slow statements (with sampled EXPLAIN plans) and the top shapes by total time."""
+    if not AdminPermissionManager.has_permission(admin.role, "settings:manage"):
+        raise UnauthorizedError(message="You don't have permission to view slow queries", error_code="PERMISSION_DENIED")
+    return {
+        "success": True,
+        "data": {
+            "threshold_ms": settings.SLOW_QUERY_THRESHOLD_MS,
+            "explain_sample_rate": settings.SLOW_QUERY_EXPLAIN_SAMPLE_RATE,
+            "recent": SlowQueryLog.recent(limit),
+            "top_by_total_time": SlowQueryLog.top(top),
+        },
+        "message": "Slow queries loaded",
+    }
+
+
+@router.delete("/system/slow-queries")
+async def admin_clear_slow_queries(admin: AdminPrincipal = Depends(get_current_admin)):
+    """Reset the slow query buffer and totals (e.g. after deploying an index)."""
+    if not AdminPermissionManager.has_permission(admin.role, "settings:manage"):
+        raise UnauthorizedError(message="You don't have permission to manage system settings", error_code="PERMISSION_DENIED")
+    SlowQueryLog.clear()
+    return {"success": True, "message": "Slow query log cleared"}
+
+
+@router.get("/system/event-loop")
+async def admin_event_loop(limit: int = Query(20, ge=1, le=50), admin: AdminPrincipal = Depends(get_current_admin)):
+    """Event loop lag percentiles and the most recent blocking stacks."""
+    if not AdminPermissionManager.has_permission(admin.role, "settings:manage"):
+        raise UnauthorizedError(message="You don't have permission to view event loop stats", error_code="PERMISSION_DENIED")
+    return {
+        "success": True,
+        "data": {
+            "enabled": loop_watchdog.running,
+            "block_threshold_ms": settings.LOOP_BLOCK_THRESHOLD_MS,
+            "lag": loop_watchdog.lag_percentiles(),
+            "recent_blocks": loop_watchdog.recent_blocks(limit),
+        },
+        "message": "Event loop stats loaded",
+    }
+
+
+@router.post("/system/profiler/tokens")
+async def admin_create_profile_token(
+    path: str = Query("/api/", max_length=200, description="Only requests under this path prefix are profiled"),
+    admin: AdminPrincipal = Depends(get_current_admin),
+):
+    """Short-lived token that profiles requests sent with it in the X-Profile-Token header."""
+    if not AdminPermissionManager.has_permission(admin.role, "settings:manage"):
+        raise UnauthorizedError(message="You don't have permission to manage system settings", error_code="PERMISSION_DENIED")
+    if not settings.PROFILER_ENABLED:
+        raise ValidationError("Request profiling is disabled (PROFILER_ENABLED)", error_code="PROFILER_DISABLED")
+    token, expires_at = create_profile_token(admin.id, path)
+    logger.info(f"Admin {admin.id} issued a profile token for {path}")
+    return {
+        "success": True,
+        "data": {"token": token, "header": PROFILE_HEADER, "path": path, "expires_at": expires_at.isoformat()},
+        "message": "Profile token issued",
+    }
+
+
+@router.get("/system/profiles")
+async def admin_list_profiles(admin: AdminPrincipal = Depends(get_current_admin)):
+    """Recently captured request profiles."""
+    if not AdminPermissionManager.has_permission(admin.role, "settings:manage"):
+        raise UnauthorizedError(message="You don't have permission to view profiles", error_code="PERMISSION_DENIED")
+    return {"success": True, "data": ProfileStore.list(), "message": "Profiles loaded"}
+
+
+@router.get("/system/profiles/{profile_id}")
+async def admin_get_profile(
+    profile_id: str,
+    format: str = Query("speedscope", pattern="^(speedscope|collapsed)$"),
+    admin: AdminPrincipal = Depends(get_current_admin),
+):
+    """One profile as speedscope JSON (open in speedscope.app) or collapsed stacks for flamegraph.pl."""
+    if not AdminPermissionManager.has_permission(admin.role, "settings:manage"):
+        raise UnauthorizedError(message="You don't have permission to view profiles", error_code="PERMISSION_DENIED")
+    profile = ProfileStore.get(profile_id)
+    if profile is None:
+        raise NotFoundError("Profile")
+    if format == "collapsed":
+        return PlainTextResponse(to_collapsed(profile))
+    return to_speedscope(profile)
+
 @router.get("/transactions/list")
 async def admin_list_transactions(
-    admin_id: str,
     q: str = Query("", max_length=120),
     status: str = Query("all"),
     page: int = Query(1, ge=1),
     page_size: int = Query(10, ge=5, le=50),
-    db: AsyncSession = Depends(get_db),
+    admin: AdminPrincipal = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Transactions list for admin UI - includes both real and generated transactions."""
-    admin_result = await db.execute(select(AdminUser).where(AdminUser.id == admin_id))
-    admin = admin_result.scalar()
-    if not admin:
-        raise UnauthorizedError(message="Admin not found", error_code="ADMIN_NOT_FOUND")
 
     # Get all transactions (both with and without transfer_id - includes generated transactions)
     tx_result = await db.execute(
@@ -1237,24 +1331,12 @@ async def admin_login(
 
 @router.post("/transfers/approve", response_model=TransferApprovalResponse)
 async def approve_transfer(
-    admin_id: str,
     request: ApproveTransferRequest,
+    admin: AdminPrincipal = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db)
 ):
     """Approve pending transfer"""
     try:
-        # Verify admin exists and has permission
-        admin_result = await db.execute(
-            select(AdminUser).where(AdminUser.id == admin_id)
-        )
-        admin = admin_result.scalar()
-        
-        if not admin:
-            raise UnauthorizedError(
-                message="Admin not found",
-                error_code="ADMIN_NOT_FOUND"
-            )
-        
         if not AdminPermissionManager.has_permission(admin.role, "transfers:approve"):
             logger.warning(f"Unauthorized transfer approval attempt by {admin.email}")
             raise UnauthorizedError(
@@ -1322,21 +1404,12 @@ async def approve_transfer(
 
 @router.post("/users/approve", response_model=UserApprovalResponse)
 async def approve_user(
-    admin_id: str,
     request: ApproveUserRequest,
+    admin: AdminPrincipal = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db)
 ):
     """Approve a newly registered user"""
     try:
-        # Verify admin exists and has permission
-        admin_result = await db.execute(
-            select(AdminUser).where(AdminUser.id == admin_id)
-        )
-        admin = admin_result.scalar()
-        
-        if not admin:
-            raise UnauthorizedError(message="Admin not found")
-        
         if not AdminPermissionManager.has_permission(admin.role, "users:update"):
             raise UnauthorizedError(message="You don't have permission to approve users")
             
@@ -1374,7 +1447,7 @@ async def approve_user(
         
         # Send approval email
         try:
-            email_service.send_approval_email(user.email, user.first_name)
+            await email_service.send_approval_email(user.email, user.first_name)
         except Exception as e:
             logger.error(f"Failed to send approval email to {user.email}: {e}")
             
@@ -1416,15 +1489,13 @@ async def approve_user(
 
 @router.post("/users/decline", response_model=UserApprovalResponse)
 async def decline_user(
-    admin_id: str,
     request: DeclineUserRequest,
+    admin: AdminPrincipal = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db)
 ):
     """Decline a user registration"""
     try:
-        admin_result = await db.execute(select(AdminUser).where(AdminUser.id == admin_id))
-        admin = admin_result.scalar()
-        if not admin or not AdminPermissionManager.has_permission(admin.role, "users:update"):
+        if not AdminPermissionManager.has_permission(admin.role, "users:update"):
             raise UnauthorizedError(message="Permission denied")
             
         user_result = await db.execute(select(User).where(User.id == request.user_id))
@@ -1461,23 +1532,12 @@ async def decline_user(
 
 @router.post("/transfers/decline", response_model=TransferApprovalResponse)
 async def decline_transfer(
-    admin_id: str,
     request: DeclineTransferRequest,
+    admin: AdminPrincipal = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db)
 ):
     """Decline pending transfer"""
     try:
-        admin_result = await db.execute(
-            select(AdminUser).where(AdminUser.id == admin_id)
-        )
-        admin = admin_result.scalar()
-        
-        if not admin:
-            raise UnauthorizedError(
-                message="Admin not found",
-                error_code="ADMIN_NOT_FOUND"
-            )
-        
         if not AdminPermissionManager.has_permission(admin.role, "transfers:decline"):
             logger.warning(f"Unauthorized transfer decline attempt by {admin.email}")
             raise UnauthorizedError(
@@ -1544,7 +1604,7 @@ async def decline_transfer(
 @router.put("/transactions/edit")
 async def admin_edit_transaction(
     payload: dict,
-    current_admin: AdminUser = Depends(get_current_admin),
+    current_admin: AdminPrincipal = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db),
 ):
     """Edit basic transaction attributes like description or created_at."""
@@ -1559,6 +1619,7 @@ async def admin_edit_transaction(
         tx = result.scalar_one_or_none()
         if not tx:
             raise NotFoundError(resource="Transaction", error_code="TX_NOT_FOUND")
+        previous_created_at = tx.created_at
         if "description" in payload and isinstance(payload["description"], str):
             tx.description = payload["description"]
         if "created_at" in payload and payload["created_at"]:
@@ -1567,6 +1628,9 @@ async def admin_edit_transaction(
             except Exception:
                 pass
         db.add(tx)
+        # Statements covering the old or new date no longer match the ledger
+        await StatementService.invalidate_cached_statements(db, tx.user_id, previous_created_at, tx.created_at)
+        await BalanceSnapshotService.rebuild_account(db, tx.account_id, previous_created_at, tx.created_at)
         audit_log = AdminAuditLog(
             id=str(uuid.uuid4()),
             admin_id=admin.id,
@@ -1588,7 +1652,7 @@ async def admin_edit_transaction(
 @router.delete("/transactions/{transaction_id}")
 async def admin_delete_transaction(
     transaction_id: str,
-    current_admin: AdminUser = Depends(get_current_admin),
+    current_admin: AdminPrincipal = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db),
 ):
     """Delete a transaction from the database."""
@@ -1614,7 +1678,9 @@ async def admin_delete_transaction(
         }
         
         # Delete the transaction
+        await StatementService.invalidate_cached_statements(db, tx.user_id, tx.created_at)
         await db.delete(tx)
+        await BalanceSnapshotService.rebuild_account(db, tx.account_id, tx.created_at)
         
         # Create audit log
         audit_log = AdminAuditLog(
@@ -1639,7 +1705,7 @@ async def admin_delete_transaction(
 @router.post("/transactions/{transaction_id}/approve")
 async def admin_approve_transaction(
     transaction_id: str,
-    current_admin: AdminUser = Depends(get_current_admin),
+    current_admin: AdminPrincipal = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db),
 ):
     """Approve a pending transaction and mark it as completed."""
@@ -1711,7 +1777,7 @@ async def admin_approve_transaction(
 @router.post("/transfers/reverse")
 async def admin_reverse_transfer(
     payload: dict,
-    current_admin: AdminUser = Depends(get_current_admin),
+    current_admin: AdminPrincipal = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db),
 ):
     """Reverse a transfer: credit sender back, and if internal/domestic to internal account, debit recipient."""
@@ -1824,7 +1890,7 @@ async def admin_reverse_transfer(
                 sender = user_res.scalar_one_or_none()
                 if sender and getattr(sender, "email", None):
                     admin_reason = (payload.get("reason") or "").strip()
-                    email_service.send_transfer_reversed_email(
+                    await email_service.send_transfer_reversed_email(
                         sender.email,
                         float(transfer.total_amount or 0.0),
                         transfer.currency,
@@ -1844,15 +1910,11 @@ async def admin_reverse_transfer(
 
 @router.get("/deposits/list")
 async def list_deposits(
-    admin_id: str,
     status: str | None = Query(None),
-    db: AsyncSession = Depends(get_db)
+    admin: AdminPrincipal = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_read_db)
 ):
     try:
-        admin_result = await db.execute(select(AdminUser).where(AdminUser.id == admin_id))
-        admin = admin_result.scalar()
-        if not admin:
-            raise UnauthorizedError(message="Admin not found", error_code="ADMIN_NOT_FOUND")
         if not AdminPermissionManager.has_permission(admin.role, "deposits:approve"):
             raise UnauthorizedError(message="You don't have permission to view deposits", error_code="PERMISSION_DENIED")
         query = select(Deposit)
@@ -1905,23 +1967,12 @@ async def list_deposits(
 
 @router.post("/deposits/approve", response_model=DepositApprovalResponse)
 async def approve_deposit(
-    admin_id: str,
     request: ApproveDepositRequest,
+    admin: AdminPrincipal = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db)
 ):
     """Approve check or direct deposit"""
     try:
-        admin_result = await db.execute(
-            select(AdminUser).where(AdminUser.id == admin_id)
-        )
-        admin = admin_result.scalar()
-        
-        if not admin:
-            raise UnauthorizedError(
-                message="Admin not found",
-                error_code="ADMIN_NOT_FOUND"
-            )
-        
         if not AdminPermissionManager.has_permission(admin.role, "deposits:approve"):
             raise UnauthorizedError(
                 message="You don't have permission to approve deposits",
@@ -2018,23 +2069,12 @@ async def approve_deposit(
 
 @router.post("/deposits/decline", response_model=DepositApprovalResponse)
 async def decline_deposit(
-    admin_id: str,
     request: DeclineDepositRequest,
+    admin: AdminPrincipal = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db)
 ):
     """Decline check or direct deposit"""
     try:
-        admin_result = await db.execute(
-            select(AdminUser).where(AdminUser.id == admin_id)
-        )
-        admin = admin_result.scalar()
-        
-        if not admin:
-            raise UnauthorizedError(
-                message="Admin not found",
-                error_code="ADMIN_NOT_FOUND"
-            )
-        
         if not AdminPermissionManager.has_permission(admin.role, "deposits:decline"):
             raise UnauthorizedError(
                 message="You don't have permission to decline deposits",
@@ -2100,23 +2140,12 @@ async def decline_deposit(
 
 @router.post("/cards/approve", response_model=VirtualCardApprovalResponse)
 async def approve_virtual_card(
-    admin_id: str,
     request: ApproveVirtualCardRequest,
+    admin: AdminPrincipal = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db)
 ):
     """Approve virtual card creation"""
     try:
-        admin_result = await db.execute(
-            select(AdminUser).where(AdminUser.id == admin_id)
-        )
-        admin = admin_result.scalar()
-        
-        if not admin:
-            raise UnauthorizedError(
-                message="Admin not found",
-                error_code="ADMIN_NOT_FOUND"
-            )
-        
         if not AdminPermissionManager.has_permission(admin.role, "cards:approve"):
             raise UnauthorizedError(
                 message="You don't have permission to approve cards",
@@ -2194,23 +2223,12 @@ async def approve_virtual_card(
 
 @router.post("/cards/decline", response_model=VirtualCardApprovalResponse)
 async def decline_virtual_card(
-    admin_id: str,
     request: DeclineVirtualCardRequest,
+    admin: AdminPrincipal = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db)
 ):
     """Decline virtual card creation"""
     try:
-        admin_result = await db.execute(
-            select(AdminUser).where(AdminUser.id == admin_id)
-        )
-        admin = admin_result.scalar()
-        
-        if not admin:
-            raise UnauthorizedError(
-                message="Admin not found",
-                error_code="ADMIN_NOT_FOUND"
-            )
-        
         if not AdminPermissionManager.has_permission(admin.role, "cards:decline"):
             raise UnauthorizedError(
                 message="You don't have permission to decline cards",
@@ -2288,17 +2306,12 @@ async def decline_virtual_card(
 
 @router.post("/loans/approve", response_model=LoanApprovalResponse)
 async def approve_loan(
-    admin_id: str,
     request: ApproveLoanRequest,
+    admin: AdminPrincipal = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db)
 ):
     """Approve loan application and disburse funds"""
     try:
-        admin_result = await db.execute(select(AdminUser).where(AdminUser.id == admin_id))
-        admin = admin_result.scalar()
-        if not admin:
-            raise UnauthorizedError(message="Admin not found", error_code="ADMIN_NOT_FOUND")
-        
         if not AdminPermissionManager.has_permission(admin.role, "loans:approve"):
             raise UnauthorizedError(message="You don't have permission to approve loans", error_code="PERMISSION_DENIED")
         
@@ -2440,7 +2453,7 @@ async def approve_loan(
             # Email
             try:
                 if getattr(settings, "SMTP_SERVER", None):
-                    email_service.send_loan_status_email(user.email, "Approved", app.approved_amount, "")
+                    await email_service.send_loan_status_email(user.email, "Approved", app.approved_amount, "")
             except Exception:
                 pass
 
@@ -2459,17 +2472,12 @@ async def approve_loan(
 
 @router.post("/loans/decline", response_model=LoanApprovalResponse)
 async def decline_loan(
-    admin_id: str,
     request: DeclineLoanRequest,
+    admin: AdminPrincipal = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db)
 ):
     """Decline loan application"""
     try:
-        admin_result = await db.execute(select(AdminUser).where(AdminUser.id == admin_id))
-        admin = admin_result.scalar()
-        if not admin:
-            raise UnauthorizedError(message="Admin not found", error_code="ADMIN_NOT_FOUND")
-        
         if not AdminPermissionManager.has_permission(admin.role, "loans:decline"):
             raise UnauthorizedError(message="You don't have permission to decline loans", error_code="PERMISSION_DENIED")
         
@@ -2536,7 +2544,7 @@ async def decline_loan(
             # Email
             try:
                 if getattr(settings, "SMTP_SERVER", None):
-                    email_service.send_loan_status_email(user.email, "Declined", app.requested_amount, request.reason)
+                    await email_service.send_loan_status_email(user.email, "Declined", app.requested_amount, request.reason)
             except Exception:
                 pass
 
@@ -2553,20 +2561,132 @@ async def decline_loan(
         raise InternalServerError(operation="loan decline", error_code="DECLINE_FAILED", original_error=e)
 
 
+# ==================== BULK APPROVALS ====================
+
+async def _run_bulk_action(
+    db: AsyncSession,
+    admin: AdminPrincipal,
+    permission: str,
+    ids: List[str],
+    operation: str,
+    action,
+) -> dict:
+    """Shared permission check, commit and side-effect dispatch for bulk endpoints"""
+    if not AdminPermissionManager.has_permission(admin.role, permission):
+        logger.warning(f"Unauthorized bulk {operation} attempt by {admin.email}")
+        raise UnauthorizedError(message=f"You don't have permission to {operation}", error_code="PERMISSION_DENIED")
+    if len(ids) > settings.BULK_APPROVAL_MAX_ITEMS:
+        raise ValidationError(
+            message=f"At most {settings.BULK_APPROVAL_MAX_ITEMS} items can be processed per request",
+            error_code="BULK_LIMIT_EXCEEDED"
+        )
+
+    try:
+        started = time.perf_counter()
+        result = await action(db, admin)
+        await db.commit()
+        duration_ms = round((time.perf_counter() - started) * 1000, 2)
+    except Exception as e:
+        await db.rollback()
+        logger.error(f"Bulk {operation} failed", error=e)
+        raise InternalServerError(operation=f"bulk {operation}", error_code="BULK_ACTION_FAILED", original_error=e)
+
+    # Realtime events and emails run after the response is sent
+    result.pop("effects").dispatch()
+    processed = len(result["processed_ids"])
+    logger.info(
+        f"Bulk {operation} by {admin.email}: {processed}/{result['requested']} processed in {duration_ms}ms"
+    )
+    return {
+        "success": True,
+        **result,
+        "processed": processed,
+        "duration_ms": duration_ms,
+        "message": f"{processed} of {result['requested']} items processed",
+    }
+
+
+@router.post("/transfers/bulk-approve", response_model=BulkActionResponse)
+async def bulk_approve_transfers(request: BulkApproveRequest, admin: AdminPrincipal = Depends(get_current_admin), db: AsyncSession = Depends(get_db)):
+    """Approve many pending transfers in one transaction"""
+    return await _run_bulk_action(
+        db, admin, "transfers:approve", request.ids, "approve transfers",
+        lambda db, admin: BulkApprovalService.approve_transfers(db, admin, request.ids, request.notes),
+    )
+
+
+@router.post("/transfers/bulk-decline", response_model=BulkActionResponse)
+async def bulk_decline_transfers(request: BulkDeclineRequest, admin: AdminPrincipal = Depends(get_current_admin), db: AsyncSession = Depends(get_db)):
+    """Decline many pending transfers in one transaction"""
+    return await _run_bulk_action(
+        db, admin, "transfers:decline", request.ids, "decline transfers",
+        lambda db, admin: BulkApprovalService.decline_transfers(db, admin, request.ids, request.reason),
+    )
+
+
+@router.post("/deposits/bulk-approve", response_model=BulkActionResponse)
+async def bulk_approve_deposits(request: BulkApproveRequest, admin: AdminPrincipal = Depends(get_current_admin), db: AsyncSession = Depends(get_db)):
+    """Approve many deposits and credit their accounts in one transaction"""
+    return await _run_bulk_action(
+        db, admin, "deposits:approve", request.ids, "approve deposits",
+        lambda db, admin: BulkApprovalService.approve_deposits(db, admin, request.ids, request.notes),
+    )
+
+
+@router.post("/deposits/bulk-decline", response_model=BulkActionResponse)
+async def bulk_decline_deposits(request: BulkDeclineRequest, admin: AdminPrincipal = Depends(get_current_admin), db: AsyncSession = Depends(get_db)):
+    """Decline many deposits in one transaction"""
+    return await _run_bulk_action(
+        db, admin, "deposits:decline", request.ids, "decline deposits",
+        lambda db, admin: BulkApprovalService.decline_deposits(db, admin, request.ids, request.reason),
+    )
+
+
+@router.post("/cards/bulk-approve", response_model=BulkActionResponse)
+async def bulk_approve_cards(request: BulkApproveRequest, admin: AdminPrincipal = Depends(get_current_admin), db: AsyncSession = Depends(get_db)):
+    """Approve many pending virtual cards in one transaction"""
+    return await _run_bulk_action(
+        db, admin, "cards:approve", request.ids, "approve cards",
+        lambda db, admin: BulkApprovalService.approve_cards(db, admin, request.ids, request.notes),
+    )
+
+
+@router.post("/cards/bulk-decline", response_model=BulkActionResponse)
+async def bulk_decline_cards(request: BulkDeclineRequest, admin: AdminPrincipal = Depends(get_current_admin), db: AsyncSession = Depends(get_db)):
+    """Decline many pending virtual cards in one transaction"""
+    return await _run_bulk_action(
+        db, admin, "cards:decline", request.ids, "decline cards",
+        lambda db, admin: BulkApprovalService.decline_cards(db, admin, request.ids, request.reason),
+    )
+
+
+@router.post("/loans/bulk-approve", response_model=BulkActionResponse)
+async def bulk_approve_loans(request: BulkApproveRequest, admin: AdminPrincipal = Depends(get_current_admin), db: AsyncSession = Depends(get_db)):
+    """Approve many submitted loan applications at their requested terms and disburse funds"""
+    return await _run_bulk_action(
+        db, admin, "loans:approve", request.ids, "approve loans",
+        lambda db, admin: BulkApprovalService.approve_loans(db, admin, request.ids, request.notes),
+    )
+
+
+@router.post("/loans/bulk-decline", response_model=BulkActionResponse)
+async def bulk_decline_loans(request: BulkDeclineRequest, admin: AdminPrincipal = Depends(get_current_admin), db: AsyncSession = Depends(get_db)):
+    """Decline many loan applications in one transaction"""
+    return await _run_bulk_action(
+        db, admin, "loans:decline", request.ids, "decline loans",
+        lambda db, admin: BulkApprovalService.decline_loans(db, admin, request.ids, request.reason),
+    )
+
+
 @router.post("/users/create")
 async def admin_create_user(
-    admin_id: str,
     request: AdminCreateUserRequest,
+    admin: AdminPrincipal = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db)
 ):
     """Admin create user"""
     try:
-        admin_result = await db.execute(
-            select(AdminUser).where(AdminUser.id == admin_id)
-        )
-        admin = admin_result.scalar()
-        
-        if not admin or not AdminPermissionManager.has_permission(admin.role, "users:create"):
+        if not AdminPermissionManager.has_permission(admin.role, "users:create"):
             raise UnauthorizedError(
                 message="You don't have permission to create users",
                 error_code="PERMISSION_DENIED"
@@ -2624,18 +2744,13 @@ async def admin_create_user(
 
 @router.put("/users/edit")
 async def admin_edit_user(
-    admin_id: str,
     request: AdminEditUserRequest,
+    admin: AdminPrincipal = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db)
 ):
     """Admin edit user details"""
     try:
-        admin_result = await db.execute(
-            select(AdminUser).where(AdminUser.id == admin_id)
-        )
-        admin = admin_result.scalar()
-        
-        if not admin or not AdminPermissionManager.has_permission(admin.role, "users:update"):
+        if not AdminPermissionManager.has_permission(admin.role, "users:update"):
             raise UnauthorizedError(
                 message="You don't have permission to edit users",
                 error_code="PERMISSION_DENIED"
@@ -2776,15 +2891,15 @@ async def admin_edit_user(
             if getattr(settings, "SMTP_SERVER", None) and email_changed_fields:
                 full_name = f"{user.first_name or ''} {user.last_name or ''}".strip() or user.username or "Customer"
                 if old_email and old_email != user.email:
-                    email_service.send_profile_update_notice(
+                    await email_service.send_profile_update_notice(
                         old_email, full_name, email_changed_fields, old_email=old_email, new_email=user.email, acted_by=None
                     )
                     if user.email:
-                        email_service.send_profile_update_notice(
+                        await email_service.send_profile_update_notice(
                             user.email, full_name, email_changed_fields, old_email=old_email, new_email=user.email, acted_by=None
                         )
                 elif user.email:
-                    email_service.send_profile_update_notice(
+                    await email_service.send_profile_update_notice(
                         user.email, full_name, email_changed_fields, acted_by=None
                     )
         except Exception:
@@ -2808,15 +2923,13 @@ async def admin_edit_user(
 
 @router.get("/users/detail")
 async def admin_get_user_detail(
-    admin_id: str,
     user_id: str,
-    db: AsyncSession = Depends(get_db)
+    admin: AdminPrincipal = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get full user detail for edit modal"""
     try:
-        admin_result = await db.execute(select(AdminUser).where(AdminUser.id == admin_id))
-        admin = admin_result.scalar()
-        if not admin or not AdminPermissionManager.has_permission(admin.role, "users:read"):
+        if not AdminPermissionManager.has_permission(admin.role, "users:read"):
             raise UnauthorizedError(message="You don't have permission to view users", error_code="PERMISSION_DENIED")
         user_result = await db.execute(select(User).where(User.id == user_id))
         user = user_result.scalar_one_or_none()
@@ -2852,15 +2965,12 @@ async def admin_get_user_detail(
 @router.get("/users/{user_id}/accounts")
 async def admin_get_user_accounts(
     user_id: str,
-    admin_id: str = Query(...),
-    db: AsyncSession = Depends(get_db)
+    admin: AdminPrincipal = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get all accounts for a specific user"""
     try:
-        # Verify admin
-        admin_result = await db.execute(select(AdminUser).where(AdminUser.id == admin_id))
-        admin = admin_result.scalar()
-        if not admin or not AdminPermissionManager.has_permission(admin.role, "users:read"):
+        if not AdminPermissionManager.has_permission(admin.role, "users:read"):
             raise UnauthorizedError(message="You don't have permission to view user accounts", error_code="PERMISSION_DENIED")
         
         # Verify user exists
@@ -2901,15 +3011,11 @@ async def admin_get_user_accounts(
 
 @router.put("/accounts/status")
 async def admin_update_account_status(
-    admin_id: str,
     request: AdminAccountStatusRequest,
+    admin: AdminPrincipal = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db)
 ):
     try:
-        admin_result = await db.execute(select(AdminUser).where(AdminUser.id == admin_id))
-        admin = admin_result.scalar()
-        if not admin:
-            raise UnauthorizedError(message="Admin not found", error_code="ADMIN_NOT_FOUND")
         acc_result = await db.execute(select(Account).where(Account.id == request.account_id))
         account = acc_result.scalar_one_or_none()
         if not account:
@@ -2946,15 +3052,11 @@ async def admin_update_account_status(
 
 @router.put("/accounts/adjust-balance")
 async def admin_adjust_account_balance(
-    admin_id: str,
     request: AdminAdjustBalanceRequest,
+    admin: AdminPrincipal = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db)
 ):
     try:
-        admin_result = await db.execute(select(AdminUser).where(AdminUser.id == admin_id))
-        admin = admin_result.scalar()
-        if not admin:
-            raise UnauthorizedError(message="Admin not found", error_code="ADMIN_NOT_FOUND")
         acc_result = await db.execute(select(Account).where(Account.id == request.account_id))
         account = acc_result.scalar_one_or_none()
         if not account:
@@ -2993,16 +3095,12 @@ class AdminUpdateWalletIdRequest(BaseModel):
 
 @router.put("/accounts/wallet-id")
 async def admin_update_wallet_id(
-    admin_id: str,
     request: AdminUpdateWalletIdRequest,
+    admin: AdminPrincipal = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db)
 ):
     """Admin: set wallet_id on a crypto account"""
     try:
-        admin_result = await db.execute(select(AdminUser).where(AdminUser.id == admin_id))
-        admin = admin_result.scalar()
-        if not admin:
-            raise UnauthorizedError(message="Admin not found", error_code="ADMIN_NOT_FOUND")
         acc_result = await db.execute(select(Account).where(Account.id == request.account_id))
         account = acc_result.scalar_one_or_none()
         if not account:
@@ -3035,17 +3133,18 @@ async def admin_update_wallet_id(
         logger.error("Wallet ID update failed", error=e)
         raise InternalServerError(operation="update wallet id", error_code="WALLET_ID_UPDATE_FAILED", original_error=e)
 
-@router.delete("/users/delete")
+@router.delete("/users/delete", status_code=status.HTTP_202_ACCEPTED)
 async def admin_delete_user(
-    admin_id: str,
     user_id: str,
+    admin: AdminPrincipal = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db)
 ):
-    """Admin delete user account and all associated data"""
+    """Admin delete user account and all associated data.
+
+    Deletion runs as a background job; poll /admin/jobs/{job_id} for progress.
+    """
     try:
-        admin_result = await db.execute(select(AdminUser).where(AdminUser.id == admin_id))
-        admin = admin_result.scalar()
-        if not admin or not AdminPermissionManager.has_permission(admin.role, "users:delete"):
+        if not AdminPermissionManager.has_permission(admin.role, "users:delete"):
             raise UnauthorizedError(message="You don't have permission to delete users", error_code="PERMISSION_DENIED")
         
         user_result = await db.execute(select(User).where(User.id == user_id))
@@ -3053,219 +3152,99 @@ async def admin_delete_user(
         if not user:
             raise NotFoundError(resource="User", error_code="USER_NOT_FOUND")
         
-        logger.info(f"Admin {admin.email} starting complete deletion of user {user_id}")
-        
-        # Delete from Stytch if applicable
-        if settings.AUTH_PROVIDER == "stytch":
-            try:
-                from utils.stytch_client import delete_stytch_user
-                # In our system, User.id IS the Stytch User ID if provider is stytch
-                delete_stytch_user(user.id)
-                logger.info(f"User {user.id} deleted from Stytch by admin {admin.email}")
-            except Exception as stytch_err:
-                logger.error(f"Failed to delete user {user.id} from Stytch: {stytch_err}")
-
-        # Delete all user-related data in order of dependencies
-        deletion_steps = []
-        
-        # 1. Delete user restrictions
-        restrictions_result = await db.execute(select(UserRestriction).where(UserRestriction.user_id == user_id))
-        restrictions = restrictions_result.scalars().all()
-        for restriction in restrictions:
-            await db.delete(restriction)
-            deletion_steps.append(f"restriction_{restriction.id}")
-        
-        # 2. Delete user notifications
-        notifications_result = await db.execute(select(Notification).where(Notification.user_id == user_id))
-        notifications = notifications_result.scalars().all()
-        for notification in notifications:
-            await db.delete(notification)
-            deletion_steps.append(f"notification_{notification.id}")
-        
-        # 3. Delete user support tickets and messages
-        tickets_result = await db.execute(select(SupportTicket).where(SupportTicket.user_id == user_id))
-        tickets = tickets_result.scalars().all()
-        for ticket in tickets:
-            # Delete ticket messages first
-            messages_result = await db.execute(select(TicketMessage).where(TicketMessage.ticket_id == ticket.id))
-            messages = messages_result.scalars().all()
-            for message in messages:
-                await db.delete(message)
-                deletion_steps.append(f"message_{message.id}")
-            # Delete the ticket
-            await db.delete(ticket)
-            deletion_steps.append(f"ticket_{ticket.id}")
-        
-        # 4. Delete user documents
-        documents_result = await db.execute(select(Document).where(Document.user_id == user_id))
-        documents = documents_result.scalars().all()
-        for document in documents:
-            await db.delete(document)
-            deletion_steps.append(f"document_{document.id}")
-        
-        # 5. Handle loan applications and loans carefully to avoid foreign key constraints
-        # First, set application_id to NULL for all user loans
-        loans_result = await db.execute(select(Loan).where(Loan.user_id == user_id))
-        loans = loans_result.scalars().all()
-        for loan in loans:
-            # Clear the foreign key reference first
-            loan.application_id = None
-            await db.flush()  # Flush to ensure the change is applied
-        
-        # Now delete loan applications
-        applications_result = await db.execute(select(LoanApplication).where(LoanApplication.user_id == user_id))
-        applications = applications_result.scalars().all()
-        for application in applications:
-            await db.delete(application)
-            deletion_steps.append(f"loan_application_{application.id}")
-        
-        # Now delete loans and their related data
-        for loan in loans:
-            # Delete loan payments
-            payments_result = await db.execute(select(LoanPayment).where(LoanPayment.loan_id == loan.id))
-            payments = payments_result.scalars().all()
-            for payment in payments:
-                await db.delete(payment)
-                deletion_steps.append(f"loan_payment_{payment.id}")
-            # Delete loan schedule
-            schedule_result = await db.execute(select(LoanSchedule).where(LoanSchedule.loan_id == loan.id))
-            schedule = schedule_result.scalars().all()
-            for schedule_item in schedule:
-                await db.delete(schedule_item)
-                deletion_steps.append(f"loan_schedule_{schedule_item.id}")
-            # Delete the loan
-            await db.delete(loan)
-            deletion_steps.append(f"loan_{loan.id}")
-        
-        # 6. Delete user virtual cards
-        cards_result = await db.execute(select(VirtualCard).where(VirtualCard.user_id == user_id))
-        cards = cards_result.scalars().all()
-        for card in cards:
-            await db.delete(card)
-            deletion_steps.append(f"virtual_card_{card.id}")
-        
-        # 7. Delete user bill payments and payees
-        bill_payments_result = await db.execute(select(BillPayment).where(BillPayment.user_id == user_id))
-        bill_payments = bill_payments_result.scalars().all()
-        for payment in bill_payments:
-            await db.delete(payment)
-            deletion_steps.append(f"bill_payment_{payment.id}")
-        
-        payees_result = await db.execute(select(BillPayee).where(BillPayee.user_id == user_id))
-        payees = payees_result.scalars().all()
-        for payee in payees:
-            await db.delete(payee)
-            deletion_steps.append(f"bill_payee_{payee.id}")
-        
-        # 8. Delete user scheduled payments
-        scheduled_payments_result = await db.execute(select(ScheduledPayment).where(ScheduledPayment.user_id == user_id))
-        scheduled_payments = scheduled_payments_result.scalars().all()
-        for scheduled_payment in scheduled_payments:
-            await db.delete(scheduled_payment)
-            deletion_steps.append(f"scheduled_payment_{scheduled_payment.id}")
-        
-        # 9. Delete user deposits
-        deposits_result = await db.execute(select(Deposit).where(Deposit.user_id == user_id))
-        deposits = deposits_result.scalars().all()
-        for deposit in deposits:
-            await db.delete(deposit)
-            deletion_steps.append(f"deposit_{deposit.id}")
-        
-        # 10. Delete user beneficiaries
-        beneficiaries_result = await db.execute(select(Beneficiary).where(Beneficiary.user_id == user_id))
-        beneficiaries = beneficiaries_result.scalars().all()
-        for beneficiary in beneficiaries:
-            await db.delete(beneficiary)
-            deletion_steps.append(f"beneficiary_{beneficiary.id}")
-        
-        # 11. Delete user transfers
-        transfers_result = await db.execute(select(Transfer).where(Transfer.from_user_id == user_id))
-        transfers = transfers_result.scalars().all()
-        for transfer in transfers:
-            await db.delete(transfer)
-            deletion_steps.append(f"transfer_{transfer.id}")
-        
-        # 12. Delete user transactions
-        transactions_result = await db.execute(select(Transaction).where(Transaction.user_id == user_id))
-        transactions = transactions_result.scalars().all()
-        for transaction in transactions:
-            await db.delete(transaction)
-            deletion_steps.append(f"transaction_{transaction.id}")
-        
-        # 13. Delete user accounts (this should be last due to foreign key constraints)
-        accounts_result = await db.execute(select(Account).where(Account.user_id == user_id))
-        accounts = accounts_result.scalars().all()
-        for account in accounts:
-            await db.delete(account)
-            deletion_steps.append(f"account_{account.id}")
-        
-        # 14. Delete user login history
-        login_history_result = await db.execute(select(LoginHistory).where(LoginHistory.user_id == user_id))
-        login_history = login_history_result.scalars().all()
-        for history in login_history:
-            await db.delete(history)
-            deletion_steps.append(f"login_history_{history.id}")
-        
-        # 15. Finally delete the user
-        await db.delete(user)
-        deletion_steps.append(f"user_{user_id}")
+        existing_job = await UserDeletionService.get_active_job(db, user_id)
+        if existing_job:
+            return {
+                "success": True,
+                "message": "User deletion already in progress",
+                "job": BackgroundJobResponse.from_job(existing_job),
+            }
         
-        # Create audit log
-        audit_log = AdminAuditLog(
+        job = await UserDeletionService.create_job(db, user, admin.id, admin.email)
+        db.add(AdminAuditLog(
             id=str(uuid.uuid4()),
             admin_id=admin.id,
             admin_email=admin.email,
-            action="delete_user_complete",
+            action="delete_user_requested",
             resource_type="user",
             resource_id=user_id,
-            details=json.dumps({
-                "user_id": user_id,
-                "user_email": user.email,
-                "deleted_items": deletion_steps,
-                "total_items_deleted": len(deletion_steps)
-            })
-        )
-        db.add(audit_log)
-        
+            details=json.dumps({"user_id": user_id, "user_email": user.email, "job_id": job.id})
+        ))
         await db.commit()
         
-        AblyRealtimeManager.publish_admin_event("users", {"type": "deleted", "user_id": user_id})
-        logger.info(f"Complete user deletion by admin {admin.email}: {user_id} - {len(deletion_steps)} items deleted")
+        UserDeletionService.start(job.id)
+        logger.info(f"Admin {admin.email} queued complete deletion of user {user_id} (job {job.id})")
         
         return {
-            "success": True, 
-            "message": f"User and all associated data deleted successfully",
-            "details": {
-                "user_id": user_id,
-                "total_items_deleted": len(deletion_steps),
-                "deleted_categories": {
-                    "restrictions": len([s for s in deletion_steps if s.startswith("restriction_")]),
-                    "notifications": len([s for s in deletion_steps if s.startswith("notification_")]),
-                    "support_tickets": len([s for s in deletion_steps if s.startswith("ticket_")]),
-                    "documents": len([s for s in deletion_steps if s.startswith("document_")]),
-                    "loans": len([s for s in deletion_steps if s.startswith("loan_")]),
-                    "virtual_cards": len([s for s in deletion_steps if s.startswith("virtual_card_")]),
-                    "bill_payments": len([s for s in deletion_steps if s.startswith("bill_payment_")]),
-                    "transfers": len([s for s in deletion_steps if s.startswith("transfer_")]),
-                    "beneficiaries": len([s for s in deletion_steps if s.startswith("beneficiary_")]),
-                    "transactions": len([s for s in deletion_steps if s.startswith("transaction_")]),
-                    "accounts": len([s for s in deletion_steps if s.startswith("account_")])
-                }
-            }
+            "success": True,
+            "message": "User deletion started",
+            "job": BackgroundJobResponse.from_job(job),
         }
     except (UnauthorizedError, NotFoundError):
         raise
     except Exception as e:
         logger.error("Complete user deletion failed", error=e)
         raise InternalServerError(operation="complete user deletion", error_code="DELETION_FAILED", original_error=e)
+
+
+# Permission needed to view another admin's job, by job type (params hold user ids and emails)
+_JOB_VIEW_PERMISSIONS = {
+    JobType.USER_DELETION: "users:delete",
+    JobType.TRANSACTION_GENERATION: "transactions:edit",
+    JobType.MONTHLY_STATEMENTS: "settings:manage",
+}
+
+
+@router.get("/jobs/{job_id}", response_model=BackgroundJobResponse)
+async def admin_get_job(
+    job_id: str,
+    admin: AdminPrincipal = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_db)
+):
+    """Progress of a background admin job"""
+    job = await db.get(BackgroundJob, job_id)
+    if not job:
+        raise NotFoundError(resource="Job", error_code="JOB_NOT_FOUND")
+    permission = _JOB_VIEW_PERMISSIONS.get(job.job_type, "settings:manage")
+    if job.requested_by != admin.id and not AdminPermissionManager.has_permission(admin.role, permission):
+        raise UnauthorizedError(message="You don't have permission to view this job", error_code="PERMISSION_DENIED")
+    return BackgroundJobResponse.from_job(job)
+
+
+@router.post("/jobs/{job_id}/resume", response_model=BackgroundJobResponse)
+async def admin_resume_job(
+    job_id: str,
+    admin: AdminPrincipal = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_db)
+):
+    """Resume an interrupted or failed user deletion or transaction generation job"""
+    job = await db.get(BackgroundJob, job_id)
+    if not job or job.job_type not in (JobType.USER_DELETION, JobType.TRANSACTION_GENERATION):
+        raise NotFoundError(resource="Job", error_code="JOB_NOT_FOUND")
+    if job.job_type == JobType.USER_DELETION:
+        service = UserDeletionService
+    else:
+        from services.transaction_generation import TransactionGenerationService
+        service = TransactionGenerationService
+    if not AdminPermissionManager.has_permission(admin.role, _JOB_VIEW_PERMISSIONS[job.job_type]):
+        raise UnauthorizedError(message="You don't have permission to resume this job", error_code="PERMISSION_DENIED")
+    if job.status == JobStatus.COMPLETED:
+        raise ConflictError(message="Job already completed", error_code="JOB_COMPLETED")
+    if service.is_running(job):
+        raise ConflictError(message="Job is already running", error_code="JOB_RUNNING")
+    service.start(job.id)
+    logger.info(f"Admin {admin.email} resumed {job.job_type.value} job {job.id}")
+    return BackgroundJobResponse.from_job(job)
+
+
 @router.get("/audit-logs", response_model=list[AdminAuditLogResponse])
 async def get_audit_logs(
     limit: int = Query(50, ge=1, le=500),
     offset: int = Query(0, ge=0),
     resource_type: str | None = Query(None),
     resource_id: str | None = Query(None),
-    db: AsyncSession = Depends(get_db),
-    admin: AdminUser = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_read_db),
+    admin: AdminPrincipal = Depends(get_current_admin),
 ):
     """Get audit logs, optionally filtered by resource type/id. Uses auth token for admin context."""
     try:
@@ -3295,36 +3274,21 @@ async def get_audit_logs(
 
 @router.get("/realtime/token")
 async def admin_realtime_token(
-    admin_id: str,
+    admin: AdminPrincipal = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db)
 ):
-    admin_result = await db.execute(select(AdminUser).where(AdminUser.id == admin_id))
-    admin = admin_result.scalar()
-    if not admin:
-        raise UnauthorizedError(message="Admin not found", error_code="ADMIN_NOT_FOUND")
-    token_request = await get_admin_ably_token_request(admin_id)
+    token_request = await get_admin_ably_token_request(admin.id)
     if token_request is None:
         raise InternalServerError(operation="get admin ably token", error_code="ABLY_TOKEN_FAILED", original_error=Exception("No Ably client"))
     return token_request
 
 @router.get("/statistics")
 async def get_admin_statistics(
-    admin_id: str,
-    db: AsyncSession = Depends(get_db)
+    admin: AdminPrincipal = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get admin dashboard statistics"""
     try:
-        admin_result = await db.execute(
-            select(AdminUser).where(AdminUser.id == admin_id)
-        )
-        admin = admin_result.scalar()
-        
-        if not admin:
-            raise UnauthorizedError(
-                message="Admin not found",
-                error_code="ADMIN_NOT_FOUND"
-            )
-        
         # Get statistics
         users_result = await db.execute(select(User))
         total_users = len(users_result.scalars().all())
@@ -3392,8 +3356,8 @@ async def get_admin_statistics(
 @router.get("/loans/applications")
 async def get_all_loan_applications(
     status: str | None = Query(None),
-    db: AsyncSession = Depends(get_db),
-    admin: AdminUser = Depends(get_current_admin)
+    db: AsyncSession = Depends(get_read_db),
+    admin: AdminPrincipal = Depends(get_current_admin)
 ):
     """List all loan applications for admin review"""
     try:
@@ -3438,7 +3402,7 @@ async def get_all_loan_applications(
 async def create_loan_product(
     request: AdminCreateLoanProductRequest,
     db: AsyncSession = Depends(get_db),
-    admin: AdminUser = Depends(get_current_admin)
+    admin: AdminPrincipal = Depends(get_current_admin)
 ):
     """Admin create new loan product"""
     try:
@@ -3504,7 +3468,7 @@ async def create_loan_product(
 async def preview_generated_transactions(
     user_id: str,
     request: GenerateTransactionsPreviewRequest,
-    admin: AdminUser = Depends(get_current_admin),
+    admin: AdminPrincipal = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -3521,10 +3485,10 @@ async def preview_generated_transactions(
         user_result = await db.execute(select(User).where(User.id == user_id))
         user = user_result.scalar_one_or_none()
         if not user:
-            raise NotFoundError(resource="User", identifier=user_id)
+            raise NotFoundError(resource="User", error_code="USER_NOT_FOUND")
         
-        # Create generator instance
-        generator = TransactionGenerator()
+        # Create generator instance; the returned seed lets generate reproduce this preview
+        generator = TransactionGenerator(seed=request.seed)
         
         # Generate preview
         preview_data = generator.generate_preview(
@@ -3538,8 +3502,10 @@ async def preview_generated_transactions(
         
         return preview_data
         
+    except NotFoundError:
+        raise
     except ValueError as e:
-        raise ValidationError(field="generation_params", message=str(e))
+        raise ValidationError(message=str(e), error_code="INVALID_GENERATION_PARAMS")
     except Exception as e:
         logger.error(f"Error previewing transactions: {str(e)}")
         raise InternalServerError(operation="preview transactions", error_code="PREVIEW_FAILED", original_error=e)
@@ -3549,7 +3515,7 @@ async def preview_generated_transactions(
 async def generate_transactions_for_user(
     user_id: str,
     request: GenerateTransactionsRequest,
-    admin: AdminUser = Depends(get_current_admin),
+    admin: AdminPrincipal = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -3568,15 +3534,14 @@ async def generate_transactions_for_user(
     """
     try:
         from services.transaction_generator import TransactionGenerator
+        from services.transaction_generation import TransactionGenerationService
         from decimal import Decimal
-        from models.account import AccountType as AT
-        import random
         
         # Verify user exists
         user_result = await db.execute(select(User).where(User.id == user_id))
         user = user_result.scalar_one_or_none()
         if not user:
-            raise NotFoundError(resource="User", identifier=user_id)
+            raise NotFoundError(resource="User", error_code="USER_NOT_FOUND")
         
         # Verify account exists and belongs to user
         account_result = await db.execute(
@@ -3589,142 +3554,94 @@ async def generate_transactions_for_user(
         )
         account = account_result.scalar_one_or_none()
         if not account:
-            raise NotFoundError(resource="Account", identifier=request.account_id)
+            raise NotFoundError(resource="Account", error_code="ACCOUNT_NOT_FOUND")
+        
+        user_name = f"{user.first_name} {user.last_name}"
+        total_closing_balance = Decimal(str(request.closing_balance))
+        params = {
+            "account_id": request.account_id,
+            "start_date": request.start_date.isoformat(),
+            "end_date": request.end_date.isoformat(),
+            "starting_balance": request.starting_balance,
+            "closing_balance": request.closing_balance,
+            "transaction_count": request.transaction_count,
+            "currency": request.currency,
+            "user_name": user_name,
+        }
         
-        # Create generator instance
-        generator = TransactionGenerator(user_name=f"{user.first_name} {user.last_name}")
+        # Create generator instance (also validates the request up front)
+        generator = TransactionGenerator(user_name=user_name, seed=request.seed)
+        params["seed"] = generator.seed
+        is_valid, message = generator.validate_generation_params(
+            request.start_date, request.end_date,
+            Decimal(str(request.starting_balance)), total_closing_balance,
+            request.transaction_count
+        )
+        if not is_valid:
+            raise ValueError(message)
+        
+        # Large requests are handed to a background job
+        if request.transaction_count > settings.TRANSACTION_GENERATION_SYNC_LIMIT:
+            job = TransactionGenerationService.create_job(db, user_id, admin.id, admin.email, params)
+            await db.commit()
+            TransactionGenerationService.start(job.id)
+            logger.info(f"Admin {admin.id} queued generation of {request.transaction_count} transactions for user {user_id} (job {job.id})")
+            return {
+                "success": True,
+                "message": f"Generating {request.transaction_count} transactions in the background",
+                "transactions_created": 0,
+                "account_id": request.account_id,
+                "new_balance": float(total_closing_balance),
+                "status": "queued",
+                "job_id": job.id,
+                "seed": generator.seed
+            }
         
         # Generate transactions
         transactions_data = generator.generate_transactions(
             start_date=request.start_date,
             end_date=request.end_date,
             starting_balance=Decimal(str(request.starting_balance)),
-            closing_balance=Decimal(str(request.closing_balance)),
+            closing_balance=total_closing_balance,
             transaction_count=request.transaction_count,
             account_id=request.account_id,
             currency=request.currency,
-            user_name=f"{user.first_name} {user.last_name}"
+            user_name=user_name
         )
         
-        # Insert transactions into database without creating synthetic transfer records
+        # Bulk insert without creating synthetic transfer records
         # Generated transactions should stand alone with descriptive text
-        created_count = 0
-        for txn_data in transactions_data:
-            # Parse datetime and remove timezone info for database
-            created_at = datetime.fromisoformat(txn_data["created_at"]).replace(tzinfo=None)
-            posted_date = datetime.fromisoformat(txn_data["posted_date"]).replace(tzinfo=None)
-            
-            transaction = Transaction(
-                id=str(uuid.uuid4()),
-                account_id=txn_data["account_id"],
-                user_id=user_id,  # Add user_id to satisfy NOT NULL constraint
-                type=TransactionType(txn_data["type"]),
-                amount=txn_data["amount"],
-                currency=txn_data["currency"],
-                description=txn_data["description"],
-                status=TransactionStatus(txn_data["status"]),
-                balance_before=txn_data["balance_before"],
-                balance_after=txn_data["balance_after"],
-                reference_number=txn_data["reference_number"],
-                transfer_id=None,  # No transfer link for generated transactions
-                created_at=created_at,
-                posted_date=posted_date
-            )
-            db.add(transaction)
-            created_count += 1
+        stats = await TransactionGenerationService.bulk_insert(db, user_id, transactions_data)
+        created_count = stats["inserted"]
         
-        # Create audit log
-        audit_log = AdminAuditLog(
-            id=str(uuid.uuid4()),
-            admin_id=admin.id,
-            admin_email=admin.email,
-            action="generate_transactions",
-            resource_type="transaction",
-            resource_id=request.account_id,
-            details=json.dumps({
-                "user_id": user_id,
-                "account_id": request.account_id,
-                "transaction_count": created_count,
-                "start_date": request.start_date.isoformat(),
-                "end_date": request.end_date.isoformat(),
-                "starting_balance": request.starting_balance,
-                "closing_balance": request.closing_balance
-            }),
-            created_at=datetime.now(timezone.utc)
-        )
-        db.add(audit_log)
-        
-        # Commit all changes
-        await db.commit()
-        await db.refresh(account)
-        
-        # Get all user accounts to update balances appropriately
-        all_accounts_result = await db.execute(
-            select(Account).where(Account.user_id == user_id)
-        )
-        all_accounts = all_accounts_result.scalars().all()
-        
-        # Separate account types
-        checking_accounts = [acc for acc in all_accounts if acc.account_type == AT.CHECKING]
-        savings_accounts = [acc for acc in all_accounts if acc.account_type == AT.SAVINGS]
-        crypto_accounts = [acc for acc in all_accounts if acc.account_type == AT.CRYPTO]
-        
-        # Update only checking and savings accounts with the closing balance
-        # Ensure savings balance is always larger than checking balance
-        total_closing_balance = Decimal(str(request.closing_balance))
-        
-        if checking_accounts and savings_accounts:
-            # Split balance: 60% to savings, 40% to checking
-            checking_balance = total_closing_balance * Decimal('0.4')
-            savings_balance = total_closing_balance * Decimal('0.6')
-            
-            # Update checking accounts
-            for checking_acc in checking_accounts:
-                checking_acc.balance = checking_balance
-                checking_acc.available_balance = checking_balance
-                checking_acc.updated_at = datetime.utcnow()
-                db.add(checking_acc)
-            
-            # Update savings accounts
-            for savings_acc in savings_accounts:
-                savings_acc.balance = savings_balance
-                savings_acc.available_balance = savings_balance
-                savings_acc.updated_at = datetime.utcnow()
-                db.add(savings_acc)
-                
-        elif checking_accounts:
-            # Only checking accounts - give them full balance
-            for checking_acc in checking_accounts:
-                checking_acc.balance = total_closing_balance
-                checking_acc.available_balance = total_closing_balance
-                checking_acc.updated_at = datetime.utcnow()
-                db.add(checking_acc)
-                
-        elif savings_accounts:
-            # Only savings accounts - give them full balance
-            for savings_acc in savings_accounts:
-                savings_acc.balance = total_closing_balance
-                savings_acc.available_balance = total_closing_balance
-                savings_acc.updated_at = datetime.utcnow()
-                db.add(savings_acc)
+        db.add(TransactionGenerationService.audit_log(admin.id, admin.email, user_id, params, created_count))
         
-        # Crypto accounts remain unchanged (keep existing balance)
+        # Update checking/savings balances to match the closing balance
+        await TransactionGenerationService.apply_closing_balance(db, user_id, total_closing_balance)
         
-        # Commit balance updates
         await db.commit()
         
-        logger.info(f"Admin {admin.id} generated {created_count} transactions for user {user_id}, account {request.account_id}")
+        logger.info(
+            f"Admin {admin.id} generated {created_count} transactions for user {user_id}, account {request.account_id} "
+            f"in {stats['duration_ms']}ms ({stats['rows_per_second']} rows/s)"
+        )
         
         return {
             "success": True,
             "message": f"Successfully generated {created_count} transactions",
             "transactions_created": created_count,
             "account_id": request.account_id,
-            "new_balance": float(total_closing_balance)
+            "new_balance": float(total_closing_balance),
+            "status": "completed",
+            "seed": generator.seed,
+            "duration_ms": stats["duration_ms"],
+            "rows_per_second": stats["rows_per_second"]
         }
         
+    except NotFoundError:
+        raise
     except ValueError as e:
-        raise ValidationError(field="generation_params", message=str(e))
+        raise ValidationError(message=str(e), error_code="INVALID_GENERATION_PARAMS")
     except Exception as e:
         logger.error(f"Error generating transactions: {str(e)}")
         await db.rollback()
@@ -3737,16 +3654,12 @@ async def generate_transactions_for_user(
 
 @router.get("/users/search")
 async def admin_search_users(
-    admin_id: str,
     q: str = Query("", max_length=120),
-    db: AsyncSession = Depends(get_db),
+    admin: AdminPrincipal = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Return all users (optionally filtered by search query) for the admin
     loan-creation modal's searchable dropdown."""
-    admin_result = await db.execute(select(AdminUser).where(AdminUser.id == admin_id))
-    admin = admin_result.scalar()
-    if not admin:
-        raise UnauthorizedError(message="Admin not found", error_code="ADMIN_NOT_FOUND")
 
     result = await db.execute(select(User))
     users = result.scalars().all()
@@ -3775,14 +3688,10 @@ async def admin_search_users(
 
 @router.get("/loans/applications")
 async def admin_get_loan_applications(
-    admin_id: str,
-    db: AsyncSession = Depends(get_db),
+    admin: AdminPrincipal = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Return all loan applications across all users for the admin dashboard."""
-    admin_result = await db.execute(select(AdminUser).where(AdminUser.id == admin_id))
-    admin = admin_result.scalar()
-    if not admin:
-        raise UnauthorizedError(message="Admin not found", error_code="ADMIN_NOT_FOUND")
 
     apps_result = await db.execute(
         select(LoanApplication).order_by(LoanApplication.created_at.desc())
@@ -3827,14 +3736,10 @@ async def admin_get_loan_applications(
 @router.post("/loans/products")
 async def admin_create_loan_product(
     request: AdminCreateLoanProductRequest,
-    admin_id: str = Query(...),
+    admin: AdminPrincipal = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db),
 ):
     """Create a new loan product."""
-    admin_result = await db.execute(select(AdminUser).where(AdminUser.id == admin_id))
-    admin = admin_result.scalar()
-    if not admin:
-        raise UnauthorizedError(message="Admin not found", error_code="ADMIN_NOT_FOUND")
 
     product_id = request.id or str(uuid.uuid4())
     product = LoanProduct(
@@ -3875,7 +3780,7 @@ async def admin_create_loan_product(
 @router.post("/loans/create")
 async def admin_create_loan(
     request: AdminCreateLoanRequest,
-    admin_id: str = Query(...),
+    admin: AdminPrincipal = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db),
 ):
     """Admin creates a loan directly for a user.
@@ -3883,11 +3788,6 @@ async def admin_create_loan(
     - The loan appears in the user's My Loans tab as a normal active loan.
     - Daily interest (if set) will accrue automatically.
     """
-    # Verify admin
-    admin_result = await db.execute(select(AdminUser).where(AdminUser.id == admin_id))
-    admin = admin_result.scalar()
-    if not admin:
-        raise UnauthorizedError(message="Admin not found", error_code="ADMIN_NOT_FOUND")
 
     # Verify user
     user_result = await db.execute(select(User).where(User.id == request.user_id))
@@ -4008,16 +3908,13 @@ async def admin_create_loan(
 
 @router.post("/users/restrict", response_model=UserRestrictionResponse)
 async def create_user_restriction(
-    admin_id: str,
     request: CreateRestrictionRequest,
+    admin: AdminPrincipal = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db)
 ):
     """Create a user restriction"""
     try:
-        admin_result = await db.execute(select(AdminUser).where(AdminUser.id == admin_id))
-        admin = admin_result.scalar()
-        
-        if not admin or not AdminPermissionManager.has_permission(admin.role, "users:update"):
+        if not AdminPermissionManager.has_permission(admin.role, "users:update"):
             raise UnauthorizedError(
                 message="You don't have permission to restrict users",
                 error_code="PERMISSION_DENIED"
@@ -4054,7 +3951,7 @@ async def create_user_restriction(
             user_id=request.user_id,
             restriction_type=request.restriction_type,
             message=request.message,
-            created_by=admin_id,
+            created_by=admin.id,
             created_at=datetime.now(timezone.utc)
         )
         db.add(restriction)
@@ -4108,16 +4005,13 @@ async def create_user_restriction(
 
 @router.delete("/users/restrict", response_model=UserRestrictionResponse)
 async def remove_user_restriction(
-    admin_id: str,
     request: RemoveRestrictionRequest,
+    admin: AdminPrincipal = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db)
 ):
     """Remove a user restriction"""
     try:
-        admin_result = await db.execute(select(AdminUser).where(AdminUser.id == admin_id))
-        admin = admin_result.scalar()
-        
-        if not admin or not AdminPermissionManager.has_permission(admin.role, "users:update"):
+        if not AdminPermissionManager.has_permission(admin.role, "users:update"):
             raise UnauthorizedError(
                 message="You don't have permission to remove restrictions",
                 error_code="PERMISSION_DENIED"
@@ -4194,15 +4088,12 @@ async def remove_user_restriction(
 @router.get("/users/{user_id}/restrictions", response_model=UserRestrictionsResponse)
 async def get_user_restrictions(
     user_id: str,
-    admin_id: str = Query(...),
-    db: AsyncSession = Depends(get_db)
+    admin: AdminPrincipal = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get all restrictions for a user"""
     try:
-        admin_result = await db.execute(select(AdminUser).where(AdminUser.id == admin_id))
-        admin = admin_result.scalar()
-        
-        if not admin or not AdminPermissionManager.has_permission(admin.role, "users:read"):
+        if not AdminPermissionManager.has_permission(admin.role, "users:read"):
             raise UnauthorizedError(
                 message="You don't have permission to view user restrictions",
                 error_code="PERMISSION_DENIED"
@@ -5,7 +5,7 @@ from models.bill_payment import BillPayee, BillPayment, ScheduledPayment, BillPa
 from models.account import Account
 from models.transaction import Transaction, TransactionType as TxType, TransactionStatus as TxStatus
 from models.user import User
-from database import get_db
+from database import get_db, get_read_db
 import uuid
 from datetime import datetime
 from utils.auth import get_current_user_id
@@ -21,7 +21,7 @@ _BILLER_CATALOG = None
 @router.get("/payees")
 async def get_bill_payees(
     current_user_id: str = Depends(get_current_user_id),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get bill payees"""
     result = await db.execute(
@@ -50,7 +50,7 @@ async def get_payee_catalog(
     q: str | None = Query(None),
     country: str | None = Query(None),
     current_user_id: str = Depends(get_current_user_id),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     # Determine country: provided param or user's registered country
     if not country:
@@ -276,7 +276,7 @@ async def pay_bill(
 async def get_payment_history(
     limit: int = Query(20),
     current_user_id: str = Depends(get_current_user_id),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get bill payment history"""
     result = await db.execute(
@@ -354,7 +354,7 @@ async def schedule_payment(
 @router.get("/scheduled")
 async def get_scheduled_payments(
     current_user_id: str = Depends(get_current_user_id),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get scheduled payments"""
     result = await db.execute(
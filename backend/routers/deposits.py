@@ -8,7 +8,7 @@ import random
 from models.deposit import Deposit, DepositType, DepositStatus
 from models.account import Account, AccountStatus
 from models.user import User
-from database import get_db
+from database import get_db, get_read_db
 from schemas.deposit import (
     CheckDepositRequest, DirectDepositSetupRequest, DepositResponse,
     DepositListResponse, DepositVerificationRequest, DepositStatusUpdateResponse,
@@ -17,6 +17,7 @@ from schemas.deposit import (
 from utils.ably import AblyRealtimeManager
 from utils.auth import get_current_user_id
 import httpx
+from utils.http_client import outbound_client
 import asyncio
 from utils.ocr import extract_check_details, ocr_status, extract_check_details_remote
 from config import settings
@@ -103,7 +104,7 @@ async def _fetch_https_via_ip(host: str, port: int, target: str, ips: List[str])
     timeout = httpx.Timeout(10.0)
     redirects_remaining = 3
     try:
-        async with httpx.AsyncClient(transport=transport, timeout=timeout, follow_redirects=False) as client:
+        async with outbound_client("check_image", transport=transport, timeout=timeout, follow_redirects=False) as client:
             current_host, current_port, current_target, current_ips = host, port, target, ips
             while True:
                 ip = current_ips[0]
@@ -378,7 +379,7 @@ async def setup_direct_deposit(
 @router.get("/list", response_model=DepositListResponse)
 async def list_deposits(
     current_user_id: str = Depends(get_current_user_id),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """List all deposits for user"""
     try:
@@ -431,7 +432,7 @@ async def list_deposits(
 async def get_deposit(
     deposit_id: str,
     current_user_id: str = Depends(get_current_user_id),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get deposit details"""
     try:
@@ -94,45 +94,38 @@ async def upload_document(
                 detail=f"File type not allowed. Allowed: {', '.join(ALLOWED_EXTENSIONS)}"
             )
         
-        temp_path = f"/tmp/{uuid.uuid4()}_{file.filename}"
-        with open(temp_path, "wb") as f:
-            f.write(file_content)
-        
-        try:
-            cloudinary_response = CloudinaryManager.upload_document(
-                temp_path,
-                document_type,
-                current_user_id
-            )
-            
-            document = Document(
-                id=str(uuid.uuid4()),
-                user_id=current_user_id,
-                document_type=document_type,
-                file_name=file.filename,
-                file_url=cloudinary_response["url"],
-                status="pending",
-                uploaded_at=datetime.utcnow()
-            )
-            
-            db.add(document)
-            await db.commit()
-            await db.refresh(document)
-            
-            AblyRealtimeManager.publish_notification(
-                current_user_id,
-                "document_uploaded",
-                "Document Uploaded",
-                f"Your {document_type} document uploaded successfully."
-            )
-            
-            return {
-                "success": True,
-                "data": DocumentResponse.from_orm(document)
-            }
-        finally:
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
+        cloudinary_response = await CloudinaryManager.upload_document(
+            file_content,
+            document_type,
+            current_user_id,
+            filename=file.filename
+        )
+        
+        document = Document(
+            id=str(uuid.uuid4()),
+            user_id=current_user_id,
+            document_type=document_type,
+            file_name=file.filename,
+            file_url=cloudinary_response["url"],
+            status="pending",
+            uploaded_at=datetime.utcnow()
+        )
+        
+        db.add(document)
+        await db.commit()
+        await db.refresh(document)
+        
+        AblyRealtimeManager.publish_notification(
+            current_user_id,
+            "document_uploaded",
+            "Document Uploaded",
+            f"Your {document_type} document uploaded successfully."
+        )
+        
+        return {
+            "success": True,
+            "data": DocumentResponse.from_orm(document)
+        }
                 
     except HTTPException:
         raise
@@ -4,7 +4,7 @@ from sqlalchemy import select
 from models.loan import LoanProduct, LoanApplication, LoanApplicationStatus, LoanType, Loan
 from models.user import User
 from models.account import Account
-from database import get_db
+from database import get_db, get_read_db
 import uuid
 from datetime import datetime, timedelta
 from utils.auth import get_current_user_id
@@ -18,7 +18,7 @@ from utils.transfer_helpers import _ensure_user_active
 @router.get("/products")
 async def get_loan_products(
     user_tier: str | None = Query(None),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get available loan products"""
     result = await db.execute(
@@ -133,7 +133,7 @@ async def apply_for_loan(
 @router.get("/applications")
 async def get_applications(
     current_user_id: str = Depends(get_current_user_id),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get loan applications"""
     result = await db.execute(
@@ -166,7 +166,7 @@ async def get_applications(
 @router.get("/applications/{application_id}")
 async def get_application_details(
     application_id: str,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get application details"""
     result = await db.execute(
@@ -194,7 +194,7 @@ async def get_application_details(
 @router.get("/accounts")
 async def get_loan_accounts(
     current_user_id: str = Depends(get_current_user_id),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get active loan accounts"""
     result = await db.execute(
@@ -225,7 +225,7 @@ async def get_loan_accounts(
 
 
 @router.get("/accounts/{loan_id}")
-async def get_loan_details(loan_id: str, db: AsyncSession = Depends(get_db)):
+async def get_loan_details(loan_id: str, db: AsyncSession = Depends(get_read_db)):
     """Get loan details"""
     result = await db.execute(
         select(Loan).where(Loan.id == loan_id)
@@ -2,7 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from models.notification import Notification, NotificationPreference
-from database import get_db
+from database import get_db, get_read_db
 import uuid
 from datetime import datetime
 from utils.auth import get_current_user_id
@@ -15,7 +15,7 @@ async def get_notifications(
     limit: int = Query(20),
     include_read: bool = Query(False, description="Include read notifications"),
     current_user_id: str = Depends(get_current_user_id),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get user notifications (unread by default)"""
     query = select(Notification).where(Notification.user_id == current_user_id)
@@ -106,7 +106,7 @@ async def mark_all_read(
 @router.get("/settings")
 async def get_notification_settings(
     current_user_id: str = Depends(get_current_user_id),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get notification preferences"""
     result = await db.execute(
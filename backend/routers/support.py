@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from models.support import SupportTicket, TicketMessage, Chat, ChatMessage
@@ -334,8 +334,8 @@ async def post_ticket_reply(
     return {"success": True, "data": {"id": msg.id}}
 
 
-def _send_contact_email(request: ContactFormRequest):
-    """Internal helper to send the contact email in background"""
+async def _send_contact_email(request: ContactFormRequest):
+    """Internal helper to queue the contact email in the email outbox"""
     try:
         # Build email content
         subject = f"Contact Form: {request.subject}"
@@ -354,26 +354,23 @@ def _send_contact_email(request: ContactFormRequest):
         html_content = email_service._wrap_html("New Contact Inquiry", body)
         
         # Send email to info@standardcharteredibank.com
-        success = email_service.send_custom_email(
+        success = await email_service.send_custom_email(
             to_email="info@standardcharteredibank.com",
             subject=subject,
             html_content=html_content
         )
         
         if not success:
-            logger.error("Failed to send contact form email in background")
+            logger.error("Failed to queue contact form email")
     except Exception as e:
-        logger.error(f"Error in background email task: {e}")
+        logger.error(f"Error queueing contact form email: {e}")
 
 
 @router.post("/contact")
-async def contact_form_submission(
-    request: ContactFormRequest,
-    background_tasks: BackgroundTasks
-):
+async def contact_form_submission(request: ContactFormRequest):
     """Public contact form submission - sends email to info@standardcharteredibank.com"""
-    # Queue the email sending to avoid blocking the request and timing out
-    background_tasks.add_task(_send_contact_email, request)
+    # Only a row insert; the outbox workers deliver it
+    await _send_contact_email(request)
     
     return {
         "success": True,
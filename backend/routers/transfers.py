@@ -6,7 +6,7 @@ from models.bill_payment import BillPayment, BillPayee
 from models.account import Account, AccountStatus
 from models.user import User
 from models.transaction import Transaction, TransactionType as TxType, TransactionStatus as TxStatus
-from database import get_db
+from database import get_db, get_read_db
 from schemas.transfer import (
     DomesticTransferRequest,
     InternationalTransferRequest,
@@ -21,7 +21,7 @@ from utils.ably import AblyRealtimeManager
 import logging
 import uuid
 from datetime import datetime, timedelta
-import httpx
+from utils.http_client import outbound_client
 import asyncio
 from utils.crypto import get_bitcoin_price
 from utils.transfer_helpers import _ensure_user_active, _verify_transfer_pin
@@ -113,7 +113,7 @@ async def _auto_complete_transfer(transfer_id: str, delay_seconds: int = 120):
 async def search_recipients(
     query: str = Query(..., min_length=2, description="Search query for recipients"),
     user_id: str = Depends(get_current_user_id),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Search for recipients by partial name matching"""
     try:
@@ -179,7 +179,7 @@ async def validate_routing_number(number: str = Query(..., min_length=9, max_len
     try:
         if not number.isdigit() or len(number) != 9:
             return {"valid": False}
-        async with httpx.AsyncClient(timeout=5.0) as client:
+        async with outbound_client("bankrouting", timeout=5.0) as client:
             resp = await client.get(f"https://bankrouting.io/api/v1/aba/{number}")
         if resp.status_code != 200:
             return {"valid": False}
@@ -208,7 +208,7 @@ async def domestic_transfer(
     
     # Validate routing number with authoritative lookup
     try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
+        async with outbound_client("bankrouting", timeout=5.0) as client:
             resp = await client.get(f"https://bankrouting.io/api/v1/aba/{request.routing_number}")
     except Exception:
         logger.exception("Authoritative routing lookup failed during domestic transfer")
@@ -318,7 +318,7 @@ async def ach_transfer(
     try:
         # Authoritative routing number lookup + bank name match
         try:
-            async with httpx.AsyncClient(timeout=5.0) as client:
+            async with outbound_client("bankrouting", timeout=5.0) as client:
                 resp = await client.get(f"https://bankrouting.io/api/v1/aba/{request.routing_number}")
         except Exception:
             logger.exception("Authoritative routing lookup failed during ACH")
@@ -620,7 +620,7 @@ async def get_transfer_history(
     sort: str = Query("desc", pattern="^(asc|desc)$"),
     page: int = Query(1, ge=1),
     page_size: int = Query(10, ge=5, le=50),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Unified transfer history built from transaction ledger.
     Returns items across user accounts with metrics and pagination."""
@@ -926,7 +926,7 @@ async def get_transfer_history(
 async def get_transfer(
     transfer_id: str,
     user_id: str = Depends(get_current_user_id),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get rich transfer receipt details for UI/printing."""
     result = await db.execute(select(Transfer).where(Transfer.id == transfer_id))
@@ -1047,7 +1047,7 @@ async def cancel_transfer(transfer_id: str, db: AsyncSession = Depends(get_db)):
 @router.get("/beneficiaries")
 async def get_beneficiaries(
     user_id: str = Depends(get_current_user_id),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get saved beneficiaries. Requires auth."""
     result = await db.execute(
@@ -183,7 +183,7 @@ async def start_pin_reset(
         user.email_verification_token = code
         user.email_verification_expires = datetime.now(timezone.utc).timestamp() + 900  # 15m
         await db.commit()
-        email_sent = email_service.send_pin_reset_email(user.email, code)
+        email_sent = await email_service.send_pin_reset_email(user.email, code)
         if not email_sent:
             from utils.errors import InternalServerError
             raise InternalServerError(operation="sending pin reset email")
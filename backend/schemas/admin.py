@@ -1,4 +1,5 @@
 from pydantic import BaseModel, EmailStr, Field, validator
+import json
 from typing import Optional, List, Literal
 from datetime import datetime
 from enum import Enum
@@ -222,6 +223,36 @@ class LoanApprovalResponse(BaseModel):
     message: str
 
 
+class BulkApproveRequest(BaseModel):
+    """Approve many pending items (transfers, deposits, cards or loan applications)"""
+    ids: List[str] = Field(..., min_length=1)
+    notes: Optional[str] = Field(None, max_length=500)
+
+
+class BulkDeclineRequest(BaseModel):
+    """Decline many pending items with a shared reason"""
+    ids: List[str] = Field(..., min_length=1)
+    reason: str = Field(..., max_length=500)
+
+
+class BulkSkippedItem(BaseModel):
+    """Item left untouched by a bulk action"""
+    id: str
+    reason: str
+
+
+class BulkActionResponse(BaseModel):
+    """Result of a bulk approve/decline"""
+    success: bool
+    action: str
+    requested: int
+    processed: int
+    processed_ids: List[str]
+    skipped: List[BulkSkippedItem]
+    duration_ms: float
+    message: str
+
+
 class AdminStatisticsResponse(BaseModel):
     """Admin dashboard statistics"""
     total_users: int
@@ -273,8 +304,9 @@ class GenerateTransactionsRequest(BaseModel):
     end_date: datetime = Field(..., description="End date for transaction history")
     starting_balance: float = Field(..., ge=0, description="Starting account balance")
     closing_balance: float = Field(..., ge=0, description="Closing account balance")
-    transaction_count: int = Field(..., ge=1, le=1000, description="Number of transactions to generate")
+    transaction_count: int = Field(..., ge=1, le=100000, description="Number of transactions to generate (large counts run in the background)")
     currency: str = Field(default="USD", description="Currency code")
+    seed: Optional[int] = Field(None, ge=0, description="Seed returned by preview; reproduces the previewed history")
 
 
 class GenerateTransactionsPreviewRequest(BaseModel):
@@ -283,8 +315,9 @@ class GenerateTransactionsPreviewRequest(BaseModel):
     end_date: datetime = Field(..., description="End date for transaction history")
     starting_balance: float = Field(..., ge=0, description="Starting account balance")
     closing_balance: float = Field(..., ge=0, description="Closing account balance")
-    transaction_count: int = Field(..., ge=1, le=1000, description="Number of transactions to generate")
+    transaction_count: int = Field(..., ge=1, le=100000, description="Number of transactions to generate")
     preview_count: int = Field(default=10, ge=1, le=50, description="Number of sample transactions to show")
+    seed: Optional[int] = Field(None, ge=0, description="Random seed; omitted to pick a new one")
 
 
 class TransactionPreviewItem(BaseModel):
@@ -312,6 +345,7 @@ class GenerateTransactionsPreviewResponse(BaseModel):
     """Response with transaction preview"""
     sample_transactions: List[TransactionPreviewItem]
     summary: TransactionGenerationSummary
+    seed: int
 
 
 class GenerateTransactionsResponse(BaseModel):
@@ -321,3 +355,46 @@ class GenerateTransactionsResponse(BaseModel):
     transactions_created: int
     account_id: str
     new_balance: float
+    status: str = "completed"  # "queued" when handed to a background job
+    job_id: Optional[str] = None
+    seed: Optional[int] = None
+    duration_ms: Optional[float] = None
+    rows_per_second: Optional[float] = None
+
+
+class BackgroundJobResponse(BaseModel):
+    """Progress of a background admin job"""
+    id: str
+    job_type: str
+    status: str
+    resource_type: str
+    resource_id: str
+    processed_items: int = 0
+    current_step: Optional[str] = None
+    completed_steps: int = 0
+    total_steps: Optional[int] = None
+    progress: dict = Field(default_factory=dict)
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    @classmethod
+    def from_job(cls, job) -> "BackgroundJobResponse":
+        progress = json.loads(job.progress or "{}")
+        return cls(
+            id=job.id,
+            job_type=getattr(job.job_type, "value", str(job.job_type)),
+            status=getattr(job.status, "value", str(job.status)),
+            resource_type=job.resource_type,
+            resource_id=job.resource_id,
+            processed_items=job.processed_items or 0,
+            current_step=progress.get("current_step"),
+            completed_steps=progress.get("step_index", 0),
+            total_steps=progress.get("total_steps"),
+            progress=progress,
+            error=job.error,
+            created_at=job.created_at,
+            started_at=job.started_at,
+            finished_at=job.finished_at,
+        )
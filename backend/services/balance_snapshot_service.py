@@ -0,0 +1,235 @@
+"""
+Balance Snapshot Service
+End-of-day account balances kept in account_balance_snapshots, so statements,
+balance-as-of lookups and balance charts read a handful of rows instead of
+replaying the ledger.
+
+Snapshots are built from the balance_after of each day's last completed
+transaction, one windowed INSERT ... SELECT per run. Days are UTC (transaction
+timestamps are stored in UTC) and only complete days are snapshotted; the
+balance at the end of any day is the latest snapshot on or before it plus the
+completed transactions posted after that snapshot (normally none once the
+nightly refresh has run).
+"""
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional
+from sqlalchemy import Date, case, cast, delete, func, literal, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from models.account import AccountBalanceSnapshot
+from models.transaction import Transaction
+from utils.logger import logger
+
+# Transactions committed slightly after the previous run started are still picked up
+_REFRESH_OVERLAP = timedelta(hours=1)
+
+_SNAPSHOT_COLUMNS = ["account_id", "snapshot_date", "closing_balance", "credits", "debits", "transaction_count", "created_at"]
+
+
+def _utc_today() -> date:
+    return datetime.utcnow().date()
+
+
+class BalanceSnapshotService:
+    """Builds and reads daily balance snapshots"""
+
+    @staticmethod
+    def _daily_closing_rows(*criteria):
+        """SELECT producing one snapshot row per (account, day) with completed transactions"""
+        day = cast(Transaction.created_at, Date)
+        per_day = (Transaction.account_id, day)
+        ranked = (
+            select(
+                Transaction.account_id.label("account_id"),
+                day.label("snapshot_date"),
+                Transaction.balance_after.label("closing_balance"),
+                func.sum(case((Transaction.amount > 0, Transaction.amount), else_=0.0)).over(partition_by=per_day).label("credits"),
+                func.sum(case((Transaction.amount < 0, -Transaction.amount), else_=0.0)).over(partition_by=per_day).label("debits"),
+                func.count().over(partition_by=per_day).label("transaction_count"),
+                func.row_number().over(
+                    partition_by=per_day, order_by=(Transaction.created_at.desc(), Transaction.id.desc())
+                ).label("day_rank"),
+            )
+            .where(Transaction.status == 'completed', *criteria)
+            .subquery()
+        )
+        return select(
+            ranked.c.account_id,
+            ranked.c.snapshot_date,
+            ranked.c.closing_balance,
+            ranked.c.credits,
+            ranked.c.debits,
+            ranked.c.transaction_count,
+            literal(datetime.utcnow()),
+        ).where(ranked.c.day_rank == 1)
+
+    @staticmethod
+    async def _upsert(db: AsyncSession, rows) -> int:
+        statement = pg_insert(AccountBalanceSnapshot).from_select(_SNAPSHOT_COLUMNS, rows)
+        statement = statement.on_conflict_do_update(
+            index_elements=["account_id", "snapshot_date"],
+            set_={column: statement.excluded[column] for column in _SNAPSHOT_COLUMNS[2:]},
+        )
+        result = await db.execute(statement)
+        return result.rowcount or 0
+
+    @staticmethod
+    async def backfill(db: AsyncSession, start: Optional[date] = None, end: Optional[date] = None) -> int:
+        """
+        Rebuild snapshots for [start, end] (default: all history through yesterday) in one query
+
+        Returns:
+            Number of snapshot rows written; the caller commits
+        """
+        end = min(end or _utc_today() - timedelta(days=1), _utc_today() - timedelta(days=1))
+        criteria = [Transaction.created_at < datetime.combine(end + timedelta(days=1), datetime.min.time())]
+        if start is not None:
+            criteria.append(Transaction.created_at >= datetime.combine(start, datetime.min.time()))
+        written = await BalanceSnapshotService._upsert(db, BalanceSnapshotService._daily_closing_rows(*criteria))
+        logger.info(f"Balance snapshot backfill wrote {written} rows through {end}")
+        return written
+
+    @staticmethod
+    async def refresh(db: AsyncSession) -> Dict[str, Any]:
+        """
+        Incremental nightly refresh
+
+        Recomputes, for every account with transactions changed since the last
+        run, the days from its earliest changed transaction through yesterday.
+        Falls back to a full backfill when no snapshots exist yet.
+        """
+        last_run = (await db.execute(select(func.max(AccountBalanceSnapshot.created_at)))).scalar()
+        if last_run is None:
+            return {"mode": "backfill", "rows": await BalanceSnapshotService.backfill(db)}
+
+        today_start = datetime.combine(_utc_today(), datetime.min.time())
+        touched = (
+            select(
+                Transaction.account_id.label("account_id"),
+                func.min(cast(Transaction.created_at, Date)).label("from_date"),
+            )
+            .where(Transaction.updated_at >= last_run - _REFRESH_OVERLAP, Transaction.created_at < today_start)
+            .group_by(Transaction.account_id)
+            .cte("touched_accounts")
+        )
+        # Drop the affected days first so days left without completed transactions disappear
+        await db.execute(
+            delete(AccountBalanceSnapshot).where(
+                AccountBalanceSnapshot.account_id == touched.c.account_id,
+                AccountBalanceSnapshot.snapshot_date >= touched.c.from_date,
+            )
+        )
+        written = await BalanceSnapshotService._upsert(db, BalanceSnapshotService._daily_closing_rows(
+            Transaction.account_id == touched.c.account_id,
+            Transaction.created_at >= touched.c.from_date,
+            Transaction.created_at < today_start,
+        ))
+        logger.info(f"Balance snapshot refresh wrote {written} rows (changes since {last_run - _REFRESH_OVERLAP})")
+        return {"mode": "incremental", "rows": written, "since": (last_run - _REFRESH_OVERLAP).isoformat()}
+
+    @staticmethod
+    async def rebuild_account(db: AsyncSession, account_id: str, *moments: Optional[datetime]) -> int:
+        """
+        Recompute one account's snapshots from the earliest of ``moments`` through yesterday
+
+        Called when a transaction is deleted or moved to another day, which the
+        incremental refresh cannot see (it finds changes through updated_at, and
+        only from a transaction's new date). Pending ORM changes are flushed
+        first so the rebuild sees them; the caller commits.
+
+        Returns:
+            Number of snapshot rows written
+        """
+        days = [moment.date() for moment in moments if moment is not None]
+        if not account_id or not days:
+            return 0
+        from_date = min(days)
+        await db.flush()
+        await db.execute(
+            delete(AccountBalanceSnapshot).where(
+                AccountBalanceSnapshot.account_id == account_id,
+                AccountBalanceSnapshot.snapshot_date >= from_date,
+            )
+        )
+        return await BalanceSnapshotService._upsert(db, BalanceSnapshotService._daily_closing_rows(
+            Transaction.account_id == account_id,
+            Transaction.created_at >= datetime.combine(from_date, datetime.min.time()),
+            Transaction.created_at < datetime.combine(_utc_today(), datetime.min.time()),
+        ))
+
+    @staticmethod
+    async def balances_as_of(db: AsyncSession, account_ids: List[str], as_of: date) -> Dict[str, float]:
+        """
+        Balance at the end of ``as_of`` (UTC) for each account
+
+        Accounts without a snapshot on or before ``as_of`` fall back to the
+        balance_after of their last completed transaction up to that day;
+        accounts with no transactions by then are left out.
+        """
+        if not account_ids:
+            return {}
+        next_day = datetime.combine(as_of + timedelta(days=1), datetime.min.time())
+
+        latest = (
+            select(AccountBalanceSnapshot.account_id, AccountBalanceSnapshot.snapshot_date, AccountBalanceSnapshot.closing_balance)
+            .where(AccountBalanceSnapshot.account_id.in_(account_ids), AccountBalanceSnapshot.snapshot_date <= as_of)
+            .distinct(AccountBalanceSnapshot.account_id)
+            .order_by(AccountBalanceSnapshot.account_id, AccountBalanceSnapshot.snapshot_date.desc())
+            .subquery()
+        )
+        posted_since_snapshot = (
+            select(func.coalesce(func.sum(Transaction.amount), 0.0))
+            .where(
+                Transaction.account_id == latest.c.account_id,
+                Transaction.status == 'completed',
+                Transaction.created_at >= latest.c.snapshot_date + 1,
+                Transaction.created_at < next_day,
+            )
+            .scalar_subquery()
+        )
+        balances = {
+            row.account_id: row.balance
+            for row in await db.execute(select(latest.c.account_id, (latest.c.closing_balance + posted_since_snapshot).label("balance")))
+        }
+
+        missing = [account_id for account_id in account_ids if account_id not in balances]
+        if missing:
+            last_posted = await db.execute(
+                select(Transaction.account_id, Transaction.balance_after)
+                .where(Transaction.account_id.in_(missing), Transaction.status == 'completed', Transaction.created_at < next_day)
+                .distinct(Transaction.account_id)
+                .order_by(Transaction.account_id, Transaction.created_at.desc(), Transaction.id.desc())
+            )
+            balances.update({row.account_id: row.balance_after for row in last_posted})
+        return balances
+
+    @staticmethod
+    async def daily_balances(db: AsyncSession, account_id: str, start: date, end: date) -> List[Dict[str, Any]]:
+        """End-of-day balance for every day in [start, end], carried forward over quiet days"""
+        opening = (await BalanceSnapshotService.balances_as_of(db, [account_id], start - timedelta(days=1))).get(account_id, 0.0)
+        snapshots = {
+            row.snapshot_date: row.closing_balance
+            for row in await db.execute(
+                select(AccountBalanceSnapshot.snapshot_date, AccountBalanceSnapshot.closing_balance)
+                .where(
+                    AccountBalanceSnapshot.account_id == account_id,
+                    AccountBalanceSnapshot.snapshot_date >= start,
+                    AccountBalanceSnapshot.snapshot_date <= end,
+                )
+            )
+        }
+        # Today is never snapshotted; its balance comes from the ledger
+        today = _utc_today()
+        if start <= today <= end:
+            current = await BalanceSnapshotService.balances_as_of(db, [account_id], today)
+            if account_id in current:
+                snapshots[today] = current[account_id]
+
+        series = []
+        balance = opening
+        day = start
+        while day <= end:
+            balance = snapshots.get(day, balance)
+            series.append({"date": day.isoformat(), "balance": round(balance, 2)})
+            day += timedelta(days=1)
+        return series
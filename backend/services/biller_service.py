@@ -1,4 +1,4 @@
-import httpx
+from utils.http_client import outbound_client
 from typing import List, Dict, Optional
 from config import settings
 from utils.logger import logger
@@ -26,7 +26,7 @@ class BillerService:
             return []
             
         try:
-            async with httpx.AsyncClient() as client:
+            async with outbound_client("method_fi") as client:
                 # Method FI Merchants/Merchants Search endpoint
                 # Note: This is real production-ready integration code
                 params = {"name": q} if q else {}
@@ -59,7 +59,7 @@ class BillerService:
             return []
             
         try:
-            async with httpx.AsyncClient() as client:
+            async with outbound_client("salt_edge") as client:
                 # Salt Edge Providers API (contains banks and utility entities)
                 headers = {
                     "App-id": settings.SALT_EDGE_APP_ID,
@@ -0,0 +1,664 @@
+"""
+Bulk Approval Service
+Approves or declines many pending transfers, deposits, virtual cards and loan
+applications in one transaction. Items and then accounts are locked in id
+order so concurrent batches cannot deadlock, balances move through set-based
+UPDATE ... FROM (VALUES ...) statements, audit logs and notifications are
+written with multi-row INSERTs, emails are queued in the email outbox inside the
+same transaction, and realtime events are handed to a background SideEffectBatch
+after the commit.
+"""
+import json
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import select, insert, update, values, column, String, Float, Integer
+from sqlalchemy.ext.asyncio import AsyncSession
+from config import settings
+from models.admin import AdminAuditLog
+from models.user import User
+from models.account import Account
+from models.transaction import Transaction, TransactionType, TransactionStatus
+from models.transfer import Transfer, TransferStatus
+from models.deposit import Deposit, DepositStatus
+from models.virtual_card import VirtualCard, VirtualCardStatus
+from models.loan import Loan, LoanStatus, LoanApplication, LoanApplicationStatus, LoanProduct
+from models.notification import Notification, NotificationType
+from services.email import email_service
+from utils.ably import AblyRealtimeManager
+from utils.admin_auth import AdminPrincipal
+from utils.background import SideEffectBatch
+
+# asyncpg rejects statements with more than 32767 bind parameters
+_MAX_BIND_PARAMS = 30000
+
+APPROVABLE_DEPOSIT_STATUSES = {DepositStatus.PENDING, DepositStatus.PROCESSING, DepositStatus.VERIFIED}
+DECLINABLE_LOAN_STATUSES = {LoanApplicationStatus.SUBMITTED, LoanApplicationStatus.UNDER_REVIEW}
+
+
+def _chunks(rows: List[Any], width: int) -> Iterable[List[Any]]:
+    size = max(1, _MAX_BIND_PARAMS // max(1, width))
+    for offset in range(0, len(rows), size):
+        yield rows[offset:offset + size]
+
+
+async def _insert_rows(db: AsyncSession, model: Any, rows: List[Dict[str, Any]]) -> None:
+    """Multi-row INSERT, split to stay under the bind parameter limit"""
+    if not rows:
+        return
+    # Column defaults are filled in per row, so size chunks by the full table width
+    for chunk in _chunks(rows, len(model.__table__.columns)):
+        await db.execute(insert(model.__table__).values(chunk))
+
+
+async def _update_from_values(
+    db: AsyncSession,
+    model: Any,
+    columns: List[Tuple[str, Any]],
+    rows: List[tuple],
+    build: Callable[[Any], Dict[str, Any]],
+) -> None:
+    """UPDATE model SET build(v) FROM (VALUES rows) AS v WHERE model.id = v.id
+
+    The first entry of ``columns`` must be the ``id`` column.
+    """
+    for chunk in _chunks(rows, len(columns)):
+        data = values(*[column(name, type_) for name, type_ in columns], name="v").data(chunk)
+        await db.execute(
+            update(model).where(model.id == data.c.id).values(**build(data.c))
+            .execution_options(synchronize_session=False)
+        )
+
+
+def _skipped(item_id: str, reason: str) -> Dict[str, str]:
+    return {"id": item_id, "reason": reason}
+
+
+def _status_name(value: Any) -> str:
+    return getattr(value, "value", str(value))
+
+
+class BulkApprovalService:
+    """Set-based approve/decline for the admin approval queues"""
+
+    @staticmethod
+    def _dedupe(ids: List[str]) -> List[str]:
+        return list(dict.fromkeys(i for i in ids if i))
+
+    @staticmethod
+    async def _lock_rows(db: AsyncSession, model: Any, ids: List[str], *cols: Any) -> List[Any]:
+        """SELECT ... FOR UPDATE in primary key order"""
+        result = await db.execute(
+            select(model.id, *cols).where(model.id.in_(ids)).order_by(model.id).with_for_update()
+        )
+        return result.all()
+
+    @staticmethod
+    async def _lock_accounts(db: AsyncSession, account_ids: Iterable[str]) -> Dict[str, Any]:
+        account_ids = sorted(set(account_ids))
+        if not account_ids:
+            return {}
+        result = await db.execute(
+            select(Account.id, Account.user_id, Account.balance, Account.available_balance, Account.currency)
+            .where(Account.id.in_(account_ids))
+            .order_by(Account.id)
+            .with_for_update()
+        )
+        return {row.id: row for row in result.all()}
+
+    @staticmethod
+    async def _credit_accounts(db: AsyncSession, deltas: Dict[str, float]) -> None:
+        await _update_from_values(
+            db, Account,
+            [("id", String), ("delta", Float)],
+            [(account_id, delta) for account_id, delta in deltas.items()],
+            lambda v: {
+                "balance": Account.balance + v.delta,
+                "available_balance": Account.available_balance + v.delta,
+                "updated_at": datetime.utcnow(),
+            },
+        )
+
+    @staticmethod
+    def _audit_rows(admin: AdminPrincipal, action: str, resource_type: str, items: List[Tuple[str, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        return [
+            {
+                "id": str(uuid.uuid4()),
+                "admin_id": admin.id,
+                "admin_email": admin.email,
+                "action": action,
+                "resource_type": resource_type,
+                "resource_id": resource_id,
+                "details": json.dumps({**details, "bulk": True}),
+            }
+            for resource_id, details in items
+        ]
+
+    @staticmethod
+    def _notification_row(user_id: str, type_: NotificationType, title: str, message: str, action_url: Optional[str] = None, **extra: Any) -> Dict[str, Any]:
+        return {
+            "id": str(uuid.uuid4()),
+            "user_id": user_id,
+            "type": type_,
+            "title": title,
+            "message": message,
+            "action_url": action_url,
+            "created_at": datetime.utcnow(),
+            **extra,
+        }
+
+    @staticmethod
+    def _result(action: str, requested: int, processed_ids: List[str], skipped: List[Dict[str, str]], effects: SideEffectBatch) -> Dict[str, Any]:
+        return {
+            "action": action,
+            "requested": requested,
+            "processed_ids": processed_ids,
+            "skipped": skipped,
+            "effects": effects,
+        }
+
+    # ==================== TRANSFERS ====================
+
+    @staticmethod
+    async def approve_transfers(db: AsyncSession, admin: AdminPrincipal, ids: List[str], notes: Optional[str]) -> Dict[str, Any]:
+        return await BulkApprovalService._set_transfer_status(
+            db, admin, ids, TransferStatus.APPROVED, "approve_transfer", {"notes": notes},
+            "transfer_approved", "Transfer Approved",
+            lambda t: f"Your transfer of {t.currency} {t.amount} has been approved.",
+        )
+
+    @staticmethod
+    async def decline_transfers(db: AsyncSession, admin: AdminPrincipal, ids: List[str], reason: str) -> Dict[str, Any]:
+        return await BulkApprovalService._set_transfer_status(
+            db, admin, ids, TransferStatus.REJECTED, "decline_transfer", {"reason": reason},
+            "transfer_declined", "Transfer Declined",
+            lambda t: f"Your transfer has been declined. Reason: {reason}",
+        )
+
+    @staticmethod
+    async def _set_transfer_status(
+        db: AsyncSession,
+        admin: AdminPrincipal,
+        ids: List[str],
+        new_status: TransferStatus,
+        action: str,
+        details: Dict[str, Any],
+        event_type: str,
+        title: str,
+        message: Callable[[Any], str],
+    ) -> Dict[str, Any]:
+        ids = BulkApprovalService._dedupe(ids)
+        rows = await BulkApprovalService._lock_rows(
+            db, Transfer, ids, Transfer.status, Transfer.from_user_id, Transfer.currency, Transfer.amount
+        )
+        found = {row.id for row in rows}
+        skipped = [_skipped(i, "not_found") for i in ids if i not in found]
+        pending = []
+        for row in rows:
+            if row.status == TransferStatus.PENDING:
+                pending.append(row)
+            else:
+                skipped.append(_skipped(row.id, f"status_{_status_name(row.status)}"))
+
+        effects = SideEffectBatch(f"bulk_{action}")
+        if pending:
+            pending_ids = [row.id for row in pending]
+            await db.execute(
+                update(Transfer).where(Transfer.id.in_(pending_ids))
+                .values(status=new_status, updated_at=datetime.utcnow())
+                .execution_options(synchronize_session=False)
+            )
+            await _insert_rows(db, AdminAuditLog, BulkApprovalService._audit_rows(
+                admin, action, "transfer", [(i, details) for i in pending_ids]
+            ))
+            for row in pending:
+                effects.add(AblyRealtimeManager.publish_notification, row.from_user_id, event_type, title, message(row))
+            effects.add(AblyRealtimeManager.publish_admin_event, "transactions",
+                        {"type": event_type, "bulk": True, "count": len(pending_ids)})
+
+        return BulkApprovalService._result(action, len(ids), [row.id for row in pending], skipped, effects)
+
+    # ==================== DEPOSITS ====================
+
+    @staticmethod
+    async def approve_deposits(db: AsyncSession, admin: AdminPrincipal, ids: List[str], notes: Optional[str]) -> Dict[str, Any]:
+        ids = BulkApprovalService._dedupe(ids)
+        rows = await BulkApprovalService._lock_rows(
+            db, Deposit, ids, Deposit.status, Deposit.account_id, Deposit.user_id,
+            Deposit.amount, Deposit.currency, Deposit.type, Deposit.created_at,
+        )
+        found = {row.id for row in rows}
+        skipped = [_skipped(i, "not_found") for i in ids if i not in found]
+        approvable = []
+        for row in rows:
+            if row.status in APPROVABLE_DEPOSIT_STATUSES:
+                approvable.append(row)
+            else:
+                skipped.append(_skipped(row.id, f"status_{_status_name(row.status)}"))
+
+        accounts = await BulkApprovalService._lock_accounts(db, (row.account_id for row in approvable))
+        effects = SideEffectBatch("bulk_approve_deposit")
+        now = datetime.utcnow()
+        balances = {account_id: float(acc.balance or 0) for account_id, acc in accounts.items()}
+        deltas: Dict[str, float] = {}
+        transactions: List[Dict[str, Any]] = []
+        deposit_updates: List[tuple] = []
+        approved = []
+
+        # Oldest deposits first so each account's running balance reads naturally
+        for row in sorted(approvable, key=lambda r: (r.created_at or now, r.id)):
+            if row.account_id not in accounts:
+                skipped.append(_skipped(row.id, "account_not_found"))
+                continue
+            amount = float(row.amount)
+            balance_before = balances[row.account_id]
+            balances[row.account_id] = balance_before + amount
+            deltas[row.account_id] = deltas.get(row.account_id, 0.0) + amount
+            tx_id = str(uuid.uuid4())
+            transactions.append({
+                "id": tx_id,
+                "account_id": row.account_id,
+                "user_id": row.user_id,
+                "type": TransactionType.DEPOSIT,
+                "status": TransactionStatus.COMPLETED,
+                "amount": amount,
+                "currency": row.currency,
+                "balance_before": balance_before,
+                "balance_after": balances[row.account_id],
+                "description": "Mobile check deposit",
+                "reference_number": f"DEP-{uuid.uuid4().hex[:10].upper()}",
+                "created_at": now,
+                "updated_at": now,
+            })
+            deposit_updates.append((row.id, tx_id))
+            approved.append(row)
+
+        if approved:
+            await BulkApprovalService._credit_accounts(db, deltas)
+            await _insert_rows(db, Transaction, transactions)
+            await _update_from_values(
+                db, Deposit,
+                [("id", String), ("transaction_id", String)],
+                deposit_updates,
+                lambda v: {
+                    "status": DepositStatus.COMPLETED,
+                    "completed_at": now,
+                    "transaction_id": v.transaction_id,
+                    "updated_at": now,
+                },
+            )
+            await _insert_rows(db, AdminAuditLog, BulkApprovalService._audit_rows(
+                admin, "approve_deposit", "deposit", [(row.id, {"notes": notes}) for row in approved]
+            ))
+            for row in approved:
+                effects.add(
+                    AblyRealtimeManager.publish_notification,
+                    row.user_id,
+                    "deposit_approved",
+                    "Deposit Approved",
+                    f"Your {_status_name(row.type)} deposit of {row.currency} {row.amount} has been approved.",
+                )
+            for account_id in deltas:
+                acc = accounts[account_id]
+                effects.add(AblyRealtimeManager.publish_balance_update, acc.user_id, account_id, balances[account_id], acc.currency)
+            effects.add(AblyRealtimeManager.publish_admin_event, "accounts",
+                        {"type": "deposit_completed", "bulk": True, "count": len(approved)})
+
+        return BulkApprovalService._result("approve_deposit", len(ids), [row.id for row in approved], skipped, effects)
+
+    @staticmethod
+    async def decline_deposits(db: AsyncSession, admin: AdminPrincipal, ids: List[str], reason: str) -> Dict[str, Any]:
+        ids = BulkApprovalService._dedupe(ids)
+        rows = await BulkApprovalService._lock_rows(db, Deposit, ids, Deposit.status, Deposit.user_id, Deposit.type)
+        found = {row.id for row in rows}
+        skipped = [_skipped(i, "not_found") for i in ids if i not in found]
+        declinable = []
+        for row in rows:
+            if row.status in APPROVABLE_DEPOSIT_STATUSES:
+                declinable.append(row)
+            else:
+                skipped.append(_skipped(row.id, f"status_{_status_name(row.status)}"))
+
+        effects = SideEffectBatch("bulk_decline_deposit")
+        if declinable:
+            declined_ids = [row.id for row in declinable]
+            await db.execute(
+                update(Deposit).where(Deposit.id.in_(declined_ids))
+                .values(status=DepositStatus.REJECTED, rejection_reason=reason, updated_at=datetime.utcnow())
+                .execution_options(synchronize_session=False)
+            )
+            await _insert_rows(db, AdminAuditLog, BulkApprovalService._audit_rows(
+                admin, "decline_deposit", "deposit", [(i, {"reason": reason}) for i in declined_ids]
+            ))
+            for row in declinable:
+                effects.add(
+                    AblyRealtimeManager.publish_notification,
+                    row.user_id,
+                    "deposit_declined",
+                    "Deposit Declined",
+                    f"Your {_status_name(row.type)} deposit has been declined. Reason: {reason}",
+                )
+            effects.add(AblyRealtimeManager.publish_admin_event, "accounts",
+                        {"type": "deposit_declined", "bulk": True, "count": len(declined_ids)})
+
+        return BulkApprovalService._result("decline_deposit", len(ids), [row.id for row in declinable], skipped, effects)
+
+    # ==================== VIRTUAL CARDS ====================
+
+    @staticmethod
+    async def approve_cards(db: AsyncSession, admin: AdminPrincipal, ids: List[str], notes: Optional[str]) -> Dict[str, Any]:
+        return await BulkApprovalService._set_card_status(
+            db, admin, ids, VirtualCardStatus.ACTIVE, "approve_card", {"notes": notes},
+            "card_approved", "Virtual Card Approved",
+            lambda c: f"Your virtual card '{c.card_name}' has been approved and is ready to use.",
+            "Card Approved",
+            lambda c: f"Your virtual card '{c.card_name}' has been approved. You can now view its details in the card management section.",
+        )
+
+    @staticmethod
+    async def decline_cards(db: AsyncSession, admin: AdminPrincipal, ids: List[str], reason: str) -> Dict[str, Any]:
+        return await BulkApprovalService._set_card_status(
+            db, admin, ids, VirtualCardStatus.DECLINED, "decline_card", {"reason": reason},
+            "card_declined", "Virtual Card Request Declined",
+            lambda c: f"Your virtual card request for '{c.card_name}' has been declined. Reason: {reason}",
+            "Card Request Cancelled",
+            lambda c: f"Your request for card '{c.card_name}' was declined. Reason: {reason}",
+        )
+
+    @staticmethod
+    async def _set_card_status(
+        db: AsyncSession,
+        admin: AdminPrincipal,
+        ids: List[str],
+        new_status: VirtualCardStatus,
+        action: str,
+        details: Dict[str, Any],
+        event_type: str,
+        realtime_title: str,
+        realtime_message: Callable[[Any], str],
+        notification_title: str,
+        notification_message: Callable[[Any], str],
+    ) -> Dict[str, Any]:
+        ids = BulkApprovalService._dedupe(ids)
+        rows = await BulkApprovalService._lock_rows(db, VirtualCard, ids, VirtualCard.status, VirtualCard.user_id, VirtualCard.card_name)
+        found = {row.id for row in rows}
+        skipped = [_skipped(i, "not_found") for i in ids if i not in found]
+        pending = []
+        for row in rows:
+            if row.status == VirtualCardStatus.PENDING:
+                pending.append(row)
+            else:
+                skipped.append(_skipped(row.id, f"status_{_status_name(row.status)}"))
+
+        effects = SideEffectBatch(f"bulk_{action}")
+        if pending:
+            pending_ids = [row.id for row in pending]
+            await db.execute(
+                update(VirtualCard).where(VirtualCard.id.in_(pending_ids))
+                .values(status=new_status, updated_at=datetime.utcnow())
+                .execution_options(synchronize_session=False)
+            )
+            await _insert_rows(db, AdminAuditLog, BulkApprovalService._audit_rows(
+                admin, action, "virtual_card", [(i, details) for i in pending_ids]
+            ))
+            await _insert_rows(db, Notification, [
+                BulkApprovalService._notification_row(row.user_id, NotificationType.LOAN, notification_title, notification_message(row))
+                for row in pending
+            ])
+            for row in pending:
+                effects.add(AblyRealtimeManager.publish_notification, row.user_id, event_type, realtime_title, realtime_message(row))
+            effects.add(AblyRealtimeManager.publish_admin_event, "accounts",
+                        {"type": event_type, "bulk": True, "count": len(pending_ids)})
+
+        return BulkApprovalService._result(action, len(ids), [row.id for row in pending], skipped, effects)
+
+    # ==================== LOANS ====================
+
+    @staticmethod
+    def _pending_loan_reference(application_id: str) -> str:
+        # Matches the pending history row written when the application is submitted
+        return f"LN-{application_id[:8].upper()}"
+
+    @staticmethod
+    async def _pending_loan_transactions(db: AsyncSession, application_ids: List[str]) -> Dict[str, Any]:
+        """Pending 'Loan Application' transactions keyed by reference number"""
+        references = [BulkApprovalService._pending_loan_reference(i) for i in application_ids]
+        if not references:
+            return {}
+        result = await db.execute(
+            select(Transaction.id, Transaction.account_id, Transaction.reference_number)
+            .where(
+                Transaction.reference_number.in_(references),
+                Transaction.status == TransactionStatus.PENDING,
+            )
+        )
+        return {row.reference_number: row for row in result.all()}
+
+    @staticmethod
+    async def _user_emails(db: AsyncSession, user_ids: Iterable[str]) -> Dict[str, str]:
+        result = await db.execute(select(User.id, User.email).where(User.id.in_(set(user_ids))))
+        return {row.id: row.email for row in result.all()}
+
+    @staticmethod
+    def _monthly_payment(amount: float, annual_rate: float, months: int) -> float:
+        rate = (annual_rate or 0.0) / 12 / 100
+        if rate == 0:
+            return amount / max(1, months)
+        return (amount * rate) / (1 - (1 + rate) ** -months)
+
+    @staticmethod
+    async def approve_loans(db: AsyncSession, admin: AdminPrincipal, ids: List[str], notes: Optional[str]) -> Dict[str, Any]:
+        """Approve submitted applications at their requested amount/term and the product base rate"""
+        ids = BulkApprovalService._dedupe(ids)
+        rows = await BulkApprovalService._lock_rows(
+            db, LoanApplication, ids, LoanApplication.status, LoanApplication.user_id, LoanApplication.product_id,
+            LoanApplication.account_id, LoanApplication.requested_amount, LoanApplication.requested_term_months,
+            LoanApplication.created_at,
+        )
+        found = {row.id for row in rows}
+        skipped = [_skipped(i, "not_found") for i in ids if i not in found]
+        submitted = []
+        for row in rows:
+            if row.status == LoanApplicationStatus.SUBMITTED:
+                submitted.append(row)
+            else:
+                skipped.append(_skipped(row.id, f"status_{_status_name(row.status)}"))
+
+        product_ids = {row.product_id for row in submitted}
+        products = {}
+        if product_ids:
+            product_result = await db.execute(select(LoanProduct).where(LoanProduct.id.in_(product_ids)))
+            products = {p.id: p for p in product_result.scalars().all()}
+
+        accounts = await BulkApprovalService._lock_accounts(db, (row.account_id for row in submitted if row.account_id))
+        pending_txs = await BulkApprovalService._pending_loan_transactions(db, [row.id for row in submitted])
+
+        effects = SideEffectBatch("bulk_approve_loan")
+        now = datetime.utcnow()
+        balances = {account_id: float(acc.balance or 0) for account_id, acc in accounts.items()}
+        deltas: Dict[str, float] = {}
+        application_updates: List[tuple] = []
+        loans: List[Dict[str, Any]] = []
+        tx_updates: List[tuple] = []
+        new_transactions: List[Dict[str, Any]] = []
+        approved = []
+
+        for row in sorted(submitted, key=lambda r: (r.created_at or now, r.id)):
+            product = products.get(row.product_id)
+            if not product:
+                skipped.append(_skipped(row.id, "product_not_found"))
+                continue
+            amount = float(row.requested_amount)
+            rate = product.base_interest_rate or 0.0
+            try:
+                term = int(row.requested_term_months) if row.requested_term_months is not None else 1
+            except Exception:
+                term = 1
+            term = max(1, term)
+            monthly_payment = BulkApprovalService._monthly_payment(amount, rate, term)
+            application_updates.append((row.id, amount, rate, term, monthly_payment))
+            loans.append({
+                "id": str(uuid.uuid4()),
+                "user_id": row.user_id,
+                "account_id": row.account_id,
+                "application_id": row.id,
+                "type": product.type,
+                "status": LoanStatus.ACTIVE,
+                "principal_amount": amount,
+                "interest_rate": rate,
+                "term_months": term,
+                "monthly_payment": monthly_payment,
+                "remaining_balance": amount,
+                "next_payment_date": now + timedelta(days=30),
+                "originated_at": now,
+                "maturity_date": now + timedelta(days=30 * term),
+                "updated_at": now,
+            })
+
+            # Disburse funds to the selected account
+            if row.account_id in accounts:
+                before = balances[row.account_id]
+                balances[row.account_id] = before + amount
+                deltas[row.account_id] = deltas.get(row.account_id, 0.0) + amount
+                description = f"Loan Disbursement: {product.name}"
+                pending_tx = pending_txs.get(BulkApprovalService._pending_loan_reference(row.id))
+                if pending_tx:
+                    tx_updates.append((pending_tx.id, before, balances[row.account_id], amount, description))
+                else:
+                    new_transactions.append({
+                        "id": str(uuid.uuid4()),
+                        "account_id": row.account_id,
+                        "user_id": row.user_id,
+                        "type": TransactionType.LOAN,
+                        "status": TransactionStatus.COMPLETED,
+                        "amount": amount,
+                        "currency": accounts[row.account_id].currency,
+                        "balance_before": before,
+                        "balance_after": balances[row.account_id],
+                        "description": description,
+                        "reference_number": f"LD-{uuid.uuid4().hex[:8].upper()}",
+                        "created_at": now,
+                        "updated_at": now,
+                    })
+            approved.append((row, amount))
+
+        if approved:
+            await _update_from_values(
+                db, LoanApplication,
+                [("id", String), ("amount", Float), ("rate", Float), ("term", Integer), ("monthly_payment", Float)],
+                application_updates,
+                lambda v: {
+                    "status": LoanApplicationStatus.APPROVED,
+                    "approved_amount": v.amount,
+                    "approved_interest_rate": v.rate,
+                    "approved_term_months": v.term,
+                    "monthly_payment": v.monthly_payment,
+                    "approved_at": now,
+                    "reviewed_at": now,
+                    "updated_at": now,
+                },
+            )
+            await _insert_rows(db, Loan, loans)
+            await BulkApprovalService._credit_accounts(db, deltas)
+            await _update_from_values(
+                db, Transaction,
+                [("id", String), ("balance_before", Float), ("balance_after", Float), ("amount", Float), ("description", String)],
+                tx_updates,
+                lambda v: {
+                    "status": TransactionStatus.COMPLETED,
+                    "type": TransactionType.LOAN,
+                    "balance_before": v.balance_before,
+                    "balance_after": v.balance_after,
+                    "amount": v.amount,
+                    "description": v.description,
+                    "updated_at": now,
+                },
+            )
+            await _insert_rows(db, Transaction, new_transactions)
+            await _insert_rows(db, AdminAuditLog, BulkApprovalService._audit_rows(
+                admin, "approve_loan", "loan_application",
+                [(row.id, {"amount": amount, "notes": notes}) for row, amount in approved],
+            ))
+            await _insert_rows(db, Notification, [
+                BulkApprovalService._notification_row(
+                    row.user_id, NotificationType.SYSTEM, "Loan Approved",
+                    f"Congratulations! Your loan of {format(amount, ',.2f')} has been approved.",
+                    action_url=f"{settings.FRONTEND_URL}/dashboard/loans",
+                )
+                for row, amount in approved
+            ])
+
+            emails = await BulkApprovalService._user_emails(db, (row.user_id for row, _ in approved))
+            for row, amount in approved:
+                effects.add(
+                    AblyRealtimeManager.publish_notification,
+                    row.user_id,
+                    "loan_approved",
+                    "Loan Approved",
+                    f"Your loan application for {format(amount, ',.2f')} has been approved and funds disbursed.",
+                )
+                if getattr(settings, "SMTP_SERVER", None) and emails.get(row.user_id):
+                    await email_service.send_loan_status_email(emails[row.user_id], "Approved", amount, "", db=db)
+            for account_id in deltas:
+                acc = accounts[account_id]
+                effects.add(AblyRealtimeManager.publish_balance_update, acc.user_id, account_id, balances[account_id], acc.currency)
+
+        return BulkApprovalService._result("approve_loan", len(ids), [row.id for row, _ in approved], skipped, effects)
+
+    @staticmethod
+    async def decline_loans(db: AsyncSession, admin: AdminPrincipal, ids: List[str], reason: str) -> Dict[str, Any]:
+        ids = BulkApprovalService._dedupe(ids)
+        rows = await BulkApprovalService._lock_rows(
+            db, LoanApplication, ids, LoanApplication.status, LoanApplication.user_id, LoanApplication.requested_amount
+        )
+        found = {row.id for row in rows}
+        skipped = [_skipped(i, "not_found") for i in ids if i not in found]
+        declinable = []
+        for row in rows:
+            if row.status in DECLINABLE_LOAN_STATUSES:
+                declinable.append(row)
+            else:
+                skipped.append(_skipped(row.id, f"status_{_status_name(row.status)}"))
+
+        effects = SideEffectBatch("bulk_decline_loan")
+        if declinable:
+            now = datetime.utcnow()
+            declined_ids = [row.id for row in declinable]
+            await db.execute(
+                update(LoanApplication).where(LoanApplication.id.in_(declined_ids))
+                .values(status=LoanApplicationStatus.REJECTED, rejected_at=now, rejection_reason=reason,
+                        reviewed_at=now, updated_at=now)
+                .execution_options(synchronize_session=False)
+            )
+            pending_txs = await BulkApprovalService._pending_loan_transactions(db, declined_ids)
+            if pending_txs:
+                await db.execute(
+                    update(Transaction).where(Transaction.id.in_([tx.id for tx in pending_txs.values()]))
+                    .values(status=TransactionStatus.FAILED, description=f"Loan Application Declined: {reason[:50]}", updated_at=now)
+                    .execution_options(synchronize_session=False)
+                )
+            await _insert_rows(db, AdminAuditLog, BulkApprovalService._audit_rows(
+                admin, "decline_loan", "loan_application", [(i, {"reason": reason}) for i in declined_ids]
+            ))
+            await _insert_rows(db, Notification, [
+                BulkApprovalService._notification_row(
+                    row.user_id, NotificationType.SYSTEM, "Loan Declined",
+                    f"We regret to inform you that your loan application has been declined. Reason: {reason}",
+                    action_url=f"{settings.FRONTEND_URL}/dashboard/loans",
+                )
+                for row in declinable
+            ])
+
+            emails = await BulkApprovalService._user_emails(db, (row.user_id for row in declinable))
+            for row in declinable:
+                effects.add(
+                    AblyRealtimeManager.publish_notification,
+                    row.user_id,
+                    "loan_declined",
+                    "Loan Declined",
+                    f"Your loan application has been declined. Reason: {reason}",
+                )
+                if getattr(settings, "SMTP_SERVER", None) and emails.get(row.user_id):
+                    await email_service.send_loan_status_email(emails[row.user_id], "Declined", row.requested_amount, reason, db=db)
+
+        return BulkApprovalService._result("decline_loan", len(ids), [row.id for row in declinable], skipped, effects)
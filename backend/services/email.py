@@ -1,10 +1,8 @@
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from email.mime.image import MIMEImage
 from typing import Optional
 from html import escape
+from sqlalchemy.ext.asyncio import AsyncSession
 from config import settings
+from services.email_outbox import email_outbox
 import logging
 import os
 import base64
@@ -97,44 +95,11 @@ class EmailService:
         </html>
         """
     
-    def _build_message(self, subject: str, to_email: str, html_content: str) -> MIMEMultipart:
-        root = MIMEMultipart('related')
-        alt = MIMEMultipart('alternative')
-        root.attach(alt)
-        html_part = MIMEText(html_content, 'html')
-        alt.attach(html_part)
-        root['Subject'] = subject
-        root['From'] = f"SCIB Bank <{self.from_email}>"
-        root['To'] = to_email
-        if self.logo_file_path:
-            try:
-                with open(self.logo_file_path, "rb") as f:
-                    file_ext = os.path.splitext(self.logo_file_path)[1].lower().replace('.', '')
-                    subtype = "svg+xml" if file_ext == "svg" else file_ext
-                    img = MIMEImage(f.read(), _subtype=subtype)
-                    img.add_header('Content-ID', f"<{self.logo_cid}>")
-                    img.add_header('Content-Disposition', 'inline', filename=os.path.basename(self.logo_file_path))
-                    root.attach(img)
-            except Exception:
-                pass
-        return root
-    
-    def _create_connection(self) -> smtplib.SMTP | smtplib.SMTP_SSL:
-        """Create SMTP or SMTP_SSL connection"""
-        try:
-            if str(self.smtp_port) == "465":
-                server = smtplib.SMTP_SSL(self.smtp_server, self.smtp_port, timeout=10)
-            else:
-                server = smtplib.SMTP(self.smtp_server, self.smtp_port, timeout=10)
-                server.starttls()
-            
-            server.login(self.smtp_user, self.smtp_password)
-            return server
-        except Exception as e:
-            logger.error(f"Failed to create SMTP connection: {e}")
-            raise
+    async def _enqueue(self, subject: str, to_email: str, html_content: str, category: str, db: Optional[AsyncSession] = None) -> None:
+        """Hand the message to the email outbox; delivery happens in its workers"""
+        await email_outbox.enqueue(to_email, subject, html_content, category, inline_logo=bool(self.logo_file_path), db=db)
     
-    def send_verification_email(self, to_email: str, verification_code: str) -> bool:
+    async def send_verification_email(self, to_email: str, verification_code: str) -> bool:
         """Send verification code email"""
         try:
             subject = "SCIB - Email Verification"
@@ -159,19 +124,16 @@ class EmailService:
             """
             html_content = self._wrap_html("Email Verification", code_html)
             
-            msg = self._build_message(subject, to_email, html_content)
-            
-            with self._create_connection() as server:
-                server.send_message(msg)
+            await self._enqueue(subject, to_email, html_content, "verification")
             
-            logger.info(f"Verification email sent to {to_email}")
+            logger.info(f"Verification email queued for {to_email}")
             return True
             
         except Exception as e:
             logger.error(f"Failed to send verification email to {to_email}: {e}")
             return False
     
-    def send_pin_reset_email(self, to_email: str, reset_code: str) -> bool:
+    async def send_pin_reset_email(self, to_email: str, reset_code: str) -> bool:
         """Send transfer PIN reset code email"""
         try:
             subject = "SCIB - Transfer PIN Reset Code"
@@ -196,16 +158,14 @@ class EmailService:
             """
             html_content = self._wrap_html("Transfer PIN Reset", body)
 
-            msg = self._build_message(subject, to_email, html_content)
-            with self._create_connection() as server:
-                server.send_message(msg)
-            logger.info(f"PIN reset email sent to {to_email}")
+            await self._enqueue(subject, to_email, html_content, "pin_reset")
+            logger.info(f"PIN reset email queued for {to_email}")
             return True
         except Exception as e:
             logger.error(f"Failed to send PIN reset email to {to_email}: {e}")
             return False
     
-    def send_welcome_email(self, to_email: str, user_name: str) -> bool:
+    async def send_welcome_email(self, to_email: str, user_name: str) -> bool:
         """Send welcome email after successful verification"""
         try:
             subject = "Welcome to SCIB Bank"
@@ -231,19 +191,16 @@ class EmailService:
             """
             html_content = self._wrap_html("Welcome", body)
             
-            msg = self._build_message(subject, to_email, html_content)
-            
-            with self._create_connection() as server:
-                server.send_message(msg)
+            await self._enqueue(subject, to_email, html_content, "welcome")
             
-            logger.info(f"Welcome email sent to {to_email}")
+            logger.info(f"Welcome email queued for {to_email}")
             return True
             
         except Exception as e:
             logger.error(f"Failed to send welcome email to {to_email}: {e}")
             return False
 
-    def send_approval_email(self, to_email: str, first_name: str) -> bool:
+    async def send_approval_email(self, to_email: str, first_name: str) -> bool:
         """Send account approval email to user"""
         try:
             subject = "Account Approved - Welcome to SCIB"
@@ -276,18 +233,15 @@ class EmailService:
             """
             html_content = self._wrap_html("Account Approved", body)
             
-            msg = self._build_message(subject, to_email, html_content)
+            await self._enqueue(subject, to_email, html_content, "account_approved")
             
-            with self._create_connection() as server:
-                server.send_message(msg)
-            
-            logger.info(f"Approval email sent to {to_email}")
+            logger.info(f"Approval email queued for {to_email}")
             return True
         except Exception as e:
             logger.error(f"Failed to send approval email to {to_email}: {e}")
             return False
     
-    def send_card_ready_email(self, to_email: str, card_name: str, card_type: str, expiry_month: int, expiry_year: int) -> bool:
+    async def send_card_ready_email(self, to_email: str, card_name: str, card_type: str, expiry_month: int, expiry_year: int) -> bool:
         try:
             subject = "Your Virtual Card Is Ready"
             body = f"""
@@ -311,16 +265,14 @@ class EmailService:
               <p style="margin-top:16px">If you see unfamiliar activity, freeze the card immediately and contact Support.</p>
             """
             html_content = self._wrap_html("Virtual Card Ready", body)
-            msg = self._build_message(subject, to_email, html_content)
-            with self._create_connection() as server:
-                server.send_message(msg)
-            logger.info(f"Card ready email sent to {to_email}")
+            await self._enqueue(subject, to_email, html_content, "card_ready")
+            logger.info(f"Card ready email queued for {to_email}")
             return True
         except Exception as e:
             logger.error(f"Failed to send card ready email to {to_email}: {e}")
             return False
     
-    def send_transfer_reversed_email(self, to_email: str, amount: float, currency: str, reference: str, reason: Optional[str] = None) -> bool:
+    async def send_transfer_reversed_email(self, to_email: str, amount: float, currency: str, reference: str, reason: Optional[str] = None) -> bool:
         """Notify user by email that a transfer was reversed and funds credited back."""
         try:
             subject = "Transfer Reversed — Funds Credited Back"
@@ -345,16 +297,14 @@ class EmailService:
               <p style="margin-top:16px">For questions or to dispute this reversal, open a ticket in Support from your dashboard.</p>
             """
             html_content = self._wrap_html("Transfer Reversed", body)
-            msg = self._build_message(subject, to_email, html_content)
-            with self._create_connection() as server:
-                server.send_message(msg)
-            logger.info(f"Transfer reversed email sent to {to_email}")
+            await self._enqueue(subject, to_email, html_content, "transfer_reversed")
+            logger.info(f"Transfer reversed email queued for {to_email}")
             return True
         except Exception as e:
             logger.error(f"Failed to send transfer reversed email to {to_email}: {e}")
             return False
     
-    def send_profile_update_notice(
+    async def send_profile_update_notice(
         self,
         to_email: str,
         user_name: str,
@@ -390,16 +340,14 @@ class EmailService:
               </div>
             """
             html_content = self._wrap_html("Profile Updated", body)
-            msg = self._build_message(subject, to_email, html_content)
-            with self._create_connection() as server:
-                server.send_message(msg)
-            logger.info(f"Profile update notice sent to {to_email}")
+            await self._enqueue(subject, to_email, html_content, "profile_update")
+            logger.info(f"Profile update notice queued for {to_email}")
             return True
         except Exception as e:
             logger.error(f"Failed to send profile update notice to {to_email}: {e}")
             return False
     
-    def send_support_ticket_reply(self, to_email: str, ticket_number: str, ticket_subject: str, reply_text: str) -> bool:
+    async def send_support_ticket_reply(self, to_email: str, ticket_number: str, ticket_subject: str, reply_text: str) -> bool:
         """Notify user by email that an admin replied to their support ticket."""
         try:
             subject = f"Official Support Update: Ticket #{ticket_number}"
@@ -428,18 +376,17 @@ class EmailService:
             """
             
             html_content = self._wrap_html("Support Update", inner_html)
-            msg = self._build_message(subject, to_email, html_content)
-            
-            with self._create_connection() as server:
-                server.send_message(msg)
-            logger.info(f"Support reply email sent to {to_email} for ticket {ticket_number}")
+            await self._enqueue(subject, to_email, html_content, "support_reply")
+            logger.info(f"Support reply email queued for {to_email} for ticket {ticket_number}")
             return True
         except Exception as e:
             logger.error(f"Failed to send support reply email to {to_email}: {e}")
             return False
 
-    def send_loan_status_email(self, to_email: str, status: str, amount: float, reason: str = "") -> bool:
-        """Notify user about loan application status"""
+    async def send_loan_status_email(
+        self, to_email: str, status: str, amount: float, reason: str = "", db: Optional[AsyncSession] = None
+    ) -> bool:
+        """Notify user about loan application status; with ``db`` the email is queued in the caller's transaction"""
         try:
             subject = f"Loan Application {status}"
             formatted_amount = f"${amount:,.2f}"
@@ -473,22 +420,18 @@ class EmailService:
             """
             
             html_content = self._wrap_html(title, body)
-            msg = self._build_message(subject, to_email, html_content)
-            with self._create_connection() as server:
-                server.send_message(msg)
-            logger.info(f"Loan status email ({status}) sent to {to_email}")
+            await self._enqueue(subject, to_email, html_content, "loan_status", db=db)
+            logger.info(f"Loan status email ({status}) queued for {to_email}")
             return True
         except Exception as e:
             logger.error(f"Failed to send loan status email to {to_email}: {e}")
             return False
 
-    def send_custom_email(self, to_email: str, subject: str, html_content: str) -> bool:
+    async def send_custom_email(self, to_email: str, subject: str, html_content: str) -> bool:
         """Send custom email with branding"""
         try:
-            msg = self._build_message(subject, to_email, html_content)
-            with self._create_connection() as server:
-                server.send_message(msg)
-            logger.info(f"Custom email sent to {to_email}")
+            await self._enqueue(subject, to_email, html_content, "custom")
+            logger.info(f"Custom email queued for {to_email}")
             return True
         except Exception as e:
             logger.error(f"Failed to send custom email to {to_email}: {e}")
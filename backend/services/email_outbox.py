@@ -0,0 +1,384 @@
+"""
+Email Outbox
+Durable queue for outgoing email. Request handlers only insert a row
+(``await email_outbox.enqueue(...)``, inside their own transaction when they
+pass ``db``); worker tasks started with the app deliver it.
+
+Each worker round claims up to EMAIL_OUTBOX_BATCH_SIZE due rows and delivers them:
+
+    resend  through Resend's batch endpoint, up to 100 messages per request
+            (messages embedding the logo go one by one: batch sends take no
+            attachments)
+    smtp    whatever Resend did not accept, or everything when RESEND_API_KEY
+            is unset, over the pooled SMTP sessions
+
+Each provider has a token-bucket rate limit per process
+(EMAIL_RESEND_REQUESTS_PER_SECOND, EMAIL_SMTP_MESSAGES_PER_SECOND). Messages
+neither provider accepted are retried with exponential backoff and
+dead-lettered (status DEAD, with the last error) after EMAIL_OUTBOX_MAX_ATTEMPTS.
+
+Rows are claimed with FOR UPDATE SKIP LOCKED and leased by moving
+next_attempt_at forward, so several processes can run workers, and a worker
+that dies mid-send only delays its batch by EMAIL_OUTBOX_LEASE_SECONDS.
+"""
+import asyncio
+import base64
+import functools
+import hashlib
+import os
+import time
+import uuid
+from datetime import datetime, timedelta
+from email.mime.image import MIMEImage
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from email.utils import formataddr
+from typing import Any, Dict, List, Optional, Tuple
+import httpx
+from sqlalchemy import delete, event, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from config import settings
+from database import AsyncSessionLocal
+from models.email_outbox import OutboxEmail, OutboxEmailStatus
+from utils.http_client import outbound_client
+from utils.logger import logger
+from utils.metrics import registry
+from utils.smtp_pool import smtp_pool
+
+_RESEND_URL = "https://api.resend.com"
+_RESEND_BATCH_LIMIT = 100
+_RETRY_BASE_SECONDS = 30
+_RETRY_MAX_SECONDS = 3600
+_PURGE_INTERVAL_SECONDS = 3600
+
+emails_total = registry.counter(
+    "emails_total", "Email delivery attempts by provider, category and outcome", ("provider", "category", "outcome")
+)
+email_outbox_delay_seconds = registry.histogram(
+    "email_outbox_delay_seconds", "Time from enqueue to delivery",
+    buckets=(1.0, 5.0, 15.0, 60.0, 300.0, 900.0, 3600.0, 21600.0),
+)
+email_outbox_dead_letters_total = registry.counter(
+    "email_outbox_dead_letters_total", "Emails given up on after EMAIL_OUTBOX_MAX_ATTEMPTS", ("category",)
+)
+
+# provider, provider message id, error; provider is None when delivery failed
+_Delivery = Tuple[Optional[str], Optional[str], Optional[str]]
+
+
+@functools.lru_cache(maxsize=1)
+def _brand_logo() -> Optional[Tuple[str, bytes, str]]:
+    """(filename, content, image subtype) of the logo EmailService references as cid:brandlogo"""
+    from services.email import email_service
+    if not email_service.logo_file_path:
+        return None
+    try:
+        with open(email_service.logo_file_path, "rb") as f:
+            content = f.read()
+    except OSError as e:
+        logger.warning(f"Email logo unavailable, sending without it: {e}")
+        return None
+    extension = os.path.splitext(email_service.logo_file_path)[1].lower().lstrip(".")
+    return os.path.basename(email_service.logo_file_path), content, "svg+xml" if extension == "svg" else extension
+
+
+class _RateLimiter:
+    """Token bucket shared by the workers of one process; a rate of 0 means unlimited"""
+
+    def __init__(self, rate_per_second: float):
+        self.rate = rate_per_second
+        self.capacity = max(1.0, rate_per_second)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class EmailOutbox:
+    """Enqueues emails and runs the workers that deliver them"""
+
+    def __init__(self, session_factory=None, resend_transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.session_factory = session_factory or AsyncSessionLocal
+        self._resend_transport = resend_transport  # injectable for offline benchmarks
+        self._client: Optional[httpx.AsyncClient] = None
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup = asyncio.Event()
+        self._resend_limit = _RateLimiter(settings.EMAIL_RESEND_REQUESTS_PER_SECOND)
+        self._smtp_limit = _RateLimiter(settings.EMAIL_SMTP_MESSAGES_PER_SECOND)
+
+    async def enqueue(
+        self,
+        to_email: str,
+        subject: str,
+        html: str,
+        category: str,
+        to_name: Optional[str] = None,
+        inline_logo: bool = False,
+        db: Optional[AsyncSession] = None
+    ) -> str:
+        """
+        Queue one email for delivery
+
+        With ``db`` the row is only staged, so it commits (or rolls back) with
+        the caller's transaction and the workers are woken once it commits;
+        otherwise it is committed right away.
+
+        Returns:
+            Outbox row id
+        """
+        now = datetime.utcnow()
+        row = OutboxEmail(
+            id=str(uuid.uuid4()),
+            category=category,
+            status=OutboxEmailStatus.PENDING,
+            to_email=to_email,
+            to_name=to_name,
+            subject=subject,
+            html=html,
+            inline_logo=inline_logo,
+            attempts=0,
+            next_attempt_at=now,
+            created_at=now,
+        )
+        if db is not None:
+            db.add(row)
+            # Waking the workers now would find nothing until the caller commits
+            if not db.info.get("email_outbox_wakeup"):
+                db.info["email_outbox_wakeup"] = True
+                event.listen(db.sync_session, "after_commit", self._on_commit)
+        else:
+            async with self.session_factory() as session:
+                session.add(row)
+                await session.commit()
+            self._wakeup.set()
+        return row.id
+
+    def _on_commit(self, session) -> None:
+        self._wakeup.set()
+
+    # Delivery
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = outbound_client(
+                "resend",
+                transport=self._resend_transport,
+                timeout=10.0,
+                headers={"Authorization": f"Bearer {settings.RESEND_API_KEY}"},
+            )
+        return self._client
+
+    @staticmethod
+    def _resend_enabled() -> bool:
+        return bool(settings.RESEND_API_KEY) and settings.RESEND_API_KEY != 're_your_api_key_here'
+
+    @staticmethod
+    def _recipient(row: OutboxEmail) -> str:
+        return formataddr((row.to_name, row.to_email)) if row.to_name else row.to_email
+
+    @staticmethod
+    def _resend_payload(row: OutboxEmail) -> Dict[str, Any]:
+        return {
+            "from": f"SCIB Bank <{settings.SMTP_FROM}>",
+            "to": [EmailOutbox._recipient(row)],
+            "subject": row.subject,
+            "html": row.html,
+        }
+
+    async def _post_resend(self, path: str, payload: Any, rows: List[OutboxEmail]) -> Tuple[Optional[List[str]], Optional[str]]:
+        """POST to Resend; returns (message ids, None) or (None, error)"""
+        await self._resend_limit.acquire()
+        # Same rows, same key: a retry after a lost response is not sent twice
+        key = hashlib.sha256(",".join(sorted(row.id for row in rows)).encode()).hexdigest()
+        try:
+            response = await self.client.post(f"{_RESEND_URL}{path}", json=payload, headers={"Idempotency-Key": key})
+        except httpx.HTTPError as e:
+            return None, f"resend: {e!r}"
+        if response.status_code not in (200, 201):
+            return None, f"resend: HTTP {response.status_code} {response.text[:300]}"
+        body = response.json()
+        data = body.get("data") if isinstance(body.get("data"), list) else [body]
+        return [item.get("id") for item in data], None
+
+    async def _send_resend(self, rows: List[OutboxEmail]) -> Dict[str, _Delivery]:
+        results: Dict[str, _Delivery] = {}
+
+        def record(chunk: List[OutboxEmail], ids: Optional[List[str]], error: Optional[str]) -> None:
+            for index, row in enumerate(chunk):
+                if ids is not None:
+                    results[row.id] = ("resend", ids[index] if index < len(ids) else None, None)
+                else:
+                    results[row.id] = (None, None, error)
+                emails_total.inc(provider="resend", category=row.category, outcome="failed" if ids is None else "sent")
+
+        plain = [row for row in rows if not (row.inline_logo and _brand_logo())]
+        for start in range(0, len(plain), _RESEND_BATCH_LIMIT):
+            chunk = plain[start:start + _RESEND_BATCH_LIMIT]
+            if len(chunk) == 1:
+                record(chunk, *await self._post_resend("/emails", self._resend_payload(chunk[0]), chunk))
+            else:
+                record(chunk, *await self._post_resend("/emails/batch", [self._resend_payload(row) for row in chunk], chunk))
+
+        for row in rows:
+            if row.id in results:
+                continue
+            filename, content, _ = _brand_logo()
+            payload = self._resend_payload(row)
+            payload["attachments"] = [{"filename": filename, "content": base64.b64encode(content).decode("ascii"), "content_id": "brandlogo"}]
+            record([row], *await self._post_resend("/emails", payload, [row]))
+        return results
+
+    @staticmethod
+    def _mime_message(row: OutboxEmail) -> MIMEMultipart:
+        message = MIMEMultipart("related")
+        alternative = MIMEMultipart("alternative")
+        message.attach(alternative)
+        alternative.attach(MIMEText(row.html, "html"))
+        message["Subject"] = row.subject
+        message["From"] = formataddr(("SCIB Bank", settings.SMTP_FROM))
+        message["To"] = EmailOutbox._recipient(row)
+        logo = _brand_logo() if row.inline_logo else None
+        if logo:
+            filename, content, subtype = logo
+            image = MIMEImage(content, _subtype=subtype)
+            image.add_header("Content-ID", "<brandlogo>")
+            image.add_header("Content-Disposition", "inline", filename=filename)
+            message.attach(image)
+        return message
+
+    async def _send_smtp(self, rows: List[OutboxEmail]) -> Dict[str, _Delivery]:
+        async def send(row: OutboxEmail) -> Tuple[str, _Delivery]:
+            await self._smtp_limit.acquire()
+            try:
+                await smtp_pool.send(self._mime_message(row))
+            except Exception as e:
+                emails_total.inc(provider="smtp", category=row.category, outcome="failed")
+                return row.id, (None, None, f"smtp: {e!r}")
+            emails_total.inc(provider="smtp", category=row.category, outcome="sent")
+            return row.id, ("smtp", None, None)
+
+        return dict(await asyncio.gather(*(send(row) for row in rows)))
+
+    async def deliver(self, rows: List[OutboxEmail]) -> Dict[str, _Delivery]:
+        """Send rows through Resend, falling back to SMTP; returns the outcome per row id"""
+        results: Dict[str, _Delivery] = {}
+        remaining = rows
+        if self._resend_enabled():
+            results = await self._send_resend(rows)
+            remaining = [row for row in rows if results[row.id][0] is None]
+        if remaining and settings.SMTP_SERVER:
+            for row_id, delivery in (await self._send_smtp(remaining)).items():
+                earlier = results.get(row_id, (None, None, None))[2]
+                results[row_id] = delivery if delivery[0] else (None, None, "; ".join(filter(None, [earlier, delivery[2]])))
+        for row in remaining:
+            results.setdefault(row.id, (None, None, "no email provider configured"))
+        return results
+
+    # Workers
+
+    async def _claim(self) -> List[OutboxEmail]:
+        now = datetime.utcnow()
+        async with self.session_factory() as db:
+            rows = (await db.execute(
+                select(OutboxEmail)
+                .where(OutboxEmail.status == OutboxEmailStatus.PENDING, OutboxEmail.next_attempt_at <= now)
+                .order_by(OutboxEmail.next_attempt_at)
+                .limit(settings.EMAIL_OUTBOX_BATCH_SIZE)
+                .with_for_update(skip_locked=True)
+            )).scalars().all()
+            lease_expiry = now + timedelta(seconds=settings.EMAIL_OUTBOX_LEASE_SECONDS)
+            for row in rows:
+                row.attempts += 1
+                row.next_attempt_at = lease_expiry
+            await db.commit()
+        return list(rows)
+
+    async def _record(self, rows: List[OutboxEmail], results: Dict[str, _Delivery]) -> None:
+        now = datetime.utcnow()
+        updates = []
+        for row in rows:
+            provider, message_id, error = results[row.id]
+            if provider:
+                updates.append({"id": row.id, "status": OutboxEmailStatus.SENT, "provider": provider,
+                                "provider_message_id": message_id, "sent_at": now, "error": None})
+                email_outbox_delay_seconds.observe((now - row.created_at).total_seconds())
+            elif row.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+                updates.append({"id": row.id, "status": OutboxEmailStatus.DEAD, "error": error})
+                email_outbox_dead_letters_total.inc(category=row.category)
+                logger.error(f"Email {row.id} ({row.category}) dead-lettered after {row.attempts} attempts: {error}")
+            else:
+                delay = min(_RETRY_MAX_SECONDS, _RETRY_BASE_SECONDS * 2 ** (row.attempts - 1))
+                updates.append({"id": row.id, "next_attempt_at": now + timedelta(seconds=delay), "error": error})
+        async with self.session_factory() as db:
+            await db.execute(update(OutboxEmail), updates)
+            await db.commit()
+
+    async def process_batch(self) -> int:
+        """Claim, deliver and record one batch of due emails; returns how many were claimed"""
+        rows = await self._claim()
+        if rows:
+            await self._record(rows, await self.deliver(rows))
+        return len(rows)
+
+    async def _worker(self) -> None:
+        while True:
+            try:
+                claimed = await self.process_batch()
+            except Exception as e:
+                logger.error("Email outbox worker round failed", error=e)
+                claimed = 0
+            if not claimed:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), settings.EMAIL_OUTBOX_POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def _purge_sent(self) -> None:
+        """Drop delivered emails after EMAIL_OUTBOX_RETENTION_DAYS; dead letters stay for inspection"""
+        while True:
+            try:
+                cutoff = datetime.utcnow() - timedelta(days=settings.EMAIL_OUTBOX_RETENTION_DAYS)
+                async with self.session_factory() as db:
+                    result = await db.execute(
+                        delete(OutboxEmail).where(OutboxEmail.status == OutboxEmailStatus.SENT, OutboxEmail.sent_at < cutoff)
+                    )
+                    await db.commit()
+                if result.rowcount:
+                    logger.info(f"Purged {result.rowcount} sent emails from the outbox")
+            except Exception as e:
+                logger.error("Email outbox purge failed", error=e)
+            await asyncio.sleep(_PURGE_INTERVAL_SECONDS)
+
+    def start(self, workers: Optional[int] = None) -> None:
+        """Start the delivery workers on the running loop"""
+        count = settings.EMAIL_OUTBOX_WORKERS if workers is None else workers
+        self._tasks = [asyncio.create_task(self._worker(), name=f"email_outbox_{i}") for i in range(count)]
+        self._tasks.append(asyncio.create_task(self._purge_sent(), name="email_outbox_purge"))
+
+    async def shutdown(self) -> None:
+        """Stop the workers; emails they had claimed are retried once their lease expires"""
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+# Shared by every sender in the process
+email_outbox = EmailOutbox()
@@ -0,0 +1,90 @@
+"""
+Job Lease
+Exclusive, expiring claim on a BackgroundJob row, so a job has at most one
+runner across API workers and job processes.
+
+A runner acquires the lease before doing any work: lease_owner names it and
+lease_expires_at is pushed JOB_LEASE_SECONDS ahead by a heartbeat task while
+it runs. Another runner can only take over once the lease is released or has
+expired because its holder died.
+
+    lease = JobLease(AsyncSessionLocal, job_id)
+    if not await lease.acquire():
+        return  # running elsewhere
+    try:
+        ...
+    finally:
+        await lease.release()
+"""
+import asyncio
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy import or_, update
+from config import settings
+from models.job import BackgroundJob
+from utils.logger import logger
+
+
+class JobLease:
+    """Lease on one BackgroundJob row, held by this runner"""
+
+    def __init__(self, session_factory, job_id: str, seconds: Optional[int] = None):
+        self.session_factory = session_factory
+        self.job_id = job_id
+        self.seconds = seconds or settings.JOB_LEASE_SECONDS
+        # Unique per runner, so a second runner in the same process is refused too
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._heartbeat: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def is_held(job: BackgroundJob) -> bool:
+        """Whether some runner currently holds ``job``'s lease"""
+        return job.lease_owner is not None and job.lease_expires_at is not None and job.lease_expires_at > datetime.utcnow()
+
+    async def _extend(self, *criteria) -> bool:
+        async with self.session_factory() as db:
+            result = await db.execute(
+                update(BackgroundJob)
+                .where(BackgroundJob.id == self.job_id, *criteria)
+                .values(lease_owner=self.owner, lease_expires_at=datetime.utcnow() + timedelta(seconds=self.seconds))
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+        return result.rowcount == 1
+
+    async def acquire(self) -> bool:
+        """Claim the job unless another runner holds an unexpired lease; starts the heartbeat"""
+        acquired = await self._extend(
+            or_(BackgroundJob.lease_owner.is_(None), BackgroundJob.lease_expires_at < datetime.utcnow())
+        )
+        if acquired:
+            self._heartbeat = asyncio.create_task(self._renew(), name=f"job_lease:{self.job_id}")
+        return acquired
+
+    async def _renew(self) -> None:
+        while True:
+            await asyncio.sleep(self.seconds / 3)
+            try:
+                if not await self._extend(BackgroundJob.lease_owner == self.owner):
+                    logger.error(f"Lost the lease on job {self.job_id}; another runner may have taken it over")
+                    return
+            except Exception as e:
+                logger.warning(f"Could not renew the lease on job {self.job_id}: {e}")
+
+    async def release(self) -> None:
+        """Stop the heartbeat and give the job up (if this runner still holds it)"""
+        heartbeat, self._heartbeat = self._heartbeat, None
+        if heartbeat is not None:
+            heartbeat.cancel()
+            await asyncio.gather(heartbeat, return_exceptions=True)
+        async with self.session_factory() as db:
+            await db.execute(
+                update(BackgroundJob)
+                .where(BackgroundJob.id == self.job_id, BackgroundJob.lease_owner == self.owner)
+                .values(lease_owner=None, lease_expires_at=None)
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
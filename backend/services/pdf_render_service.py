@@ -0,0 +1,172 @@
+"""
+PDF Render Service
+Runs reportlab statement rendering in a warm process pool so CPU-bound PDF
+work never runs on the event loop.
+
+Workers are spawned once (optionally at app startup), preload fonts and styles
+in their initializer, and are recycled after PDF_RENDER_MAX_TASKS_PER_CHILD
+jobs. Each job has a time limit: the worker interrupts itself with SIGALRM,
+and if it does not come back shortly after that the pool is torn down and
+rebuilt so a wedged process never holds a slot.
+
+Statements with more than PDF_CANVAS_ROW_THRESHOLD transactions are drawn by
+StatementCanvasRenderer instead of the platypus layout.
+"""
+import asyncio
+import functools
+import multiprocessing
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from config import settings
+from utils.logger import logger
+from utils.metrics import registry
+
+# Time a worker gets past its own alarm before the parent gives up on it
+_TIMEOUT_GRACE_SECONDS = 5.0
+
+pdf_render_duration_seconds = registry.histogram(
+    "pdf_render_duration_seconds", "Statement PDF render time in the process pool, excluding queueing",
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0),
+)
+pdf_renders_total = registry.counter(
+    "pdf_renders_total", "Statement PDF render jobs by outcome", ("outcome",)
+)
+
+
+class PdfRenderError(Exception):
+    """A statement could not be rendered by the pool"""
+
+
+class PdfRenderTimeout(PdfRenderError):
+    """A statement took longer than its render time limit"""
+
+
+class PdfRenderService:
+    """Async front end for a pool of statement render processes"""
+
+    def __init__(
+        self,
+        processes: Optional[int] = None,
+        timeout_seconds: Optional[float] = None,
+        max_tasks_per_child: Optional[int] = None
+    ):
+        configured = settings.PDF_RENDER_PROCESSES if processes is None else processes
+        self.processes = max(1, configured or os.cpu_count() or 1)
+        self.timeout_seconds = settings.PDF_RENDER_TIMEOUT_SECONDS if timeout_seconds is None else timeout_seconds
+        self.max_tasks_per_child = (
+            settings.PDF_RENDER_MAX_TASKS_PER_CHILD if max_tasks_per_child is None else max_tasks_per_child
+        ) or None
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._slots = asyncio.Semaphore(self.processes)
+
+    def _ensure_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            from utils.pdf_generator import init_render_worker
+            # spawn: the parent runs an event loop and threads, which fork does not copy safely
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.processes,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=init_render_worker,
+                max_tasks_per_child=self.max_tasks_per_child,
+            )
+        return self._pool
+
+    async def start(self) -> None:
+        """Spawn every worker and wait until each has loaded reportlab"""
+        pool = self._ensure_pool()
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        # A process is spawned per submit while none is idle, so this starts them all
+        await asyncio.gather(*(loop.run_in_executor(pool, os.getpid) for _ in range(self.processes)))
+        logger.info(f"PDF render pool ready: {self.processes} processes in {time.perf_counter() - started:.1f}s")
+
+    async def shutdown(self) -> None:
+        pool, self._pool = self._pool, None
+        if pool is not None:
+            await asyncio.to_thread(pool.shutdown, wait=True, cancel_futures=True)
+
+    async def __aenter__(self) -> "PdfRenderService":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.shutdown()
+
+    def _discard_pool(self, pool: ProcessPoolExecutor) -> None:
+        """Kill a pool holding a wedged or dead worker; the next job builds a fresh one"""
+        if self._pool is pool:
+            self._pool = None
+        # ProcessPoolExecutor has no public way to stop a running job
+        for process in list((getattr(pool, "_processes", None) or {}).values()):
+            process.terminate()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    async def _run(self, timeout: Optional[float], output_dir: Optional[str], *args):
+        from utils.pdf_generator import RenderTimeout, render_statement_job
+        limit = self.timeout_seconds if timeout is None else timeout
+        async with self._slots:
+            pool = self._ensure_pool()
+            started = time.perf_counter()
+            future = asyncio.get_running_loop().run_in_executor(
+                pool, functools.partial(render_statement_job, *args, limit, output_dir, settings.PDF_CANVAS_ROW_THRESHOLD)
+            )
+            try:
+                result = await asyncio.wait_for(future, limit + _TIMEOUT_GRACE_SECONDS if limit else None)
+            except RenderTimeout:
+                pdf_renders_total.inc(outcome="timeout")
+                raise PdfRenderTimeout(f"Statement rendering exceeded {limit}s")
+            except asyncio.TimeoutError:
+                pdf_renders_total.inc(outcome="timeout")
+                logger.error(f"PDF render worker unresponsive after {limit}s; restarting the render pool")
+                self._discard_pool(pool)
+                raise PdfRenderTimeout(f"Statement rendering exceeded {limit}s")
+            except BrokenProcessPool as e:
+                pdf_renders_total.inc(outcome="crashed")
+                logger.error("PDF render worker died; restarting the render pool", error=e)
+                self._discard_pool(pool)
+                raise PdfRenderError("Statement render worker died") from e
+            except Exception:
+                pdf_renders_total.inc(outcome="error")
+                raise
+            pdf_renders_total.inc(outcome="ok")
+            pdf_render_duration_seconds.observe(time.perf_counter() - started)
+            return result
+
+    async def render_statement(
+        self,
+        user_data: Dict[str, Any],
+        accounts_data: List[Dict[str, Any]],
+        start_date: datetime,
+        end_date: datetime,
+        timeout: Optional[float] = None
+    ) -> bytes:
+        """Render a statement PDF and return its bytes"""
+        return await self._run(timeout, None, user_data, accounts_data, start_date, end_date)
+
+    async def render_statement_to_file(
+        self,
+        user_data: Dict[str, Any],
+        accounts_data: List[Dict[str, Any]],
+        start_date: datetime,
+        end_date: datetime,
+        directory: Optional[str] = None,
+        timeout: Optional[float] = None
+    ) -> str:
+        """
+        Render a statement PDF into a temp file written by the worker
+
+        Keeps large PDFs out of the parent's memory and the result pipe.
+
+        Returns:
+            Path of the file; the caller deletes it
+        """
+        return await self._run(timeout, directory or tempfile.gettempdir(), user_data, accounts_data, start_date, end_date)
+
+
+# Shared pool for the API process
+pdf_renderer = PdfRenderService()
@@ -0,0 +1,158 @@
+"""
+Statement Export Service
+Streams an account's posted transactions as CSV, OFX or QFX for accounting tools.
+
+Rows come from a server-side cursor (STATEMENT_EXPORT_BATCH_SIZE at a time)
+and are serialized batch by batch, so memory stays flat however long the date
+range is. Nothing is written to disk or uploaded.
+"""
+import csv
+import io
+import zlib
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Iterable, Optional
+from xml.sax.saxutils import escape
+from sqlalchemy import select
+from config import settings
+from database import ReadSessionLocal
+from models.transaction import Transaction
+from services.balance_snapshot_service import BalanceSnapshotService
+
+EXPORT_FORMATS = {
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "ofx": ("application/x-ofx", "ofx"),
+    "qfx": ("application/vnd.intu.qfx", "qfx"),
+}
+
+CSV_HEADER = ["Date", "Description", "Reference", "Type", "Amount", "Balance", "Currency", "Transaction ID"]
+
+_OFX_ACCOUNT_TYPES = {"checking": "CHECKING", "savings": "SAVINGS"}
+_OFX_TRANSACTION_TYPES = {"deposit": "DEP", "interest": "INT", "fee": "FEE"}
+
+
+def _ofx_date(value: datetime) -> str:
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.strftime("%Y%m%d%H%M%S") + "[0:GMT]"
+
+
+def _ofx_text(value: Optional[str], limit: int) -> str:
+    return escape((value or "").replace("\n", " ")[:limit])
+
+
+def _enum_value(value: Any) -> str:
+    return value.value if hasattr(value, "value") else str(value)
+
+
+class StatementExportService:
+    """Streams transaction exports; every generator yields encoded chunks"""
+
+    @staticmethod
+    async def _transaction_batches(account_id: str, start_date: datetime, end_date: datetime) -> AsyncIterator[Iterable[Any]]:
+        """Posted transactions in [start_date, end_date] from a server-side cursor, oldest first"""
+        # A session of its own: the stream outlives the request handler's session
+        async with ReadSessionLocal() as db:
+            result = await db.stream(
+                select(
+                    Transaction.id,
+                    Transaction.created_at,
+                    Transaction.description,
+                    Transaction.reference_number,
+                    Transaction.type,
+                    Transaction.amount,
+                    Transaction.balance_after,
+                    Transaction.currency,
+                )
+                .where(
+                    Transaction.account_id == account_id,
+                    Transaction.created_at >= start_date,
+                    Transaction.created_at <= end_date,
+                    Transaction.status == 'completed',
+                )
+                .order_by(Transaction.created_at, Transaction.id)
+                .execution_options(yield_per=settings.STATEMENT_EXPORT_BATCH_SIZE)
+            )
+            async for batch in result.partitions():
+                yield batch
+
+    @staticmethod
+    async def stream_csv(account: Any, start_date: datetime, end_date: datetime) -> AsyncIterator[bytes]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(CSV_HEADER)
+        async for batch in StatementExportService._transaction_batches(account.id, start_date, end_date):
+            writer.writerows(
+                [
+                    row.created_at.isoformat(),
+                    row.description,
+                    row.reference_number,
+                    _enum_value(row.type),
+                    f"{row.amount:.2f}",
+                    f"{row.balance_after:.2f}",
+                    row.currency or account.currency,
+                    row.id,
+                ]
+                for row in batch
+            )
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode("utf-8")
+
+    @staticmethod
+    async def stream_ofx(account: Any, start_date: datetime, end_date: datetime, qfx: bool = False) -> AsyncIterator[bytes]:
+        """OFX 1.02 (SGML), the dialect Quicken and most accounting tools import; QFX adds Intuit's INTU.BID"""
+        now = _ofx_date(datetime.utcnow())
+        account_type = _OFX_ACCOUNT_TYPES.get(_enum_value(account.account_type), "CHECKING")
+        intu_bid = f"<INTU.BID>{settings.QFX_INTU_BID}\n" if qfx and settings.QFX_INTU_BID else ""
+        yield (
+            "OFXHEADER:100\nDATA:OFXSGML\nVERSION:102\nSECURITY:NONE\nENCODING:USASCII\n"
+            "CHARSET:1252\nCOMPRESSION:NONE\nOLDFILEUID:NONE\nNEWFILEUID:NONE\n\n"
+            "<OFX>\n<SIGNONMSGSRSV1>\n<SONRS>\n<STATUS>\n<CODE>0\n<SEVERITY>INFO\n</STATUS>\n"
+            f"<DTSERVER>{now}\n<LANGUAGE>ENG\n{intu_bid}</SONRS>\n</SIGNONMSGSRSV1>\n"
+            "<BANKMSGSRSV1>\n<STMTTRNRS>\n<TRNUID>0\n<STATUS>\n<CODE>0\n<SEVERITY>INFO\n</STATUS>\n"
+            f"<STMTRS>\n<CURDEF>{account.currency}\n"
+            f"<BANKACCTFROM>\n<BANKID>{_ofx_text(account.routing_number or settings.EXPORT_DEFAULT_BANK_ID, 9)}\n"
+            f"<ACCTID>{_ofx_text(account.account_number, 22)}\n<ACCTTYPE>{account_type}\n</BANKACCTFROM>\n"
+            f"<BANKTRANLIST>\n<DTSTART>{_ofx_date(start_date)}\n<DTEND>{_ofx_date(end_date)}\n"
+        ).encode("cp1252", "replace")
+
+        closing_balance = None
+        async for batch in StatementExportService._transaction_batches(account.id, start_date, end_date):
+            chunk = []
+            for row in batch:
+                trn_type = _OFX_TRANSACTION_TYPES.get(_enum_value(row.type)) or ("CREDIT" if row.amount >= 0 else "DEBIT")
+                chunk.append(
+                    f"<STMTTRN>\n<TRNTYPE>{trn_type}\n<DTPOSTED>{_ofx_date(row.created_at)}\n"
+                    f"<TRNAMT>{row.amount:.2f}\n<FITID>{_ofx_text(row.id, 255)}\n"
+                    f"<NAME>{_ofx_text(row.description, 32)}\n<MEMO>{_ofx_text(row.reference_number, 255)}\n</STMTTRN>\n"
+                )
+                closing_balance = row.balance_after
+            yield "".join(chunk).encode("cp1252", "replace")
+
+        if closing_balance is None:
+            async with ReadSessionLocal() as db:
+                balances = await BalanceSnapshotService.balances_as_of(db, [account.id], end_date.date())
+            closing_balance = balances.get(account.id, 0.0)
+        yield (
+            "</BANKTRANLIST>\n"
+            f"<LEDGERBAL>\n<BALAMT>{closing_balance:.2f}\n<DTASOF>{_ofx_date(end_date)}\n</LEDGERBAL>\n"
+            "</STMTRS>\n</STMTTRNRS>\n</BANKMSGSRSV1>\n</OFX>\n"
+        ).encode("ascii")
+
+    @staticmethod
+    def stream(export_format: str, account: Any, start_date: datetime, end_date: datetime) -> AsyncIterator[bytes]:
+        if export_format == "csv":
+            return StatementExportService.stream_csv(account, start_date, end_date)
+        return StatementExportService.stream_ofx(account, start_date, end_date, qfx=export_format == "qfx")
+
+    @staticmethod
+    async def gzip_stream(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+        """Compress a byte stream incrementally (Content-Encoding: gzip)"""
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+        async for chunk in chunks:
+            compressed = compressor.compress(chunk)
+            if compressed:
+                yield compressed
+        yield compressor.flush()
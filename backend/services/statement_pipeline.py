@@ -0,0 +1,431 @@
+"""
+Monthly Statement Pipeline
+Generates every user's monthly statement in three stages connected by bounded queues:
+
+    fetch   pages through the job's unfinished users and loads their statement data
+    render  builds PDFs into temp files in a PdfRenderService process pool (reportlab is CPU bound)
+    store   uploads, saves Statement rows and emails, STATEMENT_IO_CONCURRENCY at a time
+
+Each user is a BackgroundJobItem of the period's BackgroundJob. A run holds the
+job's lease (services.job_lease), so two runs of one period never process the
+same users. Rerunning the job for the same period resumes it: completed users
+are skipped, users whose statement was stored but not yet emailed only get the
+email, and failed users are retried up to STATEMENT_MAX_ATTEMPTS times. A run
+that aborts marks the job FAILED with the error.
+"""
+import asyncio
+import contextlib
+import json
+import os
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from sqlalchemy import exists, func, literal, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from config import settings
+from models.account import Account
+from models.job import BackgroundJob, BackgroundJobItem, JobItemStatus, JobStatus, JobType
+from models.user import User
+from services.job_lease import JobLease
+from services.pdf_render_service import PdfRenderService
+from services.statement_service import StatementService
+from utils.email import send_statement_email
+from utils.logger import logger
+
+_PROGRESS_INTERVAL_SECONDS = 30
+_STOP = object()
+
+
+@dataclass
+class _StatementWork:
+    user_id: str
+    email: Optional[str]
+    first_name: Optional[str]
+    user_data: Optional[Dict[str, Any]] = None
+    accounts_data: Optional[List[Dict[str, Any]]] = None
+    statement_records: List[Dict[str, Any]] = field(default_factory=list)
+    pdf_path: Optional[str] = None
+    content_hash: Optional[str] = None
+    document_url: Optional[str] = None
+
+
+class MonthlyStatementPipeline:
+    """One run of the monthly statement job for a statement period"""
+
+    def __init__(self, session_factory, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None):
+        if start_date is None or end_date is None:
+            start_date, end_date = StatementService.previous_month_period()
+        self.session_factory = session_factory
+        self.start_date = start_date
+        self.end_date = end_date
+        self.period = start_date.strftime("%Y-%m")
+        self.job_id: Optional[str] = None
+        self.counts = {"completed": 0, "failed": 0, "skipped": 0, "emailed": 0}
+        self.stage_seconds = {"fetch": 0.0, "render": 0.0, "upload": 0.0, "email": 0.0}
+        self.errors: List[str] = []
+        self._started = 0.0
+
+    async def run(self) -> Dict[str, Any]:
+        self._started = time.perf_counter()
+        self.job_id = await self._claim_job()
+        lease = JobLease(self.session_factory, self.job_id)
+        if not await lease.acquire():
+            raise RuntimeError(f"Statement job {self.job_id} for {self.period} is already running in another process")
+        try:
+            await self._prepare_job()
+            await self._run_stages()
+            return await self._finish_job()
+        except Exception as e:
+            await self._abort_job(e)
+            raise
+        finally:
+            await lease.release()
+
+    async def _run_stages(self) -> None:
+        renderer = PdfRenderService(processes=settings.STATEMENT_RENDER_PROCESSES)
+        processes = renderer.processes
+        io_workers = max(1, settings.STATEMENT_IO_CONCURRENCY)
+        render_queue: asyncio.Queue = asyncio.Queue(maxsize=processes * 2)
+        store_queue: asyncio.Queue = asyncio.Queue(maxsize=io_workers * 2)
+        logger.info(
+            f"Statement job {self.job_id} ({self.period}): {processes} render processes, {io_workers} I/O workers"
+        )
+
+        async with renderer:
+            renderers = [asyncio.create_task(self._render_stage(renderer, render_queue, store_queue)) for _ in range(processes)]
+            storers = [asyncio.create_task(self._store_stage(store_queue)) for _ in range(io_workers)]
+            reporter = asyncio.create_task(self._report_progress())
+            try:
+                await self._fetch_stage(render_queue, store_queue)
+                for _ in renderers:
+                    await render_queue.put(_STOP)
+                await asyncio.gather(*renderers)
+                for _ in storers:
+                    await store_queue.put(_STOP)
+                await asyncio.gather(*storers)
+            finally:
+                for task in (*renderers, *storers, reporter):
+                    task.cancel()
+
+    async def _claim_job(self) -> str:
+        """Find or create the period's job; concurrent runs for one period agree on a single row"""
+        async with self.session_factory() as db:
+            # Serialise find-or-create per period until this transaction ends
+            await db.execute(select(func.pg_advisory_xact_lock(func.hashtext(f"monthly_statements:{self.period}"))))
+            job = (await db.execute(
+                select(BackgroundJob).where(
+                    BackgroundJob.job_type == JobType.MONTHLY_STATEMENTS,
+                    BackgroundJob.resource_type == "statement_period",
+                    BackgroundJob.resource_id == self.period,
+                ).order_by(BackgroundJob.created_at.desc()).limit(1)
+            )).scalar_one_or_none()
+            if job is None:
+                job = BackgroundJob(
+                    id=str(uuid.uuid4()),
+                    job_type=JobType.MONTHLY_STATEMENTS,
+                    status=JobStatus.PENDING,
+                    resource_type="statement_period",
+                    resource_id=self.period,
+                    params=json.dumps({"start": self.start_date.isoformat(), "end": self.end_date.isoformat()}),
+                    progress=json.dumps({}),
+                )
+                db.add(job)
+            await db.commit()
+            return job.id
+
+    async def _prepare_job(self) -> None:
+        """Mark the leased job running and add an item for every user due a statement"""
+        async with self.session_factory() as db:
+            job = await db.get(BackgroundJob, self.job_id)
+            now = datetime.utcnow()
+            if job.status != JobStatus.PENDING:
+                logger.info(f"Resuming statement job {job.id} for {self.period}")
+            job.status = JobStatus.RUNNING
+            job.started_at = job.started_at or now
+            job.error = None
+            job.finished_at = None
+
+            # Users added since the last run get items; existing items keep their state
+            due_users = select(
+                literal(job.id), User.id, literal(JobItemStatus.PENDING, BackgroundJobItem.status.type), literal(0), literal(now)
+            ).where(
+                User.is_active == True,
+                exists().where(Account.user_id == User.id, Account.status == 'active'),
+            )
+            await db.execute(
+                pg_insert(BackgroundJobItem)
+                .from_select(["job_id", "item_id", "status", "attempts", "updated_at"], due_users)
+                .on_conflict_do_nothing(index_elements=["job_id", "item_id"])
+            )
+            await db.commit()
+
+    async def _abort_job(self, error: Exception) -> None:
+        """Record a run that stopped before finishing, so the job does not stay RUNNING"""
+        logger.error(f"Statement job {self.job_id} for {self.period} aborted", error=error)
+        try:
+            async with self.session_factory() as db:
+                await db.execute(
+                    update(BackgroundJob).where(BackgroundJob.id == self.job_id).values(
+                        status=JobStatus.FAILED,
+                        error=f"Run aborted: {error}"[:1000],
+                        progress=json.dumps(self._progress()),
+                        finished_at=datetime.utcnow(),
+                    )
+                )
+                await db.commit()
+        except Exception as e:
+            logger.error(f"Could not record the failure of statement job {self.job_id}: {e}")
+
+    async def _fetch_stage(self, render_queue: asyncio.Queue, store_queue: asyncio.Queue) -> None:
+        after = ""
+        while True:
+            async with self.session_factory() as db:
+                rows = (await db.execute(
+                    select(BackgroundJobItem.item_id, BackgroundJobItem.status, BackgroundJobItem.result, User.email, User.first_name)
+                    .join(User, User.id == BackgroundJobItem.item_id)
+                    .where(
+                        BackgroundJobItem.job_id == self.job_id,
+                        BackgroundJobItem.status.in_([JobItemStatus.PENDING, JobItemStatus.FAILED, JobItemStatus.STORED]),
+                        BackgroundJobItem.attempts < settings.STATEMENT_MAX_ATTEMPTS,
+                        BackgroundJobItem.item_id > after,
+                    )
+                    .order_by(BackgroundJobItem.item_id)
+                    .limit(settings.STATEMENT_FETCH_BATCH_SIZE)
+                )).all()
+                if not rows:
+                    return
+                after = rows[-1].item_id
+
+                to_render: List[_StatementWork] = []
+                for row in rows:
+                    work = _StatementWork(user_id=row.item_id, email=row.email, first_name=row.first_name)
+                    work.document_url = json.loads(row.result or "{}").get("document_url")
+                    if work.document_url:
+                        # Statement already uploaded and saved; only the email is outstanding
+                        await store_queue.put(work)
+                    else:
+                        to_render.append(work)
+                if not to_render:
+                    continue
+
+                # Cache keys first, so a ledger change during the fetch makes the key miss rather than go stale
+                started = time.perf_counter()
+                user_ids = [work.user_id for work in to_render]
+                try:
+                    content_hashes = await StatementService.statement_cache_keys(db, user_ids, self.start_date, self.end_date)
+                    loaded = await StatementService.load_statement_data_batch(db, user_ids, self.start_date, self.end_date)
+                except Exception as e:
+                    await db.rollback()
+                    for work in to_render:
+                        await self._fail(work.user_id, "fetch", e)
+                    continue
+                finally:
+                    self.stage_seconds["fetch"] += time.perf_counter() - started
+
+            for work in to_render:
+                data = loaded.get(work.user_id)
+                if not data or not data[1]:
+                    # Accounts closed since the item was created
+                    await self._set_item(work.user_id, JobItemStatus.SKIPPED, error="No active accounts")
+                    self.counts["skipped"] += 1
+                    continue
+                work.user_data, work.accounts_data, work.statement_records = data
+                work.content_hash = content_hashes.get(work.user_id)
+                await render_queue.put(work)
+
+    async def _render_stage(self, renderer: PdfRenderService, render_queue: asyncio.Queue, store_queue: asyncio.Queue) -> None:
+        while True:
+            work = await render_queue.get()
+            if work is _STOP:
+                return
+            started = time.perf_counter()
+            try:
+                work.pdf_path = await renderer.render_statement_to_file(
+                    user_data=work.user_data,
+                    accounts_data=work.accounts_data,
+                    start_date=self.start_date,
+                    end_date=self.end_date,
+                )
+            except Exception as e:
+                await self._fail(work.user_id, "render", e)
+                continue
+            finally:
+                self.stage_seconds["render"] += time.perf_counter() - started
+            # The PDF is on disk; drop the data before queueing for upload
+            work.user_data = work.accounts_data = None
+            await store_queue.put(work)
+
+    async def _store_stage(self, store_queue: asyncio.Queue) -> None:
+        while True:
+            work = await store_queue.get()
+            if work is _STOP:
+                return
+            try:
+                if work.document_url is None:
+                    await self._upload_and_save(work)
+                # The email is queued on the job's own sessions, in the same transaction as the checkpoint
+                async with self.session_factory() as db:
+                    if work.email:
+                        started = time.perf_counter()
+                        await send_statement_email(
+                            email=work.email,
+                            first_name=work.first_name,
+                            statement_url=work.document_url,
+                            start_date=self.start_date,
+                            end_date=self.end_date,
+                            db=db
+                        )
+                        self.stage_seconds["email"] += time.perf_counter() - started
+                    await self._set_item(work.user_id, JobItemStatus.COMPLETED, db=db)
+                if work.email:
+                    self.counts["emailed"] += 1
+                self.counts["completed"] += 1
+            except Exception as e:
+                await self._fail(work.user_id, "store", e)
+            finally:
+                if work.pdf_path is not None:
+                    # A storer that died here would leave the final _STOP put blocked forever
+                    with contextlib.suppress(OSError):
+                        os.remove(work.pdf_path)
+                    work.pdf_path = None
+
+    async def _upload_and_save(self, work: _StatementWork) -> None:
+        started = time.perf_counter()
+        # One public id per user and period, so a retried upload overwrites instead of duplicating
+        public_id = f"statement_{work.user_id}_{self.start_date.strftime('%Y%m')}.pdf"
+        work.document_url = await StatementService.upload_statement_pdf(work.pdf_path, public_id)
+        self.stage_seconds["upload"] += time.perf_counter() - started
+
+        # Statement rows and the checkpoint commit together, so a retry never duplicates rows
+        async with self.session_factory() as db:
+            StatementService.add_statement_records(
+                db, work.statement_records, self.start_date, self.end_date, work.document_url, content_hash=work.content_hash
+            )
+            await db.execute(
+                update(BackgroundJobItem)
+                .where(BackgroundJobItem.job_id == self.job_id, BackgroundJobItem.item_id == work.user_id)
+                .values(status=JobItemStatus.STORED, result=json.dumps({"document_url": work.document_url}), error=None, updated_at=datetime.utcnow())
+            )
+            await db.commit()
+
+    async def _set_item(
+        self,
+        user_id: str,
+        status: JobItemStatus,
+        error: Optional[str] = None,
+        count_attempt: bool = False,
+        db: Optional[AsyncSession] = None
+    ) -> None:
+        """Checkpoint one user's item; commits ``db`` if given, otherwise a session of its own"""
+        values: Dict[str, Any] = {"status": status, "error": error, "updated_at": datetime.utcnow()}
+        if count_attempt:
+            values["attempts"] = BackgroundJobItem.attempts + 1
+        statement = (
+            update(BackgroundJobItem)
+            .where(BackgroundJobItem.job_id == self.job_id, BackgroundJobItem.item_id == user_id)
+            .values(**values)
+        )
+        if db is not None:
+            await db.execute(statement)
+            await db.commit()
+            return
+        async with self.session_factory() as db:
+            await db.execute(statement)
+            await db.commit()
+
+    async def _fail(self, user_id: str, stage: str, error: Exception) -> None:
+        self.counts["failed"] += 1
+        message = f"{stage}: {error}"
+        if len(self.errors) < 10:
+            self.errors.append(f"User {user_id}: {message}")
+        logger.error(f"Failed to generate statement for user {user_id} ({stage}): {error}")
+        try:
+            await self._set_item(user_id, JobItemStatus.FAILED, error=message[:1000], count_attempt=True)
+        except Exception as e:
+            logger.error(f"Could not checkpoint statement failure for user {user_id}: {e}")
+
+    def _progress(self) -> Dict[str, Any]:
+        elapsed = time.perf_counter() - self._started
+        return {
+            "period": self.period,
+            "this_run": dict(self.counts),
+            "elapsed_seconds": round(elapsed, 1),
+            "users_per_second": round(self.counts["completed"] / elapsed, 2) if elapsed > 0 else 0.0,
+            "stage_seconds": {stage: round(seconds, 1) for stage, seconds in self.stage_seconds.items()},
+        }
+
+    async def _report_progress(self) -> None:
+        while True:
+            await asyncio.sleep(_PROGRESS_INTERVAL_SECONDS)
+            progress = self._progress()
+            logger.info(
+                f"Statement job {self.job_id}: {progress['this_run']['completed']} completed, "
+                f"{progress['this_run']['failed']} failed, {progress['users_per_second']} users/s"
+            )
+            try:
+                async with self.session_factory() as db:
+                    await db.execute(
+                        update(BackgroundJob).where(BackgroundJob.id == self.job_id).values(
+                            progress=json.dumps(progress), processed_items=self.counts["completed"], updated_at=datetime.utcnow()
+                        )
+                    )
+                    await db.commit()
+            except Exception as e:
+                logger.warning(f"Could not record statement job progress: {e}")
+
+    async def _finish_job(self) -> Dict[str, Any]:
+        unfinished = {status.value for status in (JobItemStatus.PENDING, JobItemStatus.FAILED, JobItemStatus.STORED)}
+        async with self.session_factory() as db:
+            status_counts: Dict[str, int] = {}
+            retryable = exhausted = 0
+            for status, attempts, count in (await db.execute(
+                select(BackgroundJobItem.status, BackgroundJobItem.attempts, func.count())
+                .where(BackgroundJobItem.job_id == self.job_id)
+                .group_by(BackgroundJobItem.status, BackgroundJobItem.attempts)
+            )).all():
+                key = status.value if hasattr(status, "value") else str(status)
+                status_counts[key] = status_counts.get(key, 0) + count
+                if key not in unfinished:
+                    continue
+                # _fetch_stage never picks these up again, so rerunning will not help
+                if attempts >= settings.STATEMENT_MAX_ATTEMPTS:
+                    exhausted += count
+                else:
+                    retryable += count
+            remaining = retryable + exhausted
+            progress = {**self._progress(), "items": status_counts, "exhausted": exhausted}
+            errors = []
+            if retryable:
+                errors.append(f"{retryable} users without a delivered statement; rerun to retry")
+            if exhausted:
+                errors.append(
+                    f"{exhausted} users failed {settings.STATEMENT_MAX_ATTEMPTS} attempts and need manual attention"
+                )
+            job = await db.get(BackgroundJob, self.job_id)
+            job.status = JobStatus.COMPLETED if remaining == 0 else JobStatus.FAILED
+            job.error = "; ".join(errors) or None
+            job.progress = json.dumps(progress)
+            job.processed_items = status_counts.get(JobItemStatus.COMPLETED.value, 0)
+            job.finished_at = datetime.utcnow()
+            await db.commit()
+
+        return {
+            'success': remaining == 0,
+            'job_id': self.job_id,
+            'period': {
+                'start': self.start_date.isoformat(),
+                'end': self.end_date.isoformat()
+            },
+            'total_users': sum(status_counts.values()),
+            'success_count': self.counts["completed"],
+            'error_count': self.counts["failed"],
+            'skipped_count': self.counts["skipped"],
+            'items': status_counts,
+            'exhausted_count': exhausted,
+            'users_per_second': progress["users_per_second"],
+            'stage_seconds': progress["stage_seconds"],
+            'errors': self.errors
+        }
@@ -2,35 +2,360 @@
 Statement Generation Service
 Handles generation, storage, and delivery of account statements
 """
-import io
+import hashlib
+import json
 import uuid
-from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
+from datetime import datetime, time, timedelta
+from typing import List, Dict, Any, Optional, Tuple, Union
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_
-import cloudinary
-import cloudinary.uploader
+from sqlalchemy import select, and_, or_, func, update
+from sqlalchemy.dialects.postgresql import aggregate_order_by, array_agg
 from config import settings
 from models.user import User
 from models.account import Account, Statement
 from models.transaction import Transaction
-from utils.pdf_generator import generate_statement_pdf
+from services.balance_snapshot_service import BalanceSnapshotService
+from services.pdf_render_service import pdf_renderer
 from utils.email import send_statement_email
 from utils.logger import logger
+from utils.storage import get_storage
 
+# (user_data, accounts_data, statement_records) as consumed by generate_statement_pdf
+StatementData = Tuple[Dict[str, Any], List[Dict[str, Any]], List[Dict[str, Any]]]
 
-# Configure Cloudinary
-cloudinary.config(
-    cloud_name=settings.CLOUDINARY_CLOUD_NAME,
-    api_key=settings.CLOUDINARY_API_KEY,
-    api_secret=settings.CLOUDINARY_API_SECRET,
-    secure=True
-)
+# Part of every statement cache key; bump when the PDF layout or contents change
+STATEMENT_CACHE_VERSION = 1
 
 
 class StatementService:
     """Service for generating and managing account statements"""
-    
+
+    @staticmethod
+    def _in_period(start_date: datetime, end_date: datetime):
+        """Completed transactions a statement for [start_date, end_date] lists"""
+        return and_(
+            Transaction.created_at >= start_date,
+            Transaction.created_at <= end_date,
+            Transaction.status == 'completed'
+        )
+
+    @staticmethod
+    async def statement_cache_keys(
+        db: AsyncSession,
+        user_ids: List[str],
+        start_date: datetime,
+        end_date: datetime
+    ) -> Dict[str, str]:
+        """
+        Content hash of everything a statement PDF is built from
+
+        One aggregate query: the user, their active accounts, the period, a
+        per-account checksum of the period's ledger (count, sums, last
+        update) and the balance the statement's opening/closing figures
+        derive from. Equal keys mean an identical statement.
+
+        Returns:
+            user_id -> hex key; users without active accounts are left out
+        """
+        if not user_ids:
+            return {}
+
+        ledger = (
+            select(
+                Transaction.account_id.label('account_id'),
+                func.count().label('tx_count'),
+                func.sum(Transaction.amount).label('amount_sum'),
+                func.sum(Transaction.balance_after).label('balance_sum'),
+                func.max(Transaction.updated_at).label('last_updated'),
+            )
+            .join(Account, Account.id == Transaction.account_id)
+            .where(Account.user_id.in_(user_ids), Account.status == 'active', StatementService._in_period(start_date, end_date))
+            .group_by(Transaction.account_id)
+            .subquery()
+        )
+        rows = (await db.execute(
+            select(
+                User.id.label('user_id'),
+                User.first_name,
+                User.last_name,
+                User.email,
+                Account.id.label('account_id'),
+                Account.account_type,
+                Account.account_number,
+                Account.currency,
+                Account.balance,
+                ledger.c.tx_count,
+                ledger.c.amount_sum,
+                ledger.c.balance_sum,
+                ledger.c.last_updated,
+            )
+            .join(Account, and_(Account.user_id == User.id, Account.status == 'active'))
+            .outerjoin(ledger, ledger.c.account_id == Account.id)
+            .where(User.id.in_(user_ids))
+            .order_by(User.id, Account.created_at, Account.id)
+        )).all()
+
+        # Same balance basis as load_statement_data_batch: snapshots on
+        # midnight-aligned periods, otherwise the account's current balance
+        opening_balances = {}
+        if rows and start_date.time() == time.min:
+            opening_balances = await BalanceSnapshotService.balances_as_of(
+                db, [row.account_id for row in rows], start_date.date() - timedelta(days=1)
+            )
+
+        parts: Dict[str, List[Any]] = {}
+        for row in rows:
+            user_parts = parts.setdefault(row.user_id, [
+                STATEMENT_CACHE_VERSION, row.user_id, row.first_name, row.last_name, row.email,
+                start_date.isoformat(), end_date.isoformat(),
+            ])
+            balance_basis = (
+                ['snapshot', opening_balances[row.account_id]] if row.account_id in opening_balances
+                else ['current', row.balance]
+            )
+            user_parts.append([
+                row.account_id, str(row.account_type), row.account_number, row.currency, balance_basis,
+                row.tx_count or 0, row.amount_sum, row.balance_sum, row.last_updated,
+            ])
+        return {
+            user_id: hashlib.sha256(json.dumps(user_parts, default=str).encode()).hexdigest()
+            for user_id, user_parts in parts.items()
+        }
+
+    @staticmethod
+    async def find_cached_statement(db: AsyncSession, user_id: str, content_hash: str) -> Optional[Tuple[str, int]]:
+        """(document_url, accounts_count) of a stored statement with this content hash"""
+        row = (await db.execute(
+            select(Statement.document_url, func.count().label('accounts_count'))
+            .join(Account, Account.id == Statement.account_id)
+            .where(Account.user_id == user_id, Statement.content_hash == content_hash, Statement.document_url.isnot(None))
+            .group_by(Statement.document_url)
+            .limit(1)
+        )).first()
+        return (row.document_url, row.accounts_count) if row else None
+
+    @staticmethod
+    async def invalidate_cached_statements(db: AsyncSession, user_id: str, *moments: datetime) -> None:
+        """
+        Stop serving cached statements whose period covers any of ``moments``
+
+        Called when a transaction is edited or deleted; the caller commits.
+        """
+        moments = [moment for moment in moments if moment is not None]
+        if not moments:
+            return
+        await db.execute(
+            update(Statement)
+            .where(
+                Statement.account_id.in_(select(Account.id).where(Account.user_id == user_id)),
+                Statement.content_hash.isnot(None),
+                or_(*(and_(Statement.start_date <= moment, Statement.end_date >= moment) for moment in moments)),
+            )
+            .values(content_hash=None)
+            .execution_options(synchronize_session=False)
+        )
+
+    @staticmethod
+    async def load_statement_data_batch(
+        db: AsyncSession,
+        user_ids: List[str],
+        start_date: datetime,
+        end_date: datetime
+    ) -> Dict[str, StatementData]:
+        """
+        Fetch statement data for a batch of users in a fixed number of queries
+
+        The first query returns every user with their active accounts and the
+        period's credit/debit totals, aggregated per account in SQL. Opening
+        balances come from the daily balance snapshots, and a last query returns
+        the period's transactions for all of those accounts ordered by
+        (account_id, created_at).
+
+        Returns:
+            user_id -> (user_data, accounts_data, statement_records). Users with
+            no active accounts map to empty lists; unknown ids are left out.
+        """
+        if not user_ids:
+            return {}
+
+        in_period = StatementService._in_period(start_date, end_date)
+        period_totals = (
+            select(
+                Transaction.account_id.label('account_id'),
+                array_agg(aggregate_order_by(Transaction.balance_before, Transaction.created_at.asc()))[1].label('opening_balance'),
+                func.coalesce(func.sum(Transaction.amount).filter(Transaction.amount > 0), 0.0).label('total_credits'),
+                func.coalesce(func.sum(-Transaction.amount).filter(Transaction.amount < 0), 0.0).label('total_debits'),
+            )
+            .join(Account, Account.id == Transaction.account_id)
+            .where(Account.user_id.in_(user_ids), Account.status == 'active', in_period)
+            .group_by(Transaction.account_id)
+            .subquery()
+        )
+        rows = (await db.execute(
+            select(
+                User.id.label('user_id'),
+                User.first_name,
+                User.last_name,
+                User.email,
+                Account.id.label('account_id'),
+                Account.account_type,
+                Account.account_number,
+                Account.currency,
+                Account.balance,
+                period_totals.c.opening_balance,
+                period_totals.c.total_credits,
+                period_totals.c.total_debits,
+            )
+            .select_from(User)
+            .outerjoin(Account, and_(Account.user_id == User.id, Account.status == 'active'))
+            .outerjoin(period_totals, period_totals.c.account_id == Account.id)
+            .where(User.id.in_(user_ids))
+            .order_by(User.id, Account.created_at, Account.id)
+        )).all()
+
+        loaded: Dict[str, StatementData] = {}
+        accounts_by_id: Dict[str, Dict[str, Any]] = {}
+        for row in rows:
+            if row.user_id not in loaded:
+                user_data = {
+                    'first_name': row.first_name,
+                    'last_name': row.last_name,
+                    'email': row.email,
+                    'user_id': row.user_id
+                }
+                loaded[row.user_id] = (user_data, [], [])
+            if row.account_id is None:
+                continue
+
+            # Without snapshots: balance before the period's first transaction, current balance
+            opening_balance = row.opening_balance if row.opening_balance is not None else row.balance
+            account_data = {
+                'id': row.account_id,
+                'type': row.account_type.value if hasattr(row.account_type, 'value') else str(row.account_type),
+                'account_number': row.account_number,
+                'currency': row.currency,
+                'opening_balance': opening_balance,
+                'closing_balance': row.balance,
+                'total_credits': row.total_credits or 0.0,
+                'total_debits': row.total_debits or 0.0,
+                'transactions': []
+            }
+            _, accounts_data, statement_records = loaded[row.user_id]
+            accounts_data.append(account_data)
+            accounts_by_id[row.account_id] = account_data
+
+            # Create statement record for this account
+            statement_records.append({
+                'id': str(uuid.uuid4()),
+                'account_id': row.account_id,
+                'opening_balance': opening_balance,
+                'closing_balance': row.balance,
+                'total_credits': account_data['total_credits'],
+                'total_debits': account_data['total_debits']
+            })
+
+        # With daily snapshots the opening balance is the previous day's closing
+        # balance and the closing balance follows from the period's activity
+        if accounts_by_id and start_date.time() == time.min:
+            opening_balances = await BalanceSnapshotService.balances_as_of(
+                db, list(accounts_by_id), start_date.date() - timedelta(days=1)
+            )
+            for _, _, statement_records in loaded.values():
+                for record in statement_records:
+                    opening_balance = opening_balances.get(record['account_id'])
+                    if opening_balance is None:
+                        continue
+                    account_data = accounts_by_id[record['account_id']]
+                    closing_balance = round(opening_balance + account_data['total_credits'] - account_data['total_debits'], 2)
+                    record['opening_balance'] = account_data['opening_balance'] = opening_balance
+                    record['closing_balance'] = account_data['closing_balance'] = closing_balance
+
+        if accounts_by_id:
+            trans_result = await db.execute(
+                select(
+                    Transaction.account_id,
+                    Transaction.created_at,
+                    Transaction.description,
+                    Transaction.reference_number,
+                    Transaction.amount,
+                    Transaction.balance_after,
+                    Transaction.type,
+                )
+                .where(Transaction.account_id.in_(list(accounts_by_id)), in_period)
+                .order_by(Transaction.account_id, Transaction.created_at.asc())
+            )
+            for t in trans_result:
+                accounts_by_id[t.account_id]['transactions'].append({
+                    'date': t.created_at,
+                    'description': t.description,
+                    'reference_number': t.reference_number,
+                    'amount': t.amount,
+                    'balance_after': t.balance_after,
+                    'type': t.type.value if hasattr(t.type, 'value') else str(t.type)
+                })
+
+        return loaded
+
+    @staticmethod
+    async def load_statement_data(
+        db: AsyncSession,
+        user_id: str,
+        start_date: datetime,
+        end_date: datetime
+    ) -> StatementData:
+        """
+        Fetch everything a statement needs for one user
+
+        Returns:
+            (user_data, accounts_data, statement_records); raises ValueError when
+            the user or their active accounts are missing
+        """
+        loaded = await StatementService.load_statement_data_batch(db, [user_id], start_date, end_date)
+        if user_id not in loaded:
+            raise ValueError(f"User {user_id} not found")
+        if not loaded[user_id][1]:
+            raise ValueError(f"No active accounts found for user {user_id}")
+        return loaded[user_id]
+
+    @staticmethod
+    async def upload_statement_pdf(pdf: Union[bytes, str], public_id: str) -> str:
+        """Upload a rendered statement (PDF bytes or a file path) to the storage backend and return its URL"""
+        upload_result = await get_storage().upload(
+            pdf,
+            folder="statements",
+            public_id=public_id,
+            resource_type="raw",
+            overwrite=True,
+            invalidate=True
+        )
+        return upload_result['url']
+
+    @staticmethod
+    def add_statement_records(
+        db: AsyncSession,
+        statement_records: List[Dict[str, Any]],
+        start_date: datetime,
+        end_date: datetime,
+        document_url: str,
+        content_hash: Optional[str] = None
+    ) -> None:
+        """Stage Statement rows on the session; the caller commits"""
+        for stmt_data in statement_records:
+            statement = Statement(
+                id=stmt_data['id'],
+                account_id=stmt_data['account_id'],
+                statement_date=datetime.utcnow(),
+                start_date=start_date,
+                end_date=end_date,
+                document_url=document_url,
+                opening_balance=stmt_data['opening_balance'],
+                closing_balance=stmt_data['closing_balance'],
+                total_credits=stmt_data['total_credits'],
+                total_debits=stmt_data['total_debits'],
+                content_hash=content_hash
+            )
+            db.add(statement)
+
     @staticmethod
     async def generate_user_statement(
         db: AsyncSession,
@@ -42,6 +367,9 @@ class StatementService:
         """
         Generate a comprehensive statement for all user accounts
         
+        When a statement with the same content hash was stored before, its
+        document is returned instead of rendering and uploading a new one.
+        
         Args:
             db: Database session
             user_id: User ID
@@ -53,150 +381,50 @@ class StatementService:
             Dict with statement URLs and metadata
         """
         try:
-            # Get user data
-            user_result = await db.execute(select(User).where(User.id == user_id))
-            user = user_result.scalar_one_or_none()
+            # Unchanged inputs: reuse the document already stored for them
+            content_hash = (await StatementService.statement_cache_keys(db, [user_id], start_date, end_date)).get(user_id)
+            cached = await StatementService.find_cached_statement(db, user_id, content_hash) if content_hash else None
             
-            if not user:
-                raise ValueError(f"User {user_id} not found")
-            
-            # Get all user accounts
-            accounts_result = await db.execute(
-                select(Account).where(
-                    and_(
-                        Account.user_id == user_id,
-                        Account.status == 'active'
-                    )
+            if cached is not None:
+                document_url, accounts_count = cached
+                user = (await db.execute(select(User.email, User.first_name).where(User.id == user_id))).one()
+                user_data = {'email': user.email, 'first_name': user.first_name}
+                logger.info(f"Statement cache hit for user {user_id} ({start_date.date()} - {end_date.date()})")
+            else:
+                user_data, accounts_data, statement_records = await StatementService.load_statement_data(
+                    db, user_id, start_date, end_date
                 )
-            )
-            accounts = accounts_result.scalars().all()
-            
-            if not accounts:
-                raise ValueError(f"No active accounts found for user {user_id}")
-            
-            # Prepare user data for PDF
-            user_data = {
-                'first_name': user.first_name,
-                'last_name': user.last_name,
-                'email': user.email,
-                'user_id': user.id
-            }
-            
-            # Prepare accounts data with transactions
-            accounts_data = []
-            statement_records = []
-            
-            for account in accounts:
-                # Get transactions for this account in the period
-                trans_result = await db.execute(
-                    select(Transaction).where(
-                        and_(
-                            Transaction.account_id == account.id,
-                            Transaction.created_at >= start_date,
-                            Transaction.created_at <= end_date,
-                            Transaction.status == 'completed'
-                        )
-                    ).order_by(Transaction.created_at.asc())
-                )
-                transactions = trans_result.scalars().all()
-                
-                # Calculate opening balance (balance before first transaction)
-                opening_balance = account.balance
-                if transactions:
-                    opening_balance = transactions[0].balance_before
                 
-                # Calculate totals
-                total_credits = sum(t.amount for t in transactions if t.amount > 0)
-                total_debits = sum(abs(t.amount) for t in transactions if t.amount < 0)
-                closing_balance = account.balance
-                
-                # Prepare account data
-                account_data = {
-                    'id': account.id,
-                    'type': account.account_type.value if hasattr(account.account_type, 'value') else str(account.account_type),
-                    'account_number': account.account_number,
-                    'currency': account.currency,
-                    'opening_balance': opening_balance,
-                    'closing_balance': closing_balance,
-                    'total_credits': total_credits,
-                    'total_debits': total_debits,
-                    'transactions': [
-                        {
-                            'date': t.created_at,
-                            'description': t.description,
-                            'reference_number': t.reference_number,
-                            'amount': t.amount,
-                            'balance_after': t.balance_after,
-                            'type': t.type.value if hasattr(t.type, 'value') else str(t.type)
-                        }
-                        for t in transactions
-                    ]
-                }
+                # Render in the PDF process pool; reportlab never runs on the event loop
+                pdf_bytes = await pdf_renderer.render_statement(
+                    user_data=user_data,
+                    accounts_data=accounts_data,
+                    start_date=start_date,
+                    end_date=end_date
+                )
                 
-                accounts_data.append(account_data)
+                # Upload to storage; named by content hash so identical inputs overwrite instead of piling up
+                statement_filename = f"statement_{user_id}_{start_date.strftime('%Y%m')}_{(content_hash or uuid.uuid4().hex)[:16]}.pdf"
+                document_url = await StatementService.upload_statement_pdf(pdf_bytes, statement_filename)
                 
-                # Create statement record for this account
-                statement_id = str(uuid.uuid4())
-                statement_records.append({
-                    'id': statement_id,
-                    'account_id': account.id,
-                    'opening_balance': opening_balance,
-                    'closing_balance': closing_balance,
-                    'total_credits': total_credits,
-                    'total_debits': total_debits
-                })
-            
-            # Generate PDF
-            pdf_bytes = generate_statement_pdf(
-                user_data=user_data,
-                accounts_data=accounts_data,
-                start_date=start_date,
-                end_date=end_date
-            )
-            
-            # Upload to Cloudinary
-            statement_filename = f"statement_{user_id}_{start_date.strftime('%Y%m')}_{uuid.uuid4().hex[:8]}.pdf"
-            
-            upload_result = cloudinary.uploader.upload(
-                io.BytesIO(pdf_bytes),
-                resource_type="raw",
-                folder="statements",
-                public_id=statement_filename,
-                overwrite=True,
-                invalidate=True
-            )
-            
-            document_url = upload_result.get('secure_url')
-            
-            # Save statement records to database
-            for stmt_data in statement_records:
-                statement = Statement(
-                    id=stmt_data['id'],
-                    account_id=stmt_data['account_id'],
-                    statement_date=datetime.utcnow(),
-                    start_date=start_date,
-                    end_date=end_date,
-                    document_url=document_url,
-                    opening_balance=stmt_data['opening_balance'],
-                    closing_balance=stmt_data['closing_balance'],
-                    total_credits=stmt_data['total_credits'],
-                    total_debits=stmt_data['total_debits']
+                # Save statement records to database
+                StatementService.add_statement_records(
+                    db, statement_records, start_date, end_date, document_url, content_hash=content_hash
                 )
-                db.add(statement)
-            
-            await db.commit()
+                await db.commit()
+                accounts_count = len(accounts_data)
             
             # Send email if requested
-            if send_email and user.email:
+            if send_email and user_data['email']:
                 try:
                     await send_statement_email(
-                        email=user.email,
-                        first_name=user.first_name,
+                        email=user_data['email'],
+                        first_name=user_data['first_name'],
                         statement_url=document_url,
                         start_date=start_date,
                         end_date=end_date
                     )
-                    logger.info(f"Statement email sent to {user.email}")
+                    logger.info(f"Statement email sent to {user_data['email']}")
                 except Exception as e:
                     logger.error(f"Failed to send statement email: {e}")
             
@@ -208,8 +436,9 @@ class StatementService:
                     'start': start_date.isoformat(),
                     'end': end_date.isoformat()
                 },
-                'accounts_count': len(accounts_data),
-                'email_sent': send_email
+                'accounts_count': accounts_count,
+                'email_sent': send_email,
+                'cached': cached is not None
             }
             
         except Exception as e:
@@ -217,80 +446,10 @@ class StatementService:
             raise
     
     @staticmethod
-    async def generate_monthly_statements(db: AsyncSession) -> Dict[str, Any]:
-        """
-        Generate monthly statements for all active users
-        Called by scheduled job at end of month
-        
-        Returns:
-            Dict with generation statistics
-        """
-        try:
-            # Calculate previous month date range
-            today = datetime.utcnow()
-            first_day_this_month = today.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-            last_day_last_month = first_day_this_month - timedelta(days=1)
-            first_day_last_month = last_day_last_month.replace(day=1)
-            
-            start_date = first_day_last_month
-            end_date = last_day_last_month.replace(hour=23, minute=59, second=59)
-            
-            # Get all active users with accounts
-            users_result = await db.execute(
-                select(User).where(User.is_active == True)
-            )
-            users = users_result.scalars().all()
-            
-            success_count = 0
-            error_count = 0
-            errors = []
-            
-            for user in users:
-                try:
-                    # Check if user has any accounts
-                    accounts_result = await db.execute(
-                        select(Account).where(
-                            and_(
-                                Account.user_id == user.id,
-                                Account.status == 'active'
-                            )
-                        )
-                    )
-                    accounts = accounts_result.scalars().all()
-                    
-                    if not accounts:
-                        continue
-                    
-                    # Generate statement with email
-                    await StatementService.generate_user_statement(
-                        db=db,
-                        user_id=user.id,
-                        start_date=start_date,
-                        end_date=end_date,
-                        send_email=True
-                    )
-                    
-                    success_count += 1
-                    logger.info(f"Generated monthly statement for user {user.id}")
-                    
-                except Exception as e:
-                    error_count += 1
-                    error_msg = f"User {user.id}: {str(e)}"
-                    errors.append(error_msg)
-                    logger.error(f"Failed to generate statement for user {user.id}: {e}")
-            
-            return {
-                'success': True,
-                'period': {
-                    'start': start_date.isoformat(),
-                    'end': end_date.isoformat()
-                },
-                'total_users': len(users),
-                'success_count': success_count,
-                'error_count': error_count,
-                'errors': errors[:10]  # Limit error list
-            }
-            
-        except Exception as e:
-            logger.error(f"Failed to generate monthly statements: {e}")
-            raise
+    def previous_month_period(today: Optional[datetime] = None) -> Tuple[datetime, datetime]:
+        """Start and end of the month before ``today``"""
+        today = today or datetime.utcnow()
+        first_day_this_month = today.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        last_day_last_month = first_day_this_month - timedelta(days=1)
+        first_day_last_month = last_day_last_month.replace(day=1)
+        return first_day_last_month, last_day_last_month.replace(hour=23, minute=59, second=59)
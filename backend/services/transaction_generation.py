@@ -0,0 +1,258 @@
+"""
+Transaction Generation Service
+Writes admin-generated transaction history through a chunked Core INSERT
+instead of one ORM object per row. Requests above the synchronous limit are
+handed to a background job that reports progress on BackgroundJob.
+"""
+import asyncio
+import json
+import time
+import uuid
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Dict, List
+from sqlalchemy import select, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from config import settings
+from database import AsyncSessionLocal
+from models.job import BackgroundJob, JobStatus, JobType
+from models.admin import AdminAuditLog
+from models.account import Account, AccountType
+from models.transaction import Transaction, TransactionType, TransactionStatus
+from services.job_lease import JobLease
+from services.transaction_generator import TransactionGenerator
+from utils.background import spawn_background_task
+from utils.logger import logger
+
+# asyncpg rejects statements with more than 32767 bind parameters
+_MAX_BIND_PARAMS = 32767
+
+
+class TransactionGenerationService:
+    """Bulk persistence of generated transactions"""
+
+    @staticmethod
+    def _to_row(txn: Dict[str, Any], user_id: str, now: datetime) -> Dict[str, Any]:
+        created_at = txn["created_at"].replace(tzinfo=None)
+        posted_date = txn["posted_date"].replace(tzinfo=None)
+        return {
+            "id": str(uuid.uuid4()),
+            "account_id": txn["account_id"],
+            "user_id": user_id,
+            "type": TransactionType(txn["type"]),
+            "status": TransactionStatus(txn["status"]),
+            "amount": float(txn["amount"]),
+            "currency": txn["currency"],
+            "balance_before": float(txn["balance_before"]),
+            "balance_after": float(txn["balance_after"]),
+            "description": txn["description"],
+            "reference_number": txn["reference_number"],
+            "transfer_id": None,  # No transfer link for generated transactions
+            "payment_id": None,
+            "created_at": created_at,
+            "posted_date": posted_date,
+            "updated_at": now,
+        }
+
+    @staticmethod
+    async def bulk_insert(
+        db: AsyncSession,
+        user_id: str,
+        transactions_data: List[Dict[str, Any]],
+        on_chunk=None,
+    ) -> Dict[str, Any]:
+        """Insert generated rows in multi-row INSERT chunks (caller commits).
+
+        Returns the inserted count together with elapsed time and throughput.
+        """
+        # Every column is bound per row, so cap the chunk by the table width
+        max_rows = _MAX_BIND_PARAMS // len(Transaction.__table__.columns)
+        chunk_size = max(1, min(settings.TRANSACTION_INSERT_CHUNK_SIZE, max_rows))
+        now = datetime.utcnow()
+        started = time.perf_counter()
+        inserted = 0
+        for offset in range(0, len(transactions_data), chunk_size):
+            chunk = [
+                TransactionGenerationService._to_row(txn, user_id, now)
+                for txn in transactions_data[offset:offset + chunk_size]
+            ]
+            await db.execute(insert(Transaction.__table__).values(chunk))
+            inserted += len(chunk)
+            if on_chunk:
+                await on_chunk(inserted)
+        elapsed = time.perf_counter() - started
+        return {
+            "inserted": inserted,
+            "duration_ms": round(elapsed * 1000, 2),
+            "rows_per_second": round(inserted / elapsed, 1) if elapsed > 0 else None,
+        }
+
+    @staticmethod
+    async def apply_closing_balance(db: AsyncSession, user_id: str, closing_balance: Decimal) -> None:
+        """Spread the closing balance over checking/savings accounts (crypto untouched).
+
+        Savings always ends up larger than checking when the user has both.
+        """
+        all_accounts_result = await db.execute(select(Account).where(Account.user_id == user_id))
+        all_accounts = all_accounts_result.scalars().all()
+        checking_accounts = [acc for acc in all_accounts if acc.account_type == AccountType.CHECKING]
+        savings_accounts = [acc for acc in all_accounts if acc.account_type == AccountType.SAVINGS]
+
+        if checking_accounts and savings_accounts:
+            # Split balance: 60% to savings, 40% to checking
+            targets = [(checking_accounts, closing_balance * Decimal('0.4')),
+                       (savings_accounts, closing_balance * Decimal('0.6'))]
+        elif checking_accounts:
+            targets = [(checking_accounts, closing_balance)]
+        elif savings_accounts:
+            targets = [(savings_accounts, closing_balance)]
+        else:
+            targets = []
+
+        for accounts, balance in targets:
+            for acc in accounts:
+                acc.balance = float(balance)
+                acc.available_balance = float(balance)
+                acc.updated_at = datetime.utcnow()
+                db.add(acc)
+
+    @staticmethod
+    def audit_log(admin_id: str, admin_email: str, user_id: str, params: Dict[str, Any], created: int) -> AdminAuditLog:
+        return AdminAuditLog(
+            id=str(uuid.uuid4()),
+            admin_id=admin_id,
+            admin_email=admin_email,
+            action="generate_transactions",
+            resource_type="transaction",
+            resource_id=params["account_id"],
+            details=json.dumps({
+                "user_id": user_id,
+                "account_id": params["account_id"],
+                "transaction_count": created,
+                "start_date": params["start_date"],
+                "end_date": params["end_date"],
+                "starting_balance": params["starting_balance"],
+                "closing_balance": params["closing_balance"],
+            }),
+        )
+
+    @staticmethod
+    def create_job(db: AsyncSession, user_id: str, admin_id: str, admin_email: str, params: Dict[str, Any]) -> BackgroundJob:
+        """Persist a pending generation job; caller commits and then calls start()"""
+        job = BackgroundJob(
+            id=str(uuid.uuid4()),
+            job_type=JobType.TRANSACTION_GENERATION,
+            status=JobStatus.PENDING,
+            resource_type="account",
+            resource_id=params["account_id"],
+            requested_by=admin_id,
+            params=json.dumps({**params, "user_id": user_id, "admin_email": admin_email}),
+            progress=json.dumps({"current_step": None, "total_items": params["transaction_count"]}),
+        )
+        db.add(job)
+        return job
+
+    @staticmethod
+    def is_running(job: BackgroundJob) -> bool:
+        """Whether a runner in any process holds the job's lease"""
+        return JobLease.is_held(job)
+
+    @staticmethod
+    def start(job_id: str) -> None:
+        """Run (or restart) a job in the background"""
+        spawn_background_task(TransactionGenerationService.run(job_id), name=f"transaction_generation:{job_id}")
+
+    @staticmethod
+    async def _update_progress(job_id: str, **fields) -> None:
+        # Progress is written on its own session so it is visible while the
+        # insert transaction is still open.
+        async with AsyncSessionLocal() as progress_db:
+            job = await progress_db.get(BackgroundJob, job_id)
+            if not job:
+                return
+            progress = json.loads(job.progress or "{}")
+            if "processed_items" in fields:
+                job.processed_items = fields.pop("processed_items")
+            progress.update(fields)
+            job.progress = json.dumps(progress)
+            await progress_db.commit()
+
+    @staticmethod
+    async def run(job_id: str) -> None:
+        """Generate and insert all rows in a single transaction, reporting progress per chunk.
+
+        Nothing is kept from an interrupted or failed run (its transaction
+        rolled back), so a restart generates the whole request again.
+        """
+        lease = JobLease(AsyncSessionLocal, job_id)
+        if not await lease.acquire():
+            logger.info(f"Transaction generation job {job_id} is already running elsewhere")
+            return
+        try:
+            await TransactionGenerationService._run(job_id)
+        finally:
+            await lease.release()
+
+    @staticmethod
+    async def _run(job_id: str) -> None:
+        async with AsyncSessionLocal() as db:
+            job = await db.get(BackgroundJob, job_id)
+            # A RUNNING job reaching here lost its runner: the lease was free
+            if not job or job.status == JobStatus.COMPLETED:
+                return
+            params = json.loads(job.params or "{}")
+            job.status = JobStatus.RUNNING
+            job.error = None
+            job.processed_items = 0
+            job.started_at = datetime.utcnow()
+            await db.commit()
+
+            try:
+                user_id = params["user_id"]
+                await TransactionGenerationService._update_progress(job_id, current_step="generating")
+                generator = TransactionGenerator(user_name=params.get("user_name", "User"), seed=params.get("seed"))
+                # Generation is array work but still CPU-bound; keep it off the event loop
+                transactions_data = await asyncio.to_thread(
+                    generator.generate_transactions,
+                    start_date=datetime.fromisoformat(params["start_date"]),
+                    end_date=datetime.fromisoformat(params["end_date"]),
+                    starting_balance=Decimal(str(params["starting_balance"])),
+                    closing_balance=Decimal(str(params["closing_balance"])),
+                    transaction_count=params["transaction_count"],
+                    account_id=params["account_id"],
+                    currency=params.get("currency", "USD"),
+                    user_name=params.get("user_name", "User"),
+                )
+
+                await TransactionGenerationService._update_progress(job_id, current_step="inserting")
+
+                async def _on_chunk(inserted: int) -> None:
+                    await TransactionGenerationService._update_progress(job_id, processed_items=inserted)
+
+                stats = await TransactionGenerationService.bulk_insert(db, user_id, transactions_data, on_chunk=_on_chunk)
+                await TransactionGenerationService.apply_closing_balance(
+                    db, user_id, Decimal(str(params["closing_balance"]))
+                )
+                db.add(TransactionGenerationService.audit_log(
+                    job.requested_by, params.get("admin_email", ""), user_id, params, stats["inserted"]
+                ))
+                await db.refresh(job)
+                progress = json.loads(job.progress or "{}")
+                progress.update({"current_step": None, **stats})
+                job.progress = json.dumps(progress)
+                job.processed_items = stats["inserted"]
+                job.status = JobStatus.COMPLETED
+                job.finished_at = datetime.utcnow()
+                await db.commit()
+                logger.info(
+                    f"Transaction generation job {job_id}: {stats['inserted']} rows "
+                    f"in {stats['duration_ms']}ms ({stats['rows_per_second']} rows/s)"
+                )
+            except Exception as e:
+                await db.rollback()
+                job = await db.get(BackgroundJob, job_id)
+                job.status = JobStatus.FAILED
+                job.error = str(e)[:1000]
+                job.finished_at = datetime.utcnow()
+                await db.commit()
+                logger.error(f"Transaction generation job {job_id} failed", error=e)
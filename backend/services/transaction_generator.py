@@ -1,7 +1,9 @@
-import random
-from datetime import datetime, timedelta
-from typing import List, Dict, Tuple
+import secrets
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Dict, Tuple, Optional
 from decimal import Decimal
+import numpy as np
 from data.names_database import (
     AMERICAN_MALE_FIRST_NAMES,
     AMERICAN_FEMALE_FIRST_NAMES,
@@ -9,8 +11,6 @@ from data.names_database import (
     LOW_AMOUNT_MERCHANTS,
     MEDIUM_AMOUNT_MERCHANTS,
     HIGH_AMOUNT_MERCHANTS,
-    P2P_DESCRIPTIONS,
-    LOW_INCOME_DESCRIPTIONS,
     HIGH_INCOME_DESCRIPTIONS
 )
 
@@ -24,7 +24,7 @@ BILLS_PAYMENTS = [
 
 # Loan payments for debits
 LOAN_PAYMENTS = [
-    "Auto Loan Payment", "Mortgage Payment", "Personal Loan Payment", 
+    "Auto Loan Payment", "Mortgage Payment", "Personal Loan Payment",
     "Business Loan Payment", "Student Loan Payment", "Home Equity Loan Payment"
 ]
 
@@ -35,148 +35,145 @@ CHECK_DEPOSITS = [
     "Rebate Check", "Gift Check Deposit", "Inheritance Check"
 ]
 
+# Person-to-person description prefixes (the person's name is appended)
+CREDIT_P2P_PREFIXES = ["Transfer from ", "Payment from ", "Zelle from ", "Wire transfer from "]
+DEBIT_P2P_PREFIXES = ["Transfer to ", "Payment to ", "Zelle to ", "Wire transfer to ", "Check payment to "]
+
+# Row kinds used while building descriptions
+KIND_CREDIT_P2P, KIND_INCOME, KIND_CHECK = 0, 1, 2
+KIND_EQUIPMENT, KIND_BILL, KIND_LOAN, KIND_PURCHASE, KIND_DEBIT_P2P = 3, 4, 5, 6, 7
+
+
+@dataclass
+class GeneratedTransactions:
+    """Columnar result of one generation run (amounts in integer cents)"""
+    timestamps: np.ndarray  # datetime64[us], naive
+    is_credit: np.ndarray  # bool
+    amount_cents: np.ndarray  # int64, always positive
+    balance_after_cents: np.ndarray  # int64
+    descriptions: np.ndarray  # object (str)
+
+    def __len__(self) -> int:
+        return len(self.amount_cents)
+
+    @property
+    def balance_before_cents(self) -> np.ndarray:
+        signed = np.where(self.is_credit, self.amount_cents, -self.amount_cents)
+        return self.balance_after_cents - signed
+
+
+def _to_cents(value: Decimal) -> int:
+    return int((Decimal(value) * 100).quantize(Decimal("1")))
+
+
+def _cents_to_decimal(cents: int) -> Decimal:
+    return Decimal(int(cents)).scaleb(-2)
+
 
 class TransactionGenerator:
-    """Generate realistic transaction history with high amounts"""
-    
+    """Generate realistic transaction history with high amounts.
+
+    All random draws are made as NumPy arrays from a single seeded generator,
+    so the same seed and parameters always produce the same history (preview
+    and generate agree) and large counts cost a handful of array operations.
+    """
+
     # Fast food merchants for limiting
     FAST_FOOD_MERCHANTS = [
-        "McDonald's", "Starbucks", "Subway", "Taco Bell", "Wendy's", 
+        "McDonald's", "Starbucks", "Subway", "Taco Bell", "Wendy's",
         "Burger King", "Dunkin'", "Chipotle Mexican Grill"
     ]
-    
-    def __init__(self, user_name: str = "User"):
+
+    # Upper bound for a single generation run (the API enforces its own lower cap)
+    MAX_TRANSACTION_COUNT = 1000000
+
+    # Largest single amount in dollars, before scaling for very large balance changes
+    MAX_AMOUNT = 50000.0
+
+    # Smallest share of either credits or debits
+    MIN_CREDIT_RATIO = 0.1
+
+    def __init__(self, user_name: str = "User", seed: Optional[int] = None):
         self.user_name = user_name  # Store user's name for internal transfers
-        self.used_names = set()  # Track used names to ensure uniqueness
-        self.fast_food_count = 0  # Track fast food transactions
+        self.seed = seed if seed is not None else secrets.randbits(31)
         self.max_fast_food = 3  # Maximum fast food transactions per generation
-    
-    def get_unique_person_name(self) -> str:
-        """Generate a unique person name (no duplicates)"""
-        max_attempts = 1000
-        for _ in range(max_attempts):
-            # Randomly choose male or female first name
-            if random.choice([True, False]):
-                first_name = random.choice(AMERICAN_MALE_FIRST_NAMES)
-            else:
-                first_name = random.choice(AMERICAN_FEMALE_FIRST_NAMES)
-            
-            last_name = random.choice(AMERICAN_LAST_NAMES)
-            full_name = f"{first_name} {last_name}"
-            
-            if full_name not in self.used_names:
-                self.used_names.add(full_name)
-                return full_name
-        
-        # Fallback: add middle initial if we somehow run out
-        first_name = random.choice(AMERICAN_MALE_FIRST_NAMES + AMERICAN_FEMALE_FIRST_NAMES)
-        middle_initial = random.choice("ABCDEFGHIJKLMNOPQRSTUVWXYZ")
-        last_name = random.choice(AMERICAN_LAST_NAMES)
-        full_name = f"{first_name} {middle_initial}. {last_name}"
-        self.used_names.add(full_name)
-        return full_name
-    
-    def get_merchant_with_amount(self, target_amount: Decimal) -> Tuple[str, Decimal]:
-        """
-        Get a merchant name appropriate for the target amount
-        Returns: (merchant_name, realistic_amount)
-        """
-        amount_float = float(target_amount)
-        
-        # Categorize by amount and select appropriate merchant
-        if amount_float < 200:
-            # Low amount: fast food (limited), subscriptions, gas
-            # Check if we've hit fast food limit
-            available_merchants = [m for m in LOW_AMOUNT_MERCHANTS if m not in self.FAST_FOOD_MERCHANTS]
-            
-            # 20% chance of fast food if under limit, otherwise non-food
-            if self.fast_food_count < self.max_fast_food and random.random() < 0.2:
-                merchant = random.choice(self.FAST_FOOD_MERCHANTS)
-                self.fast_food_count += 1
-            else:
-                merchant = random.choice(available_merchants)
-            
-            # Generate realistic amount for this category
-            amount = Decimal(str(round(random.uniform(5, 200), 2)))
-        elif amount_float < 2000:
-            # Medium amount: groceries, utilities, casual dining
-            merchant = random.choice(MEDIUM_AMOUNT_MERCHANTS)
-            amount = Decimal(str(round(random.uniform(200, 2000), 2)))
-        else:
-            # High amount: professional equipment, industrial supplies
-            merchant = random.choice(HIGH_AMOUNT_MERCHANTS)
-            amount = Decimal(str(round(random.uniform(2000, min(50000, amount_float * 1.2)), 2)))
-        
-        return merchant, amount
-    
-    def get_merchant_name(self) -> str:
-        """Get a random merchant name (deprecated - use get_merchant_with_amount)"""
-        # Randomly select from all categories
-        all_merchants = LOW_AMOUNT_MERCHANTS + MEDIUM_AMOUNT_MERCHANTS + HIGH_AMOUNT_MERCHANTS
-        return random.choice(all_merchants)
-    
-    def generate_high_amount(self, min_amount: float = 100, max_amount: float = 50000) -> Decimal:
+        self._first_names = np.array(AMERICAN_MALE_FIRST_NAMES + AMERICAN_FEMALE_FIRST_NAMES, dtype=object)
+        self._last_names = np.array(AMERICAN_LAST_NAMES, dtype=object)
+        self._non_fast_food = [m for m in LOW_AMOUNT_MERCHANTS if m not in self.FAST_FOOD_MERCHANTS]
+
+    def _rng(self) -> np.random.Generator:
+        return np.random.default_rng(self.seed)
+
+    @staticmethod
+    def _high_amounts(rng: np.random.Generator, n: int, max_amount: float = 50000) -> np.ndarray:
         """
-        Generate realistic high transaction amounts
+        Realistic high transaction amounts in dollars
         Distribution: Mix of small, medium, and large amounts
         - 30% small: $100-$1,000
         - 40% medium: $1,000-$10,000
         - 30% large: $10,000-$50,000
         """
-        rand = random.random()
-        
-        if rand < 0.3:  # 30% small amounts
-            amount = random.uniform(100, 1000)
-        elif rand < 0.7:  # 40% medium amounts
-            amount = random.uniform(1000, 10000)
-        else:  # 30% large amounts
-            amount = random.uniform(10000, max_amount)
-        
-        # Round to 2 decimal places
-        return Decimal(str(round(amount, 2)))
-    
+        bucket = rng.random(n)
+        low = np.where(bucket < 0.3, 100.0, np.where(bucket < 0.7, 1000.0, 10000.0))
+        high = np.where(bucket < 0.3, 1000.0, np.where(bucket < 0.7, 10000.0, max_amount))
+        return rng.uniform(low, high)
+
     def distribute_timestamps(
         self,
+        rng: np.random.Generator,
         start_date: datetime,
         end_date: datetime,
         count: int
-    ) -> List[datetime]:
-        """Distribute timestamps evenly across date range"""
+    ) -> np.ndarray:
+        """Distribute timestamps evenly across date range with +/-30% jitter.
+
+        Returns sorted naive datetime64[us]; the last one is exactly end_date.
+        """
+        start = np.datetime64(start_date.replace(tzinfo=None), "us")
+        end = np.datetime64(end_date.replace(tzinfo=None), "us")
         if count == 0:
-            return []
-        
+            return np.array([], dtype="datetime64[us]")
         if count == 1:
             # For single transaction, place it at the end date
-            return [end_date]
-        
-        total_seconds = (end_date - start_date).total_seconds()
-        interval = total_seconds / (count - 1)  # Changed to count-1 to ensure last transaction is at end_date
-        
-        timestamps = []
-        for i in range(count):
-            if i == count - 1:
-                # Last transaction should be exactly at end_date
-                timestamp = end_date
-            else:
-                # Add some randomness to make it more realistic, but keep within bounds
-                base_time = start_date + timedelta(seconds=(i * interval))
-                random_offset = random.uniform(-interval * 0.3, interval * 0.3)
-                timestamp = base_time + timedelta(seconds=random_offset)
-                
-                # Ensure timestamp doesn't exceed end_date
-                if timestamp > end_date:
-                    timestamp = end_date - timedelta(seconds=random.uniform(1, 3600))  # 1 second to 1 hour before end
-                
-                # Ensure timestamp doesn't go before start_date
-                if timestamp < start_date:
-                    timestamp = start_date + timedelta(seconds=random.uniform(1, 3600))
-            
-            timestamps.append(timestamp)
-        
-        # Sort chronologically
-        timestamps.sort()
-        return timestamps
-    
+            return np.array([end])
+
+        total_us = float((end - start) / np.timedelta64(1, "us"))
+        interval = total_us / (count - 1)
+        offsets = np.arange(count) * interval + rng.uniform(-interval * 0.3, interval * 0.3, count)
+        # Out-of-range timestamps are pulled back 1 second to 1 hour inside the range
+        nudge = rng.uniform(1e6, 3.6e9, count)
+        offsets = np.where(offsets > total_us, total_us - nudge, offsets)
+        offsets = np.where(offsets < 0, nudge, offsets)
+        offsets = np.clip(offsets, 0, total_us)
+        offsets[-1] = total_us
+        offsets.sort()
+        return start + offsets.astype(np.int64).astype("timedelta64[us]")
+
+    def _unique_person_names(self, rng: np.random.Generator, k: int) -> np.ndarray:
+        """Draw k distinct full names in one shot (no rejection sampling).
+
+        Plain "First Last" combinations are used first; beyond that a middle
+        initial widens the name space.
+        """
+        if k == 0:
+            return np.array([], dtype=object)
+        n_first, n_last = len(self._first_names), len(self._last_names)
+        plain_space = n_first * n_last
+        plain_k = min(k, plain_space)
+        picks = rng.choice(plain_space, size=plain_k, replace=False)
+        names = self._first_names[picks // n_last] + " " + self._last_names[picks % n_last]
+        extra = k - plain_k
+        if extra:
+            initials = np.array(list("ABCDEFGHIJKLMNOPQRSTUVWXYZ"), dtype=object)
+            space = plain_space * len(initials)
+            extra_picks = rng.choice(space, size=extra, replace=extra > space)
+            combo, initial = extra_picks // len(initials), extra_picks % len(initials)
+            extra_names = (self._first_names[combo // n_last] + " " + initials[initial] + ". "
+                           + self._last_names[combo % n_last])
+            names = np.concatenate([names, extra_names])
+        rng.shuffle(names)
+        return names
+
     def validate_generation_params(
         self,
         start_date: datetime,
@@ -186,37 +183,279 @@ class TransactionGenerator:
         transaction_count: int
     ) -> Tuple[bool, str]:
         """Validate transaction generation parameters"""
-        
+
         # Date validation
         if end_date < start_date:
             return False, "End date must be after start date"
-        
+
         # Balance validation
         if starting_balance < 0:
             return False, "Starting balance cannot be negative"
-        
+
         if closing_balance < 0:
             return False, "Closing balance cannot be negative"
-        
+
         # Transaction count validation
         if transaction_count < 1:
             return False, "Must generate at least 1 transaction"
-        
-        if transaction_count > 1000:
-            return False, "Cannot generate more than 1000 transactions at once"
-        
+
+        if transaction_count > self.MAX_TRANSACTION_COUNT:
+            return False, f"Cannot generate more than {self.MAX_TRANSACTION_COUNT} transactions at once"
+
         # Check if balance change is achievable
         balance_difference = abs(closing_balance - starting_balance)
         avg_per_transaction = float(balance_difference) / transaction_count
-        
+
         if avg_per_transaction < 5:
             return False, f"Average transaction amount (${avg_per_transaction:.2f}) is too small. Increase balance difference or reduce transaction count."
-        
+
         if avg_per_transaction > 100000:
             return False, f"Average transaction amount (${avg_per_transaction:.2f}) is too large. This may look suspicious."
-        
+
         return True, "Validation passed"
-    
+
+    def generate_batch(
+        self,
+        start_date: datetime,
+        end_date: datetime,
+        starting_balance: Decimal,
+        closing_balance: Decimal,
+        transaction_count: int
+    ) -> GeneratedTransactions:
+        """Generate the full history as arrays.
+
+        The credit ratio and amount scale are chosen so the expected drift per
+        row matches the requested balance change, a correction pass refits the
+        credit and debit totals (amounts stay within MAX_AMOUNT times the scale)
+        so the running balance lands exactly on closing_balance, and rows are
+        reordered where needed so the balance never goes negative.
+        """
+        is_valid, message = self.validate_generation_params(
+            start_date, end_date, starting_balance, closing_balance, transaction_count
+        )
+        if not is_valid:
+            raise ValueError(message)
+
+        rng = self._rng()
+        n = transaction_count
+        start_cents = _to_cents(starting_balance)
+        balance_change = _to_cents(closing_balance) - start_cents
+
+        timestamps = self.distribute_timestamps(rng, start_date, end_date, n)
+
+        # Every draw is made up front so the stream (and output) is seed-stable
+        credit_roll = rng.random(n)
+        kind_roll = rng.random(n)
+        purchase_roll = rng.random(n)
+        fast_food_roll = rng.random(n)
+        base = self._high_amounts(rng, n)
+        income_amount = rng.uniform(10000, 50000, n)
+        check_amount = rng.uniform(500, 15000, n)
+        equipment_amount = self._high_amounts(rng, n)
+        bill_amount = rng.uniform(50, 500, n)
+        loan_amount = rng.uniform(200, 2000, n)
+        low_amount = rng.uniform(5, 200, n)
+        medium_amount = rng.uniform(200, 2000, n)
+        high_amount = rng.uniform(2000, np.maximum(2000.0, np.minimum(self.MAX_AMOUNT, base * 1.2)))
+
+        # Row kinds: credits 1/3 p2p, 1/3 income, 1/3 check deposits;
+        # debits 40% equipment, 25% bills, 20% loans, 15% purchases / p2p
+        credit_kind = np.select([kind_roll < 0.33, kind_roll < 0.67], [KIND_CREDIT_P2P, KIND_INCOME], KIND_CHECK)
+        debit_kind = np.select(
+            [kind_roll < 0.40, kind_roll < 0.65, kind_roll < 0.85],
+            [KIND_EQUIPMENT, KIND_BILL, KIND_LOAN],
+            np.where(purchase_roll < 0.5, KIND_PURCHASE, KIND_DEBIT_P2P)
+        )
+
+        # Purchase category follows the target amount: <$200 low, <$2,000 medium, else high
+        category = np.select([base < 200, base < 2000], [0, 1], 2)
+        purchase_amount = np.choose(category, [low_amount, medium_amount, high_amount])
+
+        def amounts_for(kind: np.ndarray) -> np.ndarray:
+            return np.select(
+                [
+                    (kind == KIND_INCOME) & (base < 10000),
+                    (kind == KIND_CHECK) & (base < 500),
+                    kind == KIND_EQUIPMENT,
+                    (kind == KIND_BILL) & ((base < 50) | (base > 500)),
+                    (kind == KIND_LOAN) & ((base < 200) | (base > 2000)),
+                    kind == KIND_PURCHASE,
+                ],
+                [income_amount, check_amount, equipment_amount, bill_amount, loan_amount, purchase_amount],
+                base
+            )
+
+        credit_amount = amounts_for(credit_kind)
+        debit_amount = amounts_for(debit_kind)
+        credit_ratio, credit_scale, debit_scale = self._drift_plan(
+            balance_change / n / 100, float(credit_amount.mean()), float(debit_amount.mean())
+        )
+
+        is_credit = credit_roll < credit_ratio
+        if n == 1:
+            is_credit[:] = balance_change > 0
+        else:
+            # Both sides must exist so the correction pass always has rows to scale
+            if is_credit.all():
+                is_credit[-1] = False
+            elif not is_credit.any():
+                is_credit[-1] = True
+
+        kind = np.where(is_credit, credit_kind, debit_kind)
+        credit_cap = int(round(self.MAX_AMOUNT * 100 * credit_scale))
+        debit_cap = int(round(self.MAX_AMOUNT * 100 * debit_scale))
+        cents = np.where(
+            is_credit,
+            np.clip(np.round(credit_amount * credit_scale * 100), 1, credit_cap),
+            np.clip(np.round(debit_amount * debit_scale * 100), 1, debit_cap)
+        ).astype(np.int64)
+
+        # Closing-balance correction: refit the side totals so credits - debits == balance_change
+        if n == 1:
+            cents[0] = max(abs(balance_change), 1)
+        else:
+            credits, debits = cents[is_credit], cents[~is_credit]
+            credit_total, debit_total = int(credits.sum()), int(debits.sum())
+            diff = balance_change - (credit_total - debit_total)
+            # Grow the side that moves toward the target; past its cap, shrink the other side
+            if diff >= 0:
+                credit_target = min(credit_total + diff, len(credits) * credit_cap)
+                debit_target = credit_target - balance_change
+            else:
+                debit_target = min(debit_total - diff, len(debits) * debit_cap)
+                credit_target = debit_target + balance_change
+            # Every row keeps at least one cent; if that is out of reach, lift the cap just enough
+            if debit_target < len(debits):
+                debit_target, credit_target = len(debits), len(debits) + balance_change
+            if credit_target < len(credits):
+                credit_target, debit_target = len(credits), len(credits) - balance_change
+            credit_cap = max(credit_cap, -(-credit_target // len(credits)))
+            debit_cap = max(debit_cap, -(-debit_target // len(debits)))
+            cents[is_credit] = self._fit_total(credits, credit_target, credit_cap)
+            cents[~is_credit] = self._fit_total(debits, debit_target, debit_cap)
+
+        order = self._non_negative_order(is_credit, cents, start_cents)
+        is_credit, cents, kind, category, fast_food_roll = (
+            is_credit[order], cents[order], kind[order], category[order], fast_food_roll[order]
+        )
+        signed = np.where(is_credit, cents, -cents)
+        balance_after = start_cents + np.cumsum(signed)
+
+        descriptions = self._descriptions(rng, kind, category, fast_food_roll)
+        return GeneratedTransactions(
+            timestamps=timestamps,
+            is_credit=is_credit,
+            amount_cents=cents,
+            balance_after_cents=balance_after,
+            descriptions=descriptions,
+        )
+
+    @staticmethod
+    def _drift_plan(drift: float, credit_mean: float, debit_mean: float) -> Tuple[float, float, float]:
+        """(credit_ratio, credit scale, debit scale) whose expected net per row is ``drift`` dollars.
+
+        The ratio stays within [MIN_CREDIT_RATIO, 1 - MIN_CREDIT_RATIO] so both
+        sides keep appearing. A drift natural amounts cannot reach at 80% of
+        that share scales up the amounts of the side moving toward it instead.
+        """
+        high, low = 1 - TransactionGenerator.MIN_CREDIT_RATIO, TransactionGenerator.MIN_CREDIT_RATIO
+        credit_scale = max(1.0, (drift / 0.8 + low * debit_mean) / (high * credit_mean))
+        debit_scale = max(1.0, (-drift / 0.8 + low * credit_mean) / (high * debit_mean))
+        credit_mean, debit_mean = credit_mean * credit_scale, debit_mean * debit_scale
+        ratio = (drift + debit_mean) / (credit_mean + debit_mean)
+        return float(np.clip(ratio, low, high)), credit_scale, debit_scale
+
+    @staticmethod
+    def _fit_total(cents: np.ndarray, target: int, cap: int) -> np.ndarray:
+        """Rescale positive cents to sum exactly to ``target``, each staying within [1, cap]"""
+        if int(cents.sum()) == target:
+            return cents
+        values = cents.astype(np.float64)
+        pinned = np.zeros(len(values), dtype=bool)
+        # Scale the free rows proportionally; rows pushed past a bound are pinned there and the rest rescaled
+        while True:
+            free = ~pinned
+            values[free] *= (target - values[pinned].sum()) / values[free].sum()
+            out_of_range = free & ((values > cap) | (values < 1))
+            if not out_of_range.any():
+                break
+            values[out_of_range] = np.clip(values[out_of_range], 1, cap)
+            pinned |= out_of_range
+            if pinned.all():
+                break
+        result = np.clip(np.floor(values), 1, cap).astype(np.int64)
+        # Rounding leftovers: one cent at a time on rows that still have room
+        residual = target - int(result.sum())
+        while residual:
+            step = 1 if residual > 0 else -1
+            room = np.flatnonzero(result < cap if step > 0 else result > 1)[:abs(residual)]
+            result[room] += step
+            residual -= step * len(room)
+        return result
+
+    @staticmethod
+    def _non_negative_order(is_credit: np.ndarray, cents: np.ndarray, start_cents: int) -> np.ndarray:
+        """Row order that keeps the running balance >= 0, moving as few debits later as needed.
+
+        Credits and debits keep their own relative order. Each debit is placed
+        after the credits that originally preceded it or, if more, after the
+        fewest credits that fund it. The last debit is always funded because the
+        closing balance is non-negative.
+        """
+        credit_rows = np.flatnonzero(is_credit)
+        debit_rows = np.flatnonzero(~is_credit)
+        credit_funds = np.concatenate([[0], np.cumsum(cents[credit_rows])])
+        needed = np.searchsorted(credit_funds, np.cumsum(cents[debit_rows]) - start_cents, side="left")
+        credits_before = np.maximum(np.searchsorted(credit_rows, debit_rows), needed)
+        # Credit k sorts at 2k; a debit after b credits sorts at 2b - 1, between credits b - 1 and b
+        keys = np.concatenate([2 * np.arange(len(credit_rows)), 2 * credits_before - 1])
+        return np.concatenate([credit_rows, debit_rows])[np.argsort(keys, kind="stable")]
+
+    def _descriptions(
+        self,
+        rng: np.random.Generator,
+        kind: np.ndarray,
+        category: np.ndarray,
+        fast_food_roll: np.ndarray
+    ) -> np.ndarray:
+        """Build all descriptions from index arrays into the vocabulary lists"""
+        n = len(kind)
+        descriptions = np.empty(n, dtype=object)
+
+        def pick(values: List[str], mask: np.ndarray, suffix: str = "") -> None:
+            vocab = np.array([v + suffix for v in values], dtype=object)
+            descriptions[mask] = vocab[rng.integers(0, len(vocab), int(mask.sum()))]
+
+        pick(HIGH_INCOME_DESCRIPTIONS, kind == KIND_INCOME)
+        pick(CHECK_DEPOSITS, kind == KIND_CHECK)
+        pick(HIGH_AMOUNT_MERCHANTS, kind == KIND_EQUIPMENT, " Purchase")
+        pick(BILLS_PAYMENTS, kind == KIND_BILL)
+        pick(LOAN_PAYMENTS, kind == KIND_LOAN)
+
+        # Purchases: fast food is a 20% chance on low amounts, capped per generation
+        purchase = kind == KIND_PURCHASE
+        low = purchase & (category == 0)
+        fast_food = low & (fast_food_roll < 0.2)
+        fast_food &= np.cumsum(fast_food) <= self.max_fast_food
+        pick(self.FAST_FOOD_MERCHANTS, fast_food, " Purchase")
+        pick(self._non_fast_food, low & ~fast_food, " Purchase")
+        pick(MEDIUM_AMOUNT_MERCHANTS, purchase & (category == 1), " Purchase")
+        pick(HIGH_AMOUNT_MERCHANTS, purchase & (category == 2), " Purchase")
+
+        # Person-to-person rows each get a distinct counterparty name
+        p2p = (kind == KIND_CREDIT_P2P) | (kind == KIND_DEBIT_P2P)
+        names = self._unique_person_names(rng, int(p2p.sum()))
+        credit_prefixes = np.array(CREDIT_P2P_PREFIXES, dtype=object)
+        debit_prefixes = np.array(DEBIT_P2P_PREFIXES, dtype=object)
+        p2p_kind = kind[p2p]
+        prefixes = np.where(
+            p2p_kind == KIND_CREDIT_P2P,
+            credit_prefixes[rng.integers(0, len(credit_prefixes), len(p2p_kind))],
+            debit_prefixes[rng.integers(0, len(debit_prefixes), len(p2p_kind))]
+        )
+        descriptions[p2p] = prefixes + names
+        return descriptions
+
     def generate_transactions(
         self,
         start_date: datetime,
@@ -230,167 +469,42 @@ class TransactionGenerator:
     ) -> List[Dict]:
         """
         Generate realistic transactions with high amounts
-        
-        Returns list of transaction dictionaries ready for database insertion
+
+        Returns list of transaction dictionaries ready for database insertion.
+        Amounts and balances are Decimals and timestamps are datetimes, so rows
+        can be bulk inserted without a string round-trip.
         """
-        
-        # Validate parameters
-        is_valid, message = self.validate_generation_params(
-            start_date, end_date, starting_balance, closing_balance, transaction_count
-        )
-        if not is_valid:
-            raise ValueError(message)
-        
-        # Calculate target balance change
-        balance_change = closing_balance - starting_balance
-        
-        # Determine ratio of debits to credits
-        # Both credits and debits should have high amounts
-        if balance_change > 0:
-            # Need more credits than debits
-            credit_ratio = 0.65  # 65% credits (more incoming money)
-        elif balance_change < 0:
-            # Need more debits than credits
-            credit_ratio = 0.35  # 35% credits
-        else:
-            # Equal debits and credits
-            credit_ratio = 0.5
-        
-        # Generate timestamps
-        timestamps = self.distribute_timestamps(start_date, end_date, transaction_count)
-        
-        # Reset fast food counter for this generation
-        self.fast_food_count = 0
-        
-        # Generate transactions
-        transactions = []
-        current_balance = starting_balance
-        remaining_change = balance_change
-        
-        for i, timestamp in enumerate(timestamps):
-            is_last = (i == transaction_count - 1)
-            
-            # Determine if this is a credit or debit
-            if is_last:
-                # Last transaction: use exact remaining amount to hit target
-                amount = abs(remaining_change)
-                is_credit = remaining_change > 0
-            else:
-                # Random transaction
-                is_credit = random.random() < credit_ratio
-                
-                # Generate amount (leave some buffer for remaining transactions)
-                remaining_transactions = transaction_count - i - 1
-                if remaining_transactions > 0:
-                    max_amount = float(abs(remaining_change)) * 0.7  # Use max 70% of remaining
-                    amount = self.generate_high_amount(min_amount=100, max_amount=min(max_amount, 50000))
-                else:
-                    amount = self.generate_high_amount()
-            
-            # Determine transaction type and description
-            if is_credit:
-                transaction_type = "credit"
-                # Credits should be high amounts: person-to-person transfers, income, check deposits, internal transfers, etc.
-                # 25% person-to-person, 25% income/business, 25% check deposits, 25% internal transfers
-                credit_type = random.random()
-                if credit_type < 0.33:
-                    person_name = self.get_unique_person_name()
-                    description = random.choice([
-                        f"Transfer from {person_name}",
-                        f"Payment from {person_name}",
-                        f"Zelle from {person_name}",
-                        f"Wire transfer from {person_name}"
-                    ])
-                elif credit_type < 0.67:
-                    # Use high-value income sources
-                    description = random.choice(HIGH_INCOME_DESCRIPTIONS)
-                    # Ensure amount is at least $10,000 for income
-                    if not is_last and amount < Decimal('10000'):
-                        amount = Decimal(str(round(random.uniform(10000, 50000), 2)))
-                else:
-                    # Check deposits
-                    description = random.choice(CHECK_DEPOSITS)
-                    # Check deposits can be various amounts
-                    if not is_last and amount < Decimal('500'):
-                        amount = Decimal(str(round(random.uniform(500, 15000), 2)))
-                
-                current_balance += amount
-                remaining_change -= amount
-            else:
-                transaction_type = "debit"
-                # Debits: Mix of equipment purchases, bills, loan payments, and other expenses
-                # 40% equipment purchases, 25% bills, 20% loan payments, 15% other
-                debit_type = random.random()
-                if debit_type < 0.40:
-                    # Professional equipment purchase - use high amounts
-                    if is_last:
-                        amount = abs(remaining_change)
-                        # Pick merchant appropriate for this amount
-                        merchant, _ = self.get_merchant_with_amount(amount)
-                    else:
-                        # Generate high amount for equipment
-                        amount = self.generate_high_amount(min_amount=2000, max_amount=50000)
-                        merchant = random.choice(HIGH_AMOUNT_MERCHANTS)
-                    
-                    description = f"{merchant} Purchase"
-                elif debit_type < 0.65:
-                    # Bills and utilities payments
-                    description = random.choice(BILLS_PAYMENTS)
-                    # Bills are typically $50 - $500
-                    if not is_last and (amount < 50 or amount > 500):
-                        amount = Decimal(str(round(random.uniform(50, 500), 2)))
-                elif debit_type < 0.85:
-                    # Loan payments
-                    description = random.choice(LOAN_PAYMENTS)
-                    # Loan payments are typically $200 - $2000
-                    if not is_last and (amount < 200 or amount > 2000):
-                        amount = Decimal(str(round(random.uniform(200, 2000), 2)))
-                else:
-                    # Other expenses and person-to-person transfers
-                    if random.random() < 0.5:
-                        # Small merchant purchase with realistic amount
-                        merchant, realistic_amount = self.get_merchant_with_amount(amount)
-                        
-                        if is_last:
-                            amount = abs(remaining_change)
-                            merchant, _ = self.get_merchant_with_amount(amount)
-                        else:
-                            amount = realistic_amount
-                        
-                        description = f"{merchant} Purchase"
-                    else:
-                        # Person-to-person transfer (can be high amounts)
-                        person_name = self.get_unique_person_name()
-                        description = random.choice([
-                            f"Transfer to {person_name}",
-                            f"Payment to {person_name}",
-                            f"Zelle to {person_name}",
-                            f"Wire transfer to {person_name}",
-                            f"Check payment to {person_name}"
-                        ])
-                
-                current_balance -= amount
-                remaining_change += amount
-            
-            # Create transaction record with balance tracking
-            transaction = {
+        batch = self.generate_batch(start_date, end_date, starting_balance, closing_balance, transaction_count)
+
+        timestamps = batch.timestamps.astype(object)
+        if start_date.tzinfo is not None:
+            timestamps = [ts.replace(tzinfo=start_date.tzinfo) for ts in timestamps]
+        epoch_seconds = (batch.timestamps.astype("datetime64[s]").astype(np.int64)).tolist()
+        # Reference numbers must be unique in the ledger, so they do not come from the seed
+        ref_suffixes = np.random.default_rng().integers(0, 16 ** 8, len(batch)).tolist()
+        types = np.where(batch.is_credit, "credit", "debit").tolist()
+        amounts = batch.amount_cents.tolist()
+        before = batch.balance_before_cents.tolist()
+        after = batch.balance_after_cents.tolist()
+        descriptions = batch.descriptions.tolist()
+
+        return [
+            {
                 "account_id": account_id,
-                "type": transaction_type,
-                "amount": float(amount),
+                "type": types[i],
+                "amount": _cents_to_decimal(amounts[i]),
                 "currency": currency,
-                "description": description,
+                "description": descriptions[i],
                 "status": "completed",
-                "created_at": timestamp.isoformat(),
-                "posted_date": timestamp.isoformat(),
-                "balance_before": float(current_balance - (amount if is_credit else -amount)),
-                "balance_after": float(current_balance),
-                "reference_number": f"TXN{int(timestamp.timestamp())}{random.randint(1000, 9999)}"
+                "created_at": timestamps[i],
+                "posted_date": timestamps[i],
+                "balance_before": _cents_to_decimal(before[i]),
+                "balance_after": _cents_to_decimal(after[i]),
+                "reference_number": f"TXN{epoch_seconds[i]}{ref_suffixes[i]:08X}"
             }
-            
-            transactions.append(transaction)
-        
-        return transactions
-    
+            for i in range(len(batch))
+        ]
+
     def generate_preview(
         self,
         start_date: datetime,
@@ -402,56 +516,46 @@ class TransactionGenerator:
     ) -> Dict:
         """
         Generate a preview of transactions without saving to database
-        
+
         Returns:
         - sample_transactions: List of preview transactions
         - summary: Statistics about the generation
+        - seed: Pass back to generate to create exactly this history
         """
-        
-        # Generate full transaction list
-        transactions = self.generate_transactions(
-            start_date=start_date,
-            end_date=end_date,
-            starting_balance=starting_balance,
-            closing_balance=closing_balance,
-            transaction_count=transaction_count,
-            account_id="preview",  # Dummy account ID for preview
-            currency="USD"
-        )
-        
-        # Calculate summary statistics
-        total_debits = sum(t["amount"] for t in transactions if t["type"] == "debit")
-        total_credits = sum(t["amount"] for t in transactions if t["type"] == "credit")
-        debit_count = sum(1 for t in transactions if t["type"] == "debit")
-        credit_count = sum(1 for t in transactions if t["type"] == "credit")
-        
+        batch = self.generate_batch(start_date, end_date, starting_balance, closing_balance, transaction_count)
+
+        credit_cents = batch.amount_cents[batch.is_credit]
+        debit_cents = batch.amount_cents[~batch.is_credit]
+
         # Get sample transactions (evenly distributed)
-        sample_size = min(preview_count, len(transactions))
-        if sample_size == len(transactions):
-            sample_transactions = transactions
-        else:
-            step = len(transactions) // sample_size
-            sample_transactions = [transactions[i * step] for i in range(sample_size)]
-        
-        # Add running balance to preview
-        running_balance = starting_balance
-        for txn in sample_transactions:
-            if txn["type"] == "credit":
-                running_balance += Decimal(str(txn["amount"]))
-            else:
-                running_balance -= Decimal(str(txn["amount"]))
-            txn["running_balance"] = float(running_balance)
-        
+        sample_size = min(preview_count, len(batch))
+        step = len(batch) // sample_size
+        sample_index = np.arange(sample_size) * step
+
+        sample_transactions = []
+        for i in sample_index.tolist():
+            created_at = batch.timestamps[i].astype(object)
+            if start_date.tzinfo is not None:
+                created_at = created_at.replace(tzinfo=start_date.tzinfo)
+            sample_transactions.append({
+                "type": "credit" if batch.is_credit[i] else "debit",
+                "amount": float(_cents_to_decimal(batch.amount_cents[i])),
+                "description": batch.descriptions[i],
+                "created_at": created_at.isoformat(),
+                "running_balance": float(_cents_to_decimal(batch.balance_after_cents[i]))
+            })
+
         return {
             "sample_transactions": sample_transactions,
             "summary": {
                 "total_transactions": transaction_count,
-                "debit_count": debit_count,
-                "credit_count": credit_count,
-                "total_debits": float(total_debits),
-                "total_credits": float(total_credits),
+                "debit_count": int(len(debit_cents)),
+                "credit_count": int(len(credit_cents)),
+                "total_debits": float(_cents_to_decimal(debit_cents.sum())),
+                "total_credits": float(_cents_to_decimal(credit_cents.sum())),
                 "starting_balance": float(starting_balance),
                 "closing_balance": float(closing_balance),
                 "net_change": float(closing_balance - starting_balance)
-            }
+            },
+            "seed": self.seed
         }
@@ -0,0 +1,239 @@
+"""
+User Deletion Service
+Removes a user and every dependent row with set-based, chunked DELETEs.
+Runs as a background job whose checkpoint is stored on BackgroundJob so an
+interrupted deletion can be resumed from the step it stopped at.
+"""
+import asyncio
+import json
+import uuid
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from sqlalchemy import select, delete, update, or_, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+from config import settings
+from database import AsyncSessionLocal
+from models.job import BackgroundJob, JobStatus, JobType
+from models.admin import AdminAuditLog
+from models.user import User
+from models.account import Account, Statement
+from models.transaction import Transaction
+from models.transfer import Transfer, Beneficiary
+from models.loan import Loan, LoanApplication, LoanPayment, LoanSchedule
+from models.notification import Notification, NotificationPreference
+from models.document import Document
+from models.support import SupportTicket, TicketMessage, Chat, ChatMessage, LoginHistory
+from models.bill_payment import BillPayment, BillPayee, ScheduledPayment
+from models.deposit import Deposit
+from models.virtual_card import VirtualCard
+from models.security import TrustedDevice
+from models.user_restriction import UserRestriction
+from services.job_lease import JobLease
+from utils.background import spawn_background_task
+from utils.logger import logger
+
+
+def _user_loans(user_id: str):
+    return select(Loan.id).where(Loan.user_id == user_id)
+
+
+def _user_accounts(user_id: str):
+    return select(Account.id).where(Account.user_id == user_id)
+
+
+# (category, model, predicate) in foreign-key dependency order: children first.
+DELETION_STEPS: List[Tuple[str, Any, Callable[[str], Any]]] = [
+    ("restrictions", UserRestriction, lambda uid: UserRestriction.user_id == uid),
+    ("notifications", Notification, lambda uid: Notification.user_id == uid),
+    ("notification_preferences", NotificationPreference, lambda uid: NotificationPreference.user_id == uid),
+    ("ticket_messages", TicketMessage, lambda uid: TicketMessage.ticket_id.in_(
+        select(SupportTicket.id).where(SupportTicket.user_id == uid))),
+    ("support_tickets", SupportTicket, lambda uid: SupportTicket.user_id == uid),
+    ("chat_messages", ChatMessage, lambda uid: or_(
+        ChatMessage.user_id == uid,
+        ChatMessage.chat_id.in_(select(Chat.id).where(Chat.user_id == uid)))),
+    ("chats", Chat, lambda uid: Chat.user_id == uid),
+    ("documents", Document, lambda uid: Document.user_id == uid),
+    ("loan_payments", LoanPayment, lambda uid: LoanPayment.loan_id.in_(_user_loans(uid))),
+    ("loan_schedules", LoanSchedule, lambda uid: LoanSchedule.loan_id.in_(_user_loans(uid))),
+    ("loans", Loan, lambda uid: Loan.user_id == uid),
+    ("loan_applications", LoanApplication, lambda uid: LoanApplication.user_id == uid),
+    ("virtual_cards", VirtualCard, lambda uid: VirtualCard.user_id == uid),
+    ("bill_payments", BillPayment, lambda uid: BillPayment.user_id == uid),
+    ("scheduled_payments", ScheduledPayment, lambda uid: ScheduledPayment.user_id == uid),
+    ("bill_payees", BillPayee, lambda uid: BillPayee.user_id == uid),
+    ("deposits", Deposit, lambda uid: Deposit.user_id == uid),
+    ("transfers", Transfer, lambda uid: Transfer.from_user_id == uid),
+    ("beneficiaries", Beneficiary, lambda uid: Beneficiary.user_id == uid),
+    ("transactions", Transaction, lambda uid: Transaction.user_id == uid),
+    ("statements", Statement, lambda uid: Statement.account_id.in_(_user_accounts(uid))),
+    ("trusted_devices", TrustedDevice, lambda uid: TrustedDevice.user_id == uid),
+    ("login_history", LoginHistory, lambda uid: LoginHistory.user_id == uid),
+    ("accounts", Account, lambda uid: Account.user_id == uid),
+]
+
+
+class UserDeletionService:
+    """Background, resumable cascade deletion of a user"""
+
+    @staticmethod
+    async def get_active_job(db: AsyncSession, user_id: str) -> Optional[BackgroundJob]:
+        """Return an unfinished deletion job for the user, if any"""
+        result = await db.execute(
+            select(BackgroundJob).where(
+                and_(
+                    BackgroundJob.job_type == JobType.USER_DELETION,
+                    BackgroundJob.resource_id == user_id,
+                    BackgroundJob.status.in_([JobStatus.PENDING, JobStatus.RUNNING]),
+                )
+            )
+        )
+        return result.scalars().first()
+
+    @staticmethod
+    async def create_job(db: AsyncSession, user: User, admin_id: str, admin_email: str) -> BackgroundJob:
+        """Persist a pending deletion job; caller commits and then calls start()"""
+        job = BackgroundJob(
+            id=str(uuid.uuid4()),
+            job_type=JobType.USER_DELETION,
+            status=JobStatus.PENDING,
+            resource_type="user",
+            resource_id=user.id,
+            requested_by=admin_id,
+            params=json.dumps({
+                "user_email": user.email,
+                "admin_email": admin_email,
+                "batch_size": settings.USER_DELETION_BATCH_SIZE,
+            }),
+            progress=json.dumps({
+                "step_index": 0,
+                "total_steps": len(DELETION_STEPS) + 1,
+                "current_step": None,
+                "deleted": {},
+            }),
+        )
+        db.add(job)
+        return job
+
+    @staticmethod
+    def is_running(job: BackgroundJob) -> bool:
+        """Whether a runner in any process holds the job's lease"""
+        return JobLease.is_held(job)
+
+    @staticmethod
+    def start(job_id: str) -> None:
+        """Run (or resume) a job in the background"""
+        spawn_background_task(UserDeletionService.run(job_id), name=f"user_deletion:{job_id}")
+
+    @staticmethod
+    async def run(job_id: str) -> None:
+        """Execute the remaining deletion steps, committing after every chunk"""
+        lease = JobLease(AsyncSessionLocal, job_id)
+        if not await lease.acquire():
+            logger.info(f"User deletion job {job_id} is already running elsewhere")
+            return
+        try:
+            async with AsyncSessionLocal() as db:
+                job = await db.get(BackgroundJob, job_id)
+                if not job or job.status == JobStatus.COMPLETED:
+                    return
+                params = json.loads(job.params or "{}")
+                progress = json.loads(job.progress or "{}")
+                user_id = job.resource_id
+                batch_size = int(params.get("batch_size") or settings.USER_DELETION_BATCH_SIZE)
+
+                job.status = JobStatus.RUNNING
+                job.error = None
+                job.started_at = job.started_at or datetime.utcnow()
+                await db.commit()
+
+                try:
+                    await UserDeletionService._run_steps(db, job, user_id, batch_size, params, progress)
+                except Exception as e:
+                    await db.rollback()
+                    job = await db.get(BackgroundJob, job_id)
+                    job.status = JobStatus.FAILED
+                    job.error = str(e)[:1000]
+                    await db.commit()
+                    logger.error(f"User deletion job {job_id} failed", error=e)
+        finally:
+            await lease.release()
+
+    @staticmethod
+    async def _run_steps(
+        db: AsyncSession,
+        job: BackgroundJob,
+        user_id: str,
+        batch_size: int,
+        params: Dict[str, Any],
+        progress: Dict[str, Any],
+    ) -> None:
+        deleted: Dict[str, int] = progress.setdefault("deleted", {})
+        start_index = int(progress.get("step_index", 0))
+
+        if start_index == 0 and not progress.get("auth_provider_deleted") and settings.AUTH_PROVIDER == "stytch":
+            try:
+                from utils.stytch_client import delete_stytch_user
+                # In our system, User.id IS the Stytch User ID if provider is stytch
+                await asyncio.to_thread(delete_stytch_user, user_id)
+            except Exception as stytch_err:
+                logger.error(f"Failed to delete user {user_id} from Stytch: {stytch_err}")
+            progress["auth_provider_deleted"] = True
+
+        # Loans reference their application; detach before either side is deleted
+        await db.execute(
+            update(Loan).where(Loan.user_id == user_id).values(application_id=None)
+            .execution_options(synchronize_session=False)
+        )
+
+        for index in range(start_index, len(DELETION_STEPS)):
+            category, model, predicate = DELETION_STEPS[index]
+            progress["step_index"] = index
+            progress["current_step"] = category
+            while True:
+                chunk = select(model.id).where(predicate(user_id)).limit(batch_size).scalar_subquery()
+                result = await db.execute(
+                    delete(model).where(model.id.in_(chunk)).execution_options(synchronize_session=False)
+                )
+                removed = result.rowcount or 0
+                deleted[category] = deleted.get(category, 0) + removed
+                job.processed_items = (job.processed_items or 0) + removed
+                job.progress = json.dumps(progress)
+                await db.commit()
+                if removed < batch_size:
+                    break
+                # Let other requests use the connection pool between chunks
+                await asyncio.sleep(0)
+
+        progress["current_step"] = "user"
+        user_removed = (await db.execute(
+            delete(User).where(User.id == user_id).execution_options(synchronize_session=False)
+        )).rowcount or 0
+        deleted["user"] = user_removed
+        job.processed_items = (job.processed_items or 0) + user_removed
+
+        db.add(AdminAuditLog(
+            id=str(uuid.uuid4()),
+            admin_id=job.requested_by or "system",
+            admin_email=params.get("admin_email") or "system",
+            action="delete_user_complete",
+            resource_type="user",
+            resource_id=user_id,
+            details=json.dumps({
+                "user_id": user_id,
+                "user_email": params.get("user_email"),
+                "job_id": job.id,
+                "deleted_categories": deleted,
+                "total_items_deleted": job.processed_items,
+            }),
+        ))
+        progress["step_index"] = len(DELETION_STEPS) + 1
+        progress["current_step"] = None
+        job.progress = json.dumps(progress)
+        job.status = JobStatus.COMPLETED
+        job.finished_at = datetime.utcnow()
+        await db.commit()
+
+        from utils.ably import AblyRealtimeManager
+        AblyRealtimeManager.publish_admin_event("users", {"type": "deleted", "user_id": user_id})
+        logger.info(f"User deletion job {job.id} completed: {user_id} - {job.processed_items} items deleted")
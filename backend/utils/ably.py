@@ -1,12 +1,15 @@
-import ably
 import asyncio
 import inspect
 from config import settings
 from typing import Optional, Dict, Any
 from datetime import datetime
 import json
+from utils.lazy import lazy_import
+from utils.logger import logger
 
-_ably_client: Optional[ably.AblyRest] = None
+ably = lazy_import("ably")
+
+_ably_client: Optional["ably.AblyRest"] = None
 
 
 def _is_valid_ably_key(key: Optional[str]) -> bool:
@@ -20,7 +23,7 @@ def _is_valid_ably_key(key: Optional[str]) -> bool:
     return True
 
 
-def _get_ably_client() -> Optional[ably.AblyRest]:
+def _get_ably_client() -> Optional["ably.AblyRest"]:
     global _ably_client
     if _ably_client is not None:
         return _ably_client
@@ -111,7 +114,7 @@ class AblyRealtimeManager:
                         pass
             return True
         except Exception as e:
-            print(f"Error publishing transaction update: {e}")
+            logger.error("Error publishing transaction update", error=e)
             return False
     
     @staticmethod
@@ -140,7 +143,7 @@ class AblyRealtimeManager:
                         pass
             return True
         except Exception as e:
-            print(f"Error publishing card status: {e}")
+            logger.error("Error publishing card status", error=e)
             return False
     
     @staticmethod
@@ -177,7 +180,7 @@ class AblyRealtimeManager:
                         pass
             return True
         except Exception as e:
-            print(f"Error publishing balance update: {e}")
+            logger.error("Error publishing balance update", error=e)
             return False
     
     @staticmethod
@@ -214,7 +217,7 @@ class AblyRealtimeManager:
                         pass
             return True
         except Exception as e:
-            print(f"Error publishing transfer status: {e}")
+            logger.error("Error publishing transfer status", error=e)
             return False
     
     @staticmethod
@@ -252,7 +255,7 @@ class AblyRealtimeManager:
                         pass
             return True
         except Exception as e:
-            print(f"Error publishing notification: {e}")
+            logger.error("Error publishing notification", error=e)
             return False
     
     @staticmethod
@@ -290,7 +293,7 @@ class AblyRealtimeManager:
                         pass
             return True
         except Exception as e:
-            print(f"Error publishing support message: {e}")
+            logger.error("Error publishing support message", error=e)
             return False
     
     @staticmethod
@@ -327,7 +330,7 @@ class AblyRealtimeManager:
                         pass
             return True
         except Exception as e:
-            print(f"Error publishing loan status: {e}")
+            logger.error("Error publishing loan status", error=e)
             return False
 
 
@@ -354,7 +357,7 @@ async def get_ably_token_request(user_id: str) -> Optional[Dict[str, Any]]:
             token_request = await token_request
         return token_request
     except Exception as e:
-        print(f"Error creating token request: {e}")
+        logger.error("Error creating token request", error=e)
         return None
 
 async def get_admin_ably_token_request(admin_id: str) -> Optional[Dict[str, Any]]:
@@ -1,14 +1,19 @@
 import os
 import secrets
+import time
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Dict, FrozenSet, Optional, Tuple
 from utils.auth import hash_password, verify_password, create_access_token as create_user_token, verify_token
 from utils.logger import logger
+from utils.metrics import cache_requests_total
 from config import settings
 from fastapi import Request, HTTPException, status, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, event
+from sqlalchemy.orm import Session, object_session
 from database import get_db
+from utils.request_context import set_request_principal
 from models.admin import AdminUser
 
 
@@ -114,8 +119,7 @@ class AdminPermissionManager:
     @staticmethod
     def has_permission(role: str, permission: str) -> bool:
         """Check if role has specific permission"""
-        permissions = AdminPermissionManager.ROLE_PERMISSIONS.get(role, [])
-        return permission in permissions
+        return permission in ROLE_PERMISSION_SETS.get(role, frozenset())
     
     @staticmethod
     def get_role_permissions(role: str) -> list:
@@ -123,8 +127,111 @@ class AdminPermissionManager:
         return AdminPermissionManager.ROLE_PERMISSIONS.get(role, [])
 
 
-async def get_current_admin(request: Request, db: AsyncSession = Depends(get_db)) -> AdminUser:
-    """Extract and verify JWT for admin; return the AdminUser object."""
+# Precomputed once so permission checks are a single set lookup
+ROLE_PERMISSION_SETS: Dict[str, FrozenSet[str]] = {
+    role: frozenset(permissions) for role, permissions in AdminPermissionManager.ROLE_PERMISSIONS.items()
+}
+
+
+@dataclass(frozen=True)
+class AdminPrincipal:
+    """Authenticated admin resolved from the access token (detached from any session)"""
+    id: str
+    email: str
+    role: str
+    first_name: str
+    last_name: str
+    is_active: bool
+    permissions: FrozenSet[str]
+
+    @classmethod
+    def from_admin(cls, admin: AdminUser) -> "AdminPrincipal":
+        role = getattr(admin.role, "value", admin.role)
+        return cls(
+            id=admin.id,
+            email=admin.email,
+            role=role,
+            first_name=admin.first_name,
+            last_name=admin.last_name,
+            is_active=bool(admin.is_active),
+            permissions=ROLE_PERMISSION_SETS.get(role, frozenset()),
+        )
+
+    def has_permission(self, permission: str) -> bool:
+        return permission in self.permissions
+
+
+class AdminPrincipalCache:
+    """Per-process TTL cache of admin principals keyed by admin id.
+
+    Entries are dropped once an ORM update or delete of an AdminUser row
+    commits; the TTL bounds staleness for edits made by other workers.
+    """
+
+    _entries: Dict[str, Tuple[float, AdminPrincipal]] = {}
+    MAX_ENTRIES = 1024
+
+    @classmethod
+    def get(cls, admin_id: str) -> Optional[AdminPrincipal]:
+        entry = cls._entries.get(admin_id)
+        if not entry:
+            cache_requests_total.inc(cache="admin_principal", result="miss")
+            return None
+        expires_at, principal = entry
+        if expires_at < time.monotonic():
+            cls._entries.pop(admin_id, None)
+            cache_requests_total.inc(cache="admin_principal", result="expired")
+            return None
+        cache_requests_total.inc(cache="admin_principal", result="hit")
+        return principal
+
+    @classmethod
+    def put(cls, principal: AdminPrincipal) -> None:
+        ttl = settings.ADMIN_PRINCIPAL_CACHE_TTL_SECONDS
+        if ttl <= 0:
+            return
+        if len(cls._entries) >= cls.MAX_ENTRIES:
+            cls._entries.pop(next(iter(cls._entries)), None)
+        cls._entries[principal.id] = (time.monotonic() + ttl, principal)
+
+    @classmethod
+    def invalidate(cls, admin_id: str) -> None:
+        cls._entries.pop(admin_id, None)
+
+    @classmethod
+    def clear(cls) -> None:
+        cls._entries.clear()
+
+
+@event.listens_for(AdminUser, "after_update")
+@event.listens_for(AdminUser, "after_delete")
+def _invalidate_admin_principal(mapper, connection, target: AdminUser) -> None:
+    # Evicting at flush would let a concurrent request re-cache the old
+    # committed row, so only note the id here and evict once it commits
+    session = object_session(target)
+    if session is None:
+        AdminPrincipalCache.invalidate(target.id)
+        return
+    session.info.setdefault("changed_admin_ids", set()).add(target.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _evict_changed_admins(session) -> None:
+    for admin_id in session.info.pop("changed_admin_ids", ()):
+        AdminPrincipalCache.invalidate(admin_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_changed_admins(session) -> None:
+    session.info.pop("changed_admin_ids", None)
+
+
+async def get_current_admin(request: Request, db: AsyncSession = Depends(get_db)) -> AdminPrincipal:
+    """Resolve the admin from the signed access token.
+
+    The admin's role and status come from AdminPrincipalCache, so only a cache
+    miss costs a database round-trip.
+    """
     auth = request.headers.get("Authorization")
     if not auth or not auth.startswith("Bearer "):
         raise HTTPException(
@@ -139,11 +246,17 @@ async def get_current_admin(request: Request, db: AsyncSession = Depends(get_db)
             detail="Invalid or expired admin token",
         )
     admin_id = str(payload["sub"])
-    result = await db.execute(select(AdminUser).where(AdminUser.id == admin_id))
-    admin = result.scalar_one_or_none()
-    if not admin or not getattr(admin, "is_active", True):
+    principal = AdminPrincipalCache.get(admin_id)
+    if principal is None:
+        result = await db.execute(select(AdminUser).where(AdminUser.id == admin_id))
+        admin = result.scalar_one_or_none()
+        if admin:
+            principal = AdminPrincipal.from_admin(admin)
+            AdminPrincipalCache.put(principal)
+    if not principal or not principal.is_active:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Admin not found or inactive",
         )
-    return admin
+    set_request_principal(f"admin:{principal.id}")
+    return principal
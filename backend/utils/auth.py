@@ -5,6 +5,7 @@ from typing import Optional, Dict, Any
 from passlib.context import CryptContext
 from fastapi import Request, HTTPException, status
 from config import settings
+from utils.request_context import set_request_principal
 import secrets
 
 # Password hashing
@@ -115,7 +116,9 @@ async def get_current_user_id(request: Request) -> str:
                 # verify_session returns None if invalid, or raises exception
                 resp = stytch_client.sessions.authenticate(session_token=token)
                 if resp.status_code == 200:
-                    return str(resp.session.user_id)
+                    user_id = str(resp.session.user_id)
+                    set_request_principal(user_id)
+                    return user_id
             except Exception:
                 # Fallback to local JWT if Stytch fails or token is a local JWT
                 pass
@@ -126,7 +129,9 @@ async def get_current_user_id(request: Request) -> str:
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid or expired token",
         )
-    return str(payload["sub"])
+    user_id = str(payload["sub"])
+    set_request_principal(user_id)
+    return user_id
 
 
 def generate_verification_token() -> str:
@@ -0,0 +1,84 @@
+"""
+Fire-and-forget background task helper.
+Keeps strong references to running tasks so they are not garbage collected
+and logs failures instead of letting them disappear silently.
+"""
+
+import asyncio
+from typing import Any, Callable, Coroutine, Optional
+from utils.logger import logger
+from utils.metrics import background_tasks_total, registry
+
+_background_tasks: set[asyncio.Task] = set()
+
+
+def spawn_background_task(coro: Coroutine[Any, Any, Any], name: str) -> asyncio.Task:
+    """Schedule a coroutine on the running loop and track it until it finishes"""
+    task = asyncio.create_task(coro, name=name)
+    _background_tasks.add(task)
+
+    def _done_callback(t: asyncio.Task) -> None:
+        _background_tasks.discard(t)
+        if t.cancelled():
+            background_tasks_total.inc(outcome="cancelled")
+            return
+        exc = t.exception()
+        if exc:
+            background_tasks_total.inc(outcome="failed")
+            logger.error(f"Background task {name} failed", error=exc)
+        else:
+            background_tasks_total.inc(outcome="succeeded")
+
+    task.add_done_callback(_done_callback)
+    return task
+
+
+def running_task_count() -> int:
+    """Number of tracked background tasks still running"""
+    return len(_background_tasks)
+
+
+def _background_task_collector():
+    yield "background_tasks_running", "gauge", "Background tasks currently running", [({}, running_task_count())]
+
+
+registry.add_collector(_background_task_collector)
+
+
+class SideEffectBatch:
+    """Collects post-commit side effects (realtime publishes) and runs them in
+    one background task so a bulk request can return immediately.
+
+    Emails go through the email outbox instead.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._effects: list[tuple[Callable[..., Any], tuple]] = []
+
+    def add(self, fn: Callable[..., Any], *args: Any) -> None:
+        """Queue a non-blocking call (e.g. an Ably publish)"""
+        self._effects.append((fn, args))
+
+    def __len__(self) -> int:
+        return len(self._effects)
+
+    async def _run(self) -> None:
+        failed = 0
+        for index, (fn, args) in enumerate(self._effects):
+            try:
+                fn(*args)
+            except Exception as e:
+                failed += 1
+                logger.error(f"Side effect {getattr(fn, '__name__', fn)} failed in {self.name}", error=e)
+            if index % 50 == 49:
+                # Yield so a large batch does not starve request handlers
+                await asyncio.sleep(0)
+        if failed:
+            logger.warning(f"{self.name}: {failed}/{len(self._effects)} side effects failed")
+
+    def dispatch(self) -> Optional[asyncio.Task]:
+        """Run the queued effects in the background; call after the commit"""
+        if not self._effects:
+            return None
+        return spawn_background_task(self._run(), name=self.name)
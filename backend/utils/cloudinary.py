@@ -1,20 +1,28 @@
-import cloudinary
-import cloudinary.uploader
-import cloudinary.api
 from config import settings
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Union
 import hashlib
 import hmac
 import json
 import base64
 from datetime import datetime, timedelta
+from utils.lazy import lazy_import
+from utils.logger import logger
 
-# Configure Cloudinary
-cloudinary.config(
-    cloud_name=settings.CLOUDINARY_CLOUD_NAME,
-    api_key=settings.CLOUDINARY_API_KEY,
-    api_secret=settings.CLOUDINARY_API_SECRET
-)
+
+def _configure(module) -> None:
+    # Submodules are not attributes of the package until imported
+    import cloudinary.uploader  # noqa: F401
+    import cloudinary.api  # noqa: F401
+    module.config(
+        cloud_name=settings.CLOUDINARY_CLOUD_NAME,
+        api_key=settings.CLOUDINARY_API_KEY,
+        api_secret=settings.CLOUDINARY_API_SECRET,
+        secure=True
+    )
+
+
+# Imported and configured on first use
+cloudinary = lazy_import("cloudinary", on_import=_configure)
 
 
 class CloudinaryManager:
@@ -63,13 +71,15 @@ class CloudinaryManager:
         }
     
     @staticmethod
-    def upload_document(
-        file_path: str,
+    async def upload_document(
+        file: Union[bytes, str],
         document_type: str,
         user_id: str,
-        public_id: Optional[str] = None
+        public_id: Optional[str] = None,
+        filename: Optional[str] = None
     ) -> Dict[str, Any]:
-        """Upload document to Cloudinary with watermark"""
+        """Upload document (bytes or a file path) with watermark through the configured storage backend"""
+        from utils.storage import get_storage
         
         folder = f"documents/{document_type}"
         
@@ -78,6 +88,7 @@ class CloudinaryManager:
             "public_id": public_id or f"{user_id}_{document_type}_{datetime.utcnow().timestamp()}",
             "overwrite": True,
             "resource_type": "auto",
+            "filename": filename,
             "quality": "auto",
             "fetch_format": "auto",
             # Add watermark
@@ -91,16 +102,7 @@ class CloudinaryManager:
             }
         }
         
-        result = cloudinary.uploader.upload(file_path, **upload_params)
-        
-        return {
-            "public_id": result.get("public_id"),
-            "url": result.get("secure_url"),
-            "version": result.get("version"),
-            "format": result.get("format"),
-            "width": result.get("width"),
-            "height": result.get("height")
-        }
+        return await get_storage().upload(file, **upload_params)
     
     @staticmethod
     def delete_document(public_id: str, resource_type: str = "auto") -> bool:
@@ -109,7 +111,7 @@ class CloudinaryManager:
             result = cloudinary.uploader.destroy(public_id, resource_type=resource_type)
             return result.get("result") == "ok"
         except Exception as e:
-            print(f"Error deleting document: {e}")
+            logger.error("Error deleting document", error=e)
             return False
     
     @staticmethod
@@ -1,5 +1,6 @@
-import httpx
+from utils.http_client import outbound_client
 from utils.logger import logger
+from utils.metrics import cache_requests_total
 
 # Simple in-memory cache to avoid rate limits
 _price_cache = {}
@@ -17,10 +18,12 @@ async def get_crypto_price(symbol: str = "bitcoin") -> float:
     if symbol in _price_cache:
         price, expiry = _price_cache[symbol]
         if now < expiry:
+            cache_requests_total.inc(cache="crypto_price", result="hit")
             return price
+    cache_requests_total.inc(cache="crypto_price", result="miss")
 
     try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
+        async with outbound_client("crypto_prices", timeout=5.0) as client:
             # Source 1: CoinGecko
             url = f"https://api.coingecko.com/api/v3/simple/price?ids={symbol}&vs_currencies=usd"
             resp = await client.get(url)
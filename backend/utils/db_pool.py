@@ -0,0 +1,182 @@
+"""
+Connection pool telemetry.
+
+``InstrumentedAsyncPool`` times every checkout (including the wait for a free
+slot), and pool events track connection lifetimes, so pool exhaustion shows up
+as numbers instead of request timeouts. Each engine's pool gets its own
+``PoolMetrics``; the primary uses the module-level ``pool_metrics``.
+"""
+import threading
+import time
+from typing import Any, Dict
+from sqlalchemy import event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool
+from config import settings
+from utils.logger import logger
+from utils.metrics import registry
+
+
+class PoolMetrics:
+    """Process-wide counters for the database connection pool"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.checkouts = 0
+            self.checkout_wait_total = 0.0
+            self.checkout_wait_max = 0.0
+            self.slow_checkouts = 0
+            self.timeouts = 0
+            self.connects = 0
+            self.closes = 0
+            self.invalidations = 0
+            self.connection_age_max = 0.0
+            self._connected_at: Dict[int, float] = {}
+
+    def observe_checkout(self, wait_seconds: float) -> bool:
+        """Record one checkout; return True when it counts as slow"""
+        slow = wait_seconds * 1000 >= settings.DB_POOL_SLOW_CHECKOUT_MS
+        with self._lock:
+            self.checkouts += 1
+            self.checkout_wait_total += wait_seconds
+            self.checkout_wait_max = max(self.checkout_wait_max, wait_seconds)
+            if slow:
+                self.slow_checkouts += 1
+        return slow
+
+    def observe_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def observe_connect(self, key: int) -> None:
+        with self._lock:
+            self.connects += 1
+            self._connected_at[key] = time.monotonic()
+
+    def observe_close(self, key: int) -> None:
+        with self._lock:
+            self.closes += 1
+            connected_at = self._connected_at.pop(key, None)
+            if connected_at is not None:
+                self.connection_age_max = max(self.connection_age_max, time.monotonic() - connected_at)
+
+    def observe_invalidate(self) -> None:
+        with self._lock:
+            self.invalidations += 1
+
+    def snapshot(self, pool: Pool) -> Dict[str, Any]:
+        now = time.monotonic()
+        with self._lock:
+            ages = [now - connected_at for connected_at in self._connected_at.values()]
+            checkouts = self.checkouts
+            data = {
+                "checkouts": checkouts,
+                "checkout_wait_avg_ms": round(self.checkout_wait_total / checkouts * 1000, 3) if checkouts else 0.0,
+                "checkout_wait_total_ms": round(self.checkout_wait_total * 1000, 3),
+                "checkout_wait_max_ms": round(self.checkout_wait_max * 1000, 3),
+                "slow_checkouts": self.slow_checkouts,
+                "timeouts": self.timeouts,
+                "connects": self.connects,
+                "closes": self.closes,
+                "invalidations": self.invalidations,
+                "open_connections": len(ages),
+                "oldest_connection_age_s": round(max(ages), 1) if ages else 0.0,
+                "max_closed_connection_age_s": round(self.connection_age_max, 1),
+            }
+        if isinstance(pool, AsyncAdaptedQueuePool):
+            data.update({
+                "size": pool.size(),
+                "in_use": pool.checkedout(),
+                "idle": pool.checkedin(),
+                "overflow": max(pool.overflow(), 0),
+                "max_overflow": pool._max_overflow,
+            })
+        return data
+
+
+pool_metrics = PoolMetrics()
+
+
+class InstrumentedAsyncPool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that reports how long each checkout waited"""
+
+    metrics: PoolMetrics = pool_metrics
+    label: str = "primary"
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.observe_timeout()
+            logger.error(f"Database pool ({self.label}) exhausted after {time.perf_counter() - started:.1f}s: {self.metrics.snapshot(self)}")
+            raise
+        waited = time.perf_counter() - started
+        if self.metrics.observe_checkout(waited):
+            logger.warning(f"Slow database pool ({self.label}) checkout ({waited * 1000:.0f}ms): {self.metrics.snapshot(self)}")
+        return connection
+
+
+def instrumented_pool_class(label: str, metrics: PoolMetrics) -> type:
+    """Pool class bound to its own metrics; survives pool.recreate() on dispose"""
+    return type(f"InstrumentedAsyncPool[{label}]", (InstrumentedAsyncPool,), {"metrics": metrics, "label": label})
+
+
+def instrument_pool(pool: Pool) -> None:
+    """Attach lifetime listeners to ``pool`` (the engine's ``sync_engine.pool``)"""
+    pool_metrics = pool.metrics
+
+    @event.listens_for(pool, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        pool_metrics.observe_connect(id(connection_record))
+
+    @event.listens_for(pool, "close")
+    def _on_close(dbapi_connection, connection_record):
+        pool_metrics.observe_close(id(connection_record))
+
+    @event.listens_for(pool, "detach")
+    def _on_detach(dbapi_connection, connection_record):
+        # Detached connections leave the pool's accounting for good
+        pool_metrics.observe_close(id(connection_record))
+
+    @event.listens_for(pool, "invalidate")
+    def _on_invalidate(dbapi_connection, connection_record, exception):
+        pool_metrics.observe_invalidate()
+
+
+# (snapshot key, metric name, kind, help, scale)
+_POOL_SERIES = [
+    ("size", "db_pool_size", "gauge", "Configured persistent connections", 1),
+    ("in_use", "db_pool_in_use", "gauge", "Connections checked out", 1),
+    ("idle", "db_pool_idle", "gauge", "Connections idle in the pool", 1),
+    ("overflow", "db_pool_overflow", "gauge", "Overflow connections open", 1),
+    ("checkouts", "db_pool_checkouts_total", "counter", "Connection checkouts", 1),
+    ("checkout_wait_total_ms", "db_pool_checkout_wait_seconds_total", "counter", "Time spent waiting for checkouts", 0.001),
+    ("checkout_wait_max_ms", "db_pool_checkout_wait_max_seconds", "gauge", "Longest checkout wait", 0.001),
+    ("timeouts", "db_pool_timeouts_total", "counter", "Checkouts that timed out", 1),
+    ("connects", "db_pool_connects_total", "counter", "Connections opened", 1),
+    ("invalidations", "db_pool_invalidations_total", "counter", "Connections invalidated", 1),
+    ("oldest_connection_age_s", "db_pool_oldest_connection_age_seconds", "gauge", "Age of the oldest open connection", 1),
+]
+
+_published_pools: Dict[str, Any] = {}
+
+
+def publish_pool_metrics(label: str, engine) -> None:
+    """Expose ``engine``'s pool on /metrics as ``db_pool_*{pool=label}``"""
+    _published_pools[label] = engine
+
+
+def _pool_collector():
+    snapshots = []
+    for label, engine in _published_pools.items():
+        pool = engine.sync_engine.pool
+        snapshots.append((label, pool.metrics.snapshot(pool)))
+    for key, name, kind, documentation, scale in _POOL_SERIES:
+        yield name, kind, documentation, [({"pool": label}, snapshot.get(key, 0) * scale) for label, snapshot in snapshots]
+
+
+registry.add_collector(_pool_collector)
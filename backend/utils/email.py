@@ -1,14 +1,10 @@
 import logging
-import asyncio
 import html
 import socket
 from urllib.parse import quote
 from typing import Optional
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-import smtplib
-from email.utils import formataddr
-import httpx
+from sqlalchemy.ext.asyncio import AsyncSession
+from services.email_outbox import email_outbox
 from config import settings
 
 logger = logging.getLogger(__name__)
@@ -26,67 +22,6 @@ def mask_email(email: str) -> str:
         return "***"
 
 
-def _send_email_via_api(to_email: str, subject: str, html_content: str) -> bool:
-    """Send email via Resend's HTTP API. This bypasses all SMTP port blocks."""
-    if not settings.RESEND_API_KEY or settings.RESEND_API_KEY == 're_your_api_key_here':
-        logger.warning("RESEND_API_KEY not set. Falling back to SMTP (which may fail on Render).")
-        return False
-
-    try:
-        logger.info(f"Dispatching email via Resend API to {mask_email(to_email)}")
-        with httpx.Client(timeout=10.0) as client:
-            response = client.post(
-                "https://api.resend.com/emails",
-                headers={
-                    "Authorization": f"Bearer {settings.RESEND_API_KEY}",
-                    "Content-Type": "application/json",
-                },
-                json={
-                    "from": f"SCIB Bank <{settings.SMTP_FROM}>",
-                    "to": [to_email],
-                    "subject": subject,
-                    "html": html_content,
-                },
-            )
-            
-            if response.status_code in [200, 201]:
-                logger.info(f"API delivery successful: {response.json().get('id')}")
-                return True
-            else:
-                logger.error(f"Resend API error ({response.status_code}): {response.text}")
-                return False
-    except Exception as e:
-        logger.error(f"Resend API dispatch failed: {e}")
-        return False
-
-
-def _send_blocking_email(msg: MIMEMultipart) -> None:
-    """Fallback SMTP logic if API is not available."""
-    timeout = 60
-    server = None
-    try:
-        logger.info(f"FALLBACK: Connecting to SMTP {settings.SMTP_SERVER}:{settings.SMTP_PORT}")
-        
-        if int(settings.SMTP_PORT) == 465:
-            server = smtplib.SMTP_SSL(settings.SMTP_SERVER, settings.SMTP_PORT, timeout=timeout)
-        else:
-            server = smtplib.SMTP(settings.SMTP_SERVER, settings.SMTP_PORT, timeout=timeout)
-            server.starttls()
-
-        server.login(settings.SMTP_USER, settings.SMTP_PASSWORD)
-        server.send_message(msg)
-        logger.info("SMTP delivery successful!")
-    except Exception as e:
-        logger.error(f"FAILURE: SMTP delivery failed: {e}")
-        raise
-    finally:
-        if server:
-            try:
-                server.quit()
-            except Exception:
-                pass
-
-
 async def send_verification_email(email: str, verification_token: str, first_name: str) -> None:
     """Send verification email with 6-digit code to user"""
     try:
@@ -134,20 +69,9 @@ async def send_verification_email(email: str, verification_token: str, first_nam
         
         subject = "Verify Your SCIB Account"
         
-        # Try API delivery first
-        success = await asyncio.to_thread(_send_email_via_api, email, subject, html_content)
-        if success:
-            return
-
-        # Fallback to SMTP
-        msg = MIMEMultipart()
-        msg['From'] = formataddr(("SCIB Bank", settings.SMTP_FROM))
-        msg['To'] = formataddr((safe_display_name, email))
-        msg['Subject'] = subject
-        msg.attach(MIMEText(html_content, 'html'))
-        
-        await asyncio.to_thread(_send_blocking_email, msg)
-        logger.info(f"Verification email sent to {mask_email(email)}")
+        # Delivered by the email outbox workers (Resend, falling back to SMTP)
+        await email_outbox.enqueue(email, subject, html_content, "verification", to_name=safe_display_name)
+        logger.info(f"Verification email queued for {mask_email(email)}")
         
     except Exception as e:
         logger.error(f"Failed to send verification email to {mask_email(email)}: {e}")
@@ -205,26 +129,17 @@ async def send_login_alert(email: str, first_name: str, device_name: str, ip_add
         
         subject = "Security Alert: New Device Login Detected"
 
-        # Try API delivery first
-        success = await asyncio.to_thread(_send_email_via_api, email, subject, html_content)
-        if success:
-            return
-
-        # Fallback to SMTP
-        msg = MIMEMultipart()
-        msg['From'] = formataddr(("SCIB Bank", settings.SMTP_FROM))
-        msg['To'] = formataddr((safe_display_name, email))
-        msg['Subject'] = subject
-        msg.attach(MIMEText(html_content, 'html'))
-        
-        await asyncio.to_thread(_send_blocking_email, msg)
-        logger.info(f"Login alert sent to {mask_email(email)}")
+        # Delivered by the email outbox workers (Resend, falling back to SMTP)
+        await email_outbox.enqueue(email, subject, html_content, "login_alert", to_name=safe_display_name)
+        logger.info(f"Login alert queued for {mask_email(email)}")
     except Exception as e:
         logger.error(f"Failed to send login alert to {mask_email(email)}: {e}")
 
 
-async def send_statement_email(email: str, first_name: str, statement_url: str, start_date, end_date) -> None:
-    """Send monthly account statement to user"""
+async def send_statement_email(
+    email: str, first_name: str, statement_url: str, start_date, end_date, db: Optional[AsyncSession] = None
+) -> None:
+    """Send monthly account statement to user; with ``db`` the email is queued in the caller's transaction"""
     try:
         from datetime import datetime
         escaped_first_name = html.escape(first_name or "Valued Customer")
@@ -293,19 +208,8 @@ async def send_statement_email(email: str, first_name: str, statement_url: str,
         
         subject = f"Your {month_year} Account Statement"
 
-        # Try API delivery first
-        success = await asyncio.to_thread(_send_email_via_api, email, subject, html_content)
-        if success:
-            return
-
-        # Fallback to SMTP
-        msg = MIMEMultipart()
-        msg['From'] = formataddr(("SCIB Bank", settings.SMTP_FROM))
-        msg['To'] = formataddr((safe_display_name, email))
-        msg['Subject'] = subject
-        msg.attach(MIMEText(html_content, 'html'))
-        
-        await asyncio.to_thread(_send_blocking_email, msg)
-        logger.info(f"Statement email sent to {mask_email(email)}")
+        # Delivered by the email outbox workers (Resend, falling back to SMTP)
+        await email_outbox.enqueue(email, subject, html_content, "statement", to_name=safe_display_name, db=db)
+        logger.info(f"Statement email queued for {mask_email(email)}")
     except Exception as e:
         logger.error(f"Failed to send statement email to {mask_email(email)}: {e}")
@@ -0,0 +1,72 @@
+"""
+httpx clients for third-party APIs that report latency and outcome per service.
+
+    async with outbound_client("bankrouting", timeout=5.0) as client:
+        resp = await client.get(...)
+"""
+import time
+from typing import Optional
+import httpx
+from utils.metrics import outbound_http_duration_seconds, outbound_http_requests_total
+
+
+def _outcome(status_code: int) -> str:
+    return f"{status_code // 100}xx"
+
+
+class _InstrumentedAsyncTransport(httpx.AsyncBaseTransport):
+    def __init__(self, service: str, transport: httpx.AsyncBaseTransport):
+        self.service = service
+        self.transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.perf_counter()
+        try:
+            response = await self.transport.handle_async_request(request)
+        except Exception as e:
+            outbound_http_requests_total.inc(service=self.service, outcome=type(e).__name__)
+            raise
+        finally:
+            outbound_http_duration_seconds.observe(time.perf_counter() - started, service=self.service)
+        outbound_http_requests_total.inc(service=self.service, outcome=_outcome(response.status_code))
+        return response
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+
+class _InstrumentedTransport(httpx.BaseTransport):
+    def __init__(self, service: str, transport: httpx.BaseTransport):
+        self.service = service
+        self.transport = transport
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.perf_counter()
+        try:
+            response = self.transport.handle_request(request)
+        except Exception as e:
+            outbound_http_requests_total.inc(service=self.service, outcome=type(e).__name__)
+            raise
+        finally:
+            outbound_http_duration_seconds.observe(time.perf_counter() - started, service=self.service)
+        outbound_http_requests_total.inc(service=self.service, outcome=_outcome(response.status_code))
+        return response
+
+    def close(self) -> None:
+        self.transport.close()
+
+
+def outbound_client(service: str, transport: Optional[httpx.AsyncBaseTransport] = None, **kwargs) -> httpx.AsyncClient:
+    """AsyncClient labelled ``service`` in the outbound HTTP metrics"""
+    return httpx.AsyncClient(
+        transport=_InstrumentedAsyncTransport(service, transport or httpx.AsyncHTTPTransport()),
+        **kwargs,
+    )
+
+
+def outbound_sync_client(service: str, transport: Optional[httpx.BaseTransport] = None, **kwargs) -> httpx.Client:
+    """Blocking Client labelled ``service`` in the outbound HTTP metrics"""
+    return httpx.Client(
+        transport=_InstrumentedTransport(service, transport or httpx.HTTPTransport()),
+        **kwargs,
+    )
@@ -0,0 +1,57 @@
+"""
+Deferred imports for heavy optional SDKs (stytch, ably, cloudinary, reportlab).
+
+``lazy_import("stytch")`` returns a stand-in that imports the real module on
+first attribute access, so modules can keep writing ``stytch.Client(...)``
+while app startup no longer pays for the import.
+"""
+import importlib
+import threading
+from types import ModuleType
+from typing import Callable, Optional
+
+
+class LazyModule(ModuleType):
+    """Module proxy that imports its target on first attribute access"""
+
+    def __init__(self, name: str, on_import: Optional[Callable[[ModuleType], None]] = None):
+        super().__init__(name)
+        self.__dict__["_lazy_target"] = None
+        self.__dict__["_lazy_on_import"] = on_import
+        self.__dict__["_lazy_lock"] = threading.Lock()
+
+    def _load(self) -> ModuleType:
+        module = self.__dict__["_lazy_target"]
+        if module is not None:
+            return module
+        with self.__dict__["_lazy_lock"]:
+            module = self.__dict__["_lazy_target"]
+            if module is None:
+                module = importlib.import_module(self.__name__)
+                on_import = self.__dict__["_lazy_on_import"]
+                if on_import is not None:
+                    on_import(module)
+                self.__dict__["_lazy_target"] = module
+        return module
+
+    @property
+    def is_loaded(self) -> bool:
+        return self.__dict__["_lazy_target"] is not None
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr: str, value) -> None:
+        setattr(self._load(), attr, value)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.is_loaded else "not loaded"
+        return f"<lazy module '{self.__name__}' ({state})>"
+
+
+def lazy_import(name: str, on_import: Optional[Callable[[ModuleType], None]] = None) -> LazyModule:
+    """Return a proxy for ``name``; ``on_import`` runs once, right after the real import"""
+    return LazyModule(name, on_import)
@@ -1,13 +1,186 @@
 """
 Structured logging utility for backend
 Provides structured logging without exposing sensitive information
+
+Every logger (ours, the module-level ``logging`` loggers and uvicorn's) feeds
+one non-blocking pipeline: a ``QueueHandler`` on the root logger hands records
+to a ``QueueListener`` thread that does the actual formatting and I/O, so a
+slow stdout never stalls the event loop. When the queue is full records are
+dropped and counted instead of blocking, and call sites that log in a tight
+loop are sampled after a burst.
 """
 
+import atexit
 import logging
 import json
-from datetime import datetime
-from typing import Any, Optional
+import queue
+import threading
+import time
+import traceback
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Optional, Tuple
 from config import settings
+from utils.metrics import registry
+from utils.request_context import get_request_id, current_route
+
+log_records_dropped_total = registry.counter(
+    "log_records_dropped_total", "Log records dropped because the log queue was full", ("level",)
+)
+log_records_sampled_total = registry.counter(
+    "log_records_sampled_total", "Log records suppressed by per-call-site sampling", ("level",)
+)
+
+# LogRecord attributes that are not user-supplied ``extra`` fields
+_RESERVED_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "request_id", "route", "suppressed"}
+_MAX_SAMPLED_SITES = 2000
+
+
+class RequestContextFilter(logging.Filter):
+    """Stamps records with the request id and route while still on the caller's context"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = get_request_id()
+        record.route = current_route()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Lets LOG_SAMPLE_BURST records per call site through every LOG_SAMPLE_WINDOW_SECONDS.
+
+    Keyed by logger, level and source line so f-string messages from one call
+    site share a budget. The first record after a suppressed stretch carries
+    the number of records that were dropped.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._sites: Dict[Tuple[str, int, str, int], list] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.CRITICAL:
+            return True
+        key = (record.name, record.levelno, record.pathname, record.lineno)
+        now = time.monotonic()
+        with self._lock:
+            site = self._sites.get(key)
+            if site is None:
+                if len(self._sites) >= _MAX_SAMPLED_SITES:
+                    self._sites.clear()
+                site = self._sites[key] = [now, 0, 0]  # window start, passed, suppressed
+            if now - site[0] >= settings.LOG_SAMPLE_WINDOW_SECONDS:
+                if site[2]:
+                    record.suppressed = site[2]
+                site[0], site[1], site[2] = now, 0, 0
+            if site[1] < settings.LOG_SAMPLE_BURST:
+                site[1] += 1
+                return True
+            site[2] += 1
+        log_records_sampled_total.inc(level=record.levelname)
+        return False
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """QueueHandler that drops (and counts) records instead of blocking on a full queue"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Merge args and render the traceback now; the record crosses threads afterwards
+        record.message = record.getMessage()
+        if record.exc_info and not record.exc_text:
+            record.exc_text = "".join(traceback.format_exception(*record.exc_info)).rstrip()
+        record.msg = record.message
+        record.args = None
+        record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            log_records_dropped_total.inc(level=record.levelname)
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key in ("request_id", "route", "suppressed"):
+            value = getattr(record, key, None)
+            if value:
+                entry[key] = value
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and not key.startswith("_"):
+                entry[key] = value if isinstance(value, (str, int, float, bool, type(None))) else str(value)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__(fmt='%(asctime)s - %(name)s - %(levelname)s - %(message)s', datefmt='%Y-%m-%d %H:%M:%S')
+
+    def format(self, record: logging.LogRecord) -> str:
+        text = super().format(record)
+        request_id = getattr(record, "request_id", None)
+        if request_id:
+            text = f"{text} [request_id={request_id}]"
+        suppressed = getattr(record, "suppressed", None)
+        if suppressed:
+            text = f"{text} [{suppressed} similar suppressed]"
+        return text
+
+
+_listener: Optional[QueueListener] = None
+_configure_lock = threading.Lock()
+
+
+def configure_logging() -> None:
+    """Route the root logger (and uvicorn's loggers) through the queue; idempotent"""
+    global _listener
+    with _configure_lock:
+        if _listener is not None:
+            return
+        output = logging.StreamHandler()
+        output.setFormatter(JsonFormatter() if settings.LOG_FORMAT.lower() == "json" else TextFormatter())
+
+        handler = NonBlockingQueueHandler(queue.Queue(maxsize=settings.LOG_QUEUE_SIZE))
+        handler.addFilter(SamplingFilter())
+        handler.addFilter(RequestContextFilter())
+
+        root = logging.getLogger()
+        for existing in list(root.handlers):
+            root.removeHandler(existing)
+        root.addHandler(handler)
+        root.setLevel(getattr(logging, settings.LOG_LEVEL.upper(), logging.INFO))
+
+        # uvicorn installs its own synchronous handlers before importing the app
+        for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+            uvicorn_logger = logging.getLogger(name)
+            for existing in list(uvicorn_logger.handlers):
+                uvicorn_logger.removeHandler(existing)
+            uvicorn_logger.propagate = True
+
+        _listener = QueueListener(handler.queue, output, respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown_logging)
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the listener thread"""
+    global _listener
+    with _configure_lock:
+        if _listener is None:
+            return
+        _listener.stop()
+        _listener = None
 
 class StructuredLogger:
     """Structured logging for FastAPI backend"""
@@ -20,17 +193,8 @@ class StructuredLogger:
         """Configure logger based on environment"""
         log_level = getattr(logging, settings.LOG_LEVEL.upper(), logging.INFO)
         self.logger.setLevel(log_level)
-        
-        # Only add handlers if not already configured
-        if not self.logger.handlers:
-            formatter = logging.Formatter(
-                fmt='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-                datefmt='%Y-%m-%d %H:%M:%S'
-            )
-            
-            handler = logging.StreamHandler()
-            handler.setFormatter(formatter)
-            self.logger.addHandler(handler)
+        # Records propagate to the root logger's queue handler
+        configure_logging()
     
     def debug(self, message: str, **kwargs) -> None:
         """Log debug message"""
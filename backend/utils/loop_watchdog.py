@@ -0,0 +1,194 @@
+"""
+Event loop lag monitor and blocking-call detector.
+
+A heartbeat coroutine sleeps LOOP_LAG_SAMPLE_INTERVAL_MS at a time and records
+how late it wakes up; that lag is exported as percentiles on /metrics. A
+watchdog thread notices when the heartbeat has not run for longer than
+LOOP_BLOCK_THRESHOLD_MS, i.e. something is holding the loop (a synchronous SDK
+call, smtplib, reportlab, ...), and logs the loop thread's current stack along
+with the request it belongs to.
+
+With LOOP_BLOCK_STRICT (test runs) a request that blocked the loop raises
+``LoopBlockedError`` once it finishes, so the test client fails the test.
+"""
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, List, Optional
+from config import settings
+from utils.logger import logger
+from utils.metrics import registry
+from utils.request_context import route_template
+
+_LAG_WINDOW = 600
+_RECENT_BLOCKS = 50
+_QUANTILES = (0.5, 0.9, 0.99)
+_STACK_LIMIT = 25
+
+event_loop_blocks_total = registry.counter(
+    "event_loop_blocks_total", "Times the event loop was held longer than LOOP_BLOCK_THRESHOLD_MS", ("route",)
+)
+
+
+class LoopBlockedError(AssertionError):
+    """Raised in LOOP_BLOCK_STRICT mode after a request that blocked the event loop"""
+
+
+def _percentile(ordered: List[float], quantile: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(quantile * len(ordered)))]
+
+
+class LoopWatchdog:
+    """Heartbeat task plus a side thread watching it"""
+
+    def __init__(self):
+        self._lags: Deque[float] = deque(maxlen=_LAG_WINDOW)
+        self._blocks: Deque[Dict[str, Any]] = deque(maxlen=_RECENT_BLOCKS)
+        self._active_requests: Dict[Any, Dict[str, Any]] = {}
+        self._last_tick = time.monotonic()
+        self._reported_tick: Optional[float] = None
+        self._pending_block: Optional[Dict[str, Any]] = None
+        self._loop_thread_id: Optional[int] = None
+        self._heartbeat_task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._heartbeat_task is not None
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._last_tick = time.monotonic()
+        self._stop.clear()
+        self._heartbeat_task = asyncio.create_task(self._heartbeat(), name="loop-lag-heartbeat")
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+
+    async def stop(self) -> None:
+        if not self.running:
+            return
+        self._stop.set()
+        self._heartbeat_task.cancel()
+        try:
+            await self._heartbeat_task
+        except asyncio.CancelledError:
+            pass
+        self._heartbeat_task = None
+        self._thread.join(timeout=1.0)
+        self._thread = None
+
+    async def _heartbeat(self) -> None:
+        interval = settings.LOOP_LAG_SAMPLE_INTERVAL_MS / 1000
+        while True:
+            before = time.monotonic()
+            await asyncio.sleep(interval)
+            now = time.monotonic()
+            lag = max(0.0, now - before - interval)
+            self._lags.append(lag)
+            self._last_tick = now
+            pending = self._pending_block
+            if pending is not None:
+                # The block is over; record how long it actually lasted
+                pending["blocked_ms"] = round(lag * 1000, 1)
+                self._pending_block = None
+
+    def _watch(self) -> None:
+        threshold = settings.LOOP_BLOCK_THRESHOLD_MS / 1000
+        poll = max(0.01, threshold / 4)
+        while not self._stop.wait(poll):
+            tick = self._last_tick
+            stalled = time.monotonic() - tick
+            if stalled < threshold or self._reported_tick == tick:
+                continue
+            self._reported_tick = tick
+            try:
+                self._report_block(stalled)
+            except Exception as e:
+                logger.warning(f"Loop watchdog failed to capture a stack: {e}")
+
+    def _report_block(self, stalled: float) -> None:
+        frame = sys._current_frames().get(self._loop_thread_id)
+        request = None
+        walk = frame
+        while walk is not None and request is None:
+            request = self._active_requests.get(walk)
+            walk = walk.f_back
+        stack = "".join(traceback.format_stack(frame, limit=_STACK_LIMIT)) if frame is not None else ""
+        route = (request or {}).get("route") or "background"
+        block = {
+            "at": datetime.now(timezone.utc).isoformat(),
+            "route": route,
+            "blocked_ms": round(stalled * 1000, 1),
+            "stack": stack,
+        }
+        self._blocks.append(block)
+        self._pending_block = block
+        if request is not None:
+            # Counted by the middleware once the route template is known
+            request["blocks"].append(block)
+        else:
+            event_loop_blocks_total.inc(route=route)
+        logger.warning(f"Event loop blocked for >{stalled * 1000:.0f}ms in {route}:\n{stack}")
+
+    def lag_percentiles(self) -> Dict[str, float]:
+        ordered = sorted(self._lags)
+        stats = {f"p{int(quantile * 100)}_ms": round(_percentile(ordered, quantile) * 1000, 2) for quantile in _QUANTILES}
+        stats["max_ms"] = round(ordered[-1] * 1000, 2) if ordered else 0.0
+        return stats
+
+    def recent_blocks(self, limit: int = 20) -> List[Dict[str, Any]]:
+        return list(self._blocks)[-limit:][::-1]
+
+    def collect(self):
+        ordered = sorted(self._lags)
+        yield (
+            "event_loop_lag_seconds",
+            "summary",
+            "Event loop scheduling lag over the last samples",
+            [({"quantile": str(quantile)}, _percentile(ordered, quantile)) for quantile in _QUANTILES],
+        )
+
+
+loop_watchdog = LoopWatchdog()
+registry.add_collector(loop_watchdog.collect)
+
+
+class LoopBlockMiddleware:
+    """Pure ASGI middleware attributing loop blocks to requests.
+
+    Install it innermost so the handler runs in the same task as this frame;
+    the watchdog finds the request by walking the blocked stack up to it.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not loop_watchdog.running:
+            await self.app(scope, receive, send)
+            return
+        request = {"route": f"{scope.get('method', '')} {scope.get('path', '')}", "blocks": []}
+        frame = sys._getframe()
+        loop_watchdog._active_requests[frame] = request
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            loop_watchdog._active_requests.pop(frame, None)
+            route = route_template(scope) or "unmatched"
+            for block in request["blocks"]:
+                block["route"] = f"{scope.get('method', '')} {route}"
+                event_loop_blocks_total.inc(route=block["route"])
+        if settings.LOOP_BLOCK_STRICT and request["blocks"]:
+            worst = max(request["blocks"], key=lambda block: block["blocked_ms"])
+            raise LoopBlockedError(
+                f"{request['route']} blocked the event loop for {worst['blocked_ms']}ms:\n{worst['stack']}"
+            )
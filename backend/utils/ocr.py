@@ -2,7 +2,7 @@ from typing import Optional, Dict, Any
 from io import BytesIO
 import re
 from config import settings
-import httpx
+from utils.http_client import outbound_client
 
 
 def _load_modules():
@@ -110,7 +110,7 @@ async def extract_check_details_remote(url: str) -> Dict[str, Any]:
         if not key:
             return {"supported": False, "error": "OCR.Space API key missing"}
         try:
-            async with httpx.AsyncClient(timeout=30) as client:
+            async with outbound_client("ocr_space", timeout=30) as client:
                 data = {
                     "url": url,
                     "OCREngine": 2,
@@ -3,8 +3,11 @@ PDF Statement Generator
 Generates professional bank statements with account details, transactions, and balances
 """
 import io
+import os
+import signal
+import tempfile
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import letter, A4
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
@@ -12,11 +15,54 @@ from reportlab.lib.units import inch
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak
 from reportlab.platypus import Image as RLImage
 from reportlab.lib.enums import TA_CENTER, TA_RIGHT, TA_LEFT
+from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfgen import canvas
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Statements with more transaction rows than this are drawn by StatementCanvasRenderer
+CANVAS_ROW_THRESHOLD = 1000
+
+TRANSACTION_HEADERS = ['Date', 'Description', 'Reference', 'Debit', 'Credit', 'Balance']
+TRANSACTION_COL_WIDTHS = [0.9*inch, 1.8*inch, 1.2*inch, 1*inch, 1*inch, 1*inch]
+
+FOOTER_LINES = [
+    "This is a computer-generated statement and does not require a signature.",
+    "For questions or concerns, please contact customer service or visit your nearest branch.",
+    "",
+    "© 2026 SCIB Bank. All rights reserved.",
+    "Confidential - For account holder use only.",
+]
+
+
+def _transaction_row(trans: Dict[str, Any], currency: str) -> List[str]:
+    """Cell text for one transaction row, shared by both renderers"""
+    date_str = trans.get('date', '')
+    if isinstance(date_str, datetime):
+        date_str = date_str.strftime('%m/%d/%Y')
+    elif isinstance(date_str, str) and 'T' in date_str:
+        try:
+            date_str = datetime.fromisoformat(date_str.replace('Z', '+00:00')).strftime('%m/%d/%Y')
+        except:
+            pass
+    
+    description = trans.get('description', '')[:30]  # Truncate long descriptions
+    reference = trans.get('reference_number', '')[:15]
+    amount = trans.get('amount', 0.0)
+    balance = trans.get('balance_after', 0.0)
+    
+    # Determine debit/credit
+    debit = f"{currency} {abs(amount):,.2f}" if amount < 0 else ''
+    credit = f"{currency} {amount:,.2f}" if amount >= 0 else ''
+    
+    return [date_str, description, reference, debit, credit, f"{currency} {balance:,.2f}"]
+
+
+def statement_row_count(accounts_data: List[Dict[str, Any]]) -> int:
+    """Total transaction rows across all accounts of a statement"""
+    return sum(len(account.get('transactions') or []) for account in accounts_data)
+
 
 class StatementPDFGenerator:
     """Generate professional PDF statements for bank accounts"""
@@ -220,35 +266,10 @@ class StatementPDFGenerator:
             
             # Add transactions
             for trans in transactions:
-                date_str = trans.get('date', '')
-                if isinstance(date_str, datetime):
-                    date_str = date_str.strftime('%m/%d/%Y')
-                elif isinstance(date_str, str) and 'T' in date_str:
-                    try:
-                        date_str = datetime.fromisoformat(date_str.replace('Z', '+00:00')).strftime('%m/%d/%Y')
-                    except:
-                        pass
-                
-                description = trans.get('description', '')[:30]  # Truncate long descriptions
-                reference = trans.get('reference_number', '')[:15]
-                amount = trans.get('amount', 0.0)
-                balance = trans.get('balance_after', 0.0)
-                
-                # Determine debit/credit
-                debit = f"{currency} {abs(amount):,.2f}" if amount < 0 else ''
-                credit = f"{currency} {amount:,.2f}" if amount >= 0 else ''
-                
-                trans_data.append([
-                    date_str,
-                    description,
-                    reference,
-                    debit,
-                    credit,
-                    f"{currency} {balance:,.2f}"
-                ])
+                trans_data.append(_transaction_row(trans, currency))
             
             # Create transactions table
-            trans_table = Table(trans_data, colWidths=[0.9*inch, 1.8*inch, 1.2*inch, 1*inch, 1*inch, 1*inch])
+            trans_table = Table(trans_data, colWidths=TRANSACTION_COL_WIDTHS)
             trans_table.setStyle(TableStyle([
                 # Header row
                 ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#0073CF')),
@@ -285,15 +306,11 @@ class StatementPDFGenerator:
         
         elements.append(Spacer(1, 0.5*inch))
         
-        footer_text = """
-        <para align=center fontSize=8 textColor=#6B6B6B>
-        This is a computer-generated statement and does not require a signature.<br/>
-        For questions or concerns, please contact customer service or visit your nearest branch.<br/>
-        <br/>
-        © 2026 SCIB Bank. All rights reserved.<br/>
-        Confidential - For account holder use only.
-        </para>
-        """
+        footer_text = (
+            "<para align=center fontSize=8 textColor=#6B6B6B>"
+            + "<br/>".join(FOOTER_LINES)
+            + "</para>"
+        )
         
         elements.append(Paragraph(footer_text, self.styles['Normal']))
         
@@ -310,12 +327,267 @@ class StatementPDFGenerator:
         canvas.restoreState()
 
 
+class StatementCanvasRenderer:
+    """
+    Draws statements straight onto a reportlab canvas
+
+    Used for large statements: column geometry is computed once, rows are drawn
+    with plain drawString calls and each page is compressed and handed to the
+    document as soon as it fills, so render time and memory grow linearly with
+    the number of transactions instead of going through platypus table layout.
+    The output matches StatementPDFGenerator's layout, with the table header
+    repeated on every page.
+    """
+
+    PAGE_WIDTH, PAGE_HEIGHT = letter
+    MARGIN = 0.75*inch
+    ROW_HEIGHT = 20
+    HEADER_ROW_HEIGHT = 22
+    CELL_PADDING = 6
+    PRIMARY = colors.HexColor('#0073CF')
+    TEXT = colors.HexColor('#2C2C2C')
+    MUTED = colors.HexColor('#6B6B6B')
+    GRID = colors.HexColor('#E5E7EB')
+    STRIPE = colors.HexColor('#F9FAFB')
+    PAGE_FORM = 'transaction_page'
+
+    def __init__(self):
+        content_width = self.PAGE_WIDTH - 2*self.MARGIN
+        table_width = sum(TRANSACTION_COL_WIDTHS)
+        # Tables are centred in the frame, as platypus does
+        self.table_left = self.MARGIN + (content_width - table_width) / 2
+        self.table_right = self.table_left + table_width
+        self.col_edges = [self.table_left]
+        for width in TRANSACTION_COL_WIDTHS:
+            self.col_edges.append(self.col_edges[-1] + width)
+        self.header_x = [edge + self.CELL_PADDING for edge in self.col_edges[:-1]]
+        # Row text anchors: left-aligned for date/description/reference, right-aligned for amounts
+        self.text_x = [
+            (edge + self.CELL_PADDING, False) if idx < 3 else (self.col_edges[idx + 1] - self.CELL_PADDING, True)
+            for idx, edge in enumerate(self.col_edges[:-1])
+        ]
+        self.bottom = self.MARGIN
+        self.rows_per_page = int((self.PAGE_HEIGHT - 2*self.MARGIN - self.HEADER_ROW_HEIGHT) // self.ROW_HEIGHT)
+        self.canvas = None
+        self.y = 0.0
+        self._page_form_ready = False
+
+    def render(
+        self,
+        output,
+        user_data: Dict[str, Any],
+        accounts_data: List[Dict[str, Any]],
+        start_date: datetime,
+        end_date: datetime
+    ) -> None:
+        """
+        Render a statement
+
+        Args:
+            output: File path or binary file object the PDF is written to
+        """
+        self.canvas = canvas.Canvas(output, pagesize=letter, pageCompression=1)
+        self._page_form_ready = False
+        self.y = self.PAGE_HEIGHT - self.MARGIN
+        self._draw_header(user_data, start_date, end_date)
+        for idx, account in enumerate(accounts_data):
+            if idx > 0:
+                self._new_page()
+            self._draw_account(account)
+        self._draw_footer()
+        self._finish_page()
+        self.canvas.save()
+        self.canvas = None
+
+    def _finish_page(self) -> None:
+        c = self.canvas
+        c.saveState()
+        c.setFont('Helvetica', 9)
+        c.setFillColor(self.MUTED)
+        c.drawRightString(7.5*inch, 0.5*inch, f"Page {c.getPageNumber()}")
+        c.restoreState()
+
+    def _new_page(self) -> None:
+        self._finish_page()
+        self.canvas.showPage()
+        self.y = self.PAGE_HEIGHT - self.MARGIN
+
+    def _ensure_space(self, height: float) -> bool:
+        """Start a new page unless ``height`` fits; True when a page break happened"""
+        if self.y - height >= self.bottom:
+            return False
+        self._new_page()
+        return True
+
+    def _draw_centered(self, text: str, font: str, size: float, color, leading: float) -> None:
+        self.y -= leading
+        self.canvas.setFont(font, size)
+        self.canvas.setFillColor(color)
+        self.canvas.drawCentredString(self.PAGE_WIDTH / 2, self.y, text)
+
+    def _draw_label_rows(self, rows: List[List[str]], col_widths: List[float], row_height: float, label_color, value_right: bool) -> float:
+        """Two-column label/value block (user info, account summary); returns its left edge"""
+        c = self.canvas
+        left = self.MARGIN + (self.PAGE_WIDTH - 2*self.MARGIN - sum(col_widths)) / 2
+        for label, value in rows:
+            self.y -= row_height
+            c.setFont('Helvetica-Bold', 10)
+            c.setFillColor(label_color)
+            c.drawString(left + self.CELL_PADDING, self.y, label)
+            c.setFont('Helvetica', 10)
+            c.setFillColor(self.TEXT)
+            if value_right:
+                c.drawRightString(left + sum(col_widths) - self.CELL_PADDING, self.y, value)
+            else:
+                c.drawString(left + col_widths[0] + self.CELL_PADDING, self.y, value)
+        return left
+
+    def _draw_header(self, user_data: Dict[str, Any], start_date: datetime, end_date: datetime) -> None:
+        self._draw_centered("SCIB Bank", 'Helvetica-Bold', 24, self.PRIMARY, 24)
+        self.y -= 30
+        self._draw_centered("Account Statement", 'Helvetica', 12, self.MUTED, 14)
+        self._draw_centered(
+            f"{start_date.strftime('%B %d, %Y')} - {end_date.strftime('%B %d, %Y')}", 'Helvetica', 12, self.MUTED, 14
+        )
+        self.y -= 20 + 0.3*inch
+
+        user_name = f"{user_data.get('first_name', '')} {user_data.get('last_name', '')}".strip()
+        self._draw_label_rows([
+            ['Account Holder:', user_name],
+            ['Email:', user_data.get('email', '')],
+            ['Statement Date:', datetime.now().strftime('%B %d, %Y')],
+            ['Statement Period:', f"{start_date.strftime('%b %d, %Y')} - {end_date.strftime('%b %d, %Y')}"],
+        ], [2*inch, 4*inch], 20, self.MUTED, value_right=False)
+        self.y -= 0.4*inch
+
+    def _draw_section_header(self, text: str) -> None:
+        self._ensure_space(20 + 14 + 12 + self.HEADER_ROW_HEIGHT + self.ROW_HEIGHT)
+        self.y -= 20
+        self.canvas.setFont('Helvetica-Bold', 14)
+        self.canvas.setFillColor(self.PRIMARY)
+        self.y -= 14
+        self.canvas.drawString(self.MARGIN, self.y, text)
+        self.y -= 12
+
+    def _draw_account(self, account: Dict[str, Any]) -> None:
+        account_type = account.get('type', 'Account').title()
+        account_number = account.get('account_number', 'N/A')
+        masked_number = f"****{account_number[-4:]}" if len(account_number) > 4 else account_number
+        self._draw_section_header(f"{account_type} Account - {masked_number}")
+
+        currency = account.get('currency', 'USD')
+        self._ensure_space(4 * 18 + 0.3*inch)
+        left = self._draw_label_rows([
+            ['Opening Balance:', f"{currency} {account.get('opening_balance', 0.0):,.2f}"],
+            ['Total Credits:', f"{currency} {account.get('total_credits', 0.0):,.2f}"],
+            ['Total Debits:', f"{currency} {account.get('total_debits', 0.0):,.2f}"],
+            ['Closing Balance:', f"{currency} {account.get('closing_balance', 0.0):,.2f}"],
+        ], [2*inch, 2*inch], 18, self.TEXT, value_right=True)
+        self.canvas.setStrokeColor(self.PRIMARY)
+        self.canvas.setLineWidth(2)
+        self.canvas.line(left, self.y - 6, left + 4*inch, self.y - 6)
+        self.y -= 6 + 0.3*inch
+
+        transactions = account.get('transactions', [])
+        if not transactions:
+            self._ensure_space(16)
+            self.y -= 12
+            self.canvas.setFont('Helvetica', 10)
+            self.canvas.setFillColor(self.TEXT)
+            self.canvas.drawString(self.MARGIN, self.y, "No transactions during this period.")
+            return
+
+        self._draw_section_header("Transaction History")
+        rows = (_transaction_row(trans, currency) for trans in transactions)
+        remaining = len(transactions)
+        while remaining:
+            capacity = int((self.y - self.bottom - self.HEADER_ROW_HEIGHT) // self.ROW_HEIGHT)
+            if capacity < 1:
+                self._new_page()
+                continue
+            count = min(capacity, remaining)
+            self._draw_table_chunk([next(rows) for _ in range(count)])
+            remaining -= count
+            if remaining:
+                self._new_page()
+
+    def _draw_table_chunk(self, rows: List[List[str]]) -> None:
+        """Header plus ``rows`` from the cursor down; the rows are known to fit on the page"""
+        c = self.canvas
+        top = self.y
+        if top == self.PAGE_HEIGHT - self.MARGIN and len(rows) == self.rows_per_page:
+            # Full page: grid, stripes and header come from one cached form
+            if not self._page_form_ready:
+                c.beginForm(self.PAGE_FORM)
+                self._draw_table_chrome(top, len(rows))
+                c.endForm()
+                self._page_form_ready = True
+            c.doForm(self.PAGE_FORM)
+        else:
+            self._draw_table_chrome(top, len(rows))
+
+        # All cell text goes through one text object; only the origin changes per cell
+        text = c.beginText()
+        text.setFont('Helvetica', 8)
+        text.setFillColor(self.TEXT)
+        baseline = top - self.HEADER_ROW_HEIGHT - self.ROW_HEIGHT + (self.ROW_HEIGHT - 8) / 2 + 1
+        for cells in rows:
+            for (x, right_aligned), value in zip(self.text_x, cells):
+                if not value:
+                    continue
+                if right_aligned:
+                    x -= pdfmetrics.stringWidth(value, 'Helvetica', 8)
+                text.setTextOrigin(x, baseline)
+                text.textOut(value)
+            baseline -= self.ROW_HEIGHT
+        c.drawText(text)
+        self.y = top - self.HEADER_ROW_HEIGHT - len(rows) * self.ROW_HEIGHT
+
+    def _draw_table_chrome(self, top: float, row_count: int) -> None:
+        """Header row, alternating row backgrounds and grid for a table block"""
+        c = self.canvas
+        header_bottom = top - self.HEADER_ROW_HEIGHT
+        bottom = header_bottom - row_count * self.ROW_HEIGHT
+        width = self.table_right - self.table_left
+
+        c.setFillColor(self.PRIMARY)
+        c.rect(self.table_left, header_bottom, width, self.HEADER_ROW_HEIGHT, stroke=0, fill=1)
+        c.setFillColor(self.STRIPE)
+        for idx in range(1, row_count, 2):
+            c.rect(self.table_left, header_bottom - (idx + 1) * self.ROW_HEIGHT, width, self.ROW_HEIGHT, stroke=0, fill=1)
+
+        c.setStrokeColor(self.GRID)
+        c.setLineWidth(0.5)
+        lines = [(self.table_left, top, self.table_right, top)]
+        lines.extend(
+            (self.table_left, header_bottom - idx * self.ROW_HEIGHT, self.table_right, header_bottom - idx * self.ROW_HEIGHT)
+            for idx in range(row_count + 1)
+        )
+        lines.extend((edge, top, edge, bottom) for edge in self.col_edges)
+        c.lines(lines)
+
+        header = c.beginText()
+        header.setFont('Helvetica-Bold', 9)
+        header.setFillColor(colors.whitesmoke)
+        for x, value in zip(self.header_x, TRANSACTION_HEADERS):
+            header.setTextOrigin(x, header_bottom + 8)
+            header.textOut(value)
+        c.drawText(header)
+
+    def _draw_footer(self) -> None:
+        self._ensure_space(0.5*inch + len(FOOTER_LINES) * 10)
+        self.y -= 0.5*inch
+        for line in FOOTER_LINES:
+            self._draw_centered(line, 'Helvetica', 8, self.MUTED, 10)
+
+
 # Convenience function
 def generate_statement_pdf(
     user_data: Dict[str, Any],
     accounts_data: List[Dict[str, Any]],
     start_date: datetime,
-    end_date: datetime
+    end_date: datetime,
+    canvas_row_threshold: int = CANVAS_ROW_THRESHOLD
 ) -> bytes:
     """
     Generate a PDF statement
@@ -325,9 +597,87 @@ def generate_statement_pdf(
         accounts_data: List of accounts with transactions
         start_date: Statement start date
         end_date: Statement end date
+        canvas_row_threshold: Statements with more transactions are drawn
+            by StatementCanvasRenderer instead of platypus
         
     Returns:
         bytes: PDF content
     """
+    if statement_row_count(accounts_data) > canvas_row_threshold:
+        buffer = io.BytesIO()
+        StatementCanvasRenderer().render(buffer, user_data, accounts_data, start_date, end_date)
+        return buffer.getvalue()
     generator = StatementPDFGenerator()
     return generator.generate_statement(user_data, accounts_data, start_date, end_date)
+
+
+# Process-pool workers (see services/pdf_render_service.py). Each worker builds
+# the generator once, so styles and font metrics are loaded before the first job.
+_PRELOADED_FONTS = ('Helvetica', 'Helvetica-Bold')
+
+_worker_generator: Optional[StatementPDFGenerator] = None
+
+
+class RenderTimeout(Exception):
+    """A render job ran past its time limit inside the worker"""
+
+
+def _on_render_alarm(signum, frame):
+    raise RenderTimeout("Statement rendering exceeded its time limit")
+
+
+def init_render_worker() -> None:
+    """Pool initializer: preload fonts and styles, then render a blank statement to warm reportlab's lazy imports"""
+    global _worker_generator
+    for font_name in _PRELOADED_FONTS:
+        pdfmetrics.getFont(font_name)
+    _worker_generator = StatementPDFGenerator()
+    if hasattr(signal, 'setitimer'):
+        signal.signal(signal.SIGALRM, _on_render_alarm)
+    _worker_generator.generate_statement({}, [], datetime.utcnow(), datetime.utcnow())
+
+
+def render_statement_job(
+    user_data: Dict[str, Any],
+    accounts_data: List[Dict[str, Any]],
+    start_date: datetime,
+    end_date: datetime,
+    timeout_seconds: float,
+    output_dir: Optional[str] = None,
+    canvas_row_threshold: int = CANVAS_ROW_THRESHOLD
+):
+    """
+    Render one statement in a pool worker
+
+    Returns:
+        PDF bytes, or the path of a temp file under ``output_dir`` holding them
+        (the caller deletes it)
+    """
+    use_canvas = statement_row_count(accounts_data) > canvas_row_threshold
+    path = None
+    if output_dir is not None:
+        fd, path = tempfile.mkstemp(prefix='statement_', suffix='.pdf', dir=output_dir)
+        os.close(fd)
+    try:
+        if timeout_seconds and hasattr(signal, 'setitimer'):
+            signal.setitimer(signal.ITIMER_REAL, timeout_seconds)
+        try:
+            if use_canvas:
+                # Large statement: draw straight to the output file (or a buffer)
+                output = path or io.BytesIO()
+                StatementCanvasRenderer().render(output, user_data, accounts_data, start_date, end_date)
+                pdf_bytes = None if path else output.getvalue()
+            else:
+                generator = _worker_generator or StatementPDFGenerator()
+                pdf_bytes = generator.generate_statement(user_data, accounts_data, start_date, end_date)
+        finally:
+            if hasattr(signal, 'setitimer'):
+                signal.setitimer(signal.ITIMER_REAL, 0)
+        if path is not None and pdf_bytes is not None:
+            with open(path, 'wb') as output:
+                output.write(pdf_bytes)
+    except BaseException:
+        if path is not None:
+            os.remove(path)
+        raise
+    return path or pdf_bytes
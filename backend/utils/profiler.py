@@ -0,0 +1,271 @@
+"""
+On-demand sampling profiler for single requests.
+
+An admin mints a short-lived profile token (POST /admin/system/profiler/tokens)
+and replays the slow request with it:
+
+    curl -H "X-Profile-Token: <token>" https://.../api/v1/transfers/history
+
+While that request runs, a sampler thread records its stack every
+PROFILER_INTERVAL_MS. Samples are wall-clock: when the request is suspended
+(awaiting the database, an HTTP API, ...) its awaited coroutine chain is
+recorded instead of the event loop thread, so waiting shows up in the graph.
+The result is kept in memory and downloadable as speedscope JSON or collapsed
+stacks for flamegraph.pl; the response carries its id in ``X-Profile-Id``.
+
+The middleware is only installed when PROFILER_ENABLED is set, so there is no
+per-request cost otherwise.
+"""
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs
+from config import settings
+from utils.auth import create_access_token, verify_token
+from utils.logger import logger
+from utils.request_context import route_template
+
+PROFILE_HEADER = "X-Profile-Token"
+PROFILE_QUERY_PARAM = "__profile"
+
+_MAX_STACK_DEPTH = 200
+
+FrameKey = Tuple[str, str, int]
+Stack = Tuple[FrameKey, ...]
+
+
+def create_profile_token(admin_id: str, path_prefix: str = "/api/") -> Tuple[str, datetime]:
+    """Signed token that enables profiling for requests whose path starts with ``path_prefix``"""
+    expires_at = datetime.now(timezone.utc) + timedelta(minutes=settings.PROFILER_TOKEN_TTL_MINUTES)
+    token = create_access_token(
+        {"sub": admin_id, "type": "profile", "path": path_prefix},
+        expires_delta=timedelta(minutes=settings.PROFILER_TOKEN_TTL_MINUTES),
+    )
+    return token, expires_at
+
+
+def _frame_key(frame) -> FrameKey:
+    code = frame.f_code
+    return getattr(code, "co_qualname", code.co_name), code.co_filename, code.co_firstlineno
+
+
+def _awaitable_frame(obj):
+    return getattr(obj, "cr_frame", None) or getattr(obj, "gi_frame", None) or getattr(obj, "ag_frame", None)
+
+
+def _awaited(obj):
+    return getattr(obj, "cr_await", None) or getattr(obj, "gi_yieldfrom", None) or getattr(obj, "ag_await", None)
+
+
+class _Sampler(threading.Thread):
+    """Samples one request's stack from a side thread until stopped"""
+
+    def __init__(self, loop_thread_id: int, coro):
+        super().__init__(name="request-profiler", daemon=True)
+        self.loop_thread_id = loop_thread_id
+        self.coro = coro
+        self.root = coro.cr_frame
+        self.interval = settings.PROFILER_INTERVAL_MS / 1000
+        self.deadline = time.perf_counter() + settings.PROFILER_MAX_SECONDS
+        self.stacks: Dict[Stack, List[float]] = {}
+        self.truncated = False
+        self._stop_event = threading.Event()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.join(timeout=1.0)
+
+    def run(self) -> None:
+        last = time.perf_counter()
+        while not self._stop_event.wait(self.interval):
+            now = time.perf_counter()
+            if now > self.deadline:
+                self.truncated = True
+                return
+            try:
+                stack = self._sample()
+            except Exception:
+                # The request mutated its coroutine chain mid-walk; skip this tick
+                stack = None
+            if stack:
+                totals = self.stacks.setdefault(stack, [0, 0.0])
+                totals[0] += 1
+                totals[1] += (now - last) * 1000
+            last = now
+
+    def _sample(self) -> Optional[Stack]:
+        frame = sys._current_frames().get(self.loop_thread_id)
+        running: List[FrameKey] = []
+        while frame is not None and len(running) < _MAX_STACK_DEPTH:
+            running.append(_frame_key(frame))
+            if frame is self.root:
+                return tuple(reversed(running))
+            frame = frame.f_back
+
+        # Not on the CPU: record where the request is suspended
+        waiting: List[FrameKey] = []
+        obj = self.coro
+        while obj is not None and len(waiting) < _MAX_STACK_DEPTH:
+            frame = _awaitable_frame(obj)
+            if frame is None:
+                waiting.append((f"[await {type(obj).__name__}]", "", 0))
+                break
+            waiting.append(_frame_key(frame))
+            obj = _awaited(obj)
+        return tuple(waiting) if waiting else None
+
+
+class ProfileStore:
+    """Most recent request profiles, kept in memory"""
+
+    _lock = threading.Lock()
+    _profiles: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+    @classmethod
+    def add(cls, profile: Dict[str, Any]) -> None:
+        with cls._lock:
+            cls._profiles[profile["id"]] = profile
+            while len(cls._profiles) > settings.PROFILER_BUFFER_SIZE:
+                cls._profiles.popitem(last=False)
+
+    @classmethod
+    def get(cls, profile_id: str) -> Optional[Dict[str, Any]]:
+        with cls._lock:
+            return cls._profiles.get(profile_id)
+
+    @classmethod
+    def list(cls) -> List[Dict[str, Any]]:
+        with cls._lock:
+            profiles = list(cls._profiles.values())[::-1]
+        return [{key: value for key, value in profile.items() if key != "stacks"} for profile in profiles]
+
+
+def to_speedscope(profile: Dict[str, Any]) -> Dict[str, Any]:
+    """speedscope.app "sampled" file format"""
+    frame_index: Dict[FrameKey, int] = {}
+    frames: List[Dict[str, Any]] = []
+    samples: List[List[int]] = []
+    weights: List[float] = []
+    for stack, (_, elapsed_ms) in profile["stacks"].items():
+        indexes = []
+        for key in stack:
+            index = frame_index.get(key)
+            if index is None:
+                index = frame_index[key] = len(frames)
+                name, file, line = key
+                frames.append({"name": name, "file": file, "line": line} if file else {"name": name})
+            indexes.append(index)
+        samples.append(indexes)
+        weights.append(round(elapsed_ms, 3))
+    name = f"{profile['method']} {profile['path']}"
+    return {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "name": name,
+        "exporter": "banking-api request profiler",
+        "shared": {"frames": frames},
+        "profiles": [{
+            "type": "sampled",
+            "name": name,
+            "unit": "milliseconds",
+            "startValue": 0,
+            "endValue": round(sum(weights), 3),
+            "samples": samples,
+            "weights": weights,
+        }],
+    }
+
+
+def to_collapsed(profile: Dict[str, Any]) -> str:
+    """Brendan Gregg's collapsed stack format (one ``frame;frame;frame count`` line per stack)"""
+    lines = []
+    for stack, (count, _) in profile["stacks"].items():
+        frames = ";".join(f"{name} ({file.rsplit('/', 1)[-1]}:{line})" if file else name for name, file, line in stack)
+        lines.append(f"{frames} {count}")
+    return "\n".join(lines) + "\n"
+
+
+def _profile_claims(scope) -> Optional[Dict[str, Any]]:
+    token = None
+    for name, value in scope.get("headers", []):
+        if name == b"x-profile-token":
+            token = value.decode("latin-1")
+            break
+    if token is None and PROFILE_QUERY_PARAM.encode() in scope.get("query_string", b""):
+        token = (parse_qs(scope["query_string"].decode("latin-1")).get(PROFILE_QUERY_PARAM) or [None])[0]
+    if not token:
+        return None
+    claims = verify_token(token)
+    if not claims or claims.get("type") != "profile":
+        return None
+    if not scope.get("path", "").startswith(claims.get("path") or "/"):
+        return None
+    return claims
+
+
+_slots = threading.BoundedSemaphore(max(1, settings.PROFILER_MAX_CONCURRENT))
+
+
+class ProfilerMiddleware:
+    """Pure ASGI middleware profiling requests that carry a valid profile token.
+
+    Install it innermost (before other middleware) so the request handler runs
+    in the same task as this middleware's frame.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        claims = _profile_claims(scope)
+        if claims is None:
+            await self.app(scope, receive, send)
+            return
+
+        if not _slots.acquire(blocking=False):
+            async def send_busy(message):
+                if message["type"] == "http.response.start":
+                    message = {**message, "headers": [*message.get("headers", []), (b"x-profile-status", b"busy")]}
+                await send(message)
+            await self.app(scope, receive, send_busy)
+            return
+
+        profile_id = uuid.uuid4().hex[:12]
+        status_holder = {"status": 500}
+
+        async def send_with_profile_id(message):
+            if message["type"] == "http.response.start":
+                status_holder["status"] = message["status"]
+                message = {**message, "headers": [*message.get("headers", []), (b"x-profile-id", profile_id.encode())]}
+            await send(message)
+
+        coro = self.app(scope, receive, send_with_profile_id)
+        sampler = _Sampler(threading.get_ident(), coro)
+        started = time.perf_counter()
+        sampler.start()
+        try:
+            await coro
+        finally:
+            duration_ms = (time.perf_counter() - started) * 1000
+            sampler.stop()
+            _slots.release()
+            ProfileStore.add({
+                "id": profile_id,
+                "at": datetime.now(timezone.utc).isoformat(),
+                "admin_id": claims.get("sub"),
+                "method": scope.get("method"),
+                "path": scope.get("path"),
+                "route": route_template(scope),
+                "status": status_holder["status"],
+                "duration_ms": round(duration_ms, 2),
+                "samples": sum(count for count, _ in sampler.stacks.values()),
+                "truncated": sampler.truncated,
+                "stacks": sampler.stacks,
+            })
+            logger.info(f"Profiled {scope.get('method')} {scope.get('path')} in {duration_ms:.0f}ms (profile {profile_id})")
@@ -0,0 +1,160 @@
+"""
+Per-request SQL instrumentation.
+
+Cursor execute events time every statement, count it into the ``QueryStats``
+of the current request and hand slow ones to ``SlowQueryLog``. ``QueryStatsMiddleware`` reports them in a
+``Server-Timing`` header and warns when one statement shape repeats often enough
+to look like an N+1 loop. ``assert_max_queries`` puts the same counters around
+any block, e.g. a test calling an endpoint:
+
+    with assert_max_queries(5, "GET /api/v1/transfers/history"):
+        await client.get("/api/v1/transfers/history")
+"""
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from config import settings
+from utils.logger import logger
+from utils.slow_queries import SlowQueryLog
+
+_IN_LIST = re.compile(r"\((?:\$\d+(?:::[\w ]+)?|\?)(?:, (?:\$\d+(?:::[\w ]+)?|\?))+\)")
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![\w$])\d+(?:\.\d+)?\b")
+
+
+def statement_shape(statement: str) -> str:
+    """Collapse literals and expanded IN lists so loop iterations share one shape"""
+    shape = _IN_LIST.sub("(...)", statement)
+    shape = _STRING_LITERAL.sub("?", shape)
+    shape = _NUMBER_LITERAL.sub("?", shape)
+    return " ".join(shape.split())
+
+
+class QueryStats:
+    """Statements executed within one request (or one capture block)"""
+
+    __slots__ = ("count", "seconds", "statements")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.statements: Counter = Counter()
+
+    def record(self, statement: str, elapsed: float) -> None:
+        self.count += 1
+        self.seconds += elapsed
+        self.statements[statement] += 1
+
+    def merge(self, other: "QueryStats") -> None:
+        self.count += other.count
+        self.seconds += other.seconds
+        self.statements.update(other.statements)
+
+    def shape_counts(self) -> Counter:
+        shapes: Counter = Counter()
+        for statement, count in self.statements.items():
+            shapes[statement_shape(statement)] += count
+        return shapes
+
+    def repeated_shapes(self, threshold: int) -> List[Tuple[str, int]]:
+        """Statement shapes executed more than ``threshold`` times, most frequent first"""
+        if self.count <= threshold:
+            return []
+        return [(shape, count) for shape, count in self.shape_counts().most_common() if count > threshold]
+
+    def report(self, limit: int = 10) -> str:
+        lines = [f"{self.count} queries, {self.seconds * 1000:.1f}ms"]
+        for shape, count in self.shape_counts().most_common(limit):
+            lines.append(f"  {count:>4}x  {shape[:240]}")
+        return "\n".join(lines)
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    return _current_stats.get()
+
+
+# The start time rides on the statement's execution context, so a statement that
+# raises (and never reaches after_cursor_execute) leaves nothing behind on the
+# pooled connection
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._query_stats_started = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_query_stats_started", None)
+    if started is None:
+        return
+    elapsed = time.perf_counter() - started
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.record(statement, elapsed)
+    SlowQueryLog.observe(statement, parameters, executemany, elapsed)
+
+
+@contextmanager
+def capture_queries() -> Iterator[QueryStats]:
+    """Collect the statements executed inside the block (including nested requests)"""
+    stats = QueryStats()
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+@contextmanager
+def assert_max_queries(limit: int, label: str = "block") -> Iterator[QueryStats]:
+    """Fail with the statement breakdown when the block runs more than ``limit`` queries"""
+    with capture_queries() as stats:
+        yield stats
+    if stats.count > limit:
+        raise AssertionError(f"{label} ran {stats.count} queries (limit {limit})\n{stats.report()}")
+
+
+class QueryStatsMiddleware:
+    """ASGI middleware: per-request query counting, Server-Timing and N+1 warnings"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.QUERY_STATS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        parent = _current_stats.get()
+        stats = QueryStats()
+        token = _current_stats.set(stats)
+        started = time.perf_counter()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start" and settings.QUERY_STATS_SERVER_TIMING:
+                timing = (
+                    f'db;dur={stats.seconds * 1000:.1f};desc="{stats.count} queries", '
+                    f"app;dur={(time.perf_counter() - started) * 1000:.1f}"
+                )
+                message = {**message, "headers": [*message.get("headers", []), (b"server-timing", timing.encode())]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_stats.reset(token)
+            if parent is not None:
+                parent.merge(stats)
+            for shape, count in stats.repeated_shapes(settings.QUERY_REPEAT_WARN_THRESHOLD):
+                logger.warning(
+                    f"Possible N+1: statement ran {count}x in {scope.get('method')} {scope.get('path')} "
+                    f"({stats.count} queries, {stats.seconds * 1000:.0f}ms total): {shape[:300]}"
+                )
@@ -0,0 +1,97 @@
+"""
+Per-request values shared across layers without threading them through calls.
+
+FastAPI runs async dependencies and the endpoint in the same context, so a
+value set by an auth dependency is visible to the database layer afterwards.
+"""
+import re
+import uuid
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+
+_request_principal: ContextVar[Optional[str]] = ContextVar("request_principal", default=None)
+_request_scope: ContextVar[Optional[Dict[str, Any]]] = ContextVar("request_scope", default=None)
+_request_id: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+# Accept a caller-supplied X-Request-ID (load balancer, frontend) only if it looks like an id
+_VALID_REQUEST_ID = re.compile(r"^[A-Za-z0-9._:-]{8,128}$")
+
+
+def set_request_principal(principal_id: Optional[str]) -> None:
+    """Record the authenticated user/admin for the current request"""
+    _request_principal.set(principal_id)
+
+
+def get_request_principal() -> Optional[str]:
+    return _request_principal.get()
+
+
+def get_request_id() -> Optional[str]:
+    """Correlation id of the current request (echoed in the X-Request-ID response header)"""
+    return _request_id.get()
+
+
+def route_template(scope) -> Optional[str]:
+    """Full path template of the route matched for ``scope`` (``/api/v1/accounts/{account_id}``).
+
+    None until the router has matched, or when nothing matched. FastAPI no
+    longer copies included routes onto the app, so ``scope["route"].path`` is
+    relative to the route's own router (``/history``, or ``""`` for a router's
+    root); the effective route it records for the include chain carries the
+    prefixed template. Routes declared on the app itself only have the former.
+    """
+    effective = (scope.get("fastapi") or {}).get("effective_route_context")
+    path = getattr(effective, "path_format", None)
+    if path:
+        return path
+    route = scope.get("route")
+    return getattr(route, "path_format", None) or getattr(route, "path", None) or None
+
+
+def current_route() -> Optional[str]:
+    """``METHOD /route/{template}`` of the current request, or None outside a request.
+
+    The router adds the matched route to the scope after middleware has run,
+    so this resolves to the template once the endpoint is executing.
+    """
+    scope = _request_scope.get()
+    if scope is None:
+        return None
+    path = route_template(scope) or scope.get("path", "")
+    return f"{scope.get('method', '')} {path}".strip()
+
+
+def _incoming_request_id(scope) -> str:
+    for name, value in scope.get("headers", []):
+        if name == b"x-request-id":
+            candidate = value.decode("latin-1")
+            if _VALID_REQUEST_ID.match(candidate):
+                return candidate
+            break
+    return uuid.uuid4().hex
+
+
+class RequestContextMiddleware:
+    """ASGI middleware that makes the current request scope and id available to lower layers"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        request_id = _incoming_request_id(scope)
+
+        async def send_with_request_id(message):
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": [*message.get("headers", []), (b"x-request-id", request_id.encode())]}
+            await send(message)
+
+        token = _request_scope.set(scope)
+        id_token = _request_id.set(request_id)
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            _request_id.reset(id_token)
+            _request_scope.reset(token)
@@ -0,0 +1,160 @@
+"""
+Slow query recorder.
+
+Statements slower than SLOW_QUERY_THRESHOLD_MS are kept in a ring buffer with
+their normalized SQL, parameter shape (types only, never values), route and
+duration, and aggregated per statement shape for a top-N report. A sample of
+them is re-run as EXPLAIN on a separate connection so the plan is captured
+next to the timing.
+"""
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, List, Optional
+from sqlalchemy import text
+from config import settings
+from utils.background import spawn_background_task
+from utils.logger import logger
+from utils.request_context import current_route
+
+_MAX_TRACKED_SHAPES = 500
+_EXPLAIN_COOLDOWN_SECONDS = 600
+
+
+def parameters_shape(parameters: Any, executemany: bool = False) -> Any:
+    """Describe bound parameters by type so the log never holds customer data"""
+    if executemany and isinstance(parameters, (list, tuple)) and parameters:
+        return {"rows": len(parameters), "row": parameters_shape(parameters[0])}
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(value).__name__ for value in parameters]
+    return type(parameters).__name__
+
+
+def _explain_prefix(statement: str) -> Optional[str]:
+    """ANALYZE re-executes the statement, so only plain SELECTs get it; DML gets a bare plan"""
+    head = statement.lstrip().upper()
+    if head.startswith(("SELECT", "WITH")):
+        if " FOR UPDATE" in head or " FOR SHARE" in head or " FOR NO KEY UPDATE" in head:
+            return "EXPLAIN "
+        if head.startswith("WITH") and any(verb in head for verb in ("INSERT ", "UPDATE ", "DELETE ")):
+            return "EXPLAIN "
+        return "EXPLAIN (ANALYZE, BUFFERS) "
+    if head.startswith(("INSERT", "UPDATE", "DELETE")):
+        return "EXPLAIN "
+    return None
+
+
+class SlowQueryLog:
+    """Process-wide ring buffer and per-shape totals of slow statements"""
+
+    _lock = threading.Lock()
+    _entries: Deque[Dict[str, Any]] = deque(maxlen=settings.SLOW_QUERY_BUFFER_SIZE)
+    _totals: Dict[str, Dict[str, Any]] = {}
+    _explained_at: Dict[str, float] = {}
+    _explain_in_flight = False
+
+    @classmethod
+    def observe(cls, statement: str, parameters: Any, executemany: bool, elapsed: float) -> None:
+        """Called for every statement; cheap unless it crossed the threshold"""
+        duration_ms = elapsed * 1000
+        if duration_ms < settings.SLOW_QUERY_THRESHOLD_MS:
+            return
+
+        from utils.query_stats import statement_shape
+        shape = statement_shape(statement)
+        route = current_route()
+        entry = {
+            "at": datetime.now(timezone.utc).isoformat(),
+            "route": route,
+            "duration_ms": round(duration_ms, 2),
+            "statement": shape,
+            "parameters": parameters_shape(parameters, executemany),
+            "plan": None,
+        }
+        with cls._lock:
+            cls._entries.append(entry)
+            totals = cls._totals.get(shape)
+            if totals is None:
+                if len(cls._totals) >= _MAX_TRACKED_SHAPES:
+                    # Forget the cheapest shape to keep memory bounded
+                    cheapest = min(cls._totals, key=lambda key: cls._totals[key]["total_ms"])
+                    cls._totals.pop(cheapest, None)
+                totals = cls._totals[shape] = {"statement": shape, "count": 0, "total_ms": 0.0, "max_ms": 0.0, "routes": set()}
+            totals["count"] += 1
+            totals["total_ms"] += duration_ms
+            totals["max_ms"] = max(totals["max_ms"], duration_ms)
+            if route and len(totals["routes"]) < 10:
+                totals["routes"].add(route)
+
+        logger.warning(f"Slow query ({duration_ms:.0f}ms) in {route or 'background'}: {shape[:300]}")
+        cls._maybe_explain(statement, parameters, executemany, shape, entry)
+
+    @classmethod
+    def _maybe_explain(cls, statement: str, parameters: Any, executemany: bool, shape: str, entry: Dict[str, Any]) -> None:
+        prefix = _explain_prefix(statement)
+        if prefix is None or executemany or random.random() >= settings.SLOW_QUERY_EXPLAIN_SAMPLE_RATE:
+            return
+        now = time.monotonic()
+        with cls._lock:
+            if cls._explain_in_flight or now - cls._explained_at.get(shape, -_EXPLAIN_COOLDOWN_SECONDS) < _EXPLAIN_COOLDOWN_SECONDS:
+                return
+            cls._explain_in_flight = True
+            cls._explained_at[shape] = now
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            # No running event loop (sync tooling); skip the plan
+            cls._explain_in_flight = False
+            return
+        spawn_background_task(cls._explain(prefix + statement, parameters, entry), name="slow-query-explain")
+
+    @classmethod
+    async def _explain(cls, statement: str, parameters: Any, entry: Dict[str, Any]) -> None:
+        from database import engine
+        try:
+            async with engine.connect() as conn:
+                try:
+                    await conn.execute(text(f"SET LOCAL statement_timeout = {int(settings.SLOW_QUERY_EXPLAIN_TIMEOUT_MS)}"))
+                    result = await conn.exec_driver_sql(statement, tuple(parameters) if isinstance(parameters, list) else parameters)
+                    entry["plan"] = "\n".join(row[0] for row in result)
+                finally:
+                    # Never commit: ANALYZE executes the statement
+                    await conn.rollback()
+        except Exception as e:
+            entry["plan"] = f"EXPLAIN failed: {e}"
+            logger.warning(f"Slow query EXPLAIN failed: {e}")
+        finally:
+            cls._explain_in_flight = False
+
+    @classmethod
+    def recent(cls, limit: int = 50) -> List[Dict[str, Any]]:
+        with cls._lock:
+            return list(cls._entries)[-limit:][::-1]
+
+    @classmethod
+    def top(cls, limit: int = 20) -> List[Dict[str, Any]]:
+        with cls._lock:
+            ranked = sorted(cls._totals.values(), key=lambda totals: totals["total_ms"], reverse=True)[:limit]
+            return [
+                {
+                    "statement": totals["statement"],
+                    "count": totals["count"],
+                    "total_ms": round(totals["total_ms"], 2),
+                    "avg_ms": round(totals["total_ms"] / totals["count"], 2),
+                    "max_ms": round(totals["max_ms"], 2),
+                    "routes": sorted(totals["routes"]),
+                }
+                for totals in ranked
+            ]
+
+    @classmethod
+    def clear(cls) -> None:
+        with cls._lock:
+            cls._entries.clear()
+            cls._totals.clear()
+            cls._explained_at.clear()
@@ -0,0 +1,187 @@
+"""
+Pooled SMTP delivery.
+
+Opening an SMTP session costs a TCP connect, STARTTLS and AUTH (300-1500ms
+against hosted providers), far more than sending one message. SmtpPool keeps up
+to SMTP_POOL_SIZE authenticated sessions open and reuses them:
+
+    smtp_pool.send_message(msg)    # blocking, from any thread
+    await smtp_pool.send(msg)      # from the event loop, on the pool's own sender threads
+
+A session idle for longer than SMTP_POOL_NOOP_AFTER_SECONDS is checked with
+NOOP before reuse. One idle past SMTP_POOL_MAX_IDLE_SECONDS (servers drop idle
+clients after a few minutes) or that has sent SMTP_MAX_MESSAGES_PER_CONNECTION
+messages is closed instead. A send that fails because the server dropped the
+session is retried once on a fresh connection.
+"""
+import asyncio
+import smtplib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.message import Message
+from typing import List, Optional
+from config import settings
+from utils.logger import logger
+from utils.metrics import registry
+
+smtp_connections_opened_total = registry.counter(
+    "smtp_connections_opened_total", "SMTP sessions opened (connect, STARTTLS and login)"
+)
+smtp_messages_total = registry.counter(
+    "smtp_messages_total", "Messages handed to the SMTP server by outcome", ("outcome",)
+)
+smtp_send_duration_seconds = registry.histogram(
+    "smtp_send_duration_seconds", "Time to deliver one message over SMTP, including any reconnect"
+)
+
+
+class _Session:
+    __slots__ = ("smtp", "last_used", "messages")
+
+    def __init__(self, smtp: smtplib.SMTP):
+        self.smtp = smtp
+        self.last_used = time.monotonic()
+        self.messages = 0
+
+
+class SmtpPool:
+    """Thread-safe pool of authenticated SMTP sessions"""
+
+    def __init__(
+        self,
+        host: Optional[str] = None,
+        port: Optional[int] = None,
+        size: Optional[int] = None,
+        max_messages_per_connection: Optional[int] = None
+    ):
+        self.host = host or settings.SMTP_SERVER
+        self.port = int(port or settings.SMTP_PORT)
+        self.size = max(1, size or settings.SMTP_POOL_SIZE)
+        self.max_messages_per_connection = max_messages_per_connection or settings.SMTP_MAX_MESSAGES_PER_CONNECTION
+        # Most recently used last, so surplus sessions sit at the bottom and age out
+        self._idle: List[_Session] = []
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _connect(self) -> _Session:
+        if self.port == 465:
+            smtp = smtplib.SMTP_SSL(self.host, self.port, timeout=settings.SMTP_TIMEOUT_SECONDS)
+        else:
+            smtp = smtplib.SMTP(self.host, self.port, timeout=settings.SMTP_TIMEOUT_SECONDS)
+        try:
+            if self.port != 465 and settings.SMTP_USE_TLS:
+                smtp.starttls()
+            if settings.SMTP_USER:
+                smtp.login(settings.SMTP_USER, settings.SMTP_PASSWORD)
+        except BaseException:
+            smtp.close()
+            raise
+        smtp_connections_opened_total.inc()
+        return _Session(smtp)
+
+    @staticmethod
+    def _discard(session: _Session) -> None:
+        try:
+            session.smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            session.smtp.close()
+
+    @staticmethod
+    def _alive(session: _Session) -> bool:
+        try:
+            return session.smtp.noop()[0] == 250
+        except (smtplib.SMTPException, OSError):
+            return False
+
+    def _checkout(self) -> _Session:
+        while True:
+            with self._lock:
+                session = self._idle.pop() if self._idle else None
+            if session is None:
+                return self._connect()
+            idle = time.monotonic() - session.last_used
+            if idle > settings.SMTP_POOL_MAX_IDLE_SECONDS or (idle > settings.SMTP_POOL_NOOP_AFTER_SECONDS and not self._alive(session)):
+                self._discard(session)
+                continue
+            return session
+
+    def _checkin(self, session: _Session) -> None:
+        if session.messages >= self.max_messages_per_connection:
+            self._discard(session)
+            return
+        session.last_used = time.monotonic()
+        with self._lock:
+            self._idle.append(session)
+
+    @staticmethod
+    def _deliver(session: _Session, msg: Message) -> None:
+        session.smtp.send_message(msg)
+        session.messages += 1
+
+    @staticmethod
+    def _refused_only(error: BaseException) -> bool:
+        """Whether the server refused this message but the session is still usable.
+
+        Only 5xx refusals of a recipient, sender or message qualify: smtplib has
+        RSET the session. A 421 means the server is closing it, and auth or
+        other failures leave it in an unknown state.
+        """
+        if isinstance(error, smtplib.SMTPRecipientsRefused):
+            return all(500 <= code < 600 for code, _ in error.recipients.values())
+        if isinstance(error, (smtplib.SMTPSenderRefused, smtplib.SMTPDataError)):
+            return 500 <= error.smtp_code < 600
+        return False
+
+    def send_message(self, msg: Message) -> None:
+        """Deliver one message on a pooled session (blocking); raises the SMTP error on failure"""
+        started = time.perf_counter()
+        with self._slots:
+            session = self._checkout()
+            try:
+                try:
+                    self._deliver(session, msg)
+                except OSError as e:
+                    # SMTPException is an OSError too: only a dropped connection is retried
+                    if isinstance(e, smtplib.SMTPException) and not isinstance(e, smtplib.SMTPServerDisconnected):
+                        raise
+                    # Dropped between the health check and the send; retry once on a fresh session
+                    self._discard(session)
+                    session = None
+                    session = self._connect()
+                    self._deliver(session, msg)
+            except BaseException as e:
+                refused = isinstance(e, (smtplib.SMTPResponseException, smtplib.SMTPRecipientsRefused))
+                smtp_messages_total.inc(outcome="refused" if refused else "failed")
+                if session is not None:
+                    if self._refused_only(e):
+                        self._checkin(session)
+                    else:
+                        self._discard(session)
+                raise
+            self._checkin(session)
+        smtp_messages_total.inc(outcome="sent")
+        smtp_send_duration_seconds.observe(time.perf_counter() - started)
+
+    async def send(self, msg: Message) -> None:
+        """Deliver one message from the event loop on the pool's sender threads"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.size, thread_name_prefix="smtp")
+        await asyncio.get_running_loop().run_in_executor(self._executor, self.send_message, msg)
+
+    def close(self) -> None:
+        """Stop the sender threads and QUIT every idle session"""
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+        with self._lock:
+            sessions, self._idle = self._idle, []
+        for session in sessions:
+            self._discard(session)
+        if sessions:
+            logger.info(f"Closed {len(sessions)} pooled SMTP sessions")
+
+
+# Shared by every sender in the process
+smtp_pool = SmtpPool()
@@ -0,0 +1,269 @@
+"""
+Async file storage for statements and uploaded documents.
+
+    storage = get_storage()
+    result = await storage.upload(pdf_bytes, folder="statements", public_id="...", resource_type="raw")
+    result["url"]
+
+STORAGE_BACKEND selects the implementation:
+
+    cloudinary  Cloudinary Upload API over a pooled httpx client. Files larger
+                than STORAGE_CHUNK_SIZE_BYTES go up in chunks (the protocol
+                the SDK's upload_large uses); each request is retried with
+                backoff on network errors, 429 and 5xx.
+    local       Files under STORAGE_LOCAL_DIR, served from STORAGE_LOCAL_BASE_URL.
+                For development and offline benchmarks.
+
+At most STORAGE_MAX_CONCURRENT_UPLOADS uploads run at once per process. The
+Cloudinary SDK is only used to build and sign upload parameters, so uploads
+never block the event loop.
+"""
+import asyncio
+import os
+import random
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+import httpx
+from config import settings
+from utils.cloudinary import cloudinary
+from utils.http_client import outbound_client
+from utils.logger import logger
+
+Upload = Union[bytes, str]  # file content, or a local file path
+
+# Cloudinary rejects chunks smaller than 5MB (except the last)
+_MIN_CHUNK_SIZE = 5 * 1024 * 1024
+_RETRY_STATUSES = {408, 429, 500, 502, 503, 504}
+_RETRY_BASE_DELAY_SECONDS = 0.5
+
+
+class StorageError(Exception):
+    """An upload or delete failed after retries"""
+
+
+def _read_range(path: str, offset: int, size: int) -> bytes:
+    with open(path, "rb") as source:
+        source.seek(offset)
+        return source.read(size)
+
+
+class StorageBackend:
+    """Common interface; ``upload`` returns a dict with at least ``public_id`` and ``url``"""
+
+    def __init__(self):
+        self._slots = asyncio.Semaphore(max(1, settings.STORAGE_MAX_CONCURRENT_UPLOADS))
+
+    async def upload(
+        self,
+        file: Upload,
+        folder: str,
+        public_id: Optional[str] = None,
+        resource_type: str = "auto",
+        filename: Optional[str] = None,
+        **options
+    ) -> Dict[str, Any]:
+        """
+        Store a file and return its ``public_id``, ``url``, ``format`` and ``bytes``
+
+        ``filename`` (the original name) is used for type detection when
+        ``file`` is raw bytes; ``options`` are Cloudinary upload parameters.
+        """
+        if filename is None and isinstance(file, str):
+            filename = os.path.basename(file)
+        async with self._slots:
+            return await self._upload(file, folder, public_id or uuid.uuid4().hex, resource_type, filename, options)
+
+    async def _upload(
+        self, file: Upload, folder: str, public_id: str, resource_type: str, filename: Optional[str], options: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    async def delete(self, public_id: str, resource_type: str = "image") -> bool:
+        raise NotImplementedError
+
+    async def aclose(self) -> None:
+        pass
+
+
+class CloudinaryStorage(StorageBackend):
+    """Cloudinary Upload API client with pooled connections, chunking and retries"""
+
+    def __init__(self, transport: Optional[httpx.AsyncBaseTransport] = None):
+        super().__init__()
+        self._transport = transport  # injectable for offline benchmarks
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            # One keep-alive connection per upload slot, reused across uploads
+            transport = self._transport or httpx.AsyncHTTPTransport(
+                limits=httpx.Limits(max_connections=max(1, settings.STORAGE_MAX_CONCURRENT_UPLOADS)),
+                retries=0,
+            )
+            self._client = outbound_client("cloudinary", transport=transport, timeout=settings.STORAGE_UPLOAD_TIMEOUT_SECONDS)
+        return self._client
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    @staticmethod
+    def _form_fields(params: Dict[str, Any]) -> Dict[str, Any]:
+        """Signed multipart fields, named the way the SDK's call_api sends them"""
+        signed = cloudinary.utils.sign_request(cloudinary.utils.cleanup_params(params), {})
+        fields = {}
+        for key, value in signed.items():
+            if isinstance(value, list):
+                fields[f"{key}[]"] = [str(item) for item in value]
+            elif value:
+                fields[key] = str(value)
+        return fields
+
+    async def _post(self, url: str, fields: Dict[str, Any], files=None, headers=None) -> Dict[str, Any]:
+        attempts = max(1, settings.STORAGE_UPLOAD_RETRIES + 1)
+        for attempt in range(1, attempts + 1):
+            try:
+                response = await self.client.post(url, data=fields, files=files, headers=headers)
+                if response.status_code not in _RETRY_STATUSES:
+                    body = response.json()
+                    if response.status_code >= 400 or "error" in body:
+                        raise StorageError(f"Cloudinary rejected the request ({response.status_code}): {body.get('error')}")
+                    return body
+                failure = f"HTTP {response.status_code}"
+            except (httpx.TransportError, ValueError) as e:
+                failure = repr(e)
+            if attempt == attempts:
+                raise StorageError(f"Cloudinary request failed after {attempts} attempts: {failure}")
+            delay = _RETRY_BASE_DELAY_SECONDS * 2 ** (attempt - 1) * (1 + random.random())
+            logger.warning(f"Cloudinary request failed ({failure}); retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+    async def _upload(
+        self, file: Upload, folder: str, public_id: str, resource_type: str, filename: Optional[str], options: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        params = cloudinary.utils.build_upload_params(folder=folder, public_id=public_id, **options)
+        url = cloudinary.utils.cloudinary_api_url("upload", resource_type=resource_type)
+        filename = filename or public_id
+        size = await asyncio.to_thread(os.path.getsize, file) if isinstance(file, str) else len(file)
+        chunk_size = max(_MIN_CHUNK_SIZE, settings.STORAGE_CHUNK_SIZE_BYTES)
+
+        if size <= chunk_size:
+            content = await asyncio.to_thread(Path(file).read_bytes) if isinstance(file, str) else file
+            result = await self._post(url, self._form_fields(params), files={"file": (filename, content)})
+        else:
+            # Chunked upload: same signed params per part, tied together by X-Unique-Upload-Id
+            upload_id = uuid.uuid4().hex
+            result = {}
+            for offset in range(0, size, chunk_size):
+                chunk = (
+                    await asyncio.to_thread(_read_range, file, offset, chunk_size) if isinstance(file, str)
+                    else file[offset:offset + chunk_size]
+                )
+                headers = {
+                    "Content-Range": f"bytes {offset}-{offset + len(chunk) - 1}/{size}",
+                    "X-Unique-Upload-Id": upload_id,
+                }
+                result = await self._post(url, self._form_fields(params), files={"file": (filename, chunk)}, headers=headers)
+
+        return {
+            "public_id": result.get("public_id"),
+            "url": result.get("secure_url"),
+            "version": result.get("version"),
+            "format": result.get("format"),
+            "width": result.get("width"),
+            "height": result.get("height"),
+            "bytes": result.get("bytes", size),
+        }
+
+    async def delete(self, public_id: str, resource_type: str = "image") -> bool:
+        url = cloudinary.utils.cloudinary_api_url("destroy", resource_type=resource_type)
+        try:
+            result = await self._post(url, self._form_fields({"public_id": public_id, "timestamp": cloudinary.utils.now()}))
+        except StorageError as e:
+            logger.error("Error deleting document", error=e)
+            return False
+        return result.get("result") == "ok"
+
+
+class LocalStorage(StorageBackend):
+    """Stores files on the local filesystem; upload options other than folder/public_id are ignored"""
+
+    def __init__(self, root: Optional[str] = None, base_url: Optional[str] = None):
+        super().__init__()
+        self.root = Path(root or settings.STORAGE_LOCAL_DIR).resolve()
+        self.base_url = (base_url if base_url is not None else settings.STORAGE_LOCAL_BASE_URL).rstrip("/")
+
+    def _path(self, folder: str, public_id: str) -> Path:
+        path = (self.root / folder / public_id).resolve()
+        if self.root not in path.parents:
+            raise StorageError(f"Refusing to write outside the storage root: {folder}/{public_id}")
+        return path
+
+    @staticmethod
+    def _write(target: Path, file: Upload) -> int:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        partial = target.with_name(f".{target.name}.{uuid.uuid4().hex[:8]}")
+        if isinstance(file, str):
+            chunk_size = max(_MIN_CHUNK_SIZE, settings.STORAGE_CHUNK_SIZE_BYTES)
+            with open(file, "rb") as source, open(partial, "wb") as output:
+                while chunk := source.read(chunk_size):
+                    output.write(chunk)
+        else:
+            partial.write_bytes(file)
+        os.replace(partial, target)
+        return target.stat().st_size
+
+    async def _upload(
+        self, file: Upload, folder: str, public_id: str, resource_type: str, filename: Optional[str], options: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        # Keep the original extension so the file is served with the right content type
+        extension = os.path.splitext(filename or "")[1]
+        if extension and not public_id.endswith(extension):
+            public_id += extension
+        target = self._path(folder, public_id)
+        size = await asyncio.to_thread(self._write, target, file)
+        relative = target.relative_to(self.root).as_posix()
+        return {
+            "public_id": f"{folder}/{public_id}",
+            "url": f"{self.base_url}/{relative}",
+            "version": None,
+            "format": target.suffix.lstrip(".") or None,
+            "width": None,
+            "height": None,
+            "bytes": size,
+        }
+
+    async def delete(self, public_id: str, resource_type: str = "image") -> bool:
+        folder, _, name = public_id.rpartition("/")
+        path = self._path(folder, name)
+        try:
+            await asyncio.to_thread(path.unlink)
+        except FileNotFoundError:
+            return False
+        return True
+
+
+_storage: Optional[StorageBackend] = None
+
+
+def get_storage() -> StorageBackend:
+    """Process-wide storage backend chosen by STORAGE_BACKEND"""
+    global _storage
+    if _storage is None:
+        if settings.STORAGE_BACKEND == "local":
+            _storage = LocalStorage()
+        elif settings.STORAGE_BACKEND == "cloudinary":
+            _storage = CloudinaryStorage()
+        else:
+            raise ValueError(f"Unknown STORAGE_BACKEND {settings.STORAGE_BACKEND!r}")
+    return _storage
+
+
+async def close_storage() -> None:
+    global _storage
+    if _storage is not None:
+        await _storage.aclose()
+        _storage = None
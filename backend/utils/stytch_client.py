@@ -1,6 +1,8 @@
-import stytch
 from config import settings
 from utils.logger import logger
+from utils.lazy import lazy_import
+
+stytch = lazy_import("stytch")
 
 _stytch_client = None
 
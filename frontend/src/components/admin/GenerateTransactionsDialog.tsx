@@ -39,6 +39,7 @@ interface PreviewData {
     closing_balance: number
     net_change: number
   }
+  seed: number
 }
 
 export function GenerateTransactionsDialog({
@@ -159,7 +160,8 @@ export function GenerateTransactionsDialog({
           starting_balance: parseFloat(startingBalance),
           closing_balance: parseFloat(closingBalance),
           transaction_count: parseInt(transactionCount),
-          currency: account.currency || 'USD'
+          currency: account.currency || 'USD',
+          seed: previewData?.seed
         })
       )
       
@@ -15,15 +15,17 @@ export function useAdminRealtime(channelName: string, onUpdate: (payload: any) =
 
     const connect = async () => {
       try {
-        const res = await fetch(`${API_BASE_URL}/admin/system/settings?admin_id=${adminId}`)
-        const json = await res.json()
-        const enabled = json?.success && json.data?.real_time_enabled
-        if (!enabled || cancelled) return
-
         // Get admin token from localStorage
         const token = localStorage.getItem('admin_token')
         if (!token) return
 
+        const res = await fetch(`${API_BASE_URL}/admin/system/settings?admin_id=${adminId}`, {
+          headers: { 'Authorization': `Bearer ${token}` },
+        })
+        const json = await res.json()
+        const enabled = json?.success && json.data?.real_time_enabled
+        if (!enabled || cancelled) return
+
         const client = new Ably.Realtime({
           authUrl: `${API_BASE_URL}/admin/realtime/token?admin_id=${adminId}`,
           authHeaders: {